@@ -12,6 +12,47 @@ PINECONE_INDEX = "temp"
 DB_PATH = "Pinecone"    #크로마에서만 사용
 COLLECTION = "semantic_0"   #크로마에서만 사용
 PROMPT_YAML = "get_similarity/data/prompt.yaml"
+SNAPSHOT_PATH = "./data/snapshot"   #로컬 JD 벡터 스냅샷 (get_similarity/dev/build_snapshot.py로 생성)
+MATCHER_MODE = "fused"  #["fused", "parallel"] DenseMatcher scoring 방식
+MATCHER_AGGREGATION = "mean"    #["mean", "maxsim", "topm", "coverage"] CV 청크 x JD 청크 유사도 → Job 점수 집계 방식
+AGGREGATION_TOP_M = 3   #topm 집계에서 CV 청크별로 평균할 상위 JD 청크 수
+COVERAGE_THRESHOLD = 0.4    #coverage 집계에서 CV 청크가 JD에 충족됐다고 보는 최소 유사도
+ANN_TOP_K = 50  #ANN 1단계에서 CV 청크별로 가져올 JD 청크 수
+CENTROID_TOP_JOBS = 300 #Job centroid 인덱스 1단계에서 청크 단위 재정렬로 확장할 Job 수
+CENTROID_MEDOIDS = 3    #Job별로 저장할 medoid 청크 수 (centroid 인덱스 생성 시)
+CENTROID_WEIGHT = 0.8   #centroid 인덱스 coarse 점수에서 centroid 점수 가중치 (나머지는 medoid 점수)
+QUANTIZATION = "none"   #["none", "fp16", "int8", "pq"] 스냅샷 압축 벡터로 1차 scoring (build_snapshot.py --quantize로 생성)
+QUANTIZED_RESCORE_FACTOR = 3    #압축 벡터 점수 상위 (rank_depth x N)개 Job을 float32 원본으로 재계산
+SEARCH_MODE = "two_stage"   #["two_stage", "full_scan"] two_stage: 후보 Job 생성 후 후보 청크만 재정렬, full_scan: 전체 Job 재정렬 (작은 인덱스용)
+CANDIDATE_TOP_K = 100   #two_stage(Pinecone) 1단계에서 가져올 JD 청크 수 (청크가 속한 Job이 후보)
+CHUNK_FETCH_PROBE = 16  #two_stage(Pinecone) 후보 Job 청크 전체를 fetch할 때 Job마다 한 번에 요청할 청크 ID 수 (모두 있으면 다음 구간을 이어서 요청)
+FULL_SCAN_TOP_K = 2000  #Pinecone에서 한 번에 가져올 최대 JD 청크 수 (full_scan / 후보 청크 조회)
+RECALL_SAMPLE_RATE = 0.0    #two_stage 요청 중 full_scan 결과와 비교해 후보 recall을 측정할 비율 (0이면 측정 안 함)
+HEALTH_CHECK_INTERVAL = 300    #Vector DB 백그라운드 상태 확인 주기(초)
+BM25_PATH = "./data/bm25"   #BM25 lexical 인덱스 (get_similarity/dev/insert_chunks_pc&bm25.py로 생성)
+LEXICAL_TOP_K = 50  #hybrid 검색 시 dense/lexical 각각 RRF에 넣을 Job 수
+RRF_K = 60  #RRF 상수 (클수록 하위 순위의 기여도가 커짐)
+FUSION_METHOD = "rrf"   #["rrf", "combsum"] dense/lexical 순위 결합 방식
+LEXICAL_WEIGHT = 1.0    #fusion 시 BM25 순위 가중치 (dense = 1.0)
+FILTER_EXPIRED_JOBS = True  #재정렬 시 마감일이 지난 공고 제외 (마감일 없는 공고는 유지)
+NEAR_DUP_PATH = os.getenv("NEAR_DUP_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "near_dup")) #JD 근사 중복(MinHash LSH) 인덱스 (적재 스크립트와 preprocess /upsert_jd가 cluster_id를 부여하며 갱신, preprocess와 같은 경로)
+NEAR_DUP_THRESHOLD = 0.8    #같은 cluster로 묶을 JD 본문 단어 shingle Jaccard 유사도
+NEAR_DUP_NUM_PERM = 128 #MinHash 해시 함수 수
+COLLAPSE_NEAR_DUPLICATES = True #최종 순위에서 cluster_id가 같은 Job은 점수가 가장 높은 하나만 추천
+COLLAPSE_RANK_FACTOR = 3    #근사 중복 제거 후에도 top_n개가 남도록 재정렬 결과를 (top_n x N)개까지 가져옴
+INDEX_VERSION_PATH = os.getenv("INDEX_VERSION_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "index_version"))    #JD 적재 시 갱신되는 인덱스 버전 stamp (결과 캐시 무효화용, preprocess와 같은 파일: 실행 위치와 무관한 절대 경로, 환경변수로 공유)
+RESULT_CACHE_TTL = 3600     #/matching 결과 캐시 유효 시간(초)
+RESULT_CACHE_MAX_ITEMS = 1024   #/matching 결과 캐시 최대 개수 (LRU)
+BLOCKING_WORKERS = 8    #/matching의 blocking 단계(DB 조회, 임베딩, scoring)를 실행할 thread 수
+PARSER_CONCURRENCY = 4  #/matching/batch에서 동시에 호출할 이력서 파싱 요청 수
+STAGE_TIMEOUTS = {      #/matching 단계별 timeout(초)
+    "parse": 120,       #이력서 PDF 파싱 (Upstage document-parse)
+    "resources": 60,    #임베딩 모델/Vector DB 초기화
+    "retrieve": 20,     #Vector DB 후보 검색
+    "embed": 30,        #CV 청크 임베딩
+    "fetch": 30,        #Pinecone JD 벡터 조회 (스냅샷 없을 때)
+    "score": 30,        #ANN / dense scoring / lexical fusion
+}
 
 ### General api key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -21,6 +62,15 @@ JD_PATH = "./data/jd_origin"
 UPLOAD_PATH = "./data/uploads"
 PROCESSED_PATH = "./data/processed"
 CACHE_PATH = "./data/cache"
+EMBEDDING_CACHE_MAX_MB = 512    #CV 청크 임베딩 디스크 캐시 최대 크기
+EMBEDDING_CACHE_MEMORY_ITEMS = 4096     #메모리 LRU에 보관할 임베딩 개수
+EMBEDDING_BATCH_WINDOW_MS = 5   #동시 요청의 임베딩 텍스트를 모으는 시간 창(ms)
+EMBEDDING_MAX_BATCH = 100   #임베딩 API 한 번에 보낼 최대 텍스트 수 (Upstage 최대 100)
+EMBED_WORKERS = 4   #JD 적재 시 동시 임베딩 API 호출 수
+UPSERT_WORKERS = 2  #JD 적재 시 동시 Vector DB upsert 호출 수
+INGEST_QUEUE_SIZE = 4   #적재 파이프라인 단계 사이에 쌓아 둘 최대 배치 수 (backpressure)
+INGEST_MAX_RETRIES = 5  #임베딩 / upsert 429 응답 재시도 횟수 (지수 backoff + jitter)
+EMBEDDING_MODEL = "solar-embedding-1-large" #JD / CV 임베딩 모델 (청크 content_hash에 포함되므로 바꾸면 다음 적재 때 모든 청크를 다시 임베딩, preprocess와 같은 값)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY", "")
 LANGFUSE_SECRET_KEY = os.getenv("LANGFUSE_SECRET_KEY", "")
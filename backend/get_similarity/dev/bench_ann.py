@@ -0,0 +1,86 @@
+"""
+IVF-Flat ANN 인덱스 recall@k / latency 벤치마크 (정확한 brute-force 검색 대비)
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_ann
+python -m get_similarity.dev.bench_ann --vectors 2000 20000 --dim 512 --nprobe 1 4 16
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from get_similarity.index.ann import IVFFlatIndex, _l2_normalize
+
+
+def make_clustered(num_vectors, dim, num_topics=64, noise=0.6, seed=0):
+    """직무 토픽 주변에 모인 JD 청크를 흉내낸 군집형 랜덤 벡터"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((num_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, num_topics, size=num_vectors)
+    vectors = topics[labels] + noise * rng.standard_normal((num_vectors, dim)).astype(np.float32)
+    return _l2_normalize(vectors), topics
+
+
+def brute_force(vectors, queries, k):
+    sims = queries @ vectors.T
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def run(num_vectors, dim, num_queries, k, nprobes, repeat):
+    vectors, topics = make_clustered(num_vectors, dim)
+    rng = np.random.default_rng(1)
+    queries = _l2_normalize(topics[rng.integers(0, len(topics), num_queries)] + 0.8 * rng.standard_normal((num_queries, dim)))
+    ids = [str(i) for i in range(num_vectors)]
+
+    start = time.perf_counter()
+    index = IVFFlatIndex(dim=dim).build(vectors, ids)
+    build_s = time.perf_counter() - start
+
+    exact = brute_force(vectors, queries, k)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        brute_force(vectors, queries, k)
+        times.append(time.perf_counter() - start)
+    rows = [{"method": "brute_force", "nprobe": None, "recall": 1.0, "latency_ms": float(np.median(times)) * 1000}]
+
+    for nprobe in nprobes:
+        index.search(queries, k=k, nprobe=nprobe)  # warm-up
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _, found = index.search(queries, k=k, nprobe=nprobe)
+            times.append(time.perf_counter() - start)
+        recall = np.mean([len(exact[q] & {int(i) for i in found[q]}) / k for q in range(num_queries)])
+        rows.append({"method": "ivf_flat", "nprobe": nprobe, "recall": float(recall), "latency_ms": float(np.median(times)) * 1000})
+
+    return {"vectors": num_vectors, "dim": dim, "nlist": index.nlist, "k": k, "queries": num_queries, "build_s": build_s, "results": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, nargs="+", default=[2000, 20000, 200000])
+    parser.add_argument("--dim", type=int, default=4096, help="solar-embedding-1-large = 4096")
+    parser.add_argument("--queries", type=int, default=12, help="CV 청크 수 (요청당 쿼리 수)")
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    reports = []
+    for n in args.vectors:
+        report = run(n, args.dim, args.queries, args.k, args.nprobe, args.repeat)
+        reports.append(report)
+        print(f"\n=== {n} vectors (dim={args.dim}, nlist={report['nlist']}, build {report['build_s']:.1f}s) ===")
+        print(f"{'method':>12} {'nprobe':>7} {'recall@' + str(args.k):>10} {'latency(ms)':>12}")
+        for r in report["results"]:
+            print(f"{r['method']:>12} {str(r['nprobe'] or '-'):>7} {r['recall']:>10.3f} {r['latency_ms']:>12.2f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,82 @@
+"""
+Job centroid coarse-to-fine 매칭 벤치마크 (전체 청크 fused scoring 대비 latency / recall@top_n)
+
+JD 수를 늘려가며 측정합니다. coarse-to-fine은 Job 대표 벡터 점수 계산 후 상위 expand개 Job만 청크 단위로 재정렬하므로
+재정렬(rerank) 비용은 JD 수와 무관하게 거의 일정해야 합니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_centroids
+python -m get_similarity.dev.bench_centroids --jobs 2000 20000 --dim 512 --expand 100 300
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from get_similarity.dev.bench_ann import make_clustered
+from get_similarity.index.centroids import JobCentroidIndex
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+def _median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, float(np.median(times)) * 1000
+
+
+def run(num_jobs, chunks_per_job, dim, num_queries, top_n, expands, repeat, centroid_weight=0.8):
+    rng = np.random.default_rng(0)
+    counts = rng.integers(max(1, chunks_per_job // 2), chunks_per_job * 3 // 2 + 1, size=num_jobs)
+    vectors, topics = make_clustered(int(counts.sum()), dim)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    corpus = ChunkCorpus(vectors, offsets, [str(j) for j in range(num_jobs)])
+    cv = list(topics[rng.integers(0, len(topics), num_queries)] + 0.8 * rng.standard_normal((num_queries, dim)))
+    matcher = DenseMatcher(mode="fused")
+
+    start = time.perf_counter()
+    index = JobCentroidIndex(dim=dim, centroid_weight=centroid_weight).build(vectors, offsets, corpus.job_ids)
+    build_s = time.perf_counter() - start
+
+    exact, full_ms = _median_ms(lambda: matcher.rank(cv, corpus, top_k=top_n), repeat)
+    exact_ids = {job["job_id"] for job in exact}
+    rows = [{"method": "full_scan", "expand": None, "coarse_ms": 0.0, "rerank_ms": full_ms, "recall": 1.0}]
+
+    for expand in expands:
+        (positions, _), coarse_ms = _median_ms(lambda: index.search(np.asarray(cv), k=expand), repeat)
+        found, rerank_ms = _median_ms(lambda: matcher.rank(cv, corpus.select(positions), top_k=top_n), repeat)
+        recall = len(exact_ids & {job["job_id"] for job in found}) / len(exact_ids)
+        rows.append({"method": "centroid", "expand": expand, "coarse_ms": coarse_ms, "rerank_ms": rerank_ms, "recall": recall})
+
+    return {"jobs": num_jobs, "chunks": int(counts.sum()), "dim": dim, "top_n": top_n, "build_s": build_s, "results": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[2000, 10000, 40000])
+    parser.add_argument("--chunks-per-job", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=12, help="CV 청크 수")
+    parser.add_argument("--top-n", type=int, default=50, help="recall 기준 상위 Job 수 (hybrid rank_depth)")
+    parser.add_argument("--expand", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--centroid-weight", type=float, default=0.8, help="coarse 점수의 centroid 가중치")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    reports = []
+    for n in args.jobs:
+        report = run(n, args.chunks_per_job, args.dim, args.queries, args.top_n, args.expand, args.repeat, args.centroid_weight)
+        reports.append(report)
+        print(f"\n=== {n} jobs / {report['chunks']} chunks (dim={args.dim}, build {report['build_s']:.1f}s) ===")
+        print(f"{'method':>10} {'expand':>7} {'coarse(ms)':>11} {'rerank(ms)':>11} {'recall@' + str(args.top_n):>10}")
+        for r in report["results"]:
+            print(f"{r['method']:>10} {str(r['expand'] or '-'):>7} {r['coarse_ms']:>11.2f} {r['rerank_ms']:>11.2f} {r['recall']:>10.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,103 @@
+"""
+DenseMatcher scoring 방식 벤치마크
+기존 Job별 thread-pool 경로(parallel)와 단일 GEMM + segment reduction 경로(fused)를 비교합니다.
+--aggregations를 주면 fused 경로에서 집계 방식(mean / maxsim / topm / coverage)별 latency도 함께 측정합니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_matcher
+python -m get_similarity.dev.bench_matcher --chunks 2000 20000 --dim 1024 --repeat 5
+python -m get_similarity.dev.bench_matcher --chunks 20000 200000 --dim 1024 --aggregations mean maxsim topm coverage
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+def make_corpus(num_chunks, dim, chunks_per_job=8, seed=0):
+    """평균 chunks_per_job개 청크를 가진 랜덤 JD 코퍼스를 job_embeddings_map 형식으로 생성합니다."""
+    rng = np.random.default_rng(seed)
+    job_embeddings_map = {}
+    remaining, j = num_chunks, 0
+    while remaining > 0:
+        m = min(remaining, int(rng.integers(1, 2 * chunks_per_job)))
+        vecs = rng.standard_normal((m, dim)).astype(np.float32)
+        job_embeddings_map[f"job{j}"] = [{"text": "", "values": v} for v in vecs]
+        remaining -= m
+        j += 1
+    return job_embeddings_map
+
+
+def timeit(fn, repeat):
+    fn()  # warm-up (Numba JIT 컴파일 포함)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def run(num_chunks, dim, num_cv, repeat, workers, aggregations=()):
+    job_embeddings_map = make_corpus(num_chunks, dim)
+    cv_vectors = list(np.random.default_rng(1).standard_normal((num_cv, dim)).astype(np.float32))
+
+    parallel = DenseMatcher(num_workers=workers, mode="parallel")
+    fused = DenseMatcher(mode="fused")
+    corpus = ChunkCorpus.from_job_map(job_embeddings_map)
+
+    t_parallel = timeit(lambda: parallel.compute_batch_parallel(cv_vectors, job_embeddings_map), repeat)
+    t_fused = timeit(lambda: fused.compute_fused(cv_vectors, corpus), repeat)
+    t_build = timeit(lambda: ChunkCorpus.from_job_map(job_embeddings_map), 1)
+
+    # 두 경로의 점수가 같은지 확인
+    expected = {r["job_id"]: r["final_score"] for r in parallel.compute_batch_parallel(cv_vectors, job_embeddings_map)}
+    scores = fused.compute_fused(cv_vectors, corpus)
+    max_err = max(abs(expected[jid] - scores[j]) for j, jid in enumerate(corpus.job_ids))
+
+    aggregation_ms = {
+        name: timeit(lambda: DenseMatcher(mode="fused", aggregation=name).compute_fused(cv_vectors, corpus), repeat) * 1000
+        for name in aggregations
+    }
+
+    return {
+        "chunks": num_chunks,
+        "jobs": corpus.num_jobs,
+        "dim": dim,
+        "cv_chunks": num_cv,
+        "parallel_ms": t_parallel * 1000,
+        "fused_ms": t_fused * 1000,
+        "corpus_build_ms": t_build * 1000,
+        "speedup": t_parallel / t_fused,
+        "max_abs_err": float(max_err),
+        "aggregation_ms": aggregation_ms,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2000, 20000, 200000])
+    parser.add_argument("--dim", type=int, default=4096, help="solar-embedding-1-large = 4096")
+    parser.add_argument("--cv_chunks", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--aggregations", type=str, nargs="*", default=[], help="fused 경로에서 측정할 집계 방식")
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'chunks':>8} {'jobs':>7} {'parallel(ms)':>13} {'fused(ms)':>10} {'speedup':>8} {'max_err':>9}")
+    for n in args.chunks:
+        r = run(n, args.dim, args.cv_chunks, args.repeat, args.workers, args.aggregations)
+        results.append(r)
+        print(f"{r['chunks']:>8} {r['jobs']:>7} {r['parallel_ms']:>13.1f} {r['fused_ms']:>10.1f} {r['speedup']:>7.1f}x {r['max_abs_err']:>9.2e}")
+        for name, ms in r["aggregation_ms"].items():
+            print(f"{'':>8} {'':>7} {'fused/' + name:>13} {ms:>10.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,100 @@
+"""
+스냅샷 압축 벡터(fp16 / int8 / pq) 벤치마크 - 용량, scoring latency, recall@top_n (float32 full scan 대비)
+
+recall은 압축 code 점수만 사용했을 때와, 상위 (top_n x rescore_factor)개 Job을 float32로 재계산했을 때를 함께 측정합니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_quantize
+python -m get_similarity.dev.bench_quantize --jobs 5000 --dim 1024 --methods int8 pq --pq-subspaces 256
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from get_similarity.dev.bench_ann import make_clustered
+from get_similarity.index.quantize import train_codec
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+def _timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, float(np.median(times)) * 1000
+
+
+def _recall(found, exact_ids):
+    return len(exact_ids & {job["job_id"] for job in found}) / len(exact_ids)
+
+
+def run(num_jobs, chunks_per_job, dim, num_queries, top_n, methods, rescore_factor, pq_subspaces, repeat):
+    rng = np.random.default_rng(0)
+    vectors, topics = make_clustered(num_jobs * chunks_per_job, dim)
+    offsets = np.arange(0, len(vectors) + 1, chunks_per_job)
+    job_ids = [str(j) for j in range(num_jobs)]
+    exact_corpus = ChunkCorpus(vectors, offsets, job_ids)
+    cv = list(topics[rng.integers(0, len(topics), num_queries)] + 0.8 * rng.standard_normal((num_queries, dim)))
+    matcher = DenseMatcher(mode="fused")
+
+    exact, exact_ms = _timed(lambda: matcher.rank(cv, exact_corpus, top_k=top_n), repeat)
+    exact_ids = {job["job_id"] for job in exact}
+    rows = [{"method": "float32", "mb": vectors.nbytes / 2**20, "ratio": 1.0, "score_ms": exact_ms, "rescore_ms": 0.0, "recall": 1.0, "recall_rescored": 1.0}]
+
+    for method in methods:
+        start = time.perf_counter()
+        codec = train_codec(method, vectors, pq_subspaces=pq_subspaces)
+        codes = codec.encode(vectors)
+        build_s = time.perf_counter() - start
+        corpus = ChunkCorpus(codes, offsets, job_ids, codec=codec)
+
+        coarse, score_ms = _timed(lambda: matcher.rank(cv, corpus, top_k=top_n * rescore_factor), repeat)
+        positions = [int(job["job_id"]) for job in coarse]
+        rescored, rescore_ms = _timed(lambda: matcher.rank(cv, exact_corpus.select(positions), top_k=top_n), repeat)
+        rows.append({
+            "method": method,
+            "mb": codes.nbytes / 2**20,
+            "ratio": vectors.nbytes / codes.nbytes,
+            "build_s": build_s,
+            "score_ms": score_ms,
+            "rescore_ms": rescore_ms,
+            "recall": _recall(coarse[:top_n], exact_ids),
+            "recall_rescored": _recall(rescored, exact_ids),
+        })
+
+    return {"jobs": num_jobs, "chunks": len(vectors), "dim": dim, "top_n": top_n, "rescore_factor": rescore_factor, "results": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--chunks-per-job", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=12, help="CV 청크 수")
+    parser.add_argument("--top-n", type=int, default=50, help="recall 기준 상위 Job 수 (hybrid rank_depth)")
+    parser.add_argument("--methods", type=str, nargs="+", default=["fp16", "int8", "pq"])
+    parser.add_argument("--rescore-factor", type=int, default=3)
+    parser.add_argument("--pq-subspaces", type=int, default=None, help="PQ 부분공간 수 (기본값: D/4)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    reports = []
+    for n in args.jobs:
+        report = run(n, args.chunks_per_job, args.dim, args.queries, args.top_n, args.methods, args.rescore_factor, args.pq_subspaces, args.repeat)
+        reports.append(report)
+        print(f"\n=== {n} jobs / {report['chunks']} chunks (dim={args.dim}, top_n={args.top_n}) ===")
+        print(f"{'method':>8} {'MB':>8} {'ratio':>6} {'score(ms)':>10} {'rescore(ms)':>12} {'recall':>7} {'+rescore':>9}")
+        for r in report["results"]:
+            print(
+                f"{r['method']:>8} {r['mb']:>8.1f} {r['ratio']:>5.0f}x {r['score_ms']:>10.2f} {r['rescore_ms']:>12.2f}"
+                f" {r['recall']:>7.3f} {r['recall_rescored']:>9.3f}"
+            )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
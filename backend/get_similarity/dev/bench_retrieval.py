@@ -0,0 +1,204 @@
+"""
+검색 파이프라인 오프라인 벤치마크 - 단계별 latency와 정답 순위 대비 recall@k / nDCG@k (API 키 / 네트워크 불필요)
+
+합성 코퍼스(dev/synthetic.py)의 JD를 HashingEmbedder로 임베딩해 임시 로컬 스냅샷을 만들고,
+이력서마다 /matching의 스냅샷 경로와 같은 순서로 실행하며 단계별 시간을 잽니다.
+    segment   HierarchicalSegmenter로 CV 청크 분할 (search._segment_cv와 같은 설정)
+    embed     CV 청크 임베딩
+    fetch     재정렬할 후보 Job 선택 (full_scan: 전체 / centroid: Job centroid 상위 expand개 / ann: IVF 청크 검색)
+    score     후보 Job 청크 fused scoring (DenseMatcher)
+    sort      상위 top_k Job 정렬
+품질은 합성 정답 relevance 기준 recall@k(relevance 2 이상 Job), nDCG@k와 full_scan 상위 Job 대비 후보 recall로 기록합니다.
+
+결과를 JSON으로 저장하고 --baseline으로 이전 결과와 비교할 수 있어, 매칭 최적화 전후를 로컬에서 회귀 비교할 수 있습니다.
+(--max-ndcg-drop을 넘게 nDCG가 떨어지면 exit code 1)
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_retrieval --out bench.json
+python -m get_similarity.dev.bench_retrieval --jobs 20000 --resumes 100 --expand 100 300 --nprobe 4 16
+python -m get_similarity.dev.bench_retrieval --baseline bench.json --max-ndcg-drop 0.01
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from get_similarity.dev.synthetic import HashingEmbedder, make_corpus
+from get_similarity.index import IVFFlatIndex, JobCentroidIndex, SnapshotWriter, load_snapshot
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+from get_similarity.utils.segmenter import HierarchicalSegmenter
+from get_similarity.utils.stage_metrics import StageMetrics, ndcg_at_k, recall_at_k
+
+STAGES = ["segment", "embed", "fetch", "score", "sort", "total"]
+
+
+def build_snapshot(jobs, embedder, root):
+    """합성 JD 청크를 임베딩해 root에 스냅샷을 만들고 엽니다."""
+    writer = SnapshotWriter(root, dim=embedder.dim, model="hashing")
+    for job in jobs:
+        writer.add_job(job["job_id"], embedder.embed_documents(job["chunks"]), metadata=job["metadata"])
+    writer.commit()
+    return load_snapshot(root)
+
+
+def quality(ranked_ids, grades, k, min_grade=2):
+    """정답 relevance 기준 recall@k (relevance가 min_grade 이상인 Job 중 상위 k에 든 비율, 분모는 최대 k), nDCG@k"""
+    relevant = {job_id for job_id, g in grades.items() if g >= min_grade}
+    hits = len(relevant & set(ranked_ids[:k]))
+    recall = hits / min(k, len(relevant)) if relevant else 1.0
+    return recall, ndcg_at_k(ranked_ids, grades, k)
+
+
+def make_fetchers(snapshot, expands, nprobes, ann_top_k):
+    """후보 선택 방식별 fetch 함수 {이름: cv_matrix → Job 위치 (None이면 전체)}"""
+    fetchers = {"full_scan": lambda cv: None}
+    if expands:
+        centroid_index = JobCentroidIndex.from_snapshot(snapshot)
+        for expand in expands:
+            fetchers[f"centroid@{expand}"] = lambda cv, k=expand: centroid_index.search(cv, k=k)[0]
+    if nprobes:
+        ann_index = IVFFlatIndex.from_snapshot(snapshot)
+        for nprobe in nprobes:
+            fetchers[f"ann@{nprobe}"] = lambda cv, p=nprobe: snapshot.jobs_for_chunks(
+                [cid for hits in ann_index.search(cv, k=ann_top_k, nprobe=p)[1] for cid in hits]
+            )
+    return fetchers
+
+
+def run_method(fetch, resumes, embedder, corpus, matcher, top_k):
+    """
+    Returns:
+        latency: {stage: {"count", "mean", "p50", "p95"}} (ms)
+        rankings: 이력서별 상위 top_k Job ID
+        candidate_jobs: 이력서별 재정렬한 후보 Job 수
+    """
+    segmenter = HierarchicalSegmenter(min_chunk_length=100, max_chunk_length=300)
+    metrics, rankings, candidate_jobs = StageMetrics(), [], []
+    for resume in resumes:
+        start = time.perf_counter()
+        with metrics.timer("segment"):
+            cv_chunks = segmenter.segment(resume["text"]) or segmenter._segment_plaintext(resume["text"])
+        with metrics.timer("embed"):
+            cv_matrix = np.asarray(embedder.embed_documents(cv_chunks), dtype=np.float32)
+        with metrics.timer("fetch"):
+            positions = fetch(cv_matrix)
+            candidates = corpus if positions is None else corpus.select(positions)
+        with metrics.timer("score"):
+            scores = matcher.compute_fused(list(cv_matrix), candidates)
+        with metrics.timer("sort"):
+            k = min(top_k, scores.size)
+            top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+            ranked = [candidates.job_ids[j] for j in top[np.argsort(-scores[top], kind="stable")]]
+        metrics.record("total", (time.perf_counter() - start) * 1000)
+        rankings.append(ranked)
+        candidate_jobs.append(candidates.num_jobs)
+    return metrics.stats(), rankings, candidate_jobs
+
+
+def run(num_jobs, num_resumes, dim, top_k, expands, nprobes, ann_top_k, aggregation="mean", seed=0):
+    data = make_corpus(num_jobs, num_resumes, seed=seed)
+    embedder = HashingEmbedder(dim=dim)
+    matcher = DenseMatcher(mode="fused", aggregation=aggregation)
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        snapshot = build_snapshot(data["jobs"], embedder, root)
+        corpus = ChunkCorpus.from_snapshot(snapshot)
+        fetchers = make_fetchers(snapshot, expands, nprobes, ann_top_k)
+        build_s = time.perf_counter() - start
+
+        # warm-up (Numba JIT 컴파일 포함)
+        run_method(fetchers["full_scan"], data["resumes"][:1], embedder, corpus, matcher, top_k)
+
+        rows, reference = [], None
+        for name, fetch in fetchers.items():
+            latency, rankings, candidate_jobs = run_method(fetch, data["resumes"], embedder, corpus, matcher, top_k)
+            if reference is None:
+                reference = rankings
+            recalls, ndcgs = zip(*(quality(r, resume["grades"], top_k) for r, resume in zip(rankings, data["resumes"])))
+            rows.append({
+                "method": name,
+                "latency_ms": latency,
+                "candidate_jobs": float(np.mean(candidate_jobs)),
+                "candidate_recall": float(np.mean([recall_at_k(r, ref) for r, ref in zip(rankings, reference)])),
+                f"recall@{top_k}": float(np.mean(recalls)),
+                f"ndcg@{top_k}": float(np.mean(ndcgs)),
+            })
+
+        return {
+            "config": {
+                "jobs": num_jobs,
+                "chunks": snapshot.num_rows,
+                "resumes": num_resumes,
+                "dim": dim,
+                "top_k": top_k,
+                "aggregation": aggregation,
+                "seed": seed,
+            },
+            "build_s": build_s,
+            "results": rows,
+        }
+
+
+def compare(report, baseline, max_ndcg_drop=None):
+    """
+    baseline 결과와 방식별 total p50 latency 비율, nDCG 변화를 출력합니다.
+
+    Returns:
+        regressed: nDCG가 max_ndcg_drop보다 많이 떨어진 방식 목록
+    """
+    top_k = report["config"]["top_k"]
+    ndcg_key = f"ndcg@{top_k}"
+    old_rows = {r["method"]: r for r in baseline["results"]}
+    regressed = []
+    print(f"\n=== baseline 비교 ({baseline['config']}) ===")
+    for row in report["results"]:
+        old = old_rows.get(row["method"])
+        if old is None or ndcg_key not in old:
+            continue
+        speedup = old["latency_ms"]["total"]["p50"] / row["latency_ms"]["total"]["p50"]
+        delta = row[ndcg_key] - old[ndcg_key]
+        print(f"{row['method']:>14} total p50 {speedup:5.2f}x  {ndcg_key} {delta:+.4f}")
+        if max_ndcg_drop is not None and delta < -max_ndcg_drop:
+            regressed.append(row["method"])
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=1024, help="HashingEmbedder 차원")
+    parser.add_argument("--top-k", type=int, default=10, help="recall / nDCG 기준 상위 Job 수")
+    parser.add_argument("--expand", type=int, nargs="*", default=[100, 300], help="centroid 후보 Job 수 (비우면 생략)")
+    parser.add_argument("--nprobe", type=int, nargs="*", default=[4, 16], help="ANN nprobe (비우면 생략)")
+    parser.add_argument("--ann-top-k", type=int, default=50, help="ANN에서 CV 청크별로 가져올 JD 청크 수")
+    parser.add_argument("--aggregation", type=str, default="mean", choices=["mean", "maxsim", "topm", "coverage"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", type=str, default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-ndcg-drop", type=float, default=None, help="baseline 대비 허용 nDCG 하락폭")
+    args = parser.parse_args()
+
+    report = run(args.jobs, args.resumes, args.dim, args.top_k, args.expand, args.nprobe, args.ann_top_k, args.aggregation, args.seed)
+    config, k = report["config"], args.top_k
+    print(f"=== {config['jobs']} jobs / {config['chunks']} chunks / {config['resumes']} resumes (dim={args.dim}, build {report['build_s']:.1f}s) ===")
+    print(f"{'method':>14} " + " ".join(f"{s + '(ms)':>11}" for s in STAGES) + f" {'cands':>7} {'cand_rec':>8} {'recall@' + str(k):>9} {'ndcg@' + str(k):>8}")
+    for r in report["results"]:
+        stages = " ".join(f"{r['latency_ms'][s]['p50']:>11.3f}" for s in STAGES)
+        print(f"{r['method']:>14} {stages} {r['candidate_jobs']:>7.0f} {r['candidate_recall']:>8.3f} {r[f'recall@{k}']:>9.3f} {r[f'ndcg@{k}']:>8.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressed = compare(report, json.load(f), args.max_ndcg_drop)
+        if regressed:
+            print(f"[ERROR] nDCG 회귀: {', '.join(regressed)}")
+            sys.exit(1)
@@ -0,0 +1,116 @@
+"""
+HierarchicalSegmenter 처리량 벤치마크 - 기존 구현(util/segmenter.py) 대비 docs/s, MB/s, 출력 동일 여부
+
+코퍼스: 샘플 이력서(get_similarity/data/sample_resume.txt) + 합성 markdown CV + 합성 평문 JD,
+--csv를 주면 CSV의 텍스트 컬럼(예: JD description, 이력서 Resume)을 사용합니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.bench_segmenter
+python -m get_similarity.dev.bench_segmenter --csv ./data/jobs.csv --column description --repeat 5
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from get_similarity.utils.segmenter import HierarchicalSegmenter
+from util.segmenter import HierarchicalSegmenter as LegacySegmenter
+
+SAMPLE_RESUME = Path(__file__).resolve().parent.parent / "data" / "sample_resume.txt"
+
+_TASKS = [
+    "**Python**과 FastAPI로 결제 API 서버를 설계하고 운영했습니다",
+    "Kafka 기반 실시간 `event` 파이프라인 구축으로 처리 지연을 40% 줄였습니다",
+    "[사내 MLOps 플랫폼](https://example.com) 도입을 주도하고 모델 배포 주기를 단축했습니다",
+    "PostgreSQL 쿼리 튜닝 및 인덱스 재설계로 __p95__ latency 개선",
+    "신규 입사자 온보딩 문서화와 코드 리뷰 문화 정착에 기여",
+]
+_SENTENCES = [
+    "우리 회사는 핀테크 솔루션을 제공하는 스타트업입니다.",
+    "API 개발 및 유지보수를 담당합니다.",
+    "데이터베이스 설계 및 최적화 경험이 필요합니다!",
+    "Python 또는 Java 3년 이상 경험이 필요합니다.",
+    "AWS 또는 GCP 사용 경험을 우대합니다.",
+    "RESTful API 설계 경험이 있으신가요?",
+]
+
+
+def make_markdown_cv(rng):
+    lines = ["# 홍길동", "## 경력"]
+    for p in range(rng.randint(2, 5)):
+        lines += [f"### **프로젝트 {p}**", f"**기간:** 20{10 + p}.03 - 20{11 + p}.02", f"**개요:** {rng.choice(_TASKS)}"]
+        lines += [f"- {rng.choice(_TASKS)}" for _ in range(rng.randint(2, 8))]
+        lines.append("---")
+    lines += ["## 기술", "- " + ", ".join(rng.sample(["Python", "Go", "Kafka", "Spark", "K8s", "AWS"], 4))]
+    return "\n".join(lines)
+
+
+def make_plain_jd(rng):
+    paragraphs = []
+    for _ in range(rng.randint(3, 8)):
+        sep = rng.choice([" ", " | ", " • ", "\n"])
+        paragraphs.append(sep.join(rng.choice(_SENTENCES) for _ in range(rng.randint(2, 6))))
+    return "\n\n".join(paragraphs)
+
+
+def load_corpus(num_docs, csv_path=None, column="description", seed=0):
+    if csv_path:
+        import pandas as pd
+
+        return [str(t) for t in pd.read_csv(csv_path)[column].dropna()]
+    rng = random.Random(seed)
+    docs = [SAMPLE_RESUME.read_text(encoding="utf-8")]
+    for i in range(num_docs - 1):
+        docs.append(make_markdown_cv(rng) if i % 2 else make_plain_jd(rng))
+    return docs
+
+
+def _throughput(segment, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            segment(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(docs, repeat, min_chunk_length=100, max_chunk_length=300):
+    legacy = LegacySegmenter(min_chunk_length, max_chunk_length)
+    segmenter = HierarchicalSegmenter(min_chunk_length, max_chunk_length)
+    mismatches = sum(legacy.segment(doc) != segmenter.segment(doc) for doc in docs)
+    mb = sum(len(doc.encode("utf-8")) for doc in docs) / 2**20
+
+    rows = []
+    for name, segment in [
+        ("legacy", legacy.segment),
+        ("segment", segmenter.segment),
+        ("with_offsets", segmenter.segment_with_offsets),
+    ]:
+        seconds = _throughput(segment, docs, repeat)
+        rows.append({"method": name, "seconds": seconds, "docs_per_s": len(docs) / seconds, "mb_per_s": mb / seconds})
+
+    return {"docs": len(docs), "mb": mb, "mismatches": mismatches, "results": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000, help="합성 코퍼스 문서 수")
+    parser.add_argument("--csv", type=str, default=None, help="텍스트 컬럼이 있는 CSV (합성 코퍼스 대신 사용)")
+    parser.add_argument("--column", type=str, default="description")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run(load_corpus(args.docs, args.csv, args.column), args.repeat)
+    print(f"=== {report['docs']} docs / {report['mb']:.2f} MB (출력 불일치 {report['mismatches']}건) ===")
+    print(f"{'method':>13} {'seconds':>8} {'docs/s':>9} {'MB/s':>7}")
+    legacy_s = report["results"][0]["seconds"]
+    for r in report["results"]:
+        print(f"{r['method']:>13} {r['seconds']:>8.3f} {r['docs_per_s']:>9.0f} {r['mb_per_s']:>7.2f}  ({legacy_s / r['seconds']:.1f}x)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,55 @@
+"""
+Pinecone 인덱스(또는 로컬 Chroma collection) 전체를 로컬 JD 벡터 스냅샷(SNAPSHOT_PATH)으로 내려받는 코드입니다.
+인덱스를 업데이트한 뒤 한 번 실행하면, 서버는 다음 /matching 요청부터 새 스냅샷을 mmap으로 사용합니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.build_snapshot --index temp
+python -m get_similarity.dev.build_snapshot --db Chroma --index semantic_0   # 로컬 Chroma collection (DB_PATH, 네트워크 불필요)
+python -m get_similarity.dev.build_snapshot --index temp --ann --nprobe 8   # ANN(IVF-Flat) 인덱스도 함께 생성
+python -m get_similarity.dev.build_snapshot --index temp --no-centroids    # Job centroid 인덱스 생성 생략
+python -m get_similarity.dev.build_snapshot --index temp --quantize int8   # 압축 벡터(fp16 / int8 / pq)도 함께 생성
+"""
+
+import argparse
+
+from configs import CENTROID_MEDOIDS, CENTROID_WEIGHT, COLLECTION, DB_PATH, DB_TYPE, PINECONE_API_KEY, PINECONE_INDEX, QUANTIZATION, SNAPSHOT_PATH
+from get_similarity.index import (
+    ChromaIndex,
+    build_snapshot_ann,
+    build_snapshot_centroids,
+    build_snapshot_from_pinecone,
+    build_snapshot_quantized,
+    load_snapshot,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=str, default=DB_TYPE, choices=["Chroma", "Pinecone"], help="스냅샷을 만들 Vector DB")
+    parser.add_argument("--index", type=str, help="Pinecone 인덱스 이름 (Chroma는 collection 이름)", default=None)
+    parser.add_argument("--db-path", type=str, default=DB_PATH, help="Chroma persist 경로")
+    parser.add_argument("--out", type=str, help="스냅샷 저장 경로", default=SNAPSHOT_PATH)
+    parser.add_argument("--namespace", type=str, default="")
+    parser.add_argument("--ann", action="store_true", help="스냅샷 청크로 ANN(IVF-Flat) 인덱스 생성")
+    parser.add_argument("--nlist", type=int, default=None, help="ANN 클러스터 개수 (기본값: 4 * sqrt(N))")
+    parser.add_argument("--nprobe", type=int, default=8, help="ANN 검색 시 확인할 클러스터 개수")
+    parser.add_argument("--no-centroids", action="store_true", help="Job centroid/medoid 인덱스 생성 생략")
+    parser.add_argument("--medoids", type=int, default=CENTROID_MEDOIDS, help="Job별 medoid 청크 수")
+    parser.add_argument("--quantize", type=str, default=QUANTIZATION, choices=["none", "fp16", "int8", "pq"], help="스냅샷 압축 벡터 방식")
+    parser.add_argument("--pq-subspaces", type=int, default=None, help="PQ 부분공간 수 (기본값: D/4)")
+    args = parser.parse_args()
+
+    if args.db == "Chroma":
+        index = ChromaIndex.open(args.db_path, args.index or COLLECTION)
+    else:
+        from pinecone import Pinecone
+
+        index = Pinecone(api_key=PINECONE_API_KEY).Index(args.index or PINECONE_INDEX)
+    build_snapshot_from_pinecone(index, args.out, namespace=args.namespace, model="solar-embedding-1-large")
+    snapshot = load_snapshot(args.out)
+    if not args.no_centroids:
+        build_snapshot_centroids(snapshot, num_medoids=args.medoids, centroid_weight=CENTROID_WEIGHT)
+    if args.ann:
+        build_snapshot_ann(snapshot, nlist=args.nlist, nprobe=args.nprobe)
+    if args.quantize != "none":
+        build_snapshot_quantized(snapshot, method=args.quantize, pq_subspaces=args.pq_subspaces)
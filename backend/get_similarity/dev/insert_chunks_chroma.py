@@ -8,7 +8,10 @@ from langchain_openai import OpenAIEmbeddings
 from langchain.embeddings import CacheBackedEmbeddings
 from langchain.storage import LocalFileStore
 from langchain_chroma import Chroma
-from configs import JD_PATH, COLLECTION, DB_PATH
+from configs import JD_PATH, COLLECTION, DB_PATH, NEAR_DUP_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM
+from get_similarity.index import load_near_dup_index
+from get_similarity.utils.chunk_ids import make_chunk_id, stable_job_id
+from get_similarity.utils.ingest import set_hashes
 
 from dotenv import load_dotenv
 import os
@@ -36,13 +39,22 @@ def set_splitter(emb_model):
     return text_splitter
 
 
-def get_chunks(df, text_splitter):
+def get_chunks(df, text_splitter, near_dup_index=None):
     total_chunks = []
     for i, desciption in enumerate(df["description"]):
         # meta_data = [df.loc[i, df.columns != 'description'].to_dict()]
         meta_data = [df.loc[i].to_dict()]
-        chunk = text_splitter.create_documents([desciption], meta_data)
-        total_chunks.extend(chunk)
+        ## 같은 공고는 다시 적재해도 같은 청크 ID ("<job_id>__c<NNNN>", job_id는 URL 기반) → 중복 없이 덮어씀
+        job_id = stable_job_id(meta_data[0], desciption)
+        meta_data[0]["job_id"] = job_id
+        ## 문구만 조금 바뀐 재등록 공고는 같은 cluster_id (검색 시 하나로 합침)
+        if near_dup_index is not None:
+            meta_data[0]["cluster_id"] = near_dup_index.add(job_id, desciption)
+        chunks = text_splitter.create_documents([desciption], meta_data)
+        for c, chunk in enumerate(chunks):
+            chunk.id = make_chunk_id(job_id, c)
+            set_hashes(chunk.metadata, chunk.page_content)
+        total_chunks.extend(chunks)
     return total_chunks
 
 
@@ -50,12 +62,15 @@ def insert_chunks(document_path: str, collection: str):
     emb_model = load_emb_model()
 
     preprocessed_doc = preprocess(document_path)
-    total_chunks = get_chunks(preprocessed_doc, set_splitter(emb_model))
+    # 폴더의 csv를 차례로 적재하므로 근사 중복 인덱스는 이어서 사용
+    near_dup_index = load_near_dup_index(NEAR_DUP_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM)
+    total_chunks = get_chunks(preprocessed_doc, set_splitter(emb_model), near_dup_index)
 
     # 청크를 디스크에 저장. 저장시 persist_directory에 저장할 경로 지정
     # VectorDB에 저장할 때 임베딩 모델도 지정
-    db = Chroma.from_documents(total_chunks, emb_model, persist_directory=DB_PATH, collection_name=collection)
+    db = Chroma.from_documents(total_chunks, emb_model, ids=[chunk.id for chunk in total_chunks], persist_directory=DB_PATH, collection_name=collection)
     print("Completed inserting dataset into vector db")
+    near_dup_index.save(NEAR_DUP_PATH)
 
     return None
 
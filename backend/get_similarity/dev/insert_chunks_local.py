@@ -0,0 +1,167 @@
+"""
+입력 경로의 JD csv 파일들을 전처리한 다음 로컬 Chroma collection(DB_PATH / COLLECTION)에 적재하는 코드입니다.
+(insert_chunks_pc&bm25.py의 로컬 버전, Pinecone 불필요)
+
+청크 ID는 Pinecone과 같은 "<job_id>__c<NNNN>" 규칙을 사용하고 ChromaIndex로 upsert하므로,
+DB_TYPE = "Chroma"에서도 /matching이 Pinecone과 같은 Dense Multi-aspect 재정렬 경로를 사용합니다.
+BM25 인덱스, 근사 중복 인덱스를 함께 만들고 --snapshot을 주면 로컬 스냅샷(+ Job centroid 인덱스)까지 생성합니다.
+
+Job ID는 URL 기반(stable_job_id)이라 다시 실행하면 저장된 청크 hash와 비교해 새 청크 / 바뀐 청크만 임베딩·upsert하고
+폴더에 없는 공고의 청크는 삭제합니다. (--rebuild로 collection을 비우고 전부 다시 적재)
+
+임베딩은 서버와 같은 모델(registry.load_embedding_model)을 사용하며 디스크 캐시(CACHE_PATH)를 거치므로,
+한 번 적재한 JD를 다시 적재할 때는 네트워크 없이 실행됩니다.
+
+실행 방법 (backend 디렉토리에서):
+python -m get_similarity.dev.insert_chunks_local --jd_folder ../research/Retrieval/updated_jd
+python -m get_similarity.dev.insert_chunks_local --jd_folder ./data/jd --snapshot
+"""
+
+import argparse
+import os
+
+import pandas as pd
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from tqdm import tqdm
+
+from configs import (
+    BM25_PATH,
+    CENTROID_MEDOIDS,
+    CENTROID_WEIGHT,
+    COLLECTION,
+    DB_PATH,
+    EMBED_WORKERS,
+    EMBEDDING_MODEL,
+    INDEX_VERSION_PATH,
+    INGEST_MAX_RETRIES,
+    INGEST_QUEUE_SIZE,
+    NEAR_DUP_NUM_PERM,
+    NEAR_DUP_PATH,
+    NEAR_DUP_THRESHOLD,
+    SNAPSHOT_PATH,
+    UPSERT_WORKERS,
+)
+from get_similarity.index import (
+    BM25Index,
+    ChromaIndex,
+    NearDuplicateIndex,
+    build_snapshot_centroids,
+    build_snapshot_from_pinecone,
+    bump_index_version,
+    load_snapshot,
+)
+from get_similarity.registry import load_embedding_model
+from get_similarity.utils.chunk_ids import stable_job_id
+from get_similarity.utils.ingest import IngestPipeline, job_records, plan_delta, reuse_vectors, stored_hashes
+
+JOB_TYPES = {"fulltime": "fulltime", "parttime": "parttime", "contract": "fulltime", "internship": "fulltime"}
+
+
+def load_jd_frame(jd_folder: str, max_len: int = 10000) -> pd.DataFrame:
+    """폴더의 JD csv를 합치고 insert_chunks_pc&bm25.py와 같은 기준으로 정리합니다."""
+    dfs = []
+    for name in sorted(os.listdir(jd_folder)):
+        df = pd.read_csv(os.path.join(jd_folder, name))
+        df["location"] = name.split("_")[0]
+        dfs.append(df)
+    df = pd.concat(dfs, ignore_index=True)
+    print(f"중복 제거 전 description 개수: {len(df)}")
+
+    df = df.dropna(subset=["description", "is_remote"]).drop_duplicates(subset="description")
+    print(f"중복 제거 후 description 개수: {len(df)}")
+    # job_type 분류 (알 수 없는 유형은 제외)
+    df["job_type"] = df["job_type"].map(lambda t: next((v for k, v in JOB_TYPES.items() if k in str(t)), None))
+    df = df.dropna(subset=["job_type"])
+    df = df[df["description"].str.len() <= max_len].reset_index(drop=True)
+    print(f"최대 길이 {max_len} 이하 description 개수: {len(df)}")
+    return df
+
+
+def get_chunks(df: pd.DataFrame, text_splitter, near_dup_index=None):
+    """
+    Returns:
+        records: [{"id", "text", "metadata"}] (id = "<job_id>__c<NNNN>", metadata에 content_hash 포함)
+    """
+    jobs = {}
+    for i, description in enumerate(df["description"]):
+        meta = df.iloc[i].to_dict()
+        job_id = stable_job_id(meta, description)
+        if job_id in jobs:
+            continue
+        # Job ID는 RRF에서 semantic 결과와 맞추기 위해 metadata의 id에도 저장
+        meta["id"] = job_id
+        jobs[job_id] = (description, meta)
+
+    # cluster_id는 job_id 순서로 부여 (csv 순서가 바뀌어도 같은 값 → metadata_hash가 바뀌지 않음)
+    if near_dup_index is not None:
+        for job_id, cluster_id in near_dup_index.add_all({job_id: description for job_id, (description, _) in jobs.items()}).items():
+            jobs[job_id][1]["cluster_id"] = cluster_id
+
+    records = []
+    for job_id, (description, meta) in jobs.items():
+        records.extend(job_records(job_id, text_splitter.split_text(description), meta, model=EMBEDDING_MODEL))
+    return records
+
+
+def insert_chunks(index: ChromaIndex, records, emb_model, batch_size: int = 100):
+    """
+    저장된 청크와 비교해 새 청크 / 본문이 바뀐 청크만 임베딩·upsert하고, 메타데이터만 바뀐 청크는 저장된 벡터로 upsert하며,
+    records에 없는 청크는 삭제합니다.
+    """
+    delta = plan_delta(records, stored_hashes(index), full_sync=True)
+    print(f"증분 적재: upsert {len(delta['upsert'])}, 메타데이터 갱신 {len(delta['update'])}, 변경 없음 {delta['unchanged']}, 삭제 {len(delta['delete'])} chunks")
+    index.delete(ids=delta["delete"])
+    vectors, missing = reuse_vectors(index, delta["update"])
+    if vectors:
+        index.upsert(vectors)
+
+    upserts = delta["upsert"] + missing
+    with tqdm(total=len(upserts), desc="Upserting to Chroma") as pbar:
+        pipeline = IngestPipeline(
+            emb_model.embed_documents,
+            index.upsert,
+            embed_workers=EMBED_WORKERS,
+            upsert_workers=UPSERT_WORKERS,
+            queue_size=INGEST_QUEUE_SIZE,
+            max_retries=INGEST_MAX_RETRIES,
+            progress=pbar.update,
+        )
+        pipeline.run(upserts[start:start + batch_size] for start in range(0, len(upserts), batch_size))
+    print(f"Chroma DB 세팅 완료: {index.collection.count()} chunks")
+
+    bm25_index = BM25Index().build(
+        [r["text"] for r in records],
+        doc_ids=[r["id"] for r in records],
+        job_ids=[r["metadata"]["job_id"] for r in records],
+    )
+    bm25_index.save(BM25_PATH)
+    print(f"BM25 인덱스 세팅 완료: {len(bm25_index)} chunks, {bm25_index.num_terms} terms")
+    return delta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jd_folder", type=str, help="JD csv 폴더 경로", default="../research/Retrieval/updated_jd")
+    parser.add_argument("--db-path", type=str, default=DB_PATH, help="Chroma persist 경로")
+    parser.add_argument("--collection", type=str, default=COLLECTION)
+    parser.add_argument("--snapshot", action="store_true", help="적재 후 로컬 스냅샷(SNAPSHOT_PATH)과 Job centroid 인덱스 생성")
+    parser.add_argument("--rebuild", action="store_true", help="증분 적재 대신 collection을 비우고 전부 다시 적재")
+    args = parser.parse_args()
+
+    index = ChromaIndex.open(args.db_path, args.collection, create=True)
+    if args.rebuild:
+        index.delete(delete_all=True)
+
+    # BM25 / 근사 중복 인덱스는 폴더의 전체 JD로 다시 만듦 (cluster_id는 job_id 순서로 부여하므로 csv 순서와 무관)
+    near_dup_index = NearDuplicateIndex(threshold=NEAR_DUP_THRESHOLD, num_perm=NEAR_DUP_NUM_PERM)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100, separators=["#", "##", "###", "####", "**", "---", "\r\n", "\n\n", "\n", "\t", " ", ""])
+    records = get_chunks(load_jd_frame(args.jd_folder), text_splitter, near_dup_index)
+    print("청크 개수: ", len(records))
+
+    insert_chunks(index, records, load_embedding_model())
+    near_dup_index.save(NEAR_DUP_PATH)
+    bump_index_version(INDEX_VERSION_PATH)
+
+    if args.snapshot:
+        build_snapshot_from_pinecone(index, SNAPSHOT_PATH, model=EMBEDDING_MODEL)
+        build_snapshot_centroids(load_snapshot(SNAPSHOT_PATH), num_medoids=CENTROID_MEDOIDS, centroid_weight=CENTROID_WEIGHT)
@@ -1,6 +1,8 @@
 """
 입력 경로에 들어있는 csv 파일들을 전처리한 다음
-Pinecone에 업로드하고 BM25 retriever를 생성하는 코드입니다.
+Pinecone에 업로드하고 BM25 인덱스(BM25_PATH)를 생성하는 코드입니다.
+청크 ID는 "<job_id>__c<NNNN>"(job_id는 URL 기반)이라 다시 실행하면 새 청크 / 바뀐 청크만 임베딩·upsert하고
+입력에 없는 청크는 삭제합니다.
 """
 
 import os
@@ -10,13 +12,11 @@ from langchain_openai import OpenAIEmbeddings
 from langchain.embeddings import CacheBackedEmbeddings
 from langchain.storage import LocalFileStore
 from langchain_chroma import Chroma
-from configs import JD_PATH, COLLECTION, DB_PATH,PINECONE_INDEX
-from langchain_pinecone import PineconeVectorStore
-from langchain_community.retrievers import BM25Retriever
-import string
-from uuid import uuid4
-import pickle
-from pathlib import Path
+from configs import JD_PATH, COLLECTION, DB_PATH,PINECONE_INDEX, BM25_PATH, NEAR_DUP_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM
+from configs import EMBED_WORKERS, UPSERT_WORKERS, INGEST_QUEUE_SIZE, INGEST_MAX_RETRIES
+from get_similarity.index import BM25Index, NearDuplicateIndex
+from get_similarity.utils.chunk_ids import stable_job_id
+from get_similarity.utils.ingest import IngestPipeline, job_records, plan_delta, reuse_vectors, stored_hashes
 from tqdm import tqdm
 import argparse
 
@@ -34,21 +34,6 @@ def preprocess(df):
     df = df.reset_index(drop=True)
     return df
 
-def clean_tokens(text: str):
-    """공백 기준 토큰화 후 특수문자 제거·소문자 변환"""
-    tokens = text.split()                       # ① 공백 기준 분리
-    cleaned = []
-    for tok in tokens:
-        # ② 토큰 앞뒤 특수문자 제거  ( ###Job**  →  Job )
-        tok = tok.strip(string.punctuation)
-        # ③ 소문자 변환
-        tok = tok.lower()
-        # ④ 빈 토큰·순수 특수문자 토큰은 건너뛰기
-        if tok and not all(ch in string.punctuation for ch in tok):
-            cleaned.append(tok)
-    return cleaned
-
-
 def load_emb_model(cache=True):
     """embedding model을 로드하고 캐싱하는 함수입니다."""
     embedding = OpenAIEmbeddings()
@@ -68,28 +53,39 @@ def set_splitter(emb_model):
     return text_splitter
 
 
-def get_chunks(df, text_splitter):
-    total_chunks = []
+def get_chunks(df, text_splitter, near_dup_index=None, model=""):
+    """
+    Returns:
+        records: [{"id", "text", "metadata"}] (id = "<job_id>__c<NNNN>", metadata에 content_hash 포함)
+    """
+    jobs = {}
     for i, desciption in enumerate(df["description"]):
-        meta_data = [df.iloc[i].to_dict()]
-        unique_id = str(uuid4())    #랜덤 id 생성
+        meta_data = df.iloc[i].to_dict()
+        ## 같은 공고는 다시 적재해도 같은 id (URL 기반) → 재적재 시 바뀐 청크만 임베딩
+        job_id = stable_job_id(meta_data, desciption)
+        if job_id in jobs:
+            continue
         ## RRF를 위해 id를 메타데이터로 추가
-        ## 한 문서에 여러 개의 chunk가 생기기 때문에 vectorDB의 id로 추가하면 중복되서 사라진다
-        meta_data[0]["id"] = unique_id
+        meta_data["id"] = job_id
+        jobs[job_id] = (desciption, meta_data)
+
+    ## 문구만 조금 바뀐 재등록 공고는 같은 cluster_id (검색 시 하나로 합침)
+    ## job_id 순서로 부여하므로 csv 순서가 바뀌어도 cluster_id(→ metadata_hash)가 그대로
+    if near_dup_index is not None:
+        for job_id, cluster_id in near_dup_index.add_all({job_id: desciption for job_id, (desciption, _) in jobs.items()}).items():
+            jobs[job_id][1]["cluster_id"] = cluster_id
 
-        chunks = text_splitter.create_documents([desciption], meta_data)
-        total_chunks.extend(chunks)
-    return total_chunks
+    total_records = []
+    for job_id, (desciption, meta_data) in jobs.items():
+        total_records.extend(job_records(job_id, text_splitter.split_text(desciption), meta_data, model=model))
+    return total_records
 
 
-def insert_chunks(total_chunks, collection: str):
+def insert_chunks(total_records, collection: str):
     index_name = collection
     if pc.has_index(index_name):
         print("인덱스가 이미 존재합니다")
         index = pc.Index(index_name)
-        ## 데이터가 남아있을때 데이터 제거
-        if len(index.describe_index_stats()["namespaces"]) > 0:
-            index.delete(delete_all=True, namespace="")
     else:
         ## openAI의 embedding dimension과 동일
         ## dimension은 embedding model을 변경한다면 설정하기
@@ -100,26 +96,44 @@ def insert_chunks(total_chunks, collection: str):
         ) ) #서버리스 인덱스 생성
         index = pc.Index(index_name)
 
-    vector_store = PineconeVectorStore(index=index, embedding=emb_model)
+    ## 저장된 청크 hash와 비교해 새 청크 / 바뀐 청크만 적재하고, 이번 JD에 없는 청크는 삭제
+    delta = plan_delta(total_records, stored_hashes(index), full_sync=True)
+    print(f"증분 적재: upsert {len(delta['upsert'])}, 메타데이터 갱신 {len(delta['update'])}, 변경 없음 {delta['unchanged']}, 삭제 {len(delta['delete'])} chunks")
+    for start in range(0, len(delta["delete"]), 1000):
+        index.delete(ids=delta["delete"][start:start + 1000])
+
     batch_size = 100           # 한 번에 보낼 문서 수
-    total = len(total_chunks)    # 전체 문서 개수
-    for start in tqdm(range(0, total, batch_size), desc="Upserting to Pinecone"):
-        end = start + batch_size
-        batch_docs = total_chunks[start:end]
-        vector_store.add_documents(documents=batch_docs)
-    # vector_store.add_documents(documents=total_chunks)
-    print("Pinecone DB 세팅 완료")
+    ## 마감일 / cluster_id 등 메타데이터만 바뀐 청크는 임베딩하지 않고 저장된 벡터로 upsert
+    vectors, missing = reuse_vectors(index, delta["update"], batch_size)
+    for start in range(0, len(vectors), batch_size):
+        index.upsert(vectors=vectors[start:start + batch_size])
+    records = delta["upsert"] + missing
+    # 임베딩 worker와 upsert worker가 겹쳐서 진행
+    with tqdm(total=len(records), desc="Upserting to Pinecone") as pbar:
+        pipeline = IngestPipeline(
+            emb_model.embed_documents,
+            lambda vectors: index.upsert(vectors=vectors),
+            embed_workers=EMBED_WORKERS,
+            upsert_workers=UPSERT_WORKERS,
+            queue_size=INGEST_QUEUE_SIZE,
+            max_retries=INGEST_MAX_RETRIES,
+            progress=pbar.update,
+        )
+        stats = pipeline.run(records[start:start + batch_size] for start in range(0, len(records), batch_size))
+    print(f"Pinecone DB 세팅 완료 (embed {stats['embed']['items_per_s']:.0f} chunks/s, 재시도 embed {stats['embed']['retries']} / upsert {stats['upsert']['retries']})")
     # pinecone와 같은 메타데이터를 사용해 rank fusion하므로 무조건 동시에 생성할 것
-    bm25retriever = BM25Retriever.from_documents(total_chunks, preprocess_func=clean_tokens, k=10)
-    SAVE_PATH = Path("bm25_retriever.pkl")
-    with SAVE_PATH.open("wb") as f:
-        pickle.dump(bm25retriever, f)
-    print("BM25 retriever 세팅 완료")
+    # doc_id는 Pinecone 벡터 ID와 같은 "<job_id>__c<NNNN>"
+    bm25_index = BM25Index().build(
+        [record["text"] for record in total_records],
+        doc_ids=[record["id"] for record in total_records],
+        job_ids=[record["metadata"]["id"] for record in total_records],
+    )
+    bm25_index.save(BM25_PATH)
+    print(f"BM25 인덱스 세팅 완료: {len(bm25_index)} chunks, {bm25_index.num_terms} terms")
 
     return None
 
 
-
 def classify_jobpype(df):
     remove_index = []
     for idx, data in df.iterrows():
@@ -181,7 +195,13 @@ if __name__ == "__main__":
     final_df = preprocess(merged_df_dedup)
     
     emb_model = load_emb_model()
-    total_chunks = get_chunks(final_df, set_splitter(emb_model))   # semantic chunking, langchain document list 반환
+    # 근사 중복 인덱스는 전체 JD로 새로 생성 (같은 순서면 cluster_id도 같아 바뀐 청크만 다시 적재됨)
+    near_dup_index = NearDuplicateIndex(threshold=NEAR_DUP_THRESHOLD, num_perm=NEAR_DUP_NUM_PERM)
+    # 청크 레코드 list 반환 (결정적 id + 본문 / 메타데이터 hash, content_hash에는 임베딩 모델 이름 포함)
+    total_chunks = get_chunks(final_df, set_splitter(emb_model), near_dup_index, model=emb_model.underlying_embeddings.model if hasattr(emb_model, "underlying_embeddings") else emb_model.model)
+    print(f"근사 중복 cluster: {len(near_dup_index)}개 JD → {len(set(near_dup_index.cluster_ids))}개 cluster")
     ### research/Retrieval/pinecone_upsert.ipynb의 결과와 동일한 갯수의 청크가 생성되었는지 확인
     print("청크 개수: ", len(total_chunks))      
-    insert_chunks(total_chunks, collection_name)  # 청크를 DB에 저장하는 함수 호출
\ No newline at end of file
+    insert_chunks(total_chunks, collection_name)  # 청크를 DB에 저장하는 함수 호출
+    # 이후 추가 적재에서 같은 cluster_id를 이어서 부여할 수 있도록 저장
+    near_dup_index.save(NEAR_DUP_PATH)
\ No newline at end of file
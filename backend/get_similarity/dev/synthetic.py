@@ -0,0 +1,189 @@
+"""
+API 키 없이 검색 품질 / latency를 재현하기 위한 합성 JD·이력서 코퍼스와 hashing 임베딩
+
+    HashingEmbedder     토큰 unigram + bigram을 crc32로 dim개 버킷에 부호와 함께 더한 뒤 L2 정규화
+                        (LangChain Embeddings와 같은 embed_documents / embed_query, 같은 텍스트는 항상 같은 벡터)
+    make_corpus         직무(topic)별 기술 어휘로 markdown JD와 이력서를 seed 기반으로 생성
+    grade               (이력서, JD) 정답 relevance 0~3 (주 직무 / 부 직무 일치 여부)
+
+JD 청크는 실제 적재처럼 본문을 나눈 결과로, 섹션(## 헤더) 단위로 자릅니다.
+"""
+
+import random
+import re
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+
+# 영문/숫자 토큰(Next.js, C++ 포함)과 한글 토큰을 분리 ("PyTorch와" → "pytorch", "와")
+_TOKEN = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*|[가-힣]+")
+
+TOPICS = {
+    "backend": ["Python", "Django", "FastAPI", "PostgreSQL", "Redis", "Kafka", "gRPC", "REST", "Celery", "MySQL"],
+    "frontend": ["React", "TypeScript", "Next.js", "Redux", "Webpack", "CSS", "Storybook", "Vue", "GraphQL", "Jest"],
+    "ml": ["PyTorch", "TensorFlow", "Transformers", "LLM", "RAG", "MLOps", "Triton", "CUDA", "scikit-learn", "fine-tuning"],
+    "data": ["Spark", "Airflow", "dbt", "BigQuery", "Snowflake", "Hadoop", "Flink", "ETL", "Looker", "Parquet"],
+    "devops": ["Kubernetes", "Docker", "Terraform", "AWS", "Prometheus", "Grafana", "ArgoCD", "Helm", "Linux", "Ansible"],
+    "mobile": ["Swift", "Kotlin", "Android", "iOS", "Flutter", "SwiftUI", "Jetpack", "Firebase", "RxJava", "Xcode"],
+    "security": ["SIEM", "OWASP", "pentest", "IAM", "Zero-Trust", "Wireshark", "Burp", "SOC", "threat-modeling", "PKI"],
+    "embedded": ["C", "C++", "RTOS", "ARM", "Yocto", "CAN", "firmware", "FPGA", "Zephyr", "I2C"],
+}
+
+_DUTIES = [
+    "{a}와 {b}를 활용한 서비스 설계 및 개발",
+    "{a} 기반 시스템의 성능 개선과 운영 자동화",
+    "{a}, {b} 환경에서 신규 기능 개발과 코드 리뷰",
+    "{a} 파이프라인 구축 및 장애 대응",
+]
+_REQUIREMENTS = [
+    "{a} 실무 경험 {n}년 이상",
+    "{a} 또는 {b}에 대한 깊은 이해",
+    "{a}를 이용한 대규모 트래픽 처리 경험",
+]
+_PROJECTS = [
+    "{a}와 {b}로 사내 플랫폼을 구축하고 배포 주기를 단축했습니다",
+    "{a} 기반 서비스의 응답 지연을 {n}0% 줄였습니다",
+    "{a}, {b}를 도입해 운영 비용을 절감했습니다",
+    "{a} 모듈을 설계하고 팀 내 코드 리뷰 문화를 정착시켰습니다",
+]
+# 모든 JD에 공통으로 들어가는 문구 (직무 구분에 도움이 되지 않는 노이즈)
+_BOILERPLATE = [
+    "자율 출퇴근제와 원격 근무를 지원합니다",
+    "도서 구입비와 교육비를 지원합니다",
+    "수평적인 문화에서 함께 성장할 동료를 찾습니다",
+]
+_LOCATIONS = ["Korea", "USA", "Japan"]
+_JOB_TYPES = ["fulltime", "parttime"]
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256, ngram: int = 2):
+        """
+        Args:
+            dim: 임베딩 차원 (hash 버킷 수)
+            ngram: 사용할 최대 단어 n-gram 길이
+        """
+        self.dim = dim
+        self.ngram = ngram
+
+    def _embed(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall((text or "").lower())
+        grams = [" ".join(tokens[i:i + n]) for n in range(1, self.ngram + 1) for i in range(len(tokens) - n + 1)]
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not grams:
+            vector[0] = 1.0
+            return vector
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+        signs = np.where(hashes & 1, 1.0, -1.0).astype(np.float32)
+        np.add.at(vector, ((hashes >> 1) % self.dim).astype(np.int64), signs)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return vector / norm
+
+    def embed_documents(self, texts: List[str]) -> List[np.ndarray]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+def _fill(rng, templates, skills):
+    a, b = rng.sample(skills, 2)
+    return rng.choice(templates).format(a=a, b=b, n=rng.randint(2, 7))
+
+
+def make_jd(rng, primary: str, secondary: str) -> str:
+    skills, extra = TOPICS[primary], TOPICS[secondary]
+    lines = [f"# {primary} 엔지니어 채용", "## 주요 업무"]
+    lines += [f"- {_fill(rng, _DUTIES, skills)}" for _ in range(rng.randint(3, 5))]
+    lines += ["## 자격 요건"] + [f"- {_fill(rng, _REQUIREMENTS, skills)}" for _ in range(rng.randint(2, 4))]
+    lines += ["## 우대 사항"] + [f"- {_fill(rng, _REQUIREMENTS, extra)}" for _ in range(rng.randint(1, 3))]
+    lines += ["## 복지"] + [f"- {text}" for text in rng.sample(_BOILERPLATE, 2)]
+    return "\n".join(lines)
+
+
+def make_resume(rng, primary: str, secondary: str) -> str:
+    lines = ["# 지원자", "## 경력"]
+    for p in range(rng.randint(2, 4)):
+        lines += [f"### **프로젝트 {p}**", f"**기간:** 20{15 + p}.03 - 20{16 + p}.02", f"**개요:** {_fill(rng, _PROJECTS, TOPICS[primary])}"]
+        lines += [f"- {_fill(rng, _PROJECTS, TOPICS[primary])}" for _ in range(rng.randint(2, 4))]
+    # 부 직무 경험은 마지막 프로젝트의 한 줄로만
+    lines.append(f"- {_fill(rng, _PROJECTS, TOPICS[secondary])}")
+    lines += ["## 기술", "- " + ", ".join(rng.sample(TOPICS[primary], 5) + rng.sample(TOPICS[secondary], 2))]
+    return "\n".join(lines)
+
+
+def chunk_jd(text: str) -> List[str]:
+    """JD 본문을 섹션(## 헤더) 단위 청크로 나눕니다. (제목 줄은 첫 섹션에 포함)"""
+    chunks, current = [], []
+    for line in text.split("\n"):
+        if line.startswith("## ") and len(current) > 1:
+            chunks.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def grade(resume: Dict[str, Any], job: Dict[str, Any]) -> int:
+    """
+    정답 relevance
+        3: 주 직무와 부 직무가 모두 일치
+        2: 주 직무 일치
+        1: 한쪽의 주 직무가 다른 쪽의 부 직무
+        0: 무관
+    """
+    if job["primary"] == resume["primary"]:
+        return 3 if job["secondary"] == resume["secondary"] else 2
+    if job["primary"] == resume["secondary"] or job["secondary"] == resume["primary"]:
+        return 1
+    return 0
+
+
+def make_corpus(num_jobs: int, num_resumes: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns:
+        {
+            "jobs": [{"job_id", "text", "chunks", "primary", "secondary", "metadata"}],
+            "resumes": [{"resume_id", "text", "primary", "secondary", "grades": {job_id: relevance (>0만)}}],
+        }
+    """
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+
+    def pick_topics():
+        primary = rng.choice(topics)
+        return primary, rng.choice([t for t in topics if t != primary])
+
+    jobs = []
+    for j in range(num_jobs):
+        primary, secondary = pick_topics()
+        text = make_jd(rng, primary, secondary)
+        job_id = f"job{j:06d}"
+        jobs.append({
+            "job_id": job_id,
+            "text": text,
+            "chunks": chunk_jd(text),
+            "primary": primary,
+            "secondary": secondary,
+            "metadata": {
+                "job_id": job_id,
+                "company": f"company{j % 97}",
+                "job_url": f"https://example.com/jobs/{job_id}",
+                "location": rng.choice(_LOCATIONS),
+                "is_remote": rng.random() < 0.3,
+                "job_type": rng.choice(_JOB_TYPES),
+            },
+        })
+
+    resumes = []
+    for r in range(num_resumes):
+        primary, secondary = pick_topics()
+        resume = {"resume_id": f"cv{r:04d}", "text": make_resume(rng, primary, secondary), "primary": primary, "secondary": secondary}
+        resume["grades"] = {job["job_id"]: g for job in jobs if (g := grade(resume, job)) > 0}
+        resumes.append(resume)
+    return {"jobs": jobs, "resumes": resumes}
@@ -0,0 +1,51 @@
+from get_similarity.index.ann import IVFFlatIndex, build_snapshot_ann, get_snapshot_ann
+from get_similarity.index.bm25 import BM25Index, get_bm25_index
+from get_similarity.index.catalog import CatalogedIndex, MetadataCatalog
+from get_similarity.index.chroma import ChromaIndex
+from get_similarity.index.centroids import JobCentroidIndex, build_snapshot_centroids, get_snapshot_centroids
+from get_similarity.index.dedup import (
+    NearDuplicateIndex,
+    collapse_duplicates,
+    load_near_dup_index,
+)
+from get_similarity.index.expiry import ExpirySweeper
+from get_similarity.index.filters import FilterIndex, get_snapshot_filters
+from get_similarity.index.quantize import QuantizedVectors, build_snapshot_quantized, get_snapshot_quantized
+from get_similarity.index.snapshot import (
+    VectorSnapshot,
+    SnapshotWriter,
+    build_snapshot_from_pinecone,
+    get_snapshot,
+    load_snapshot,
+)
+from get_similarity.index.version import bump_index_version, index_version
+
+__all__ = [
+    "IVFFlatIndex",
+    "build_snapshot_ann",
+    "get_snapshot_ann",
+    "BM25Index",
+    "get_bm25_index",
+    "CatalogedIndex",
+    "MetadataCatalog",
+    "ChromaIndex",
+    "JobCentroidIndex",
+    "build_snapshot_centroids",
+    "get_snapshot_centroids",
+    "NearDuplicateIndex",
+    "collapse_duplicates",
+    "load_near_dup_index",
+    "ExpirySweeper",
+    "FilterIndex",
+    "get_snapshot_filters",
+    "QuantizedVectors",
+    "build_snapshot_quantized",
+    "get_snapshot_quantized",
+    "VectorSnapshot",
+    "SnapshotWriter",
+    "build_snapshot_from_pinecone",
+    "get_snapshot",
+    "load_snapshot",
+    "bump_index_version",
+    "index_version",
+]
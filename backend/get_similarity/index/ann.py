@@ -0,0 +1,278 @@
+"""
+In-process 근사 최근접 이웃(ANN) 인덱스 - IVF-Flat (cosine)
+
+JD 청크 벡터를 spherical k-means로 nlist개 클러스터(inverted list)에 나누고,
+검색 시 쿼리와 가까운 nprobe개 클러스터의 벡터만 정확히 비교합니다.
+Pinecone top-k 또는 전체 스캔 대신 청크 단위 후보 생성(1단계)에 사용하고,
+후보 Job에 대해서만 DenseMatcher 재정렬(2단계)을 수행합니다.
+
+저장 구조 (<path>/):
+    order.npy       (N',) int64, 살아 있는 행 번호를 클러스터 순서로 정렬한 permutation
+    lists.npy       (nlist + 1,) int64, 클러스터 l의 행 = order[lists[l]:lists[l+1]]
+    centroids.npy   (nlist x D) float32
+    ivf.json        설정 + 원본 행렬 크기 (마지막에 기록)
+
+벡터 자체는 저장하지 않습니다. load 시 인덱스를 만든 행렬(스냅샷의 mmap 벡터)과 행 순서의 외부 ID를 넘겨받아
+행을 그대로 참조하므로, 가장 큰 벡터 데이터가 디스크 / page cache에 두 번 올라가지 않습니다.
+"""
+
+import json
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms < 1e-9] = 1.0
+    return vectors / norms
+
+
+class IVFFlatIndex:
+    def __init__(self, dim: int, nlist: Optional[int] = None, nprobe: int = 8):
+        """
+        Args:
+            dim: 벡터 차원
+            nlist: 클러스터 개수 (None이면 build 시 4 * sqrt(N))
+            nprobe: 검색 시 확인할 클러스터 개수 (클수록 recall↑, latency↑)
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids = np.empty((0, dim), dtype=np.float32)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self.alive = np.empty(0, dtype=bool)
+        self.ids: List[str] = []
+        self._id_to_row = {}
+        self._order = None
+        self._list_offsets = None
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    # --------------------------------------------------------------------------
+    # Build / Add / Delete
+    # --------------------------------------------------------------------------
+
+    def _assign(self, vectors: np.ndarray, block: int = 16384) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block):
+            out[start:start + block] = np.argmax(vectors[start:start + block] @ self.centroids.T, axis=1)
+        return out
+
+    def build(
+        self,
+        vectors,
+        ids: Iterable[str],
+        n_iter: int = 10,
+        sample_size: int = 50000,
+        seed: int = 0,
+        normalized: bool = False,
+    ):
+        """
+        spherical k-means로 클러스터를 학습하고 전체 벡터를 추가합니다.
+
+        Args:
+            normalized: vectors가 이미 L2 정규화된 float32 행렬이면 복사하지 않고 그대로 참조 (스냅샷 mmap)
+        """
+        vectors = vectors if normalized else _l2_normalize(vectors)
+        ids = list(ids)
+        if len(vectors) != len(ids):
+            raise ValueError("vectors와 ids의 개수가 다릅니다.")
+        if len(vectors) == 0:
+            raise ValueError("빈 벡터로 인덱스를 만들 수 없습니다.")
+
+        rng = np.random.default_rng(seed)
+        nlist = self.nlist or max(1, int(4 * np.sqrt(len(vectors))))
+        nlist = min(nlist, len(vectors))
+        sample = vectors[rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False)]
+
+        self.centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            labels = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            # 빈 클러스터는 랜덤 샘플로 다시 초기화
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            self.centroids = _l2_normalize(sums)
+        self.nlist = nlist
+
+        self.vectors = np.empty((0, self.dim), dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self.alive = np.empty(0, dtype=bool)
+        self.ids, self._id_to_row = [], {}
+        self._add_normalized(vectors, ids)
+        return self
+
+    def add(self, vectors, ids: Iterable[str]):
+        """학습된 클러스터에 벡터를 추가합니다. 같은 ID가 이미 있으면 기존 벡터를 삭제 후 추가합니다."""
+        if len(self.centroids) == 0:
+            return self.build(vectors, ids)
+        ids = list(ids)
+        self.delete([i for i in ids if i in self._id_to_row])
+        self._add_normalized(_l2_normalize(vectors), ids)
+        return self
+
+    def _add_normalized(self, vectors: np.ndarray, ids: List[str]):
+        start = len(self.ids)
+        self.vectors = np.concatenate([self.vectors, vectors]) if len(self.vectors) else vectors
+        self.assign = np.concatenate([self.assign, self._assign(vectors)])
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        for offset, vid in enumerate(ids):
+            self._id_to_row[vid] = start + offset
+        self.ids.extend(ids)
+        self._order = None
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """ID 목록을 삭제(tombstone)합니다. 실제 공간은 save 시 정리됩니다."""
+        deleted = 0
+        for vid in ids:
+            row = self._id_to_row.pop(vid, None)
+            if row is not None and self.alive[row]:
+                self.alive[row] = False
+                deleted += 1
+        return deleted
+
+    # --------------------------------------------------------------------------
+    # Search
+    # --------------------------------------------------------------------------
+
+    def _lists(self):
+        if self._order is None:
+            self._order = np.argsort(self.assign, kind="stable")
+            self._list_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.assign, minlength=self.nlist))])
+        return self._order, self._list_offsets
+
+    def search(self, queries, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, List[List[str]]]:
+        """
+        Args:
+            queries: (Q x D) 쿼리 벡터
+            k: 쿼리별 반환 개수
+            nprobe: 확인할 클러스터 개수 (None이면 self.nprobe)
+        Returns:
+            scores: (Q x k') cosine 유사도 (내림차순)
+            ids: 쿼리별 외부 ID 리스트
+        """
+        queries = _l2_normalize(np.atleast_2d(queries))
+        if len(self.ids) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32), [[] for _ in queries]
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        order, offsets = self._lists()
+
+        # 1. 쿼리별로 가까운 nprobe개 클러스터 선택
+        centroid_sims = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_sims, nprobe - 1, axis=1)[:, :nprobe]
+        probe_mask = np.zeros((len(queries), self.nlist), dtype=bool)
+        np.put_along_axis(probe_mask, probes, True, axis=1)
+
+        # 2. 모든 쿼리가 확인하는 클러스터의 합집합 행을 한 번의 GEMM으로 비교
+        lists = np.flatnonzero(probe_mask.any(axis=0))
+        rows = np.concatenate([order[offsets[l]:offsets[l + 1]] for l in lists])
+        rows = rows[self.alive[rows]]
+        if len(rows) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32), [[] for _ in queries]
+
+        sims = queries @ self.vectors[rows].T
+        sims[~probe_mask[:, self.assign[rows]]] = -np.inf
+
+        # 3. argpartition으로 쿼리별 top-k
+        k = min(k, len(rows))
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        sort = np.argsort(-top_sims, axis=1, kind="stable")
+        top = np.take_along_axis(top, sort, axis=1)
+        top_sims = np.take_along_axis(top_sims, sort, axis=1)
+
+        ids = [
+            [self.ids[rows[c]] for c, s in zip(top[q], top_sims[q]) if np.isfinite(s)]
+            for q in range(len(queries))
+        ]
+        return top_sims, ids
+
+    # --------------------------------------------------------------------------
+    # Save / Load
+    # --------------------------------------------------------------------------
+
+    def save(self, path: str):
+        """
+        클러스터 permutation / centroid만 디스크에 저장합니다. (벡터는 저장하지 않음)
+        삭제된 행은 permutation에서 빠지고, load 시에는 같은 행렬을 넘겨야 합니다.
+        """
+        os.makedirs(path, exist_ok=True)
+        order, _ = self._lists()
+        order = order[self.alive[order]].astype(np.int64)
+        counts = np.bincount(self.assign[order], minlength=self.nlist)
+        np.save(os.path.join(path, "order.npy"), order)
+        np.save(os.path.join(path, "lists.npy"), np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+        np.save(os.path.join(path, "centroids.npy"), self.centroids)
+        with open(os.path.join(path, "ivf.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "nlist": self.nlist, "nprobe": self.nprobe, "num_rows": len(self.ids)}, f)
+
+    @classmethod
+    def load(cls, path: str, vectors: np.ndarray, ids: List[str]) -> "IVFFlatIndex":
+        """
+        Args:
+            path: save()로 저장한 디렉토리
+            vectors: 인덱스를 만든 L2 정규화 행렬 (복사하지 않고 참조, 예: VectorSnapshot.vectors)
+            ids: vectors 행 순서의 외부 ID
+        """
+        with open(os.path.join(path, "ivf.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if len(vectors) != meta["num_rows"] or len(ids) != meta["num_rows"]:
+            raise ValueError(f"인덱스 행 수({meta['num_rows']})와 vectors / ids의 행 수가 다릅니다.")
+        index = cls(dim=meta["dim"], nlist=meta["nlist"], nprobe=meta["nprobe"])
+        index.vectors = vectors
+        index.centroids = np.load(os.path.join(path, "centroids.npy"))
+        order = np.load(os.path.join(path, "order.npy"))
+        offsets = np.load(os.path.join(path, "lists.npy"))
+
+        # permutation에서 행별 클러스터 번호 / 생존 여부 복원 (permutation에 없는 행은 삭제된 행)
+        index.assign = np.zeros(len(ids), dtype=np.int32)
+        index.assign[order] = np.repeat(np.arange(index.nlist, dtype=np.int32), np.diff(offsets))
+        index.alive = np.zeros(len(ids), dtype=bool)
+        index.alive[order] = True
+        index.ids = list(ids)
+        index._id_to_row = {index.ids[r]: int(r) for r in order}
+        index._order, index._list_offsets = order, offsets
+        return index
+
+    @classmethod
+    def from_snapshot(cls, snapshot, nlist: Optional[int] = None, nprobe: int = 8) -> "IVFFlatIndex":
+        """VectorSnapshot의 전체 청크 벡터로 인덱스를 만듭니다. (외부 ID = 청크 ID, 벡터는 스냅샷 mmap을 그대로 참조)"""
+        return cls(dim=snapshot.dim, nlist=nlist, nprobe=nprobe).build(snapshot.vectors, snapshot.chunk_ids, normalized=True)
+
+
+ANN_DIR = "ann"
+_ann_cache = {}
+
+
+def get_snapshot_ann(snapshot) -> Optional[IVFFlatIndex]:
+    """
+    스냅샷 버전 디렉토리(<snapshot>/ann)에 저장된 ANN 인덱스를 버전별로 캐싱해서 반환합니다.
+    행 벡터는 스냅샷의 mmap을 그대로 읽습니다.
+    스냅샷과 함께 만들어지지 않았다면 None을 반환합니다.
+    """
+    if snapshot is None:
+        return None
+    if snapshot.version not in _ann_cache:
+        path = os.path.join(snapshot.path, ANN_DIR)
+        # ivf.json은 save()에서 마지막에 기록되므로, 저장이 끝난 인덱스만 로드
+        if not os.path.exists(os.path.join(path, "ivf.json")):
+            return None
+        _ann_cache.clear()
+        _ann_cache[snapshot.version] = IVFFlatIndex.load(path, snapshot.vectors, snapshot.chunk_ids)
+    return _ann_cache[snapshot.version]
+
+
+def build_snapshot_ann(snapshot, nlist: Optional[int] = None, nprobe: int = 8) -> IVFFlatIndex:
+    """스냅샷 전체 청크로 ANN 인덱스를 만들어 스냅샷 버전 디렉토리에 저장합니다."""
+    index = IVFFlatIndex.from_snapshot(snapshot, nlist=nlist, nprobe=nprobe)
+    index.save(os.path.join(snapshot.path, ANN_DIR))
+    print(f"✅ ANN 인덱스 저장 완료: {len(index)} vectors, nlist={index.nlist}")
+    return index
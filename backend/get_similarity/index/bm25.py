@@ -0,0 +1,242 @@
+"""
+In-process BM25 lexical 인덱스 (array 기반 inverted index)
+
+LangChain BM25Retriever(pickle) 대신 posting list를 CSR 형태의 numpy 배열로 보관합니다.
+BM25 가중치(idf · tf 정규화)는 build 시 posting마다 미리 계산해두므로,
+검색은 쿼리 term들의 posting을 모아 bincount 한 번으로 문서 점수를 구하고
+argpartition으로 top-k를 뽑습니다.
+
+저장 구조 (스냅샷과 같이 빌드마다 새 버전 디렉토리에 쓰고 CURRENT를 원자적으로 교체):
+    <path>/CURRENT              현재 사용 중인 버전 이름
+    <path>/<version>/indptr.npy      (V+1,) int64, term별 posting 구간
+    <path>/<version>/postings.npy    (nnz,) int32, 문서(청크) 번호
+    <path>/<version>/weights.npy     (nnz,) float32, BM25 가중치
+    <path>/<version>/doc_job.npy     (N,) int32, 문서가 속한 Job 번호
+    <path>/<version>/vocab.json      term 목록, 문서(청크) ID, Job ID, 설정
+이미 mmap으로 로드한 worker가 있어도 기존 파일을 덮어쓰지 않으므로 (SIGBUS 없음) 재빌드 중에도 안전하고,
+배열과 vocab.json이 항상 같은 버전으로 짝지어 로드됩니다.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from get_similarity.index.snapshot import CURRENT_FILE, current_version
+from get_similarity.utils.chunk_ids import resolve_job_id
+from get_similarity.utils.tokenizer import korean_tokens
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75, tokenizer: Callable[[str], List[str]] = korean_tokens):
+        """
+        Args:
+            k1: term frequency 포화 정도
+            b: 문서 길이 정규화 정도
+            tokenizer: 문서/쿼리 토크나이저 (기본: 한국어 조사 제거 + 음절 bigram)
+        """
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self.vocab = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.postings = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.doc_job = np.empty(0, dtype=np.int32)
+        self.doc_ids: List[str] = []
+        self.job_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def num_terms(self) -> int:
+        return len(self.vocab)
+
+    # --------------------------------------------------------------------------
+    # Build
+    # --------------------------------------------------------------------------
+
+    def build(self, texts: Iterable[str], doc_ids: Iterable[str], job_ids: Optional[Iterable[str]] = None):
+        """
+        Args:
+            texts: 문서(청크) 텍스트
+            doc_ids: 문서(청크) ID
+            job_ids: 문서가 속한 Job ID (None이면 청크 ID에서 추출)
+        """
+        texts, doc_ids = list(texts), list(doc_ids)
+        if len(texts) != len(doc_ids):
+            raise ValueError("texts와 doc_ids의 개수가 다릅니다.")
+        if job_ids is None:
+            job_ids = [resolve_job_id(doc_id, {}) or doc_id for doc_id in doc_ids]
+        job_ids = list(job_ids)
+
+        # 1. 토큰화 후 (term, doc, tf) triple 수집
+        vocab = {}
+        term_col, doc_col, tf_col = [], [], []
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for d, text in enumerate(texts):
+            counts = Counter(self.tokenizer(text or ""))
+            doc_len[d] = sum(counts.values())
+            for term, tf in counts.items():
+                term_col.append(vocab.setdefault(term, len(vocab)))
+                doc_col.append(d)
+                tf_col.append(tf)
+
+        term_col = np.asarray(term_col, dtype=np.int64)
+        doc_col = np.asarray(doc_col, dtype=np.int32)
+        tf_col = np.asarray(tf_col, dtype=np.float32)
+
+        # 2. term 순으로 정렬해 CSR posting list 구성
+        order = np.argsort(term_col, kind="stable")
+        df = np.bincount(term_col, minlength=len(vocab))
+        self.indptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.postings = doc_col[order]
+
+        # 3. BM25 가중치 미리 계산: idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        num_docs = len(texts)
+        idf = np.log1p((num_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(doc_len.mean()) if num_docs else 0.0
+        tf = tf_col[order]
+        norm = self.k1 * (1 - self.b + self.b * doc_len[self.postings] / max(avgdl, 1e-9))
+        self.weights = (np.repeat(idf, df) * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+
+        # 4. 문서 → Job 매핑
+        job_pos = {}
+        self.doc_job = np.asarray([job_pos.setdefault(j, len(job_pos)) for j in job_ids], dtype=np.int32)
+        self.job_ids = list(job_pos)
+        self.vocab = vocab
+        self.doc_ids = doc_ids
+        return self
+
+    # --------------------------------------------------------------------------
+    # Search
+    # --------------------------------------------------------------------------
+
+    def score(self, query: str) -> np.ndarray:
+        """쿼리에 대한 전체 문서의 BM25 점수 (N,)"""
+        counts = Counter(t for t in self.tokenizer(query or "") if t in self.vocab)
+        if not counts:
+            return np.zeros(len(self.doc_ids), dtype=np.float32)
+
+        term_ids = np.fromiter((self.vocab[t] for t in counts), dtype=np.int64)
+        qtf = np.fromiter(counts.values(), dtype=np.float32)
+        starts, ends = self.indptr[term_ids], self.indptr[term_ids + 1]
+        lengths = ends - starts
+        # 쿼리 term들의 posting 구간을 한 번에 gather
+        rows = np.repeat(starts - np.cumsum(np.concatenate([[0], lengths[:-1]])), lengths) + np.arange(lengths.sum())
+        weights = self.weights[rows] * np.repeat(qtf, lengths)
+        return np.bincount(self.postings[rows], weights=weights, minlength=len(self.doc_ids)).astype(np.float32)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        return hits[np.argsort(-scores[hits], kind="stable")]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """청크 단위 top-k [(doc_id, score), ...] (점수 내림차순, 0점 제외)"""
+        scores = self.score(query)
+        return [(self.doc_ids[d], float(scores[d])) for d in self._top_k(scores, k)]
+
+    def search_jobs(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Job 단위 top-k [(job_id, score), ...] (Job 점수 = 소속 청크 중 최고 점수)"""
+        scores = self.score(query)
+        job_scores = np.zeros(len(self.job_ids), dtype=np.float32)
+        np.maximum.at(job_scores, self.doc_job, scores)
+        return [(self.job_ids[j], float(job_scores[j])) for j in self._top_k(job_scores, k)]
+
+    # --------------------------------------------------------------------------
+    # Save / Load
+    # --------------------------------------------------------------------------
+
+    def save(self, path: str, keep: int = 2) -> str:
+        """
+        새 버전 디렉토리에 저장한 뒤 CURRENT를 교체합니다.
+
+        Args:
+            path: BM25 인덱스 root (BM25_PATH)
+            keep: 남겨 둘 최근 버전 수 (이전 버전을 mmap 중인 worker용)
+        Returns:
+            version: 저장한 버전 이름
+        """
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        tmp_dir = os.path.join(path, f".{version}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            np.save(os.path.join(tmp_dir, "indptr.npy"), self.indptr)
+            np.save(os.path.join(tmp_dir, "postings.npy"), self.postings)
+            np.save(os.path.join(tmp_dir, "weights.npy"), self.weights)
+            np.save(os.path.join(tmp_dir, "doc_job.npy"), self.doc_job)
+            terms = [None] * len(self.vocab)
+            for term, tid in self.vocab.items():
+                terms[tid] = term
+            with open(os.path.join(tmp_dir, "vocab.json"), "w", encoding="utf-8") as f:
+                json.dump(
+                    {"k1": self.k1, "b": self.b, "terms": terms, "doc_ids": self.doc_ids, "job_ids": self.job_ids},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.rename(tmp_dir, os.path.join(path, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        tmp_current = os.path.join(path, f".{CURRENT_FILE}.{version}")
+        with open(tmp_current, "w") as f:
+            f.write(version)
+        os.replace(tmp_current, os.path.join(path, CURRENT_FILE))
+
+        # 이미 mmap 중인 worker가 있을 수 있으므로 최근 keep개 버전은 남겨 둠 (삭제해도 열린 mmap은 유지됨)
+        versions = sorted(
+            d for d in os.listdir(path)
+            if not d.startswith(".") and d != version and os.path.isdir(os.path.join(path, d))
+        )
+        for old in versions[:max(len(versions) - (keep - 1), 0)]:
+            shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+        return version
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "BM25Index":
+        """
+        CURRENT가 가리키는 버전(없으면 path 자체)을 로드합니다.
+        posting 배열은 mmap으로 로드합니다. (요청마다 pickle 역직렬화 없음)
+        """
+        version = current_version(path)
+        if version:
+            path = os.path.join(path, version)
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index.indptr = np.load(os.path.join(path, "indptr.npy"))
+        index.postings = np.load(os.path.join(path, "postings.npy"), mmap_mode=mode)
+        index.weights = np.load(os.path.join(path, "weights.npy"), mmap_mode=mode)
+        index.doc_job = np.load(os.path.join(path, "doc_job.npy"))
+        index.vocab = {term: tid for tid, term in enumerate(meta["terms"])}
+        index.doc_ids = meta["doc_ids"]
+        index.job_ids = meta["job_ids"]
+        return index
+
+
+_bm25_cache = {}
+
+
+def get_bm25_index(path: str) -> Optional[BM25Index]:
+    """
+    저장된 BM25 인덱스를 프로세스 단위로 캐싱해서 반환합니다.
+    CURRENT 파일만 확인해서 새 버전이 저장되면(재빌드) 다시 로드하고, 인덱스가 없으면 None을 반환합니다.
+    """
+    version = current_version(path)
+    if not version:
+        return None
+    cached = _bm25_cache.get(path)
+    if cached is None or cached[0] != version:
+        _bm25_cache[path] = (version, BM25Index.load(os.path.join(path, version)))
+    return _bm25_cache[path][1]
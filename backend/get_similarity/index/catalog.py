@@ -0,0 +1,300 @@
+"""
+벡터 인덱스 메타데이터 카탈로그 (로컬 SQLite)
+
+적재할 때마다 index.list() + fetch로 전체 벡터 메타데이터를 훑지 않도록, 청크마다 아래 값을 로컬에 미러링합니다.
+    id              청크 벡터 ID ("<job_id>__c<NNNN>", 예전 벡터는 랜덤 ID)
+    job_id          청크가 속한 Job ID
+    url             공고 URL (job_url)
+    deadline        마감일 (YYYY-MM-DD로 파싱한 값, 상시채용 등 파싱 불가면 NULL)
+    content_hash    청크 본문 + 임베딩 모델 hash (증분 재적재 시 다시 임베딩할지 비교)
+    ingested_at     upsert 시각 (unix time)
+    metadata_hash   메타데이터 hash (본문은 같고 메타데이터만 바뀐 청크 비교)
+url / deadline / job_id에 인덱스가 있어 "이미 있는 URL", "마감된 벡터"가 로컬 쿼리 한 번이 됩니다.
+
+CatalogedIndex로 raw index를 감싸면 upsert / delete가 성공한 뒤 같은 내용을 카탈로그에 한 트랜잭션으로 반영합니다.
+원격 호출이 실패하면 카탈로그는 바뀌지 않습니다.
+
+동기화 상태는 원격 호출(describe_index_stats는 serverless에서 늦게 반영됨) 없이 로컬에서 추적합니다.
+    synced_at   마지막 전체 동기화(sync) 시각 (없으면 아직 한 번도 채우지 않은 카탈로그)
+    pending     진행 중인 원격 쓰기 (원격 호출 전에 기록, 카탈로그 반영과 같은 트랜잭션에서 삭제)
+    dirty       카탈로그가 인덱스와 어긋났을 수 있는 이유 (이전 프로세스가 남긴 pending, filter 삭제, 카탈로그 반영 실패)
+in_sync()는 synced_at이 있고 dirty가 없으면 True이며, 전체 sync()(list + fetch)는 최초 1회와 명시적인 복구 명령에서만 실행합니다.
+카탈로그를 거치지 않은 변경(다른 프로세스가 raw index에 직접 쓴 경우 등)은 감지하지 못하므로 복구 명령으로 맞춥니다.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from get_similarity.utils.chunk_ids import CONTENT_HASH_KEY, METADATA_HASH_KEY, resolve_job_id
+
+DEADLINE_FORMAT = "%Y-%m-%d"
+_SQL_BATCH = 500
+
+
+def parse_deadline(value: Any) -> Optional[str]:
+    """마감일을 YYYY-MM-DD 문자열로 (preprocess check_deadline과 같은 형식만 인정, 나머지는 None)"""
+    try:
+        return datetime.strptime(str(value).strip(), DEADLINE_FORMAT).date().isoformat()
+    except ValueError:
+        return None
+
+
+def _vector_fields(vector) -> Tuple[str, Dict[str, Any]]:
+    """upsert 입력({"id", "values", "metadata"} 또는 (id, values, metadata) tuple) → (id, metadata)"""
+    if isinstance(vector, dict):
+        return vector["id"], vector.get("metadata") or {}
+    return vector[0], (vector[2] if len(vector) > 2 else None) or {}
+
+
+def _row(vid: str, metadata: Dict[str, Any], ingested_at: float) -> Tuple:
+    url = metadata.get("job_url") or metadata.get("url")
+    return (
+        vid,
+        resolve_job_id(vid, metadata),
+        str(url) if url else None,
+        parse_deadline(metadata.get("deadline")),
+        metadata.get(CONTENT_HASH_KEY),
+        ingested_at,
+        metadata.get(METADATA_HASH_KEY),
+    )
+
+
+class MetadataCatalog:
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite 파일 경로 (인덱스마다 하나, 예: CATALOG_PATH/<collection>.sqlite)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # IngestPipeline의 upsert worker 여러 개가 같은 연결을 사용하므로 lock으로 직렬화
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id TEXT PRIMARY KEY, job_id TEXT, url TEXT, deadline TEXT, content_hash TEXT, ingested_at REAL NOT NULL, metadata_hash TEXT)"
+        )
+        # metadata_hash가 없던 예전 카탈로그 파일에 컬럼 추가 (기존 청크는 NULL → 다음 적재 때 메타데이터 갱신)
+        if "metadata_hash" not in {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}:
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN metadata_hash TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_url ON chunks(url)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_deadline ON chunks(deadline)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_job_id ON chunks(job_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS pending (token TEXT PRIMARY KEY, op TEXT, started_at REAL NOT NULL)")
+        # 이전 프로세스가 원격 쓰기 후 카탈로그에 반영하지 못하고 종료됨 → 복구 전까지 어긋난 상태
+        leftover = self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        if leftover:
+            self._conn.execute("DELETE FROM pending")
+            self._set_state("dirty", f"이전 프로세스의 미반영 쓰기 {leftover}건")
+        self._conn.commit()
+
+    def _set_state(self, key: str, value: Optional[str]):
+        if value is None:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+        else:
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES (?, ?)", (key, value))
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --------------------------------------------------------------------------
+    # 쓰기 (CatalogedIndex가 원격 호출 성공 후 호출)
+    # --------------------------------------------------------------------------
+
+    def begin_write(self, op: str) -> str:
+        """원격 쓰기 직전에 호출: pending에 기록하고 token을 반환합니다. (반영은 upsert / delete의 token으로)"""
+        token = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO pending VALUES (?, ?, ?)", (token, op, time.time()))
+        return token
+
+    def cancel_write(self, token: str):
+        """원격 쓰기가 실패한 경우: 카탈로그는 그대로 두고 pending만 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending WHERE token = ?", (token,))
+
+    def mark_dirty(self, reason: str):
+        with self._lock, self._conn:
+            self._set_state("dirty", reason)
+
+    def upsert(self, vectors: Iterable, ingested_at: Optional[float] = None, token: Optional[str] = None):
+        now = time.time() if ingested_at is None else ingested_at
+        rows = [_row(*_vector_fields(v), now) for v in vectors]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM pending WHERE token = ?", (token,))
+
+    def delete(self, ids: Iterable[str], token: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(vid,) for vid in ids])
+            self._conn.execute("DELETE FROM pending WHERE token = ?", (token,))
+
+    def clear(self, token: Optional[str] = None):
+        """인덱스 전체 삭제(delete_all) 반영: 빈 인덱스와 빈 카탈로그는 동기화된 상태"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM pending WHERE token = ?", (token,))
+
+    def sync(self, index, batch_size: int = 100) -> int:
+        """
+        index.list() + fetch로 전체 메타데이터를 읽어 카탈로그를 인덱스와 같게 맞춥니다. (최초 1회 / 명시적인 복구 명령)
+        이미 있던 청크의 ingested_at은 유지하고, 인덱스에 없는 청크는 삭제합니다. 완료되면 synced_at을 갱신하고 dirty를 지웁니다.
+
+        Returns:
+            count: 동기화 후 청크 수
+        """
+        now = time.time()
+        rows = []
+        for page in index.list():
+            page = list(page)
+            for start in range(0, len(page), batch_size):
+                resp = index.fetch(ids=page[start:start + batch_size])
+                rows.extend(_row(vid, vector_data.metadata or {}, now) for vid, vector_data in resp.vectors.items())
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM seen")
+            self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", [(row[0],) for row in rows])
+            self._conn.execute("DELETE FROM chunks WHERE id NOT IN (SELECT id FROM seen)")
+            self._conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET"
+                " job_id = excluded.job_id, url = excluded.url, deadline = excluded.deadline,"
+                " content_hash = excluded.content_hash, metadata_hash = excluded.metadata_hash",
+                rows,
+            )
+            self._conn.execute("DELETE FROM seen")
+            self._set_state("synced_at", str(now))
+            self._set_state("dirty", None)
+        print(f"📊 카탈로그 동기화 완료: {len(rows)}개 벡터")
+        return len(rows)
+
+    # --------------------------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------------------------
+
+    def _select_in(self, sql: str, column: str, values: List[Any]) -> List[Tuple]:
+        rows = []
+        with self._lock:
+            for start in range(0, len(values), _SQL_BATCH):
+                batch = values[start:start + _SQL_BATCH]
+                rows.extend(self._conn.execute(f"{sql} WHERE {column} IN ({','.join('?' * len(batch))})", batch).fetchall())
+        return rows
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def synced_at(self) -> Optional[float]:
+        """마지막 전체 동기화 시각 (한 번도 sync하지 않았으면 None)"""
+        value = self._get_state("synced_at")
+        return float(value) if value is not None else None
+
+    def in_sync(self) -> bool:
+        """전체 동기화 이후 모든 쓰기가 카탈로그에 반영되었는지 (로컬 상태만 확인, 원격 호출 없음)"""
+        return self.synced_at() is not None and self._get_state("dirty") is None
+
+    def status(self) -> Dict[str, Any]:
+        return {"count": self.count(), "synced_at": self.synced_at(), "in_sync": self.in_sync(), "dirty": self._get_state("dirty")}
+
+    def existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        """urls 중 이미 적재된 URL"""
+        return {row[0] for row in self._select_in("SELECT DISTINCT url FROM chunks", "url", [str(u) for u in set(urls)])}
+
+    def hashes(self, job_ids: Iterable[str] = (), urls: Iterable[str] = ()) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        job_ids 또는 urls에 속한 저장 청크 (같은 URL의 예전 랜덤 ID 벡터 포함)
+
+        Returns:
+            {vector_id: (content_hash, metadata_hash)} (plan_delta의 stored 형식)
+        """
+        rows = self._select_in("SELECT id, content_hash, metadata_hash FROM chunks", "job_id", list(set(job_ids)))
+        rows += self._select_in("SELECT id, content_hash, metadata_hash FROM chunks", "url", [str(u) for u in set(urls)])
+        return {vid: (content, meta) for vid, content, meta in rows}
+
+    def deadline_buckets(self, until: Optional[date] = None, include_undated: bool = True) -> "OrderedDict[Optional[str], List[str]]":
+        """
+        마감일(일 단위) bucket별 청크 ID (deadline 인덱스 범위 조회, 오래된 날짜부터)
+
+        Args:
+            until: 이 날짜 이하 bucket만 (None이면 전체)
+            include_undated: 마감일이 없거나 파싱할 수 없는 청크를 None bucket으로 포함
+        Returns:
+            {"YYYY-MM-DD" 또는 None: [vector_id]}
+        """
+        where, params = [], []
+        if until is not None:
+            where.append("deadline <= ?")
+            params.append(until.isoformat())
+        else:
+            where.append("deadline IS NOT NULL")
+        if include_undated:
+            where.append("deadline IS NULL")
+        with self._lock:
+            rows = self._conn.execute(f"SELECT deadline, id FROM chunks WHERE {' OR '.join(where)} ORDER BY deadline", params).fetchall()
+        buckets = OrderedDict()
+        for day, vid in rows:
+            buckets.setdefault(day, []).append(vid)
+        return buckets
+
+    def expired_ids(self, today: Optional[date] = None, include_undated: bool = True) -> List[str]:
+        """마감일이 today 이하이거나 파싱할 수 없는 청크 ID (preprocess check_deadline이 False인 청크)"""
+        buckets = self.deadline_buckets(today or date.today(), include_undated=include_undated)
+        return [vid for ids in buckets.values() for vid in ids]
+
+    def close(self):
+        self._conn.close()
+
+
+class CatalogedIndex:
+    """
+    raw index(Pinecone / ChromaIndex)를 감싸 upsert / delete를 카탈로그에 함께 반영합니다.
+    그 밖의 호출(query, list, fetch, describe_index_stats 등)은 그대로 전달합니다.
+    """
+
+    def __init__(self, index, catalog: MetadataCatalog):
+        self.index = index
+        self.catalog = catalog
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def _write(self, op: str, remote, mirror):
+        """pending 기록 → 원격 호출 → 카탈로그 반영 (원격 실패는 pending만 취소, 반영 실패는 dirty로 표시)"""
+        token = self.catalog.begin_write(op)
+        try:
+            result = remote()
+        except Exception:
+            self.catalog.cancel_write(token)
+            raise
+        try:
+            mirror(token)
+        except Exception:
+            self.catalog.mark_dirty(f"{op} 카탈로그 반영 실패")
+            raise
+        return result
+
+    def upsert(self, vectors, **kwargs):
+        vectors = list(vectors)
+        return self._write("upsert", lambda: self.index.upsert(vectors=vectors, **kwargs), lambda token: self.catalog.upsert(vectors, token=token))
+
+    def delete(self, ids=None, delete_all=False, **kwargs):
+        if delete_all:
+            return self._write("delete_all", lambda: self.index.delete(delete_all=True, **kwargs), lambda token: self.catalog.clear(token=token))
+        if kwargs.get("filter"):
+            # filter 삭제는 어떤 벡터가 지워졌는지 알 수 없으므로 카탈로그를 비우고(다음 적재는 전부 upsert)
+            # 복구 명령(sync) 전까지 어긋난 상태로 표시
+            result = self.index.delete(**kwargs)
+            self.catalog.clear()
+            self.catalog.mark_dirty("filter 삭제")
+            return result
+        ids = list(ids or [])
+        return self._write("delete", lambda: self.index.delete(ids=ids, **kwargs), lambda token: self.catalog.delete(ids, token=token))
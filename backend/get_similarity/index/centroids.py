@@ -0,0 +1,197 @@
+"""
+Job 단위 coarse 인덱스 - centroid + medoid 청크 (coarse-to-fine 매칭 1단계)
+
+청크 단위 scoring 비용은 전체 JD 청크 수에 비례하므로, Job마다 작은 대표 벡터를 미리 계산해두고
+이 인덱스로 Job 순위를 먼저 매긴 뒤 상위 수백 개 Job만 청크 단위 재정렬(DenseMatcher)로 확장합니다.
+JD가 수만 개로 늘어나도 재정렬 비용은 거의 일정하게 유지됩니다.
+
+Job 대표 벡터:
+    centroid   Job 청크(L2 정규화) 벡터의 평균 (정규화하지 않음)
+               → CV 청크 평균과의 내적 = 모든 CV 청크 x JD 청크 유사도의 평균 (현재 scoring과 동일한 값)
+    medoids    청크를 최대 num_medoids개 그룹으로 나눈 뒤 그룹별 medoid 청크 (Job 안의 서로 다른 요구사항)
+               → CV 청크별 가장 가까운 medoid 유사도의 평균 (일부 청크만 잘 맞는 Job의 recall 보완)
+coarse 점수 = centroid_weight * centroid 점수 + (1 - centroid_weight) * medoid 점수
+
+저장 구조 (<path>/):
+    centroids.npy       (J x D) float32
+    medoids.npy         (R x D) float32, L2 정규화, Job 단위로 연속 배치
+    medoid_offsets.npy  (J + 1) int64, Job j의 medoid 행 범위
+    jobs.json           Job ID 목록 (스냅샷 Job 순서) + 설정
+"""
+
+import json
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms < 1e-9] = 1.0
+    return vectors / norms
+
+
+def select_medoids(vectors: np.ndarray, num_medoids: int) -> np.ndarray:
+    """
+    Job 청크(L2 정규화)에서 대표 medoid 청크 행 번호를 고릅니다.
+    centroid와 가장 가까운 청크에서 시작해 가장 먼 청크를 차례로 seed로 추가(farthest-first)하고,
+    청크를 가장 가까운 seed 그룹에 배정한 뒤 그룹마다 그룹 내 유사도 합이 가장 큰 청크를 medoid로 사용합니다.
+    """
+    n = len(vectors)
+    if n <= num_medoids:
+        return np.arange(n)
+    sims = vectors @ vectors.T
+    seeds = [int(np.argmax(sims.sum(axis=1)))]
+    closest = sims[seeds[0]].copy()
+    while len(seeds) < num_medoids:
+        seeds.append(int(np.argmin(closest)))
+        closest = np.maximum(closest, sims[seeds[-1]])
+    groups = np.argmax(sims[:, seeds], axis=1)
+    medoids = []
+    for g in range(len(seeds)):
+        members = np.flatnonzero(groups == g)
+        medoids.append(int(members[np.argmax(sims[np.ix_(members, members)].sum(axis=1))]))
+    return np.unique(medoids)
+
+
+class JobCentroidIndex:
+    def __init__(self, dim: int, num_medoids: int = 3, centroid_weight: float = 0.8):
+        """
+        Args:
+            dim: 벡터 차원
+            num_medoids: Job별 최대 medoid 청크 수
+            centroid_weight: coarse 점수에서 centroid 점수의 가중치 (나머지는 medoid 점수)
+        """
+        self.dim = dim
+        self.num_medoids = num_medoids
+        self.centroid_weight = centroid_weight
+        self.centroids = np.empty((0, dim), dtype=np.float32)
+        self.medoids = np.empty((0, dim), dtype=np.float32)
+        self.medoid_offsets = np.zeros(1, dtype=np.int64)
+        self.job_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def build(self, vectors, offsets, job_ids: List[str]) -> "JobCentroidIndex":
+        """
+        Args:
+            vectors: (N x D) JD 청크 벡터, Job 단위로 연속 배치
+            offsets: (J + 1) Job j의 청크 행 범위 = offsets[j]:offsets[j+1]
+            job_ids: Job ID (J,)
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        centroids = np.zeros((len(job_ids), self.dim), dtype=np.float32)
+        medoid_blocks, medoid_offsets = [], [0]
+        for j in range(len(job_ids)):
+            block = _l2_normalize(vectors[offsets[j]:offsets[j + 1]])
+            if len(block) == 0:
+                # 청크가 없는 Job도 offset 구간이 비지 않도록 0 벡터 하나를 둠 (점수 0)
+                block = np.zeros((1, self.dim), dtype=np.float32)
+            centroids[j] = block.mean(axis=0)
+            medoid_blocks.append(block[select_medoids(block, self.num_medoids)])
+            medoid_offsets.append(medoid_offsets[-1] + len(medoid_blocks[-1]))
+
+        self.centroids = centroids
+        self.medoids = np.concatenate(medoid_blocks) if medoid_blocks else np.empty((0, self.dim), dtype=np.float32)
+        self.medoid_offsets = np.asarray(medoid_offsets, dtype=np.int64)
+        self.job_ids = list(job_ids)
+        return self
+
+    @classmethod
+    def from_snapshot(cls, snapshot, num_medoids: int = 3, centroid_weight: float = 0.8) -> "JobCentroidIndex":
+        return cls(dim=snapshot.dim, num_medoids=num_medoids, centroid_weight=centroid_weight).build(
+            snapshot.vectors, snapshot.offsets, snapshot.job_ids
+        )
+
+    # --------------------------------------------------------------------------
+    # Search
+    # --------------------------------------------------------------------------
+
+    def scores(self, cv_vectors) -> np.ndarray:
+        """CV 청크 벡터 (Q x D) → Job별 coarse 점수 (J,)"""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.float32)
+        cv = _l2_normalize(np.atleast_2d(cv_vectors))
+        centroid_scores = self.centroids @ cv.mean(axis=0)
+        # (Q x R) → Job별 가장 가까운 medoid → CV 청크 평균
+        medoid_scores = np.maximum.reduceat(cv @ self.medoids.T, self.medoid_offsets[:-1], axis=1).mean(axis=0)
+        return self.centroid_weight * centroid_scores + (1 - self.centroid_weight) * medoid_scores
+
+    def search(self, cv_vectors, k: int = 300, job_positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        coarse 점수 상위 k개 Job을 반환합니다.
+
+        Args:
+            cv_vectors: CV 청크 벡터 (Q x D)
+            k: 반환할 Job 수 (청크 단위 재정렬로 확장할 Job 수)
+            job_positions: 대상 Job 위치 (메타데이터 필터 통과 Job, None이면 전체)
+        Returns:
+            positions: Job 위치 (coarse 점수 내림차순)
+            scores: positions 순서의 coarse 점수
+        """
+        scores = self.scores(cv_vectors)
+        positions = np.arange(len(scores)) if job_positions is None else np.asarray(job_positions, dtype=np.int64)
+        if len(positions) > k:
+            positions = positions[np.argpartition(-scores[positions], k - 1)[:k]]
+        positions = positions[np.argsort(-scores[positions], kind="stable")]
+        return positions, scores[positions]
+
+    # --------------------------------------------------------------------------
+    # Save / Load
+    # --------------------------------------------------------------------------
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "centroids.npy"), self.centroids)
+        np.save(os.path.join(path, "medoids.npy"), self.medoids)
+        np.save(os.path.join(path, "medoid_offsets.npy"), self.medoid_offsets)
+        with open(os.path.join(path, "jobs.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {"dim": self.dim, "num_medoids": self.num_medoids, "centroid_weight": self.centroid_weight, "job_ids": self.job_ids},
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "JobCentroidIndex":
+        with open(os.path.join(path, "jobs.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(dim=meta["dim"], num_medoids=meta["num_medoids"], centroid_weight=meta["centroid_weight"])
+        mmap_mode = "r" if mmap else None
+        index.centroids = np.load(os.path.join(path, "centroids.npy"), mmap_mode=mmap_mode)
+        index.medoids = np.load(os.path.join(path, "medoids.npy"), mmap_mode=mmap_mode)
+        index.medoid_offsets = np.load(os.path.join(path, "medoid_offsets.npy"))
+        index.job_ids = meta["job_ids"]
+        return index
+
+
+CENTROIDS_DIR = "centroids"
+_centroid_cache = {}
+
+
+def get_snapshot_centroids(snapshot) -> Optional[JobCentroidIndex]:
+    """
+    스냅샷 버전 디렉토리(<snapshot>/centroids)에 저장된 Job centroid 인덱스를 버전별로 캐싱해서 반환합니다.
+    스냅샷과 함께 만들어지지 않았다면 None을 반환합니다.
+    """
+    if snapshot is None:
+        return None
+    if snapshot.version not in _centroid_cache:
+        path = os.path.join(snapshot.path, CENTROIDS_DIR)
+        # jobs.json은 save()에서 마지막에 기록되므로, 저장이 끝난 인덱스만 로드
+        if not os.path.exists(os.path.join(path, "jobs.json")):
+            return None
+        _centroid_cache.clear()
+        _centroid_cache[snapshot.version] = JobCentroidIndex.load(path)
+    return _centroid_cache[snapshot.version]
+
+
+def build_snapshot_centroids(snapshot, num_medoids: int = 3, centroid_weight: float = 0.8) -> JobCentroidIndex:
+    """스냅샷 Job별 centroid/medoid 인덱스를 만들어 스냅샷 버전 디렉토리에 저장합니다."""
+    index = JobCentroidIndex.from_snapshot(snapshot, num_medoids=num_medoids, centroid_weight=centroid_weight)
+    index.save(os.path.join(snapshot.path, CENTROIDS_DIR))
+    print(f"✅ Job centroid 인덱스 저장 완료: {len(index)} jobs, {len(index.medoids)} medoids")
+    return index
@@ -0,0 +1,122 @@
+"""
+로컬 Chroma collection을 Pinecone Index와 같은 방식으로 사용하기 위한 wrapper
+
+검색 경로(_fetch_job_embeddings, build_snapshot_from_pinecone, 적재 스크립트)는 raw Pinecone Index의
+query / list / fetch / upsert / delete / describe_index_stats만 사용하므로, 같은 메서드를 Chroma collection 위에 구현하면
+네트워크 없이도 Pinecone과 동일한 Dense Multi-aspect 재정렬(DenseMatcher) 경로를 그대로 실행할 수 있습니다.
+
+청크 ID는 Pinecone과 같은 "<job_id>__c<NNNN>" 규칙을 사용하고, 청크 본문은 metadata["text"]와 Chroma document에 함께 저장합니다.
+(LangChain Chroma retriever는 document를 page_content로 사용)
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+def _clean_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chroma metadata 값은 str / int / float / bool만 허용 (None은 제거, 나머지는 문자열)"""
+    cleaned = {}
+    for key, value in (metadata or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (np.integer, np.floating, np.bool_)):
+            value = value.item()
+        cleaned[key] = value if isinstance(value, (str, int, float, bool)) else str(value)
+    return cleaned
+
+
+class ChromaIndex:
+    def __init__(self, collection, page_size: int = 100):
+        """
+        Args:
+            collection: chromadb Collection (LangChain Chroma의 _collection)
+            page_size: list()가 한 번에 반환하는 ID 수
+        """
+        self.collection = collection
+        self.page_size = page_size
+
+    @classmethod
+    def open(cls, path: str, collection: str, create: bool = False) -> "ChromaIndex":
+        """persist 경로의 collection을 엽니다. (create=True면 cosine 공간으로 생성)"""
+        import chromadb
+
+        client = chromadb.PersistentClient(path=path)
+        if create:
+            return cls(client.get_or_create_collection(collection, metadata={"hnsw:space": "cosine"}))
+        return cls(client.get_collection(collection))
+
+    def _score(self, distance: float) -> float:
+        # cosine / ip 거리 = 1 - 유사도, l2는 거리가 작을수록 유사
+        space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        return -float(distance) if space == "l2" else 1.0 - float(distance)
+
+    def query(self, vector, top_k: int = 10, include_metadata: bool = True, include_values: bool = False, namespace: str = "", **kwargs):
+        count = self.collection.count()
+        if count == 0:
+            return {"matches": []}
+        include = ["distances"] + (["metadatas"] if include_metadata else []) + (["embeddings"] if include_values else [])
+        resp = self.collection.query(query_embeddings=[list(map(float, vector))], n_results=min(top_k, count), include=include)
+        matches = []
+        for i, vid in enumerate(resp["ids"][0]):
+            match = {"id": vid, "score": self._score(resp["distances"][0][i])}
+            if include_metadata:
+                match["metadata"] = resp["metadatas"][0][i] or {}
+            if include_values:
+                match["values"] = np.asarray(resp["embeddings"][0][i], dtype=np.float32)
+            matches.append(match)
+        return {"matches": matches}
+
+    def list(self, namespace: str = "") -> Iterator[List[str]]:
+        offset = 0
+        while True:
+            ids = self.collection.get(include=[], limit=self.page_size, offset=offset)["ids"]
+            if not ids:
+                return
+            yield ids
+            offset += len(ids)
+
+    def fetch(self, ids: List[str], namespace: str = ""):
+        resp = self.collection.get(ids=list(ids), include=["embeddings", "metadatas"])
+        vectors = {
+            vid: SimpleNamespace(values=np.asarray(resp["embeddings"][i], dtype=np.float32), metadata=resp["metadatas"][i] or {})
+            for i, vid in enumerate(resp["ids"])
+        }
+        return SimpleNamespace(vectors=vectors)
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = ""):
+        """
+        Args:
+            vectors: [{"id", "values", "metadata"}] (Pinecone upsert와 같은 형식)
+        """
+        if not vectors:
+            return {"upserted_count": 0}
+        metadatas = [_clean_metadata(v.get("metadata")) for v in vectors]
+        self.collection.upsert(
+            ids=[v["id"] for v in vectors],
+            embeddings=[np.asarray(v["values"], dtype=np.float32).tolist() for v in vectors],
+            metadatas=[m or None for m in metadatas],
+            documents=[str(m.get("text", "")) for m in metadatas],
+        )
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, namespace: str = ""):
+        if delete_all:
+            for batch in list(self.list()):
+                self.collection.delete(ids=batch)
+        elif ids:
+            ids = list(ids)
+            for start in range(0, len(ids), 1000):
+                self.collection.delete(ids=ids[start:start + 1000])
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        count = self.collection.count()
+        dim = 0
+        if count:
+            dim = len(self.collection.get(include=["embeddings"], limit=1)["embeddings"][0])
+        return {
+            "dimension": dim,
+            "total_vector_count": count,
+            "namespaces": {"": {"vector_count": count}} if count else {},
+        }
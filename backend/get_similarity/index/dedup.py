@@ -0,0 +1,208 @@
+"""
+JD 근사 중복(near-duplicate) 탐지 - 단어 shingle + MinHash LSH
+
+같은 공고가 문구만 조금 바뀌어 재등록되면 exact 중복 제거(drop_duplicates)로는 걸러지지 않아
+추천 상위 자리를 여러 개 차지하고 재정렬 비용도 낭비됩니다.
+적재 시 JD 본문마다 cluster_id를 부여해 청크 메타데이터에 저장하고, 검색에서는 cluster_id가 같은 Job을
+점수가 가장 높은 하나로 합칩니다. (후보 Job당 O(1))
+
+    shingle     정규화한 단어 shingle_size-gram
+    signature   num_perm개 해시 함수별 shingle 해시 최솟값 (두 signature의 일치 비율 ≈ Jaccard 유사도)
+    LSH         signature를 bands개 구간으로 나눠 한 구간이라도 같은 문서만 후보로 비교
+    cluster_id  추정 Jaccard 유사도가 threshold 이상인 가장 유사한 기존 Job의 cluster_id (없으면 자기 job_id)
+                (add_all은 job_id 순서로 추가하므로 적재 순서와 무관)
+
+저장 구조 (<path>/):
+    signatures.npy  (N x num_perm) uint32
+    jobs.json       Job ID / cluster_id 목록 + 설정
+"""
+
+import json
+import os
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from get_similarity.utils.tokenizer import clean_tokens
+
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, shingle_size: int = 3) -> List[str]:
+    """정규화(소문자, 앞뒤 특수문자 제거)한 단어 shingle_size-gram (단어 수가 모자라면 전체를 하나의 shingle로)"""
+    tokens = clean_tokens(text or "")
+    if len(tokens) <= shingle_size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+
+def optimal_bands(threshold: float, num_perm: int, min_recall: float = 0.99) -> Tuple[int, int]:
+    """
+    bands x rows = num_perm 중, 유사도가 threshold인 문서 쌍이 LSH 후보가 될 확률 1 - (1 - t^rows)^bands가
+    min_recall 이상인 조합 가운데 rows가 가장 큰 (후보가 가장 적은) 조합을 고릅니다.
+    후보는 signature 일치 비율로 다시 확인하므로 false positive는 비교 비용만 늘립니다.
+    """
+    pairs = sorted(((num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0), key=lambda p: p[1])
+    best = pairs[0]
+    for bands, rows in pairs:
+        if 1 - (1 - threshold ** rows) ** bands >= min_recall:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            threshold: 같은 cluster로 묶을 최소 Jaccard 유사도 (signature 추정값)
+            num_perm: MinHash 해시 함수 수 (클수록 추정이 정확하고 느림)
+            shingle_size: 단어 shingle 길이
+            seed: 해시 함수 계수 seed (저장된 signature와 같은 값을 써야 함)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        self.job_ids: List[str] = []
+        self.cluster_ids: List[str] = []
+        self._signatures: List[np.ndarray] = []
+        self._positions: Dict[str, int] = {}
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def signature(self, text: str) -> np.ndarray:
+        """JD 본문 → MinHash signature (num_perm,) uint32 (shingle이 없으면 모두 최댓값)"""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+        # (a * x + b) mod p: a < 2^31, x < 2^32 이므로 uint64에서 overflow 없음
+        return ((hashes[:, None] * self._a + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, text: str = None, signature: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        text(또는 signature)와 추정 유사도가 threshold 이상인 Job을 반환합니다.
+
+        Returns:
+            [(job_id, 추정 Jaccard 유사도)] (유사도 내림차순)
+        """
+        if signature is None:
+            signature = self.signature(text)
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        hits = []
+        for pos in candidates:
+            similarity = float(np.mean(self._signatures[pos] == signature))
+            if similarity >= self.threshold:
+                hits.append((self.job_ids[pos], similarity))
+        return sorted(hits, key=lambda x: (-x[1], x[0]))
+
+    def add(self, job_id: str, text: str) -> str:
+        """
+        Job을 인덱스에 추가하고 cluster_id를 반환합니다. (이미 있는 Job이면 기존 cluster_id)
+        가장 유사한 기존 Job의 cluster_id를 물려받으므로, 한 번 부여된 cluster_id는 이후 적재에서도 바뀌지 않습니다.
+        """
+        if job_id in self._positions:
+            return self.cluster_ids[self._positions[job_id]]
+        signature = self.signature(text)
+        hits = self.query(signature=signature)
+        cluster_id = self.cluster_ids[self._positions[hits[0][0]]] if hits else job_id
+
+        pos = len(self.job_ids)
+        self.job_ids.append(job_id)
+        self.cluster_ids.append(cluster_id)
+        self._signatures.append(signature)
+        self._positions[job_id] = pos
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].append(pos)
+        return cluster_id
+
+    def add_all(self, texts: Dict[str, str]) -> Dict[str, str]:
+        """
+        여러 Job을 job_id 순서로 추가하고 {job_id: cluster_id}를 반환합니다.
+        입력(CSV 파일 / 행) 순서와 무관하게 같은 Job 집합이면 같은 cluster_id가 부여되며,
+        빈 인덱스에서 시작하면 cluster_id는 cluster에서 가장 작은 job_id입니다.
+        (cluster_id가 metadata_hash에 포함되므로 순서만 바뀐 재적재가 메타데이터 갱신을 일으키지 않도록)
+        """
+        return {job_id: self.add(job_id, texts[job_id]) for job_id in sorted(texts)}
+
+    def cluster_of(self, job_id: str) -> Optional[str]:
+        pos = self._positions.get(job_id)
+        return self.cluster_ids[pos] if pos is not None else None
+
+    # --------------------------------------------------------------------------
+    # Save / Load
+    # --------------------------------------------------------------------------
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        signatures = np.asarray(self._signatures, dtype=np.uint32).reshape(len(self), self.num_perm)
+        np.save(os.path.join(path, "signatures.npy"), signatures)
+        with open(os.path.join(path, "jobs.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "threshold": self.threshold,
+                    "num_perm": self.num_perm,
+                    "shingle_size": self.shingle_size,
+                    "seed": self.seed,
+                    "job_ids": self.job_ids,
+                    "cluster_ids": self.cluster_ids,
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "NearDuplicateIndex":
+        with open(os.path.join(path, "jobs.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(threshold=meta["threshold"], num_perm=meta["num_perm"], shingle_size=meta["shingle_size"], seed=meta["seed"])
+        signatures = np.load(os.path.join(path, "signatures.npy"))
+        for pos, (job_id, cluster_id) in enumerate(zip(meta["job_ids"], meta["cluster_ids"])):
+            index.job_ids.append(job_id)
+            index.cluster_ids.append(cluster_id)
+            index._signatures.append(signatures[pos])
+            index._positions[job_id] = pos
+            for band, key in index._band_keys(signatures[pos]):
+                index._buckets[band][key].append(pos)
+        return index
+
+
+def load_near_dup_index(path: str, threshold: float = 0.8, num_perm: int = 128) -> NearDuplicateIndex:
+    """적재 스크립트용: path에 저장된 인덱스가 있으면 이어서 사용하고, 없으면 새로 만듭니다."""
+    if os.path.exists(os.path.join(path, "jobs.json")):
+        index = NearDuplicateIndex.load(path)
+        print(f"근사 중복 인덱스 로드: {len(index)} jobs, {len(set(index.cluster_ids))} clusters")
+        return index
+    return NearDuplicateIndex(threshold=threshold, num_perm=num_perm)
+
+
+def collapse_duplicates(items: Iterable, cluster_of: Callable) -> List:
+    """
+    순위 순서의 items에서 cluster별 첫 항목만 남깁니다. (cluster_of(item)이 None이면 중복 없음)
+    """
+    seen, unique = set(), []
+    for item in items:
+        cluster_id = cluster_of(item)
+        if cluster_id is not None:
+            if cluster_id in seen:
+                continue
+            seen.add(cluster_id)
+        unique.append(item)
+    return unique
+
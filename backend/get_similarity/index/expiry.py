@@ -0,0 +1,113 @@
+"""
+마감 공고 정기 삭제 (expiry sweeper)
+
+마감된 JD 벡터는 /upsert_jd를 호출할 때만 벡터마다 마감일을 확인해 삭제되었습니다.
+ExpirySweeper는 메타데이터 카탈로그(catalog.py)의 마감일(일 단위) bucket 중 오늘 이하인 bucket을 통째로 골라
+batch_size개씩 묶은 delete 호출로 삭제하고, 삭제가 있으면 on_expire(인덱스 버전 stamp 갱신 등)로
+하위 캐시를 무효화합니다. 마감 공고가 검색 후보 / 재정렬 / 결과 캐시에 남아 비용을 쓰지 않도록 합니다.
+sweep은 원격 인덱스를 훑지 않고 카탈로그만 조회합니다. (전체 동기화는 카탈로그를 처음 만들 때 한 번, 이후에는 복구 명령으로만)
+
+FastAPI lifespan에서 start()/stop()을 호출하면 interval초마다 백그라운드에서 sweep()을 실행합니다.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+from get_similarity.index.catalog import CatalogedIndex
+
+
+class ExpirySweeper:
+    def __init__(
+        self,
+        index: CatalogedIndex,
+        interval: float = 86400,
+        batch_size: int = 1000,
+        include_undated: bool = True,
+        on_expire: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            index: 카탈로그와 함께 연 인덱스 (삭제가 카탈로그에도 반영됨)
+            interval: 백그라운드 sweep 주기(초)
+            batch_size: delete 호출 한 번에 보낼 최대 ID 수 (Pinecone 제한 1000)
+            include_undated: 마감일이 없거나 파싱할 수 없는 공고도 삭제 (preprocess check_deadline 기준)
+            on_expire: 삭제가 있었던 sweep 결과를 받아 하위 캐시를 무효화하는 함수
+        """
+        self.index = index
+        self.interval = interval
+        self.batch_size = batch_size
+        self.include_undated = include_undated
+        self.on_expire = on_expire
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def sweep(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        오늘(today) 이하 마감일 bucket을 삭제합니다. (동시에 호출되면 하나씩 실행)
+
+        Returns:
+            {"buckets": 삭제한 bucket 수, "deleted": 삭제한 벡터 수, "calls": delete 호출 수, "seconds": 소요 시간,
+             "catalog_in_sync": 카탈로그 동기화 상태 (False면 복구 명령 필요)}
+        """
+        with self._lock:
+            start = time.perf_counter()
+            catalog = self.index.catalog
+            if catalog.synced_at() is None:
+                # 카탈로그를 처음 만든 경우에만 인덱스를 한 번 훑어 채움 (이후에는 적재/삭제 경로가 카탈로그를 함께 갱신)
+                catalog.sync(self.index)
+            elif not catalog.in_sync():
+                # 전체 sync는 주기 작업에서 실행하지 않음 (명시적인 복구 명령으로만), 카탈로그가 아는 마감 벡터는 그대로 삭제
+                print(f"[WARN] 카탈로그가 인덱스와 어긋났을 수 있습니다 ({catalog.status()['dirty']}). 복구 명령으로 다시 동기화하세요.")
+
+            buckets = catalog.deadline_buckets(today or date.today(), include_undated=self.include_undated)
+            # 여러 bucket을 이어서 batch_size개씩 삭제 (작은 bucket마다 호출하지 않음)
+            ids = [vid for bucket in buckets.values() for vid in bucket]
+            calls = 0
+            for offset in range(0, len(ids), self.batch_size):
+                self.index.delete(ids=ids[offset:offset + self.batch_size])
+                calls += 1
+
+            result = {
+                "buckets": len(buckets),
+                "deleted": len(ids),
+                "calls": calls,
+                "seconds": time.perf_counter() - start,
+                "catalog_in_sync": catalog.in_sync(),
+            }
+            if ids:
+                print(f"🧹 마감 공고 삭제: {len(ids)}개 벡터 ({len(buckets)}개 마감일 bucket, delete {calls}회)")
+                if self.on_expire is not None:
+                    self.on_expire(result)
+            self.last_result, self.last_error = result, None
+            return result
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self._task is not None, "interval": self.interval, "last_result": self.last_result, "last_error": self.last_error}
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[WARN] 마감 공고 삭제 실패: {self.last_error}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        """FastAPI lifespan 시작 시 호출: 백그라운드 sweep을 시작합니다."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,165 @@
+"""
+JD 청크 행 단위 메타데이터 필터 인덱스 (bitmap + deadline range index)
+
+/upload의 필터(location, is_remote, job_type)는 Pinecone 검색에만 적용되고
+로컬 재정렬 경로는 필터를 무시했습니다. 필터 값마다 청크 행 bitset(np.packbits)을 만들어두고
+요청 필터를 bitwise AND/OR로 한 번에 계산한 뒤, 통과한 행(Job)만 재정렬합니다.
+
+마감일은 (정렬된 일 단위 값, 행 번호) 쌍으로 보관해 searchsorted로 범위 조회합니다.
+마감일이 없거나 파싱할 수 없는 공고(상시채용 등)는 항상 통과합니다.
+
+적재된 메타데이터(preprocess make_chunks)에는 is_remote / job_type이 없고 location은 "서울 성동구" 같은
+자유 형식이지만, 프론트엔드는 location="Korea", job_type="fulltime,parttime"처럼 보냅니다.
+그래서 필터는 다음처럼 느슨하게 적용합니다. (전체 스캔 대신 "결과 없음"이 되지 않도록)
+    - "a,b"처럼 쉼표로 이은 값은 값 목록(OR)으로 나눔
+    - 해당 필드 값이 없는 공고는 통과 (마감일 없는 공고와 같은 규칙)
+    - 요청 값이 인덱스에 하나도 없으면(예: 코퍼스에 없는 국가 단위 location) 그 필드는 적용하지 않음
+    - location은 정규화한 부분 문자열로 비교 ("서울" → "서울 성동구")
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+FILTER_FIELDS = ("location", "is_remote", "job_type")
+# 필터를 적용하지 않는 값 (/upload 기본값 "any" 포함)
+ANY_VALUES = {"", "any", "all", "none"}
+# 값이 같지 않아도 요청 값을 포함하면 통과하는 자유 형식 필드
+CONTAINS_FIELDS = ("location",)
+NO_DEADLINE = np.iinfo(np.int32).max
+
+
+def _normalize(value: Any) -> str:
+    value = "" if value is None or value != value else value  # None / NaN은 값 없음
+    return " ".join(str(value).split()).lower()
+
+
+def parse_deadline(value: Any) -> Optional[int]:
+    """'YYYY-MM-DD' (또는 'YYYY.MM.DD', 시간 포함 문자열) → date ordinal, 실패 시 None"""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(str(value).strip()[:10].replace(".", "-")).toordinal()
+    except ValueError:
+        return None
+
+
+class FilterIndex:
+    def __init__(self, num_rows: int, bitmaps: Dict[str, Dict[str, np.ndarray]], deadline_days: np.ndarray, deadline_rows: np.ndarray):
+        """
+        Args:
+            num_rows: 청크 행 수
+            bitmaps: {필드: {정규화된 값: packed bitset (ceil(N/8),) uint8}}
+            deadline_days: 정렬된 마감일 ordinal (N,)
+            deadline_rows: deadline_days 순서의 행 번호 (N,)
+        """
+        self.num_rows = num_rows
+        self.bitmaps = bitmaps
+        self.deadline_days = deadline_days
+        self.deadline_rows = deadline_rows
+
+    @classmethod
+    def build(cls, job_metadata: List[Dict[str, Any]], counts: Iterable[int], fields=FILTER_FIELDS) -> "FilterIndex":
+        """
+        Args:
+            job_metadata: Job별 메타데이터 (Job 순서)
+            counts: Job별 청크 행 수 (행은 Job 단위로 연속 배치)
+        """
+        counts = np.asarray(list(counts), dtype=np.int64)
+        num_rows = int(counts.sum())
+
+        bitmaps = {}
+        for field in fields:
+            # Job별 값 → 값 번호, 행으로 펼친 뒤 값마다 bitset 생성
+            values = {}
+            codes = np.asarray(
+                [values.setdefault(_normalize(meta.get(field, "")), len(values)) for meta in job_metadata],
+                dtype=np.int32,
+            )
+            row_codes = np.repeat(codes, counts)
+            bitmaps[field] = {value: np.packbits(row_codes == code) for value, code in values.items()}
+
+        job_days = np.asarray(
+            [d if (d := parse_deadline(meta.get("deadline"))) is not None else NO_DEADLINE for meta in job_metadata],
+            dtype=np.int32,
+        )
+        row_days = np.repeat(job_days, counts)
+        order = np.argsort(row_days, kind="stable")
+        return cls(num_rows, bitmaps, row_days[order], order.astype(np.int64))
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "FilterIndex":
+        return cls.build(snapshot.job_metadata, np.diff(snapshot.offsets))
+
+    @staticmethod
+    def is_active(filters: Optional[Dict[str, Any]]) -> bool:
+        return any(_values(v) for v in (filters or {}).values())
+
+    def _matching_values(self, field: str, wanted: List[str]) -> List[str]:
+        """요청 값과 일치하는 인덱스 값 (CONTAINS_FIELDS는 요청 값을 포함하는 값)"""
+        indexed = [v for v in self.bitmaps.get(field, {}) if v]
+        if field in CONTAINS_FIELDS:
+            return [v for v in indexed if any(w in v for w in wanted)]
+        return [v for v in indexed if v in wanted]
+
+    def bitmap(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """필터 조건(필드 간 AND, 값 목록은 OR)을 만족하는 행의 packed bitset"""
+        result = np.full((self.num_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for field, value in (filters or {}).items():
+            wanted = _values(value)
+            if not wanted:
+                continue
+            values = self._matching_values(field, wanted)
+            if not values:
+                # 코퍼스에 없는 필드 / 값은 모든 공고를 제외하지 않고 적용하지 않음
+                continue
+            field_bitmaps = self.bitmaps[field]
+            matched = field_bitmaps.get("", np.zeros_like(result)).copy()
+            for v in values:
+                matched |= field_bitmaps[v]
+            result &= matched
+        return result
+
+    def deadline_mask(self, start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """마감일이 [start, end] 범위인 행 (마감일 없는 공고는 end와 무관하게 통과)"""
+        lo = np.searchsorted(self.deadline_days, start.toordinal(), side="left") if start else 0
+        hi = np.searchsorted(self.deadline_days, end.toordinal(), side="right") if end else len(self.deadline_days)
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.deadline_rows[lo:hi]] = True
+        mask[self.deadline_rows[np.searchsorted(self.deadline_days, NO_DEADLINE, side="left"):]] = True
+        return mask
+
+    def mask(self, filters: Optional[Dict[str, Any]] = None, deadline_from: Optional[date] = None, deadline_to: Optional[date] = None) -> np.ndarray:
+        """필터와 마감일 범위를 모두 만족하는 행 (N,) bool"""
+        mask = np.unpackbits(self.bitmap(filters), count=self.num_rows).astype(bool)
+        if deadline_from or deadline_to:
+            mask &= self.deadline_mask(deadline_from, deadline_to)
+        return mask
+
+    @staticmethod
+    def job_positions(mask: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """행 mask를 Job 위치로 변환 (필터는 Job 단위 속성이므로 Job의 첫 행으로 판단)"""
+        offsets = np.asarray(offsets)
+        non_empty = np.flatnonzero(np.diff(offsets) > 0)
+        return non_empty[mask[offsets[non_empty]]]
+
+
+def _values(value: Any) -> List[str]:
+    """요청 필터 값 → 정규화된 값 목록 ("a,b"는 두 값으로 나눔, "any" 등은 제외)"""
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    parts = [_normalize(p) for v in values if v is not None for p in str(v).split(",")]
+    return [p for p in parts if p not in ANY_VALUES]
+
+
+_filter_cache = {}
+
+
+def get_snapshot_filters(snapshot) -> Optional[FilterIndex]:
+    """스냅샷 버전별로 필터 인덱스를 한 번만 만들어 캐싱합니다."""
+    if snapshot is None:
+        return None
+    if snapshot.version not in _filter_cache:
+        _filter_cache.clear()
+        _filter_cache[snapshot.version] = FilterIndex.from_snapshot(snapshot)
+    return _filter_cache[snapshot.version]
@@ -0,0 +1,305 @@
+"""
+JD 청크 벡터 압축 저장 (float16 / int8 scalar quantization / product quantization)
+
+solar-embedding-1-large 벡터는 4096차원(float32 16KB/청크)이라 Job 수가 늘면 scoring 시 읽어야 하는 메모리가 커집니다.
+스냅샷 청크를 압축 code로 한 번 더 저장해두고 1차 scoring은 code에서 바로 계산한 뒤,
+최종 상위 Job만 원본 float32 스냅샷(mmap)으로 정확히 다시 계산(re-score)합니다.
+
+    fp16    float16 그대로 저장                                        2x
+    int8    차원별 scale로 대칭 양자화, 점수 = (query * scale) @ code    4x
+    pq      D를 m개 부분공간으로 나누고 부분공간별 256개 codebook 번호   4D/m x
+            점수 = 부분공간별 (query · codeword) 표를 code로 조회해서 합산 (ADC)
+
+저장 구조 (<snapshot>/quantized/):
+    codes.npy       (N x D) float16 / (N x D) int8 / (N x m) uint8, 스냅샷 행 순서
+    codec.npz       int8: scale (D,), pq: codebooks (m x 256 x D/m)
+    codec.json      방식 + 설정 (마지막에 기록)
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+# Numba가 설치되어 있지 않을 경우를 대비한 안전 장치
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+        return wrapper
+
+QUANTIZATION_METHODS = ("fp16", "int8", "pq")
+
+
+class VectorCodec(ABC):
+    """압축 방식 공통 인터페이스 (메서드를 모두 구현하지 않은 codec은 생성 시점에 TypeError)"""
+
+    method = ""
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """(Q x D) query와 code 행들의 내적 (Q x B) float32"""
+
+    @abstractmethod
+    def bytes_per_vector(self, dim: int) -> int:
+        ...
+
+    def params(self):
+        return {}
+
+
+class Float16Codec(VectorCodec):
+    method = "fp16"
+
+    def __init__(self, block_rows: int = 8192):
+        self.block_rows = block_rows
+
+    def encode(self, vectors):
+        return np.asarray(vectors, dtype=np.float16)
+
+    def decode(self, codes):
+        return np.asarray(codes, dtype=np.float32)
+
+    def scores(self, queries, codes):
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.empty((len(queries), len(codes)), dtype=np.float32)
+        # float32 변환 버퍼가 커지지 않도록 블록 단위로 변환
+        for start in range(0, len(codes), self.block_rows):
+            end = start + self.block_rows
+            out[:, start:end] = queries @ codes[start:end].astype(np.float32).T
+        return out
+
+    def bytes_per_vector(self, dim):
+        return 2 * dim
+
+
+class Int8Codec(VectorCodec):
+    method = "int8"
+
+    def __init__(self, scale: Optional[np.ndarray] = None, block_rows: int = 8192):
+        """
+        Args:
+            scale: 차원별 scale (D,), code = round(x / scale) ∈ [-127, 127]
+        """
+        self.scale = scale
+        self.block_rows = block_rows
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, block_rows: int = 8192) -> "Int8Codec":
+        # 스냅샷 mmap 전체를 float32로 복사하지 않도록 블록 단위로 차원별 최댓값 계산
+        peak = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, len(vectors), block_rows):
+            block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+            np.maximum(peak, np.abs(block).max(axis=0), out=peak)
+        scale = peak / 127
+        scale[scale < 1e-12] = 1.0
+        return cls(scale, block_rows=block_rows)
+
+    def encode(self, vectors):
+        return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) / self.scale), -127, 127).astype(np.int8)
+
+    def decode(self, codes):
+        return codes.astype(np.float32) * self.scale
+
+    def scores(self, queries, codes):
+        # scale을 query 쪽에 곱해두면 code 행렬을 복원하지 않고 바로 내적
+        scaled = np.asarray(queries, dtype=np.float32) * self.scale
+        out = np.empty((len(scaled), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), self.block_rows):
+            end = start + self.block_rows
+            out[:, start:end] = scaled @ codes[start:end].astype(np.float32).T
+        return out
+
+    def bytes_per_vector(self, dim):
+        return dim
+
+    def params(self):
+        return {"scale": self.scale}
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _adc_scores(tables: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """tables (Q x m x 256), codes (B x m) → (Q x B) 부분공간별 표 조회 합"""
+    num_queries, num_sub = tables.shape[0], tables.shape[1]
+    out = np.empty((num_queries, codes.shape[0]), dtype=np.float32)
+    for n in prange(codes.shape[0]):
+        for q in range(num_queries):
+            s = 0.0
+            for j in range(num_sub):
+                s += tables[q, j, codes[n, j]]
+            out[q, n] = s
+    return out
+
+
+def _kmeans(vectors: np.ndarray, k: int, n_iter: int, rng) -> np.ndarray:
+    """부분공간 codebook 학습용 Euclidean k-means"""
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=len(vectors) < k)].copy()
+    for _ in range(n_iter):
+        dists = (vectors ** 2).sum(axis=1, keepdims=True) - 2 * vectors @ centroids.T + (centroids ** 2).sum(axis=1)
+        assign = np.argmin(dists, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=k)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class ProductQuantizer(VectorCodec):
+    method = "pq"
+
+    def __init__(self, codebooks: Optional[np.ndarray] = None):
+        """
+        Args:
+            codebooks: (m x 256 x D/m) 부분공간별 codeword
+        """
+        self.codebooks = codebooks
+
+    @property
+    def num_subspaces(self) -> int:
+        return self.codebooks.shape[0]
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, num_subspaces: int, n_iter: int = 10, sample_size: int = 20000, seed: int = 0) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        if dim % num_subspaces:
+            raise ValueError(f"벡터 차원({dim})이 부분공간 수({num_subspaces})로 나누어떨어지지 않습니다.")
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), size=sample_size, replace=False))]
+        sub = vectors.reshape(len(vectors), num_subspaces, dim // num_subspaces)
+        codebooks = np.stack([_kmeans(sub[:, j], 256, n_iter, rng) for j in range(num_subspaces)])
+        return cls(codebooks.astype(np.float32))
+
+    def encode(self, vectors, block_rows: int = 8192):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        m, _, sub_dim = self.codebooks.shape
+        codes = np.empty((len(vectors), m), dtype=np.uint8)
+        norms = (self.codebooks ** 2).sum(axis=2)
+        for start in range(0, len(vectors), block_rows):
+            sub = vectors[start:start + block_rows].reshape(-1, m, sub_dim)
+            for j in range(m):
+                codes[start:start + block_rows, j] = np.argmin(norms[j] - 2 * sub[:, j] @ self.codebooks[j].T, axis=1)
+        return codes
+
+    def decode(self, codes):
+        m = self.codebooks.shape[0]
+        return self.codebooks[np.arange(m), codes].reshape(len(codes), -1)
+
+    def scores(self, queries, codes):
+        queries = np.asarray(queries, dtype=np.float32)
+        m, _, sub_dim = self.codebooks.shape
+        # (Q x m x 256) 부분공간별 query · codeword 표
+        tables = np.einsum("qjd,jkd->qjk", queries.reshape(len(queries), m, sub_dim), self.codebooks)
+        if HAS_NUMBA:
+            return _adc_scores(np.ascontiguousarray(tables, dtype=np.float32), np.ascontiguousarray(codes))
+        return tables[:, np.arange(m), np.asarray(codes)].sum(axis=2).astype(np.float32)
+
+    def bytes_per_vector(self, dim):
+        return self.codebooks.shape[0]
+
+    def params(self):
+        return {"codebooks": self.codebooks}
+
+
+def train_codec(method: str, vectors: np.ndarray, pq_subspaces: Optional[int] = None) -> VectorCodec:
+    """
+    Args:
+        method: "fp16" | "int8" | "pq"
+        vectors: 학습용 (정규화된) 청크 벡터
+        pq_subspaces: PQ 부분공간 수 (None이면 D/4 → float32 대비 16x)
+    """
+    if method == "fp16":
+        return Float16Codec()
+    if method == "int8":
+        return Int8Codec.train(vectors)
+    if method == "pq":
+        return ProductQuantizer.train(vectors, pq_subspaces or vectors.shape[1] // 4)
+    raise ValueError(f"지원하지 않는 양자화 방식입니다: {method} (가능: {QUANTIZATION_METHODS})")
+
+
+class QuantizedVectors:
+    """스냅샷 행 순서의 압축 code + codec"""
+
+    def __init__(self, codec: VectorCodec, codes: np.ndarray, dim: int):
+        self.codec = codec
+        self.codes = codes
+        self.dim = dim
+
+    @property
+    def method(self) -> str:
+        return self.codec.method
+
+    def compression_ratio(self) -> float:
+        """float32 대비 압축률"""
+        return 4 * self.dim / self.codec.bytes_per_vector(self.dim)
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "codes.npy"), self.codes)
+        np.savez(os.path.join(path, "codec.npz"), **self.codec.params())
+        with open(os.path.join(path, "codec.json"), "w", encoding="utf-8") as f:
+            json.dump({"method": self.method, "dim": self.dim, "num_rows": len(self.codes)}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "QuantizedVectors":
+        with open(os.path.join(path, "codec.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        params = np.load(os.path.join(path, "codec.npz"))
+        if meta["method"] == "fp16":
+            codec = Float16Codec()
+        elif meta["method"] == "int8":
+            codec = Int8Codec(params["scale"])
+        else:
+            codec = ProductQuantizer(params["codebooks"])
+        codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="r" if mmap else None)
+        return cls(codec, codes, meta["dim"])
+
+
+QUANTIZED_DIR = "quantized"
+_quantized_cache = {}
+
+
+def get_snapshot_quantized(snapshot) -> Optional[QuantizedVectors]:
+    """
+    스냅샷 버전 디렉토리(<snapshot>/quantized)에 저장된 압축 벡터를 버전별로 캐싱해서 반환합니다.
+    스냅샷과 함께 만들어지지 않았다면 None을 반환합니다.
+    """
+    if snapshot is None:
+        return None
+    if snapshot.version not in _quantized_cache:
+        path = os.path.join(snapshot.path, QUANTIZED_DIR)
+        # codec.json은 save()에서 마지막에 기록되므로, 저장이 끝난 압축 벡터만 로드
+        if not os.path.exists(os.path.join(path, "codec.json")):
+            return None
+        _quantized_cache.clear()
+        _quantized_cache[snapshot.version] = QuantizedVectors.load(path)
+    return _quantized_cache[snapshot.version]
+
+
+def build_snapshot_quantized(snapshot, method: str = "int8", pq_subspaces: Optional[int] = None, block_rows: int = 65536) -> QuantizedVectors:
+    """스냅샷 전체 청크를 압축해서 스냅샷 버전 디렉토리에 저장합니다."""
+    codec = train_codec(method, snapshot.vectors, pq_subspaces=pq_subspaces)
+    # float32 변환 버퍼가 커지지 않도록 블록 단위로 압축
+    codes = np.concatenate([codec.encode(snapshot.vectors[start:start + block_rows]) for start in range(0, max(snapshot.num_rows, 1), block_rows)])
+    quantized = QuantizedVectors(codec, codes, snapshot.dim)
+    quantized.save(os.path.join(snapshot.path, QUANTIZED_DIR))
+    print(f"✅ 압축 벡터 저장 완료: {method}, {len(quantized.codes)} vectors, float32 대비 {quantized.compression_ratio():.0f}x")
+    return quantized
@@ -0,0 +1,308 @@
+"""
+JD 청크 벡터 로컬 스냅샷
+
+Pinecone 인덱스의 모든 청크 벡터를 하나의 연속된 float32 행렬로 디스크에 저장하고,
+매 요청마다 네트워크로 벡터를 받아오는 대신 memory-map으로 읽어서 사용합니다.
+mmap 페이지는 OS page cache를 통해 공유되므로 여러 uvicorn worker가 같은 물리 메모리를 읽기 전용으로 사용합니다.
+
+디렉토리 구조:
+    <root>/CURRENT                  현재 사용 중인 버전 이름 (원자적으로 교체)
+    <root>/<version>/vectors.f32    (N x D) float32 행렬, L2 정규화, Job 단위로 연속 배치
+    <root>/<version>/offsets.npy    (J + 1) int64, Job j의 청크 행 범위 = offsets[j]:offsets[j+1]
+    <root>/<version>/jobs.json      manifest + job_ids + chunk_ids + Job별 메타데이터
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from get_similarity.utils.chunk_ids import resolve_job_id
+
+CURRENT_FILE = "CURRENT"
+VECTORS_FILE = "vectors.f32"
+OFFSETS_FILE = "offsets.npy"
+JOBS_FILE = "jobs.json"
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms < 1e-9] = 1.0
+    return vectors / norms
+
+
+class VectorSnapshot:
+    """
+    memory-map으로 로드된 읽기 전용 JD 청크 벡터 스냅샷
+    """
+
+    def __init__(
+        self,
+        path: str,
+        vectors: np.ndarray,
+        offsets: np.ndarray,
+        job_ids: List[str],
+        chunk_ids: List[str],
+        job_metadata: List[Dict[str, Any]],
+        manifest: Dict[str, Any],
+    ):
+        self.path = path
+        self.vectors = vectors
+        self.offsets = offsets
+        self.job_ids = job_ids
+        self.chunk_ids = chunk_ids
+        self.job_metadata = job_metadata
+        self.manifest = manifest
+        self._job_index = {jid: i for i, jid in enumerate(job_ids)}
+        self._chunk_index = None
+        self._row_jobs = None
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @property
+    def num_rows(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def num_jobs(self) -> int:
+        return len(self.job_ids)
+
+    def job_vectors(self, j: int) -> np.ndarray:
+        """Job j의 청크 벡터 (복사 없이 mmap view 반환)"""
+        return self.vectors[self.offsets[j]:self.offsets[j + 1]]
+
+    def job_position(self, job_id: str) -> Optional[int]:
+        return self._job_index.get(job_id)
+
+    @property
+    def row_jobs(self) -> np.ndarray:
+        """각 청크 행이 속한 Job 위치 (N,)"""
+        if self._row_jobs is None:
+            self._row_jobs = np.repeat(np.arange(self.num_jobs, dtype=np.int64), np.diff(self.offsets))
+        return self._row_jobs
+
+    def jobs_for_chunks(self, chunk_ids: List[str]) -> np.ndarray:
+        """청크 ID 목록이 속한 Job 위치를 중복 없이 반환합니다."""
+        if self._chunk_index is None:
+            self._chunk_index = {cid: r for r, cid in enumerate(self.chunk_ids)}
+        rows = [self._chunk_index[c] for c in chunk_ids if c in self._chunk_index]
+        return np.unique(self.row_jobs[rows]) if rows else np.empty(0, dtype=np.int64)
+
+    def metadata(self, job_id: str) -> Dict[str, Any]:
+        j = self._job_index.get(job_id)
+        return self.job_metadata[j] if j is not None else {}
+
+    @classmethod
+    def open(cls, path: str) -> "VectorSnapshot":
+        with open(os.path.join(path, JOBS_FILE), "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        manifest = sidecar["manifest"]
+        vectors = np.memmap(
+            os.path.join(path, VECTORS_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=(manifest["num_rows"], manifest["dim"]),
+        )
+        offsets = np.load(os.path.join(path, OFFSETS_FILE))
+        return cls(
+            path=path,
+            vectors=vectors,
+            offsets=offsets,
+            job_ids=sidecar["job_ids"],
+            chunk_ids=sidecar["chunk_ids"],
+            job_metadata=sidecar["job_metadata"],
+            manifest=manifest,
+        )
+
+
+class SnapshotWriter:
+    """
+    Job 단위로 청크 벡터를 받아 새 스냅샷 버전을 만들고, commit 시 CURRENT를 원자적으로 교체합니다.
+    벡터는 받는 즉시 파일에 append하므로 전체 행렬을 메모리에 올리지 않습니다.
+
+    Example:
+        >>> writer = SnapshotWriter(SNAPSHOT_PATH, dim=4096)
+        >>> writer.add_job("wd_1234", vectors, metadata={...}, chunk_ids=[...])
+        >>> version = writer.commit()
+    """
+
+    def __init__(self, root: str, dim: int, model: str = "", keep: int = 2):
+        self.root = root
+        self.dim = dim
+        self.model = model
+        self.keep = keep
+        self.version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._tmp_dir = os.path.join(root, f".{self.version}.tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._vec_file = open(os.path.join(self._tmp_dir, VECTORS_FILE), "wb")
+        self._offsets = [0]
+        self._job_ids: List[str] = []
+        self._chunk_ids: List[str] = []
+        self._job_metadata: List[Dict[str, Any]] = []
+
+    def add_job(self, job_id: str, vectors, metadata: Optional[Dict[str, Any]] = None, chunk_ids: Optional[List[str]] = None):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"{job_id}: 벡터 shape {vectors.shape}가 dim={self.dim}와 맞지 않습니다.")
+        if len(vectors) == 0:
+            return
+        if chunk_ids is None:
+            chunk_ids = [f"{job_id}__c{i:04d}" for i in range(len(vectors))]
+
+        self._vec_file.write(np.ascontiguousarray(_l2_normalize(vectors)).tobytes())
+        self._offsets.append(self._offsets[-1] + len(vectors))
+        self._job_ids.append(job_id)
+        self._chunk_ids.extend(chunk_ids)
+        self._job_metadata.append(metadata or {})
+
+    def commit(self) -> str:
+        self._vec_file.close()
+        manifest = {
+            "version": self.version,
+            "dim": self.dim,
+            "num_rows": self._offsets[-1],
+            "num_jobs": len(self._job_ids),
+            "model": self.model,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        np.save(os.path.join(self._tmp_dir, OFFSETS_FILE), np.asarray(self._offsets, dtype=np.int64))
+        with open(os.path.join(self._tmp_dir, JOBS_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "manifest": manifest,
+                    "job_ids": self._job_ids,
+                    "chunk_ids": self._chunk_ids,
+                    "job_metadata": self._job_metadata,
+                },
+                f,
+                ensure_ascii=False,
+                default=str,
+            )
+
+        os.replace(self._tmp_dir, os.path.join(self.root, self.version))
+        tmp_current = os.path.join(self.root, f".{CURRENT_FILE}.{self.version}")
+        with open(tmp_current, "w") as f:
+            f.write(self.version)
+        os.replace(tmp_current, os.path.join(self.root, CURRENT_FILE))
+        self._prune_old_versions()
+        print(f"✅ 스냅샷 저장 완료: {self.version} ({manifest['num_jobs']} jobs, {manifest['num_rows']} vectors)")
+        return self.version
+
+    def abort(self):
+        self._vec_file.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def _prune_old_versions(self):
+        # 이미 mmap 중인 worker가 있을 수 있으므로 최근 keep개 버전은 남겨 둠
+        versions = sorted(
+            d for d in os.listdir(self.root)
+            if not d.startswith(".") and os.path.isdir(os.path.join(self.root, d))
+        )
+        for old in versions[:-self.keep]:
+            shutil.rmtree(os.path.join(self.root, old), ignore_errors=True)
+
+
+def current_version(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(root: str) -> Optional[VectorSnapshot]:
+    """CURRENT가 가리키는 스냅샷을 로드합니다. 스냅샷이 없으면 None을 반환합니다."""
+    version = current_version(root)
+    if not version:
+        return None
+    return VectorSnapshot.open(os.path.join(root, version))
+
+
+_snapshot_cache: Dict[str, VectorSnapshot] = {}
+
+
+def get_snapshot(root: str) -> Optional[VectorSnapshot]:
+    """
+    프로세스 단위로 스냅샷을 캐싱해서 반환합니다.
+    CURRENT 파일만 확인하므로 비용이 거의 없고, 새 버전이 commit되면 자동으로 다시 로드합니다.
+    """
+    version = current_version(root)
+    if not version:
+        return None
+    cached = _snapshot_cache.get(root)
+    if cached is None or cached.version != version:
+        try:
+            cached = VectorSnapshot.open(os.path.join(root, version))
+        except Exception as e:
+            print(f"스냅샷 로드 중 에러 발생: {str(e)}")
+            return cached
+        _snapshot_cache[root] = cached
+    return cached
+
+
+def build_snapshot_from_pinecone(index, root: str, namespace: str = "", batch_size: int = 100, model: str = "") -> str:
+    """
+    Pinecone 인덱스 전체를 읽어 로컬 스냅샷을 생성합니다.
+
+    Args:
+        index: Pinecone Index 객체 (list / fetch / describe_index_stats가 같은 ChromaIndex도 사용 가능)
+        root: 스냅샷 저장 경로
+        namespace: Pinecone namespace
+        batch_size: fetch 배치 크기 (URI 길이 제한으로 100 권장)
+        model: 임베딩 모델 이름 (manifest 기록용)
+    Returns:
+        version: 생성된 스냅샷 버전
+    """
+    os.makedirs(root, exist_ok=True)
+    ids = [vid for batch in index.list(namespace=namespace) for vid in batch]
+    dim = int(index.describe_index_stats()["dimension"])
+    print(f"총 {len(ids)}개 벡터를 {batch_size}개씩 가져옵니다 (dim={dim})")
+
+    # 1. 도착 순서대로 scratch 파일에 기록 (메모리 사용량을 Job 하나 크기로 제한)
+    scratch_path = os.path.join(root, f".scratch-{uuid.uuid4().hex[:6]}.f32")
+    scratch = np.memmap(scratch_path, dtype=np.float32, mode="w+", shape=(max(len(ids), 1), dim))
+    rows_by_job = defaultdict(list)
+    job_metadata = {}
+    row = 0
+    try:
+        for start in range(0, len(ids), batch_size):
+            resp = index.fetch(ids=ids[start:start + batch_size], namespace=namespace)
+            for vid, vector_data in resp.vectors.items():
+                meta = vector_data.metadata or {}
+                job_id = resolve_job_id(vid, meta)
+                if not job_id:
+                    continue
+                scratch[row] = vector_data.values
+                rows_by_job[job_id].append((vid, row))
+                job_metadata.setdefault(job_id, meta)
+                row += 1
+
+        # 2. Job 단위로 정렬해서 연속 배치
+        writer = SnapshotWriter(root, dim=dim, model=model)
+        try:
+            for job_id in sorted(rows_by_job):
+                chunk_rows = sorted(rows_by_job[job_id])
+                writer.add_job(
+                    job_id,
+                    scratch[[r for _, r in chunk_rows]],
+                    metadata=job_metadata[job_id],
+                    chunk_ids=[vid for vid, _ in chunk_rows],
+                )
+            return writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+    finally:
+        del scratch
+        os.remove(scratch_path)
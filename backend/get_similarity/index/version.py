@@ -0,0 +1,40 @@
+"""
+JD 인덱스 버전 stamp
+
+결과 캐시 key에 포함해서, 인덱스가 바뀌면 이전 결과가 자동으로 무효화되도록 합니다.
+    - 로컬 스냅샷: CURRENT 버전 (build_snapshot 시 교체)
+    - BM25 인덱스: CURRENT 버전 (BM25Index.save 시 교체)
+    - Pinecone 적재: ingestion(/upsert_jd 등)이 bump_index_version()으로 기록하는 stamp 파일
+"""
+
+import os
+import time
+import uuid
+
+from get_similarity.index.snapshot import current_version
+
+
+def bump_index_version(path: str) -> str:
+    """새 stamp를 원자적으로 기록하고 반환합니다. (JD 적재/삭제 후 호출)"""
+    stamp = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(stamp)
+    os.replace(tmp, path)
+    return stamp
+
+
+def _read_stamp(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or "-"
+    except FileNotFoundError:
+        return "-"
+
+
+def index_version(snapshot_root: str, bm25_path: str, stamp_path: str) -> str:
+    """현재 JD 인덱스 상태를 나타내는 문자열 (구성 요소 중 하나라도 바뀌면 달라짐)"""
+    snapshot = current_version(snapshot_root) or "-"
+    bm25 = current_version(bm25_path) or "-"
+    return f"{snapshot}:{bm25}:{_read_stamp(stamp_path)}"
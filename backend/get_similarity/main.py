@@ -1,9 +1,25 @@
 from get_similarity.nodes.retrieval import get_retriever
-from get_similarity.nodes.search import search_jd, search_jd_summary
+from get_similarity.nodes.search import search_jd, search_jd_summary, search_jd_summary_batch
 from get_similarity.nodes.generate import generation
-from get_similarity.nodes.db_load import get_db
-import pickle#로컬에서 그대로 받는거라 강조는 안되지만 필요
-from configs import COLLECTION, DB_PATH, DB_TYPE
+from get_similarity.registry import registry
+from get_similarity.index import get_bm25_index, index_version
+from get_similarity.utils.result_cache import ResultCache
+from get_similarity.utils.offload import run_blocking
+from configs import BM25_PATH, INDEX_VERSION_PATH, RESULT_CACHE_MAX_ITEMS, RESULT_CACHE_TTL, SNAPSHOT_PATH
+
+# (이력서 해시, 필터, JD 인덱스 버전) → 매칭 결과
+result_cache = ResultCache(max_items=RESULT_CACHE_MAX_ITEMS, ttl=RESULT_CACHE_TTL)
+
+def _search_filter(location, remote, jobtype):
+    search_filter = {}
+    if location:
+        search_filter["location"] = location
+    if remote :
+        search_filter["is_remote"] = remote
+    if jobtype:
+        search_filter["job_type"] = jobtype
+    return search_filter
+
 
 async def matching(resume, location, remote, jobtype):
     """
@@ -20,35 +36,44 @@ async def matching(resume, location, remote, jobtype):
         jd_url: 채용공고 URL
         c_name: 채용공고를 올린 회사 이름
     """
-    search_filter = {}
-    if location:
-        search_filter["location"] = location
-    if remote :
-        search_filter["is_remote"] = remote
-    if jobtype:
-        search_filter["job_type"] = jobtype
+    search_filter = _search_filter(location, remote, jobtype)
 
-    from langchain_upstage import UpstageEmbeddings
-    from configs import UPSTAGE_API_KEY
-    # 노트북과 동일한 모델 사용
-    emb_model = UpstageEmbeddings(model="solar-embedding-1-large", api_key=UPSTAGE_API_KEY)
+    # 같은 이력서·필터·인덱스 버전이면 캐시된 결과 반환 (인덱스가 바뀌면 자동 무효화)
+    version = index_version(SNAPSHOT_PATH, BM25_PATH, INDEX_VERSION_PATH)
+    cached = result_cache.get(resume, search_filter, version)
+    if cached is not None:
+        print(f"결과 캐시 hit (index version={version})")
+        return cached
 
-    print(">>>>"*30)
-    print("Loading vector DB...")
-    print("Loading vector DB...")
-    db, pinecone_index = get_db(DB_PATH, emb_model, COLLECTION, DB_TYPE)
-    ## lexical DB 로딩
-    ### 한국어 BM25 retrieval 추가시 활용
-    # with open("backend/get_similarity/data/bm25_retriever_final.pkl", "rb") as f:
-    #     lexical_retriever = pickle.load(f)
-    lexical_retriever = None
+    # 임베딩 모델, Vector DB는 프로세스 단위 registry에서 warm 상태로 재사용 (첫 요청 시 초기화는 thread에서 수행)
+    emb_model, db, pinecone_index = await run_blocking("resources", registry.resources)
+    ## lexical DB 로딩 (mmap된 BM25 인덱스를 프로세스 단위로 캐싱, 인덱스가 없으면 None → dense only)
+    lexical_retriever = get_bm25_index(BM25_PATH)
 
-    retriever = get_retriever(db, emb_model, filter=search_filter)
+    retriever = registry.retriever(search_filter)
 
     # ## 기존 1개 결과 Retrieval, Generation 방식
     # jd, jd_url, c_name = await search_jd(retriever, lexical_retriever, resume, pinecone_index)
     # answer = await generation(resume, jd)
 
 
-    jd_summaries, jd_urls, c_names = await search_jd_summary(retriever, lexical_retriever, resume, pinecone_index)
+    jd_summaries, jd_urls, c_names = await search_jd_summary(retriever, lexical_retriever, resume, pinecone_index, search_filter=search_filter)
+    result_cache.put(resume, search_filter, version, (jd_summaries, jd_urls, c_names))
     return jd_summaries, jd_urls, c_names
+
+
+async def matching_batch(resumes, location=None, remote=None, jobtype=None, top_k=4):
+    """
+    여러 이력서를 한 번에 매칭합니다. (새 JD 적재 후 야간 일괄 재정렬용)
+    모든 CV 청크를 하나의 행렬로 쌓아 JD corpus와 GEMM으로 점수를 계산하므로 요청별 오버헤드가 없습니다.
+
+    Args:
+        resumes: 이력서 텍스트 리스트
+        location, remote, jobtype: matching()과 동일한 필터 (모든 이력서에 공통 적용)
+        top_k: 이력서별 반환할 채용공고 수
+    Returns:
+        results: 이력서 순서대로 (jd_summaries, jd_urls, c_names) 리스트
+    """
+    emb_model, db, pinecone_index = await run_blocking("resources", registry.resources)
+    search_filter = _search_filter(location, remote, jobtype)
+    return await search_jd_summary_batch(emb_model, resumes, pinecone_index, search_filter=search_filter, top_n=top_k)
@@ -3,8 +3,9 @@ from pinecone import Pinecone
 from langchain_pinecone import PineconeVectorStore
 from configs import PINECONE_API_KEY, PINECONE_INDEX
 from get_similarity.nodes.retrieval import check_db_status
+from get_similarity.index.chroma import ChromaIndex
 
-def get_db(DB_PATH, emb_model, collection, DB_TYPE):
+def get_db(DB_PATH, emb_model, collection, DB_TYPE, check_status=True):
     """
     Vector DB를 로드하는 함수
     Args:
@@ -12,8 +13,10 @@ def get_db(DB_PATH, emb_model, collection, DB_TYPE):
         emb_model: 임베딩 모델
         collection: Chroma의 collection 이름
         DB_TYPE: DB 타입 ["Chroma", "Pinecone"]
+        check_status: 로드 직후 DB 상태 확인 여부 (registry에서는 백그라운드로 확인하므로 False)
     Returns:
         persist_db: 로드된 Vector DB
+        index: raw 벡터 index (Pinecone Index 또는 같은 인터페이스의 ChromaIndex, 재정렬용 벡터 조회)
     """
     if DB_TYPE == "Chroma":
         print("Chroma DB 사용")
@@ -22,7 +25,10 @@ def get_db(DB_PATH, emb_model, collection, DB_TYPE):
             embedding_function=emb_model,
             collection_name=collection,
         )
-        check_db_status(persist_db, "chroma")
+        if check_status:
+            check_db_status(persist_db, "chroma")
+        # 로컬 collection도 Pinecone과 같은 인터페이스로 raw 벡터를 조회 (Dense Multi-aspect 재정렬 경로 공유)
+        return persist_db, ChromaIndex(persist_db._collection)
 
     elif DB_TYPE == "Pinecone":
         print("Pinecone DB 사용")
@@ -30,7 +36,8 @@ def get_db(DB_PATH, emb_model, collection, DB_TYPE):
         index = pc.Index(PINECONE_INDEX)
         # text 필드가 없으므로 job_id를 텍스트로 쓰게 함 (Chunk ID 추출용으로만 사용)
         persist_db = PineconeVectorStore(index=index, embedding=emb_model, text_key="job_id")
-        check_db_status(index, "pinecone", index)
+        if check_status:
+            check_db_status(index, "pinecone", index)
         # 중요: Raw Index 객체를 함께 반환해야 fetch_vectors가 가능함
         return persist_db, index
 
@@ -1,30 +1,41 @@
 from langchain_upstage import ChatUpstage
 from configs import *
 import numpy as np
+import random
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from get_similarity.index import (
+    FilterIndex,
+    collapse_duplicates,
+    get_snapshot,
+    get_snapshot_ann,
+    get_snapshot_centroids,
+    get_snapshot_filters,
+    get_snapshot_quantized,
+)
+from get_similarity.utils.chunk_ids import make_chunk_id, resolve_job_id
+from get_similarity.utils.fusion import fuse, rrf
+from get_similarity.utils.offload import run_blocking
+from get_similarity.utils.stage_metrics import recall_at_k, search_metrics
+
+SEARCH_MODES = ("two_stage", "full_scan")
 
 llm = ChatUpstage(model=RAG_MODEL, api_key=UPSTAGE_API_KEY)
-search_dict = defaultdict(list)
 
-def make_rank(results,k, full=False):
-    ## query와 db를 넣으면 id의 list를 리턴
-    search_range = min(k, len(results))
-    scores = np.empty(search_range, dtype=object)
-    for i in range(search_range):
-        scores[i] = results[i].metadata['id']
-        search_dict[results[i].metadata['id']].append(results[i])
-    return scores
-
-def rrf(multi_scores, k=1):        #n*10개의 입력, id로 들어옴
-    score = 0.0
-    score_dict = defaultdict(int)
-    for scores in multi_scores:
-        for rank, id in enumerate(scores):
-            score = 1.0 / ( k + rank+1)       #index는 0부터 시작하므로 +1
-            score_dict[id]+=score
-    score_dict = sorted(score_dict.items(), key=lambda x: x[1], reverse=True)
-    return score_dict
+def make_rank(results, k):
+    """
+    검색 결과 Document 리스트를 ID 순위로 변환합니다.
 
+    Returns:
+        ranks: metadata['id'] 순위 리스트
+        docs_by_id: {id: [Document, ...]} (요청 로컬)
+    """
+    ranks, docs_by_id = [], defaultdict(list)
+    for doc in results[:k]:
+        ranks.append(doc.metadata['id'])
+        docs_by_id[doc.metadata['id']].append(doc)
+    return ranks, docs_by_id
 
 
 async def search_jd(retriever, lexical_retriever, resume):
@@ -43,14 +54,17 @@ async def search_jd(retriever, lexical_retriever, resume):
     """
     print("\n=== Generation 함수 시작 ===")
     print("입력된 resume:", resume[:100], "...")  # 긴 텍스트는 일부만 출력
-    job_descriptions = retriever.invoke(resume)
+    job_descriptions = await run_blocking("retrieve", retriever.invoke, resume)
 
-    ### 한국어 BM25 retrieval 추가시 활용
+    ### 한국어 BM25 retrieval (BM25Index의 Job ID = 청크 metadata의 id)
     if lexical_retriever:
-        lexical_job_descriptions = lexical_retriever.invoke(resume)
-        sem_rank = make_rank(job_descriptions, k=10)
-        lex_rank = make_rank(lexical_job_descriptions, k=10)
-        job_descriptions = search_dict[rrf([sem_rank, lex_rank], k=1.2)[0][0]]
+        sem_rank, docs_by_id = make_rank(job_descriptions, k=10)
+        lex_rank = [job_id for job_id, _ in lexical_retriever.search_jobs(resume, k=10)]
+        # lexical에서만 나온 Job은 문서가 없으므로 semantic 결과에 있는 Job 중 최상위를 사용
+        for job_id, _ in rrf([sem_rank, lex_rank], k=1.2):
+            if docs_by_id.get(job_id):
+                job_descriptions = docs_by_id[job_id]
+                break
 
     # Retriever 실행
     print("\n=== Retriever 실행 ===")
@@ -84,212 +98,556 @@ async def search_jd(retriever, lexical_retriever, resume):
     return top_job_description, top_job_url, top_company_name
 
 
-async def search_jd_summary(retriever, lexical_retriever, resume, pinecone_index=None):
+def _segment_cv(resume):
+    """이력서를 CV 청크로 분할합니다. (구조 분할이 안 되면 plain text 분할)"""
     from get_similarity.utils.segmenter import HierarchicalSegmenter
-    from get_similarity.utils.matcher import DenseMatcher
-    
-    print("\n=== Summary 검색 함수 시작 ===")
-    print("입력된 resume:", resume[:100], "...")  # 긴 텍스트는 일부만 출력
 
-    # 1. 문서 검색 (Candidate Selection)
-    # 기존 invoke(resume)는 '문서' 단위 유사도로 k개를 가져옵니다.
-    # 하지만 우리의 목표는 'JD id' 후보군을 뽑는 것입니다.
-    # 따라서 넉넉하게 k=30~50개를 가져와서 unique job_id를 추립니다.
-    
-    # retriever search_kwargs 업데이트 (잠시 후보군 탐색용으로 확장)
-    original_k = retriever.search_kwargs.get("k", 10)
-    retriever.search_kwargs["k"] = 50
-    
-    candidates = retriever.invoke(resume)
-    
-    # 2. 후보군 Job ID 추출
-    candidate_job_ids = set()
-    job_to_metadata = {}
-    
-    candidate_job_ids = set()
-    job_to_metadata = {}
-    
-    if candidates:
-        print(f"[DEBUG] 첫 번째 문서 Metadata 예시: {candidates[0].metadata}")
-
-    for doc in candidates:
-        job_id = None
-        # 1. doc.id 파싱 (wd_1234__c0001)
-        did = getattr(doc, "id", "")
-        if did and "__" in did:
-            job_id = did.split("__")[0]
-            
-        # 2. metadata 확인
-        if not job_id:
-             job_id = doc.metadata.get("job_id")
-        
-        # 3. URL 확인
-        if not job_id:
-             url = doc.metadata.get("job_url") or doc.metadata.get("url")
-             if url:
-                 job_id = str(url).rstrip("/").split("/")[-1]
+    segmenter = HierarchicalSegmenter(min_chunk_length=100, max_chunk_length=300)
+    cv_chunks = segmenter.segment(resume)
+    if not cv_chunks:
+        cv_chunks = segmenter._segment_plaintext(resume)
+    return cv_chunks
 
-        if job_id:
-            candidate_job_ids.add(job_id)
-            # 메타데이터 저장
-            # 중요: doc.metadata에 회사명 등이 있어야 함.
-            if job_id not in job_to_metadata:
-                 job_to_metadata[job_id] = doc.metadata
-
-    print(f"후보군 추출 완료: {len(candidate_job_ids)}개의 고유 JD 발견")
-
-    # Pinecone Index가 없으면 기존 로직(search_dict 사용)으로 fallback
-    if not pinecone_index:
-        print("[WARN] Pinecone Index 객체가 없습니다. 기존 단순 검색 로직으로 수행합니다.")
-        retriever.search_kwargs["k"] = original_k # 복구
-        job_descriptions = candidates[:10] # 상위 10개만
-        # ... (기존 RRF 로직 생략, 필요한 경우 추가) ...
-    else:
-        # 3. Dense Multi-aspect Re-ranking 수행
-        print(">>> Dense Multi-aspect Re-ranking 시작")
-        
-        # (A) CV Segmentation & Embedding
-        # Embedder는 retriever가 가지고 있는 모델을 재사용하거나 새로 선언
-        # 여기서는 retriever.embeddings 객체가 있다고 가정 (LangChain 표준)
-        segmenter = HierarchicalSegmenter(min_chunk_length=100, max_chunk_length=300)
-        cv_chunks = segmenter.segment(resume) 
-        if not cv_chunks:
-            cv_chunks = segmenter._segment_plaintext(resume)
-            
-        print(f"CV 청크 분할: {len(cv_chunks)}개")
-        
-        # CV 청크 벡터화
-        # retriever가 embedding_function을 가지고 있음
-        embedding_model = retriever.tags[0] if hasattr(retriever, "tags") else None
-        # LangChain Retriever 구조상 embedding_function 접근이 다를 수 있음.
-        # 가장 확실한 건 전달받은 retriever 객체 내부를 사용하는 것임.
-        # 만약 접근이 어렵다면 main.py에서 emb_model을 넘겨받는 게 좋으나,
-        # 여기서는 retriever.vectorstore.embedding_function 등을 시도하거나 
-        # OpenAIEmbeddings을 새로 인스턴스화 하는 오버헤드를 줄이기 위해 노력함.
-        
-        # 접근법: retriever -> vectorstore -> embeddings
-        emb_fn = None
-        if hasattr(retriever, "vectorstore"):
-             emb_fn = retriever.vectorstore.embeddings
-        
-        if not emb_fn:
-            # Fallback: 새로 생성 (비효율적이지만 안전)
-            from langchain_openai import OpenAIEmbeddings
-            emb_fn = OpenAIEmbeddings()
 
-        cv_vectors = emb_fn.embed_documents(cv_chunks)
-        cv_vectors_np = [np.array(v) for v in cv_vectors]
+def _format_jobs(top_jobs, verbose=True):
+    """
+    재정렬된 Job의 메타데이터에서 응답 형식 (summaries, urls, company_names)을 만듭니다.
+    """
+    top_job_summaries = []
+    top_job_urls = []
+    top_company_names = []
 
-        # (B) JD Full Vectors Fetching
-        # [Full Scan Mode Implementation]
-        # 노트북 로직 복제: DB 전체 벡터를 가져와서 Scoring 수행
-        
-        # 2. JD Full Scan (Pinecone에서 모든 벡터 가져오기)
-        TOTAL_VECTORS_TO_FETCH = 2000 # temp 인덱스 전체 크기 커버 (약 2000개)
-        print(f">>> 2. JD 전체 데이터 로드 (Full Scan Mode, Target: {TOTAL_VECTORS_TO_FETCH} vectors)")
+    for job in top_jobs:
+        meta = job["metadata"]
+        url = meta.get("job_url") or meta.get("url") or ""
+        company = meta.get("company_name") or meta.get("company") or ""
+        summary = meta.get("summary") or meta.get("text") or "요약 없음"
+
+        # 중요: None 방지
+        if not company and job["job_id"]:
+            company = f"Job {job['job_id']}"
+
+        if verbose:
+            print(f"[Rank] Score: {job['final_score']:.4f} | {company}")
+            print(f"🔗 URL: {url}")
+            print(f"📝 요약: {str(summary)[:100]}...")
+            print("-" * 30)
+
+        top_job_summaries.append(summary)
+        top_job_urls.append(url)
+        top_company_names.append(company)
+    return top_job_summaries, top_job_urls, top_company_names
+
+
+def _fuse_lexical(scored_jobs, lexical_index, resume, top_n, allowed_jobs=None):
+    """
+    Dense 재정렬 순위와 BM25 Job 순위를 fuse()로 합칩니다. (FUSION_METHOD, LEXICAL_WEIGHT)
+
+    Args:
+        scored_jobs: dense scoring 결과 [{"job_id", "final_score", ...}]
+        lexical_index: BM25Index
+        resume: 사용자의 이력서 (BM25 쿼리)
+        top_n: 반환할 Job 수
+        allowed_jobs: 메타데이터 필터를 통과한 Job ID 집합 (None이면 필터 없음)
+    Returns:
+        fused_jobs: final_score = fusion 점수, similarity = dense 점수 (lexical에서만 나온 Job은 0)
+    """
+    dense_jobs = sorted(scored_jobs, key=lambda x: x["final_score"], reverse=True)[:LEXICAL_TOP_K]
+    dense_by_id = {job["job_id"]: job for job in dense_jobs}
+    lexical_hits = lexical_index.search_jobs(resume, k=LEXICAL_TOP_K)
+    if allowed_jobs is not None:
+        lexical_hits = [(job_id, score) for job_id, score in lexical_hits if job_id in allowed_jobs]
+    print(f"BM25 후보군 추출 완료: {len(lexical_hits)}개 Job")
+
+    fused = fuse(
+        [[(job["job_id"], job["final_score"]) for job in dense_jobs], lexical_hits],
+        weights=[1.0, LEXICAL_WEIGHT],
+        method=FUSION_METHOD,
+        k=RRF_K,
+        top_k=top_n,
+    )
+    fused_jobs = []
+    for job_id, score in fused:
+        dense = dense_by_id.get(job_id, {})
+        fused_jobs.append({**dense, "job_id": job_id, "final_score": score, "similarity": dense.get("similarity", 0.0)})
+    return fused_jobs
+
+
+def _fetch_job_embeddings(pinecone_index, query_vec, total_vectors_to_fetch=FULL_SCAN_TOP_K):
+    """
+    Pinecone에서 query 벡터와 가까운 JD 청크를 벡터 값과 함께 한 번에 가져와 Job 단위로 재조립합니다.
+    (로컬 스냅샷이 없을 때 사용, total_vectors_to_fetch가 인덱스 크기 이상이면 전체 조회)
+
+    Returns:
+        job_embeddings_map: {job_id: [{"text", "values"}, ...]}
+        job_to_metadata: {job_id: metadata}
+    """
+    print(f">>> 2. Pinecone JD 청크 조회 (top_k={total_vectors_to_fetch})")
+    job_embeddings_map = defaultdict(list)
+    job_to_metadata = {}
+
+    try:
+        # include_metadata=True, include_values=True 필수
+        resp = pinecone_index.query(
+            vector=query_vec, 
+            top_k=total_vectors_to_fetch, 
+            include_metadata=True, 
+            include_values=True,
+            namespace=""
+        )
         
-        # 이전 단계 candidates 루프에서 수집한 메타데이터는 무시하고 새로 수집 (Full Scan이므로)
-        job_embeddings_map = defaultdict(list)
-        job_to_metadata = {}
+        matches = resp.get("matches", [])
+        print(f"Pinecone Query 완료: {len(matches)}개 청크 확보")
         
-        if pinecone_index:
-            try:
-                # CV 첫 청크 벡터를 Query로 사용 (어차피 k가 매우 커서 다 딸려옴)
-                # 만약 차원이 4096이 아니라면 임베딩 모델 확인 필요.
-                query_vec = cv_vectors[0]
-                
-                # include_metadata=True, include_values=True 필수
-                resp = pinecone_index.query(
-                    vector=query_vec, 
-                    top_k=TOTAL_VECTORS_TO_FETCH, 
-                    include_metadata=True, 
-                    include_values=True,
-                    namespace=""
-                )
-                
-                matches = resp.get("matches", [])
-                print(f"Pinecone Full Query 완료: {len(matches)}개 청크 확보")
+        for m in matches:
+            # m is ScoredVector (id, score, values, metadata)
+            meta = m.get("metadata", {})
+            job_id = resolve_job_id(m["id"], meta)
+            
+            if job_id:
+                # 메타데이터 저장 (회사명 등)
+                if job_id not in job_to_metadata:
+                    job_to_metadata[job_id] = meta
                 
-                for m in matches:
-                    # m is ScoredVector (id, score, values, metadata)
-                    vid = m["id"]
-                    vals = m["values"]
-                    meta = m.get("metadata", {})
-                    
-                    # Job ID 추출
-                    job_id = None
-                    if "__" in vid:
-                        job_id = vid.split("__")[0]
-                    # 메타데이터에 job_id가 있는 경우
-                    elif meta and "job_id" in meta:
-                        job_id = str(meta["job_id"])
-                    
-                    if job_id:
-                        # 메타데이터 저장 (회사명 등)
-                        if job_id not in job_to_metadata:
-                            job_to_metadata[job_id] = meta
-                        
-                        # 텍스트 추출 (Coverage용)
-                        text_content = str(meta.get("text", "") or meta.get("chunk_text", "") or meta.get("context", ""))
-
-                        job_embeddings_map[job_id].append({
-                            "text": text_content,
-                            "values": np.array(vals)
-                        })
-                        
-            except Exception as e:
-                print(f"Pinecone Full Query Error: {e}")
-                import traceback
-                traceback.print_exc()
+                job_embeddings_map[job_id].append({
+                    "text": _chunk_text(meta),
+                    "values": np.asarray(m["values"], dtype=np.float32)
+                })
                 
+    except Exception as e:
+        print(f"Pinecone Query Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+    return job_embeddings_map, job_to_metadata
+
+
+def _chunk_text(meta):
+    """청크 메타데이터의 본문 (Coverage용)"""
+    return str(meta.get("text", "") or meta.get("chunk_text", "") or meta.get("context", ""))
+
+
+def _fetch_job_chunks(pinecone_index, job_ids, probe=CHUNK_FETCH_PROBE, batch_size=100, num_workers=4):
+    """
+    후보 Job의 청크 전체를 결정적 청크 ID("<job_id>__c<NNNN>")로 fetch해서 Job 단위로 재조립합니다. (two_stage 재정렬용)
+    청크 번호는 Job마다 0부터 연속이므로 Job마다 probe개씩 ID를 요청하고, 요청한 구간이 모두 있는 Job만 다음 구간을 이어서 요청합니다.
+    (청크 ID 규칙을 따르지 않는 예전 벡터만 있는 Job은 결과에 없음)
+
+    Returns:
+        job_embeddings_map: {job_id: [{"text", "values"}, ...]} (청크 번호 순서)
+        job_to_metadata: {job_id: metadata}
+    """
+    job_embeddings_map, job_to_metadata = defaultdict(list), {}
+    pending = {job_id: 0 for job_id in job_ids}     # Job별 다음에 요청할 청크 번호
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        while pending:
+            ids = [make_chunk_id(job_id, c) for job_id, start in pending.items() for c in range(start, start + probe)]
+            vectors = {}
+            for resp in executor.map(lambda batch: pinecone_index.fetch(ids=batch), [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]):
+                vectors.update(resp.vectors)
+
+            next_pending = {}
+            for job_id, start in pending.items():
+                for c in range(start, start + probe):
+                    vector = vectors.get(make_chunk_id(job_id, c))
+                    if vector is None:
+                        break
+                    meta = vector.metadata or {}
+                    job_to_metadata.setdefault(job_id, meta)
+                    job_embeddings_map[job_id].append({"text": _chunk_text(meta), "values": np.asarray(vector.values, dtype=np.float32)})
+                else:
+                    next_pending[job_id] = start + probe
+            pending = next_pending
+    return job_embeddings_map, job_to_metadata
+
+
+def _fetch_all_job_chunks(pinecone_index, batch_size=100, num_workers=4):
+    """
+    인덱스의 청크 전체를 list / fetch로 읽어 Job 단위로 재조립합니다. (스냅샷이 없을 때 batch 매칭용)
+    query 결과는 query 벡터와 가까운 청크만 담으므로, 여러 이력서를 같은 corpus로 점수 매기려면 전체를 읽어야 합니다.
+
+    Returns:
+        job_embeddings_map: {job_id: [{"text", "values"}, ...]} (청크 ID 순서)
+        job_to_metadata: {job_id: metadata}
+    """
+    ids = sorted(vid for page in pinecone_index.list() for vid in page)
+    print(f">>> 2. 인덱스 전체 청크 조회: {len(ids)}개 청크")
+    vectors = {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for resp in executor.map(lambda batch: pinecone_index.fetch(ids=batch), [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]):
+            vectors.update(resp.vectors)
+
+    job_embeddings_map, job_to_metadata = defaultdict(list), {}
+    for vid in ids:
+        vector = vectors.get(vid)
+        if vector is None:
+            continue
+        meta = vector.metadata or {}
+        job_id = resolve_job_id(vid, meta)
+        if not job_id:
+            continue
+        job_to_metadata.setdefault(job_id, meta)
+        job_embeddings_map[job_id].append({"text": _chunk_text(meta), "values": np.asarray(vector.values, dtype=np.float32)})
+    return job_embeddings_map, job_to_metadata
+
+
+def _embedding_fn(retriever):
+    """retriever의 vectorstore 임베딩 모델을 재사용합니다. (없으면 새로 생성)"""
+    emb_fn = None
+    if hasattr(retriever, "vectorstore"):
+        emb_fn = retriever.vectorstore.embeddings
+    if not emb_fn:
+        # Fallback: 새로 생성 (비효율적이지만 안전)
+        from langchain_openai import OpenAIEmbeddings
+        emb_fn = OpenAIEmbeddings()
+    return emb_fn
+
+
+def _matcher(mode=MATCHER_MODE):
+    """configs의 집계 방식(MATCHER_AGGREGATION)을 적용한 DenseMatcher"""
+    from get_similarity.utils.matcher import DenseMatcher
+    return DenseMatcher(
+        num_workers=4,
+        mode=mode,
+        aggregation=MATCHER_AGGREGATION,
+        top_m=AGGREGATION_TOP_M,
+        coverage_threshold=COVERAGE_THRESHOLD,
+    )
+
+
+def _query_vector(cv_vectors_np):
+    """CV 청크 벡터의 정규화된 평균 (Pinecone 1단계 후보 검색 query, 추가 임베딩 호출 없음)"""
+    mean = np.mean(np.asarray(cv_vectors_np, dtype=np.float32), axis=0)
+    norm = np.linalg.norm(mean)
+    return (mean / norm if norm > 0 else mean).tolist()
+
+
+def _filter_settings(search_filter):
+    use_filter = FilterIndex.is_active(search_filter) or FILTER_EXPIRED_JOBS
+    deadline_from = date.today() if FILTER_EXPIRED_JOBS else None
+    return use_filter, deadline_from
+
+
+def _collapse_ranked(ranked_jobs, get_metadata, top_n):
+    """
+    점수 내림차순 Job 목록에서 cluster_id(근사 중복 JD)가 같은 Job은 점수가 가장 높은 하나만 남기고 상위 top_n개를 반환합니다.
+    (COLLAPSE_NEAR_DUPLICATES가 꺼져 있으면 상위 top_n개만 자름)
+    """
+    if COLLAPSE_NEAR_DUPLICATES:
+        ranked_jobs = collapse_duplicates(ranked_jobs, lambda job: get_metadata(job["job_id"]).get("cluster_id"))
+    return ranked_jobs[:top_n]
+
+
+async def _snapshot_candidates(snapshot, cv_vectors_np, mode, search_filter):
+    """
+    로컬 스냅샷에서 재정렬할 Job 위치를 고릅니다.
+    메타데이터 필터(location / is_remote / job_type, 마감일)를 통과한 Job 중에서, two_stage면
+        1. Job centroid 인덱스가 있으면 coarse 점수 상위 CENTROID_TOP_JOBS개 Job
+        2. 없고 ANN 인덱스가 있으면 CV 청크별 가까운 JD 청크가 속한 Job
+        3. 둘 다 없으면 전체 Job
+    만 청크 단위 재정렬 후보로 사용합니다.
+
+    Returns:
+        job_positions: 재정렬할 Job 위치 (None이면 전체 Job)
+        allowed_jobs: 필터를 통과한 Job ID 집합 (필터를 적용하지 않으면 None)
+    """
+    job_positions, allowed_jobs = None, None
+    use_filter, deadline_from = _filter_settings(search_filter)
+    if use_filter:
+        row_mask = get_snapshot_filters(snapshot).mask(search_filter, deadline_from=deadline_from)
+        job_positions = FilterIndex.job_positions(row_mask, snapshot.offsets)
+        allowed_jobs = {snapshot.job_ids[p] for p in job_positions}
+        print(f"메타데이터 필터 적용: {int(row_mask.sum())}/{snapshot.num_rows} vectors 통과, {len(job_positions)}개 Job 대상")
+        if len(job_positions) == snapshot.num_jobs:
+            # 모든 Job이 통과하면 select 없이 전체 스냅샷을 그대로 사용
+            job_positions = None
+
+    if mode == "two_stage":
+        centroid_index = get_snapshot_centroids(snapshot)
+        ann_index = get_snapshot_ann(snapshot) if centroid_index is None else None
+        cv_matrix = np.asarray(cv_vectors_np, dtype=np.float32)
+        if centroid_index is not None:
+            job_positions, _ = await run_blocking("score", centroid_index.search, cv_matrix, k=CENTROID_TOP_JOBS, job_positions=job_positions)
+            print(f"Job centroid 후보군 추출 완료: {len(job_positions)}/{snapshot.num_jobs}개 Job (top {CENTROID_TOP_JOBS})")
+        elif ann_index is not None:
+            _, hit_ids = await run_blocking("score", ann_index.search, cv_matrix, k=ANN_TOP_K)
+            hit_positions = snapshot.jobs_for_chunks([cid for hits in hit_ids for cid in hits])
+            job_positions = hit_positions if job_positions is None else np.intersect1d(hit_positions, job_positions)
+            print(f"ANN 후보군 추출 완료: {len(job_positions)}/{snapshot.num_jobs}개 Job (nprobe={ann_index.nprobe}, k={ANN_TOP_K})")
         else:
-            print("[ERROR] Pinecone Index Required for Full Scan")
+            print("[INFO] 스냅샷 centroid/ANN 인덱스가 없어 전체 Job을 재정렬합니다.")
+    return job_positions, allowed_jobs
 
-        print(f"JDs 재조립 완료: {len(job_embeddings_map)}개 Job (유효 벡터 보유)")
 
-        # 3. Scoring (Parallel & JIT Optimized)
-        print(">>> 3. Dense Multi-aspect Scoring (Similarity Only)")
-        matcher = DenseMatcher(num_workers=4)
-        
-        scored_jobs = matcher.compute_batch_parallel(cv_vectors_np, job_embeddings_map)
-        
+async def _pinecone_candidates(pinecone_index, cv_vectors_np, mode, search_filter):
+    """
+    Pinecone에서 재정렬할 JD 청크를 가져옵니다.
+    two_stage면 CANDIDATE_TOP_K개 청크 query로 후보 Job만 고르고, 후보 Job의 청크 전체를 청크 ID로 fetch해서 재정렬합니다.
+    (query에 걸린 일부 청크만으로 점수를 매기면 query와 가까운 청크가 많은 Job에 치우치므로)
+    full_scan이면 FULL_SCAN_TOP_K개(작은 인덱스 전체)를 한 번에 가져옵니다. 메타데이터 필터를 통과한 Job만 남깁니다.
+
+    Returns:
+        corpus: 후보 Job 청크 ChunkCorpus
+        job_embeddings_map: {job_id: [{"text", "values"}, ...]} (corpus와 같은 Job)
+        job_to_metadata: {job_id: metadata}
+        allowed_jobs: 필터를 통과한 Job ID 집합 (필터를 적용하지 않으면 None)
+    """
+    from get_similarity.utils.matcher import ChunkCorpus
+
+    top_k = CANDIDATE_TOP_K if mode == "two_stage" else FULL_SCAN_TOP_K
+    job_embeddings_map, job_to_metadata = await run_blocking("fetch", _fetch_job_embeddings, pinecone_index, _query_vector(cv_vectors_np), top_k)
+    if mode == "two_stage" and job_embeddings_map:
+        full_map, full_metadata = await run_blocking("fetch", _fetch_job_chunks, pinecone_index, list(job_embeddings_map))
+        # 청크 ID 규칙을 따르지 않는 예전 벡터의 Job은 query로 받은 청크를 그대로 사용
+        job_embeddings_map.update(full_map)
+        job_to_metadata.update(full_metadata)
+        print(f"후보 Job 청크 전체 조회: {sum(len(v) for v in full_map.values())}개 청크 ({len(full_map)}/{len(job_embeddings_map)}개 Job)")
+    print(f"JDs 재조립 완료: {len(job_embeddings_map)}개 Job (유효 벡터 보유)")
+
+    corpus = ChunkCorpus.from_job_map(job_embeddings_map)
+    allowed_jobs = None
+    use_filter, deadline_from = _filter_settings(search_filter)
+    if use_filter:
+        filter_index = FilterIndex.build([job_to_metadata.get(j, {}) for j in corpus.job_ids], corpus.counts)
+        row_mask = filter_index.mask(search_filter, deadline_from=deadline_from)
+        passed = FilterIndex.job_positions(row_mask, corpus.offsets)
+        if len(passed) < corpus.num_jobs:
+            corpus = corpus.select(passed)
+        allowed_jobs = set(corpus.job_ids)
+        job_embeddings_map = {j: job_embeddings_map[j] for j in corpus.job_ids}
+        print(f"메타데이터 필터 적용: {int(row_mask.sum())}/{len(row_mask)} vectors 통과, {len(passed)}개 Job 대상")
+    return corpus, job_embeddings_map, job_to_metadata, allowed_jobs
+
+
+async def _rank_snapshot(matcher, cv_vectors_np, snapshot, job_positions, rank_depth):
+    """
+    스냅샷 후보 Job을 fused scoring으로 정렬합니다.
+    압축 벡터(QUANTIZATION)가 있으면 code에서 바로 점수를 계산해 상위 rank_depth * QUANTIZED_RESCORE_FACTOR개 Job을 고르고,
+    이 Job들만 float32 원본 스냅샷으로 다시 계산해서 상위 rank_depth개를 반환합니다.
+    """
+    from get_similarity.utils.matcher import ChunkCorpus
+
+    quantized = get_snapshot_quantized(snapshot) if QUANTIZATION != "none" else None
+    corpus = ChunkCorpus.from_snapshot(snapshot, quantized=quantized)
+    if job_positions is not None:
+        corpus = corpus.select(job_positions)
+    if quantized is None:
+        return await run_blocking("score", matcher.rank, cv_vectors_np, corpus, top_k=rank_depth)
+
+    coarse = await run_blocking("score", matcher.rank, cv_vectors_np, corpus, top_k=rank_depth * QUANTIZED_RESCORE_FACTOR)
+    with search_metrics.timer("rescore"):
+        exact = ChunkCorpus.from_snapshot(snapshot).select([snapshot.job_position(job["job_id"]) for job in coarse])
+        scored_jobs = await run_blocking("score", matcher.rank, cv_vectors_np, exact, top_k=rank_depth)
+    print(f"압축 벡터({quantized.method}) scoring 후 상위 {len(coarse)}개 Job float32 재계산")
+    return scored_jobs
+
+
+async def _measure_recall(cv_vectors_np, scored_jobs, top_n, snapshot=None, pinecone_index=None, search_filter=None):
+    """
+    two_stage dense 상위 top_n Job이 full_scan 상위 top_n Job을 얼마나 포함하는지 search_metrics에 기록합니다.
+    샘플링된 요청에서만 호출되며, 해당 요청은 full_scan 비용이 추가됩니다.
+    """
+    from get_similarity.utils.matcher import ChunkCorpus
+
+    if snapshot is not None:
+        job_positions, _ = await _snapshot_candidates(snapshot, cv_vectors_np, "full_scan", search_filter)
+        corpus = ChunkCorpus.from_snapshot(snapshot)
+        if job_positions is not None:
+            corpus = corpus.select(job_positions)
+    else:
+        corpus, _, _, _ = await _pinecone_candidates(pinecone_index, cv_vectors_np, "full_scan", search_filter)
+
+    reference = await run_blocking("score", _matcher("fused").rank, cv_vectors_np, corpus, top_k=top_n)
+    dense_top = sorted(scored_jobs, key=lambda x: x["final_score"], reverse=True)[:top_n]
+    recall = recall_at_k([job["job_id"] for job in dense_top], [job["job_id"] for job in reference])
+    search_metrics.record("candidate_recall", recall)
+    print(f"후보 recall@{top_n} (two_stage vs full_scan): {recall:.2f}")
+
+
+async def _search_retriever_only(retriever, lexical_retriever, resume, top_n):
+    """
+    스냅샷과 Pinecone Index가 모두 없을 때 (예: Chroma) retriever 검색 결과를 Job 단위로 묶어 반환합니다.
+    """
+    docs = await run_blocking("retrieve", retriever.invoke, resume)
+    job_to_metadata = {}
+    for doc in docs:
+        job_id = resolve_job_id(getattr(doc, "id", None) or "", doc.metadata)
+        if job_id:
+            job_to_metadata.setdefault(job_id, doc.metadata)
+
+    rankings = [list(job_to_metadata)]
+    if lexical_retriever is not None:
+        # lexical에서만 나온 Job은 메타데이터가 없으므로 retriever 결과에 있는 Job만 사용
+        rankings.append([job_id for job_id, _ in lexical_retriever.search_jobs(resume, k=LEXICAL_TOP_K) if job_id in job_to_metadata])
+    top_jobs = [
+        {"job_id": job_id, "final_score": score, "metadata": job_to_metadata[job_id]}
+        for job_id, score in fuse(rankings, method="rrf", k=RRF_K)
+    ]
+    return _format_jobs(_collapse_ranked(top_jobs, lambda job_id: job_to_metadata[job_id], top_n))
+
+
+async def search_jd_summary(retriever, lexical_retriever, resume, pinecone_index=None, search_filter=None, mode=SEARCH_MODE):
+    """
+    이력서를 CV 청크로 나눠 JD 청크와 Dense Multi-aspect 재정렬을 수행하고 상위 Job 요약을 반환합니다.
+
+    two_stage: 1단계 후보 Job 생성 (스냅샷은 Job centroid 또는 ANN 인덱스, Pinecone은 청크 top-k 한 번 조회) → 후보 Job 청크만 재정렬
+    full_scan: 전체 Job 청크를 재정렬 (작은 인덱스용)
+    단계별 latency와 후보 recall(RECALL_SAMPLE_RATE 비율의 요청)은 search_metrics에 기록됩니다.
+
+    Args:
+        retriever: semantic retriever (임베딩 모델 재사용, 스냅샷/Pinecone이 없을 때 검색)
+        lexical_retriever: BM25Index (None이면 dense only)
+        resume: 사용자의 이력서
+        pinecone_index: 스냅샷이 없을 때 JD 벡터를 가져올 Pinecone 인덱스 (로컬 Chroma는 같은 인터페이스의 ChromaIndex)
+        search_filter: 메타데이터 필터
+        mode: "two_stage" 또는 "full_scan" (기본값 SEARCH_MODE)
+    Returns:
+        top_job_summaries, top_job_urls, top_company_names
+    """
+    from get_similarity.utils.matcher import ChunkCorpus
+
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"지원하지 않는 검색 방식입니다: {mode} (가능: {SEARCH_MODES})")
+
+    print("\n=== Summary 검색 함수 시작 ===")
+    print("입력된 resume:", resume[:100], "...")  # 긴 텍스트는 일부만 출력
+
+    top_n = 4
+    snapshot = get_snapshot(SNAPSHOT_PATH)
+    if snapshot is None and not pinecone_index:
+        print("[WARN] JD 스냅샷과 Pinecone Index가 모두 없습니다. retriever 검색 결과로 수행합니다.")
+        return await _search_retriever_only(retriever, lexical_retriever, resume, top_n)
+
+    with search_metrics.timer("total"):
+        # 1. CV Segmentation & Embedding
+        cv_chunks = _segment_cv(resume)
+        print(f"CV 청크 분할: {len(cv_chunks)}개")
+        emb_fn = _embedding_fn(retriever)
+        with search_metrics.timer("embed"):
+            cv_vectors = await run_blocking("embed", emb_fn.embed_documents, cv_chunks)
+        cv_vectors_np = [np.array(v) for v in cv_vectors]
+
+        # 2. 후보 생성 + 3. Dense Multi-aspect 재정렬
+        # fused 모드는 후보 청크 단일 GEMM 후 상위 Job만 반환, parallel 모드는 Job별 thread-pool로 후보 Job 점수 반환
+        # hybrid 검색이면 RRF에 넣을 만큼, 근사 중복 제거를 하면 제거 후에도 top_n개가 남도록 dense 순위를 넉넉하게 가져옴
+        keep_depth = top_n * COLLAPSE_RANK_FACTOR if COLLAPSE_NEAR_DUPLICATES else top_n
+        rank_depth = max(LEXICAL_TOP_K, keep_depth) if lexical_retriever is not None else keep_depth
+        matcher = _matcher()
+        print(f">>> 검색 방식: {mode}, scoring: {matcher.mode}, 집계: {matcher.aggregation}")
+
+        if snapshot is not None:
+            # [Local Snapshot] mmap된 로컬 스냅샷에서 바로 Scoring (네트워크 전송 없음)
+            print(f">>> 2. JD 로컬 스냅샷 사용 (version={snapshot.version}, {snapshot.num_rows} vectors, {snapshot.num_jobs} jobs)")
+            with search_metrics.timer("candidates"):
+                job_positions, allowed_jobs = await _snapshot_candidates(snapshot, cv_vectors_np, mode, search_filter)
+            get_metadata = snapshot.metadata
+
+            print(">>> 3. Dense Multi-aspect Scoring (Similarity Only)")
+            with search_metrics.timer("rerank"):
+                if matcher.mode == "fused":
+                    scored_jobs = await _rank_snapshot(matcher, cv_vectors_np, snapshot, job_positions, rank_depth)
+                else:
+                    scored_jobs = await run_blocking("score", matcher.compute_from_snapshot, cv_vectors_np, snapshot, job_positions=job_positions)
+            search_metrics.record("candidate_jobs", snapshot.num_jobs if job_positions is None else len(job_positions))
+        else:
+            # [Pinecone] 후보 청크를 벡터 값과 함께 한 번에 가져와서 Scoring
+            with search_metrics.timer("candidates"):
+                corpus, job_embeddings_map, job_to_metadata, allowed_jobs = await _pinecone_candidates(pinecone_index, cv_vectors_np, mode, search_filter)
+            get_metadata = lambda job_id: job_to_metadata.get(job_id, {})
+
+            print(">>> 3. Dense Multi-aspect Scoring (Similarity Only)")
+            with search_metrics.timer("rerank"):
+                if matcher.mode == "fused":
+                    scored_jobs = await run_blocking("score", matcher.rank, cv_vectors_np, corpus, top_k=rank_depth)
+                else:
+                    scored_jobs = await run_blocking("score", matcher.compute_batch_parallel, cv_vectors_np, job_embeddings_map)
+            search_metrics.record("candidate_jobs", corpus.num_jobs)
+
+        # 후보 생성으로 잃은 품질 측정 (샘플링)
+        if mode == "two_stage" and random.random() < RECALL_SAMPLE_RATE:
+            await _measure_recall(cv_vectors_np, scored_jobs, top_n, snapshot, pinecone_index, search_filter)
+
+        # 4. Hybrid: BM25 lexical 순위와 RRF fusion
+        if lexical_retriever is not None:
+            with search_metrics.timer("fusion"):
+                scored_jobs = await run_blocking("score", _fuse_lexical, scored_jobs, lexical_retriever, resume, keep_depth, allowed_jobs=allowed_jobs)
+
         # 메타데이터 병합
         for job in scored_jobs:
-            jid = job["job_id"]
-            job["metadata"] = job_to_metadata.get(jid, {})
+            job["metadata"] = get_metadata(job["job_id"])
 
-        # 정렬
+        # 정렬 후 최종 순위에서 근사 중복 JD는 점수가 가장 높은 하나만 남김
         scored_jobs.sort(key=lambda x: x["final_score"], reverse=True)
-        top_jobs = scored_jobs[:4]
-        
-        # 결과 포맷팅
-        top_job_summaries = []
-        top_job_urls = []
-        top_company_names = []
-        
-        print("\n>>> 검색 결과 확인")
-        print("-" * 60)
-
-        for job in top_jobs:
-            meta = job["metadata"]
-            url = meta.get("job_url") or meta.get("url") or ""
-            company = meta.get("company_name") or meta.get("company") or ""
-            summary = meta.get("summary") or meta.get("text") or "요약 없음"
-            
-            # 중요: None 방지
-            if not company and job["job_id"]:
-                 company = f"Job {job['job_id']}"
-            
-            # Coverage 출력 제거
-            print(f"[Rank] Score: {job['final_score']:.4f} | {company}")
-            print(f"🔗 URL: {url}")
-            print(f"📝 요약: {str(summary)[:100]}...")
-            print("-" * 30)
+        top_jobs = _collapse_ranked(scored_jobs, get_metadata, top_n)
+
+    # 결과 포맷팅
+    print("\n>>> 검색 결과 확인")
+    print("-" * 60)
+    return _format_jobs(top_jobs)
 
-            top_job_summaries.append(summary)
-            top_job_urls.append(url)
-            top_company_names.append(company)
 
-        retriever.search_kwargs["k"] = original_k # 복구
-        return top_job_summaries, top_job_urls, top_company_names
+async def search_jd_summary_batch(emb_fn, resumes, pinecone_index=None, search_filter=None, top_n=4):
+    """
+    여러 이력서를 한 번에 JD corpus와 매칭합니다. (야간 일괄 재정렬용)
+    모든 이력서의 CV 청크를 한 번에 임베딩하고, 하나의 행렬로 쌓아 JD 청크와 GEMM으로 점수를 계산합니다.
+
+    Args:
+        emb_fn: 임베딩 모델 (embed_documents)
+        resumes: 이력서 텍스트 리스트
+        pinecone_index: 스냅샷이 없을 때 전체 JD 벡터를 list / fetch로 가져올 Pinecone 인덱스 (로컬 Chroma는 같은 인터페이스의 ChromaIndex)
+        search_filter: 메타데이터 필터 (모든 이력서에 동일하게 적용)
+        top_n: 이력서별 반환할 Job 수
+    Returns:
+        results: 이력서별 (summaries, urls, company_names) 리스트 (search_jd_summary와 같은 형식)
+    """
+    from get_similarity.utils.matcher import ChunkCorpus
+
+    print(f"\n=== Batch 검색 함수 시작 ({len(resumes)}개 이력서) ===")
+    # 1. CV 분할 후 전체 청크를 한 번에 임베딩
+    cv_chunk_groups = [_segment_cv(resume) for resume in resumes]
+    all_chunks = [chunk for chunks in cv_chunk_groups for chunk in chunks]
+    print(f"CV 청크 분할: {len(all_chunks)}개")
+    # 배치 작업은 이력서 수에 비례해서 오래 걸리므로 단일 요청용 단계 timeout을 적용하지 않음
+    all_vectors = await run_blocking("embed", emb_fn.embed_documents, all_chunks, timeout=None) if all_chunks else []
+
+    cv_groups, start = [], 0
+    for chunks in cv_chunk_groups:
+        cv_groups.append(all_vectors[start:start + len(chunks)])
+        start += len(chunks)
+
+    # 2. JD corpus (스냅샷 우선, 없으면 인덱스 전체를 list / fetch) + 메타데이터 필터
+    #    (한 이력서 청크로 query한 부분 집합을 쓰면 나머지 이력서의 top-k가 그 부분 집합에 치우침)
+    snapshot = get_snapshot(SNAPSHOT_PATH)
+    if snapshot is not None:
+        corpus = ChunkCorpus.from_snapshot(snapshot)
+        filter_index = get_snapshot_filters(snapshot)
+        get_metadata = snapshot.metadata
+    elif pinecone_index is not None and all_vectors:
+        job_embeddings_map, job_to_metadata = await run_blocking("fetch", _fetch_all_job_chunks, pinecone_index, timeout=None)
+        corpus = ChunkCorpus.from_job_map(job_embeddings_map)
+        filter_index = FilterIndex.build([job_to_metadata.get(j, {}) for j in corpus.job_ids], corpus.counts)
+        get_metadata = lambda job_id: job_to_metadata.get(job_id, {})
+    else:
+        print("[WARN] JD 스냅샷과 Pinecone Index가 모두 없습니다.")
+        return [([], [], []) for _ in resumes]
+
+    if FilterIndex.is_active(search_filter) or FILTER_EXPIRED_JOBS:
+        row_mask = filter_index.mask(search_filter, deadline_from=date.today() if FILTER_EXPIRED_JOBS else None)
+        passed = FilterIndex.job_positions(row_mask, corpus.offsets)
+        if len(passed) < corpus.num_jobs:
+            # 통과한 Job의 청크 행 구간만 계산 (스냅샷 mmap 복사 없음)
+            corpus = corpus.select(passed)
+        print(f"메타데이터 필터 적용: {int(row_mask.sum())}/{len(row_mask)} vectors 통과, {corpus.num_jobs}개 Job 대상")
+
+    # 3. 전체 CV 청크 x JD 청크 GEMM → 이력서별 top-n (근사 중복 제거 후에도 top_n개가 남도록 넉넉하게 정렬)
+    rank_depth = top_n * COLLAPSE_RANK_FACTOR if COLLAPSE_NEAR_DUPLICATES else top_n
+    ranked = await run_blocking("score", _matcher("fused").rank_batch, cv_groups, corpus, top_k=rank_depth, timeout=None)
+
+    results = []
+    for jobs in ranked:
+        jobs = _collapse_ranked(jobs, get_metadata, top_n)
+        for job in jobs:
+            job["metadata"] = get_metadata(job["job_id"])
+        results.append(_format_jobs(jobs, verbose=False))
+    return results
     
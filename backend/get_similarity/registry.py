@@ -0,0 +1,147 @@
+"""
+프로세스 단위 리소스 레지스트리
+
+임베딩 모델, Vector DB(LangChain VectorStore), raw Pinecone Index를 프로세스당 한 번만 생성해서
+/matching 요청마다 재사용합니다. DB 상태 확인(describe_index_stats)은 요청 경로에서 빼고 백그라운드에서 주기적으로 수행합니다.
+
+FastAPI lifespan에서 start()/stop()을 호출하며, lifespan 없이 matching()을 직접 호출하는 스크립트에서는
+첫 요청 시 resources()가 lazy하게 초기화합니다.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from configs import (
+    CACHE_PATH,
+    COLLECTION,
+    DB_PATH,
+    DB_TYPE,
+    EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    EMBEDDING_MAX_BATCH,
+    EMBEDDING_MODEL,
+    HEALTH_CHECK_INTERVAL,
+    UPSTAGE_API_KEY,
+)
+from get_similarity.nodes.db_load import get_db
+from get_similarity.nodes.retrieval import check_db_status, get_retriever
+from get_similarity.utils.embedding_batcher import MicroBatchEmbeddings
+from get_similarity.utils.embedding_cache import CachedEmbeddings
+from get_similarity.utils.stage_metrics import search_metrics
+
+
+def load_embedding_model():
+    """
+    노트북과 동일한 Upstage 임베딩 모델을 생성합니다.
+    캐시 miss인 텍스트만 micro-batcher로 전달되고, batcher가 동시 요청을 모아 API를 호출합니다.
+    """
+    from langchain_upstage import UpstageEmbeddings
+
+    batcher = MicroBatchEmbeddings(
+        UpstageEmbeddings(model=EMBEDDING_MODEL, api_key=UPSTAGE_API_KEY),
+        window_ms=EMBEDDING_BATCH_WINDOW_MS,
+        max_batch=EMBEDDING_MAX_BATCH,
+    )
+    return CachedEmbeddings(
+        batcher,
+        cache_dir=os.path.join(CACHE_PATH, "embeddings"),
+        max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+        max_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+    )
+
+
+class ResourceRegistry:
+    def __init__(self, health_interval: float = HEALTH_CHECK_INTERVAL):
+        self.health_interval = health_interval
+        self.emb_model = None
+        self.db = None
+        self.index = None
+        self.healthy: Optional[bool] = None
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _build(self):
+        print("Loading embedding model & vector DB...")
+        emb_model = load_embedding_model()
+        db, index = get_db(DB_PATH, emb_model, COLLECTION, DB_TYPE, check_status=False)
+        self.emb_model, self.db, self.index = emb_model, db, index
+
+    def resources(self):
+        """
+        warm 상태의 (emb_model, db, index)를 반환합니다. 아직 초기화되지 않았다면 한 번만 생성합니다.
+        """
+        if self.db is None:
+            with self._lock:
+                if self.db is None:
+                    self._build()
+        return self.emb_model, self.db, self.index
+
+    def retriever(self, search_filter: Dict[str, Any]):
+        """
+        요청별 retriever를 생성합니다. (search_kwargs를 요청마다 수정하므로 retriever 자체는 공유하지 않음)
+        """
+        emb_model, db, _ = self.resources()
+        return get_retriever(db, emb_model, filter=search_filter)
+
+    def check_health(self) -> bool:
+        try:
+            if DB_TYPE == "Pinecone":
+                check_db_status(self.index, "pinecone")
+            else:
+                check_db_status(self.db, "chroma")
+            self.healthy, self.last_error = True, None
+        except Exception as e:
+            self.healthy, self.last_error = False, str(e)
+        self.last_checked = time.time()
+        return self.healthy
+
+    def status(self) -> Dict[str, Any]:
+        status = {
+            "initialized": self.db is not None,
+            "healthy": self.healthy,
+            "last_error": self.last_error,
+            "last_checked": self.last_checked,
+        }
+        # 임베딩 캐시 hit율, micro-batch fill rate
+        if isinstance(self.emb_model, CachedEmbeddings):
+            status["embedding_cache"] = self.emb_model.stats()
+            if isinstance(self.emb_model.embeddings, MicroBatchEmbeddings):
+                status["embedding_batcher"] = self.emb_model.embeddings.stats()
+        # /matching 단계별 latency(ms), 후보 recall
+        status["search_stages"] = search_metrics.stats()
+        return status
+
+    async def _health_loop(self):
+        while True:
+            healthy = await asyncio.to_thread(self.check_health)
+            if not healthy:
+                print(f"[WARN] Vector DB 상태 확인 실패: {self.last_error}")
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self):
+        """FastAPI lifespan 시작 시 호출: 리소스를 미리 생성하고 백그라운드 상태 확인을 시작합니다."""
+        try:
+            await asyncio.to_thread(self.resources)
+        except Exception as e:
+            # 초기화 실패 시 서버는 그대로 띄우고 첫 요청에서 다시 시도
+            print(f"[WARN] 리소스 초기화 실패, 첫 요청에서 재시도합니다: {str(e)}")
+            return
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+
+registry = ResourceRegistry()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+# 청크 벡터 ID 규칙: "<job_id>__c<NNNN>" (예: wd_1234__c0001)
+CHUNK_ID_SEP = "__"
+# 청크 본문 + 임베딩 모델 hash를 저장하는 메타데이터 키 (재적재 시 다시 임베딩할지 비교)
+CONTENT_HASH_KEY = "content_hash"
+# 메타데이터 hash를 저장하는 메타데이터 키 (본문은 같고 마감일 / cluster_id 등만 바뀌면 기존 벡터로 메타데이터만 갱신)
+METADATA_HASH_KEY = "metadata_hash"
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def make_chunk_id(job_id: str, index: int) -> str:
+    return f"{job_id}{CHUNK_ID_SEP}c{index:04d}"
+
+
+def content_hash(text: str, model: str = "") -> str:
+    """
+    청크 본문 + 임베딩 모델 hash (sha1 앞 16자리)
+    벡터는 본문과 모델로만 정해지므로, 이 값이 같으면 메타데이터가 바뀌어도 다시 임베딩하지 않습니다.
+    """
+    return _sha1(f"{model}\n{text or ''}")[:16]
+
+
+def metadata_hash(metadata: Optional[Dict[str, Any]]) -> str:
+    """메타데이터 hash (sha1 앞 16자리, hash 키 자신은 제외)"""
+    metadata = {k: v for k, v in (metadata or {}).items() if k not in (CONTENT_HASH_KEY, METADATA_HASH_KEY)}
+    return _sha1(json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str))[:16]
+
+
+def stable_job_id(metadata: Optional[Dict[str, Any]] = None, text: Optional[str] = None) -> Optional[str]:
+    """
+    같은 공고는 다시 적재해도 같은 값이 되는 Job ID를 만듭니다.
+        1. metadata["job_id"] (ASCII이고 CHUNK_ID_SEP가 없을 때)
+        2. job_url / url의 hash ("jd_<sha1 16자리>", 사이트가 달라도 충돌하지 않도록 URL 전체 사용)
+        3. 본문(text) hash
+    """
+    metadata = metadata or {}
+    job_id = metadata.get("job_id")
+    if job_id and str(job_id) != "nan" and str(job_id).isascii() and CHUNK_ID_SEP not in str(job_id):
+        return str(job_id)
+    url = metadata.get("job_url") or metadata.get("url")
+    if url and str(url) != "nan":
+        return f"jd_{_sha1(str(url).strip())[:16]}"
+    if text:
+        return f"jd_{_sha1(text)[:16]}"
+    return None
+
+
+def resolve_job_id(vector_id: str, metadata: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    벡터 ID와 메타데이터로부터 청크가 속한 채용공고(Job) ID를 추출합니다.
+
+    Args:
+        vector_id: 벡터 DB의 청크 ID
+        metadata: 청크 메타데이터 (job_id, job_url/url 키 사용)
+    Returns:
+        job_id: 추출된 Job ID (찾지 못하면 None)
+    """
+    # 1. 청크 ID 파싱 (wd_1234__c0001)
+    if vector_id and CHUNK_ID_SEP in vector_id:
+        return vector_id.split(CHUNK_ID_SEP)[0]
+
+    metadata = metadata or {}
+    # 2. metadata 확인
+    if metadata.get("job_id"):
+        return str(metadata["job_id"])
+
+    # 3. URL 확인
+    url = metadata.get("job_url") or metadata.get("url")
+    if url:
+        return str(url).rstrip("/").split("/")[-1]
+    return None
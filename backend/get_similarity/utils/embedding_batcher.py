@@ -0,0 +1,196 @@
+"""
+요청 간 임베딩 micro-batcher
+
+동시에 들어온 /matching 요청들의 임베딩 텍스트를 짧은 시간 창(window_ms) 동안 모아서
+하나의 embed_documents 호출(최대 max_batch개)로 보내고, 결과를 각 요청에 나눠 돌려줍니다.
+부하가 높을수록 외부 API 호출 수와 tail latency가 줄어듭니다.
+
+    CachedEmbeddings (캐시 miss만 전달) → MicroBatchEmbeddings → UpstageEmbeddings
+
+호출자는 run_blocking의 worker thread이므로 batcher도 thread 기반으로 동작합니다.
+query(embed_query)는 별도 모델(Upstage "-query")을 사용하므로 documents와 다른 batch로 모읍니다.
+embed_documents는 "-passage" 모델이라 query를 대신 보낼 수 없어서, UpstageEmbeddings면 "-query" 모델에
+list 입력으로 한 번에 보냅니다. 그 외 모델은 같은 query 텍스트를 한 번만 embed_query로 호출합니다. (중복 제거만)
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+DOCUMENTS = "documents"
+QUERY = "query"
+
+
+def _embed_queries(embeddings: Embeddings, texts: List[str]):
+    """
+    query 모델로 여러 텍스트를 임베딩합니다.
+
+    Returns:
+        vectors: 텍스트 순서의 벡터
+        calls: 외부 호출 수
+    """
+    try:
+        from langchain_upstage import UpstageEmbeddings
+    except ImportError:
+        UpstageEmbeddings = None
+
+    if UpstageEmbeddings is None or not isinstance(embeddings, UpstageEmbeddings):
+        return [embeddings.embed_query(text) for text in texts], len(texts)
+
+    # UpstageEmbeddings.embed_query와 같은 모델 / 파라미터, 입력만 list (embed_batch_size개씩)
+    params = embeddings._invocation_params
+    params["model"] = params["model"] + "-query"
+    vectors = []
+    for start in range(0, len(texts), embeddings.embed_batch_size):
+        data = embeddings.client.create(input=texts[start:start + embeddings.embed_batch_size], **params).data
+        vectors.extend(r.embedding for r in sorted(data, key=lambda r: r.index))
+    return vectors, math.ceil(len(texts) / embeddings.embed_batch_size)
+
+
+class _Request:
+    def __init__(self, kind: str, texts: List[str]):
+        self.kind = kind
+        self.texts = texts
+        self.arrived = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[List[List[float]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatchEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, window_ms: float = 5, max_batch: int = 100, max_concurrency: int = 4):
+        """
+        Args:
+            embeddings: 실제 임베딩 모델
+            window_ms: 첫 요청 도착 후 다른 요청을 기다리는 시간
+            max_batch: 한 번의 호출에 보낼 최대 텍스트 수 (이보다 큰 단일 요청은 단독으로 전달)
+            max_concurrency: 동시에 진행할 수 있는 외부 호출 수
+        """
+        self.embeddings = embeddings
+        self.model = getattr(embeddings, "model", None)
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+
+        self._pending: Dict[str, List[_Request]] = {DOCUMENTS: [], QUERY: []}
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed-batch")
+        self._dispatcher: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.calls = 0
+        self.texts = 0
+        self.filled = 0
+        self.sent = 0
+
+    # --------------------------------------------------------------------------
+    # Embeddings interface
+    # --------------------------------------------------------------------------
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._submit(DOCUMENTS, list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._submit(QUERY, [text])[0]
+
+    def _submit(self, kind: str, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        request = _Request(kind, texts)
+        with self._cond:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._run, name="embed-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._pending[kind].append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    # --------------------------------------------------------------------------
+    # Dispatcher
+    # --------------------------------------------------------------------------
+
+    def _pending_texts(self, kind: str) -> int:
+        return sum(len(r.texts) for r in self._pending[kind])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not any(self._pending.values()):
+                    self._cond.wait()
+                # 가장 먼저 도착한 요청 기준으로 window가 지나거나 batch가 가득 찰 때까지 대기
+                kind = min((k for k in self._pending if self._pending[k]), key=lambda k: self._pending[k][0].arrived)
+                deadline = self._pending[kind][0].arrived + self.window
+                while self._pending_texts(kind) < self.max_batch and (remaining := deadline - time.monotonic()) > 0:
+                    self._cond.wait(remaining)
+                batch = self._take(kind)
+            self._pool.submit(self._call, kind, batch)
+
+    def _take(self, kind: str) -> List[_Request]:
+        """max_batch를 넘지 않는 범위에서 도착 순서대로 요청을 꺼냅니다. (첫 요청은 크기와 무관하게 포함)"""
+        queue = self._pending[kind]
+        batch = [queue.pop(0)]
+        size = len(batch[0].texts)
+        while queue and size + len(queue[0].texts) <= self.max_batch:
+            size += len(queue[0].texts)
+            batch.append(queue.pop(0))
+        return batch
+
+    def _call(self, kind: str, batch: List[_Request]):
+        # 같은 텍스트는 한 번만 전송
+        unique: Dict[str, int] = {}
+        for request in batch:
+            for text in request.texts:
+                unique.setdefault(text, len(unique))
+        inputs = list(unique)
+        try:
+            if kind == DOCUMENTS:
+                vectors = self.embeddings.embed_documents(inputs)
+                calls = math.ceil(len(inputs) / getattr(self.embeddings, "embed_batch_size", len(inputs)))
+            else:
+                vectors, calls = _embed_queries(self.embeddings, inputs)
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+                request.done.set()
+            return
+
+        with self._stats_lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.calls += calls
+            self.texts += sum(len(r.texts) for r in batch)
+            self.filled += min(len(inputs), self.max_batch)
+            self.sent += len(inputs)
+        for request in batch:
+            request.result = [vectors[unique[text]] for text in request.texts]
+            request.done.set()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            batches: 합쳐서 보낸 batch 수
+            calls: 실제 외부 임베딩 호출 수 (모델의 embed_batch_size로 나뉘거나, query를 하나씩 보낸 경우 batch보다 많음)
+            requests_per_batch: batch당 합쳐진 요청 수
+            fill_rate: batch당 평균 전송 텍스트 수 / max_batch
+            texts_per_call: 외부 호출당 평균 전송 텍스트 수
+            dedup_ratio: 중복 제거 후 실제 전송한 텍스트 비율
+        """
+        with self._stats_lock:
+            batches = max(self.batches, 1)
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "calls": self.calls,
+                "requests_per_batch": self.requests / batches,
+                "fill_rate": self.filled / (batches * self.max_batch),
+                "texts_per_call": self.sent / max(self.calls, 1),
+                "dedup_ratio": self.sent / max(self.texts, 1),
+            }
@@ -0,0 +1,181 @@
+"""
+Content-addressed 임베딩 캐시
+
+(모델 이름, 임베딩 종류, 텍스트)의 해시를 key로 벡터를 저장합니다.
+    1. 메모리 LRU tier: 프로세스 내부, 최근 사용한 벡터 max_items개
+    2. 디스크 tier: CACHE_PATH 아래 SQLite 파일, 전체 크기가 max_bytes를 넘으면 오래 사용하지 않은 벡터부터 삭제
+같은 이력서를 필터만 바꿔 다시 매칭하면 CV 청크/쿼리 임베딩 API 호출이 0회가 됩니다.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_dir: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_items: int = 4096,
+        model_name: Optional[str] = None,
+    ):
+        """
+        Args:
+            embeddings: 실제 임베딩 모델 (UpstageEmbeddings 등)
+            cache_dir: 디스크 캐시 저장 경로 (CACHE_PATH)
+            max_bytes: 디스크 캐시 최대 크기
+            max_items: 메모리 LRU 최대 벡터 개수
+            model_name: 캐시 key에 포함할 모델 이름 (기본값: embeddings.model)
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name or str(getattr(embeddings, "model", type(embeddings).__name__))
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "embeddings.sqlite"), check_same_thread=False, timeout=30)
+        # 여러 uvicorn worker가 같은 파일을 공유하므로 WAL 모드 사용
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._conn.commit()
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    # --------------------------------------------------------------------------
+    # Memory tier
+    # --------------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        vec = self._memory.get(key)
+        if vec is not None:
+            self._memory.move_to_end(key)
+        return vec
+
+    def _memory_put(self, key: str, vec: List[float]):
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    # --------------------------------------------------------------------------
+    # Disk tier
+    # --------------------------------------------------------------------------
+
+    def _disk_get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        if found:
+            now = time.time()
+            self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, k) for k in found])
+            self._conn.commit()
+        return found
+
+    def _disk_put_many(self, items: Dict[str, List[float]]):
+        now = time.time()
+        rows = []
+        for key, vec in items.items():
+            blob = np.asarray(vec, dtype=np.float32).tobytes()
+            rows.append((key, blob, len(blob), now))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)", rows
+        )
+        self._conn.commit()
+        self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 최대 크기의 90%까지 오래 사용하지 않은 순서로 삭제
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_access ASC").fetchall()
+        delete_keys = []
+        for key, size in rows:
+            if total <= target:
+                break
+            delete_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", delete_keys)
+        self._conn.commit()
+
+    # --------------------------------------------------------------------------
+    # Embeddings interface
+    # --------------------------------------------------------------------------
+
+    def _embed_cached(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(kind, t) for t in texts]
+        results: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                vec = self._memory_get(key)
+                if vec is not None:
+                    results[key] = vec
+            remaining = [k for k in dict.fromkeys(keys) if k not in results]
+            if remaining:
+                from_disk = self._disk_get_many(remaining)
+                for key, vec in from_disk.items():
+                    self._memory_put(key, vec)
+                results.update(from_disk)
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) 실제 임베딩 API 호출
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in results:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            miss_keys = list(missing)
+            if kind == "query":
+                vectors = [self.embeddings.embed_query(missing[miss_keys[0]])]
+            else:
+                vectors = self.embeddings.embed_documents([missing[k] for k in miss_keys])
+            # 캐시 hit 결과와 동일하도록 float32로 맞춤
+            new_items = {k: np.asarray(v, dtype=np.float32).tolist() for k, v in zip(miss_keys, vectors)}
+            with self._lock:
+                for key, vec in new_items.items():
+                    self._memory_put(key, vec)
+                self._disk_put_many(new_items)
+            results.update(new_items)
+
+        return [results[k] for k in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed_cached("document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        # Upstage는 query/passage 모델이 다르므로 종류별로 key를 분리
+        return self._embed_cached("query", [text])[0]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
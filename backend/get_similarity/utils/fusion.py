@@ -0,0 +1,86 @@
+from typing import Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FUSION_METHODS = ("rrf", "combsum")
+
+# ranking 하나 = ID 리스트 (순위만) 또는 (ID, 점수) 리스트 (내림차순)
+Ranking = Sequence[Union[Hashable, Tuple[Hashable, float]]]
+
+
+def _split(ranking: Ranking):
+    if len(ranking) and isinstance(ranking[0], tuple):
+        ids = [item[0] for item in ranking]
+        scores = np.fromiter((item[1] for item in ranking), dtype=np.float64, count=len(ranking))
+        return ids, scores
+    return list(ranking), None
+
+
+def _minmax(scores: Optional[np.ndarray], n: int) -> np.ndarray:
+    """CombSUM용 [0, 1] 정규화 (점수가 없으면 순위로 1 → 1/n 선형 감소)"""
+    if scores is None:
+        return (n - np.arange(n)) / n
+    low, high = scores.min(), scores.max()
+    if high - low < 1e-12:
+        return np.ones(n)
+    return (scores - low) / (high - low)
+
+
+def fuse(
+    rankings: Sequence[Ranking],
+    weights: Optional[Sequence[float]] = None,
+    method: str = "rrf",
+    k: float = 60,
+    top_k: Optional[int] = None,
+) -> List[Tuple[Hashable, float]]:
+    """
+    여러 검색 결과(dense, lexical, 메타데이터 boost 등)의 순위를 하나로 합칩니다.
+    상태는 호출마다 지역 변수로만 유지하므로 요청 간에 결과가 섞이거나 누적되지 않습니다.
+
+    Args:
+        rankings: ranking 리스트. 각 ranking은 ID 리스트 또는 (ID, 점수) 리스트 (내림차순)
+        weights: ranking별 가중치 (None이면 모두 1.0)
+        method: "rrf" (weighted Reciprocal Rank Fusion) 또는 "combsum" (min-max 정규화 점수의 가중합)
+        k: RRF 상수, 점수 = weight / (k + rank)
+        top_k: 반환 개수 (None이면 전체)
+    Returns:
+        fused: [(id, score), ...] 점수 내림차순 (동점이면 먼저 등장한 ID 우선)
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"지원하지 않는 fusion 방식입니다: {method} (가능: {FUSION_METHODS})")
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    if len(weights) != len(rankings):
+        raise ValueError("rankings와 weights의 개수가 다릅니다.")
+
+    # 1. ID → 정수 위치 (요청 로컬), ranking별 기여도 배열 계산
+    positions = {}
+    rows, contributions = [], []
+    for ranking, weight in zip(rankings, weights):
+        ids, scores = _split(ranking)
+        if not ids:
+            continue
+        rows.append(np.fromiter((positions.setdefault(i, len(positions)) for i in ids), dtype=np.int64, count=len(ids)))
+        if method == "rrf":
+            contributions.append(weight / (k + np.arange(1, len(ids) + 1)))
+        else:
+            contributions.append(weight * _minmax(scores, len(ids)))
+    if not positions:
+        return []
+
+    # 2. bincount로 ID별 점수 합산
+    totals = np.bincount(np.concatenate(rows), weights=np.concatenate(contributions), minlength=len(positions))
+
+    # 3. argpartition top-k 후 정렬
+    n = len(totals) if top_k is None else min(top_k, len(totals))
+    if n <= 0:
+        return []
+    top = np.arange(len(totals)) if n == len(totals) else np.argpartition(-totals, n - 1)[:n]
+    top = top[np.lexsort((top, -totals[top]))]
+    ids = list(positions)
+    return [(ids[i], float(totals[i])) for i in top]
+
+
+def rrf(multi_scores, k=1):
+    """기존 인터페이스 호환용 RRF (가중치 없이 전체 결과 반환)"""
+    return fuse(multi_scores, method="rrf", k=k)
@@ -0,0 +1,362 @@
+"""
+JD 적재용 임베딩 / upsert 파이프라인
+
+배치마다 임베딩이 끝난 뒤 upsert하고 다음 배치로 넘어가던 직렬 루프(vector_store.add_documents)를
+크기 제한 queue로 연결한 두 단계 worker pool로 바꿔, 임베딩 API와 Vector DB 호출이 겹쳐서 진행되도록 합니다.
+
+    batches ─feeder─▶ [queue] ─▶ embed worker x N ─▶ [queue] ─▶ upsert worker x M
+
+    - queue가 차면 앞 단계가 기다리므로(backpressure) 메모리에는 최대 (queue_size x 2 + N + M)개 배치만 남습니다.
+    - 429(rate limit) 응답은 지수 backoff + full jitter로 max_retries번까지 재시도하고, 다른 예외나 재시도 초과는
+      전체 파이프라인을 멈추고 run()에서 다시 발생시킵니다.
+    - 단계별 배치 수, 청크 수, 재시도 수, 호출 시간(busy), 다음 queue를 기다린 시간(wait)을 기록합니다.
+      (wait가 큰 단계의 다음 단계가 병목)
+
+레코드 형식은 raw Pinecone Index / ChromaIndex upsert와 같습니다.
+    입력 배치: [{"id", "text", "metadata"}] → upsert: [{"id", "values", "metadata"}]
+
+증분 재적재 (delta):
+    청크 ID는 "<job_id>__c<NNNN>"로 결정적이고 metadata에 CONTENT_HASH_KEY(본문 + 임베딩 모델)와
+    METADATA_HASH_KEY(메타데이터) hash를 저장하므로, stored_hashes()로 저장된 hash를 읽어 plan_delta()로 비교하면
+    새 청크 / 본문이 바뀐 청크만 임베딩·upsert하고, 마감일 / cluster_id 등 메타데이터만 바뀐 청크는
+    reuse_vectors()로 저장된 벡터를 다시 써서 upsert하며, 더 이상 없는 청크(orphan)는 삭제할 수 있습니다.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from get_similarity.utils.chunk_ids import CONTENT_HASH_KEY, METADATA_HASH_KEY, content_hash, make_chunk_id, metadata_hash, resolve_job_id
+
+STAGES = ("embed", "upsert")
+_STOP = object()
+
+
+def documents_to_records(documents, text_key: str = "text") -> List[Dict[str, Any]]:
+    """
+    LangChain Document 리스트 → 파이프라인 입력 레코드
+    PineconeVectorStore.add_documents와 같이 본문을 metadata[text_key]에 저장하고,
+    Document.id가 없으면 랜덤 ID를 사용합니다.
+    """
+    return [
+        {"id": getattr(doc, "id", None) or str(uuid4()), "text": doc.page_content, "metadata": {**doc.metadata, text_key: doc.page_content}}
+        for doc in documents
+    ]
+
+
+def set_hashes(metadata: Dict[str, Any], text: str, model: str = "") -> Dict[str, Any]:
+    """청크 메타데이터에 본문 + 모델 hash와 메타데이터 hash를 기록합니다. (메타데이터의 다른 값이 모두 정해진 뒤 호출)"""
+    metadata[CONTENT_HASH_KEY] = content_hash(text, model)
+    metadata[METADATA_HASH_KEY] = metadata_hash(metadata)
+    return metadata
+
+
+def job_records(job_id: str, texts: List[str], metadata: Dict[str, Any], text_key: str = "text", model: str = "") -> List[Dict[str, Any]]:
+    """
+    한 공고의 청크 본문 → 결정적 ID("<job_id>__c<NNNN>")와 본문 / 메타데이터 hash를 가진 레코드 (빈 청크는 번호 없이 제외)
+
+    Args:
+        model: 임베딩 모델 이름 (content_hash에 포함, 모델을 바꾸면 모든 청크를 다시 임베딩)
+    """
+    records = []
+    for text in texts:
+        if not text or not text.strip():
+            continue
+        meta = set_hashes({**metadata, "job_id": job_id, text_key: text}, text, model)
+        records.append({"id": make_chunk_id(job_id, len(records)), "text": text, "metadata": meta})
+    return records
+
+
+def stored_hashes(index, job_ids: Optional[Set[str]] = None, batch_size: int = 100) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    인덱스에 저장된 청크의 본문 / 메타데이터 hash를 읽습니다.
+    index.list()로 ID만 훑고, job_ids가 주어지면 해당 Job의 청크만 fetch합니다. (hash가 없는 예전 청크는 None)
+
+    Returns:
+        {vector_id: (content_hash, metadata_hash)}
+    """
+    hashes = {}
+    for page in index.list():
+        ids = [vid for vid in page if job_ids is None or resolve_job_id(vid) in job_ids]
+        for start in range(0, len(ids), batch_size):
+            resp = index.fetch(ids=ids[start:start + batch_size])
+            for vid, vector_data in resp.vectors.items():
+                metadata = vector_data.metadata or {}
+                hashes[vid] = (metadata.get(CONTENT_HASH_KEY), metadata.get(METADATA_HASH_KEY))
+    return hashes
+
+
+def plan_delta(records: List[Dict[str, Any]], stored: Dict[str, Tuple[Optional[str], Optional[str]]], full_sync: bool = False) -> Dict[str, Any]:
+    """
+    새 레코드와 저장된 hash를 비교합니다.
+
+    Args:
+        records: job_records() 레코드
+        stored: stored_hashes() 결과
+        full_sync: True면 records에 없는 저장 청크를 모두 삭제 (전체 재적재),
+                   False면 records에 포함된 Job의 남는 청크만 삭제 (일부 공고 재적재, Job의 청크는 모두 records에 있어야 함)
+    Returns:
+        {"upsert": 임베딩할 새 청크 / 본문이 바뀐 청크 레코드,
+         "update": 본문은 같고 메타데이터만 바뀐 청크 레코드 (reuse_vectors로 저장된 벡터를 다시 씀),
+         "delete": orphan 청크 ID, "unchanged": 건너뛴 청크 수}
+    """
+    upsert, update = [], []
+    for record in records:
+        stored_content, stored_metadata = stored.get(record["id"]) or (None, None)
+        if stored_content is None or stored_content != record["metadata"].get(CONTENT_HASH_KEY):
+            upsert.append(record)
+        elif stored_metadata != record["metadata"].get(METADATA_HASH_KEY):
+            update.append(record)
+    if full_sync:
+        new_ids = {record["id"] for record in records}
+        delete = [vid for vid in stored if vid not in new_ids]
+    else:
+        # 청크 번호는 Job마다 0부터 연속이므로, 새 청크 수 이후 번호가 저장돼 있으면 orphan (stored 전체를 훑지 않음)
+        delete = []
+        for job_id, count in Counter(resolve_job_id(record["id"]) for record in records).items():
+            while make_chunk_id(job_id, count) in stored:
+                delete.append(make_chunk_id(job_id, count))
+                count += 1
+    return {"upsert": upsert, "update": update, "delete": delete, "unchanged": len(records) - len(upsert) - len(update)}
+
+
+def reuse_vectors(index, records: List[Dict[str, Any]], batch_size: int = 100) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    메타데이터만 바뀐 청크 레코드(plan_delta의 "update")의 저장된 벡터를 fetch해서 새 메타데이터와 함께 upsert할 레코드로 만듭니다.
+    (임베딩 API 호출 없음, CatalogedIndex로 upsert하면 카탈로그의 마감일 / hash도 함께 갱신)
+
+    Returns:
+        vectors: upsert 입력 [{"id", "values", "metadata"}]
+        missing: 그 사이 인덱스에서 사라져 다시 임베딩해야 하는 레코드
+    """
+    vectors, missing = [], []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        stored = index.fetch(ids=[record["id"] for record in batch]).vectors
+        for record in batch:
+            if record["id"] in stored:
+                vectors.append({"id": record["id"], "values": list(stored[record["id"]].values), "metadata": record["metadata"]})
+            else:
+                missing.append(record)
+    return vectors, missing
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """HTTP 429 / rate limit 예외인지 확인합니다. (openai: status_code, pinecone: status)"""
+    for attr in ("status_code", "status", "code"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(exc).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, rng=random) -> float:
+    """지수 backoff + full jitter: [0, min(max_delay, base_delay * 2^attempt)] 균등 분포"""
+    return rng.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        upsert_fn: Callable[[List[Dict[str, Any]]], Any],
+        embed_workers: int = 4,
+        upsert_workers: int = 2,
+        queue_size: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        progress: Optional[Callable[[int], Any]] = None,
+    ):
+        """
+        Args:
+            embed_fn: 텍스트 리스트 → 벡터 리스트 (embed_documents)
+            upsert_fn: [{"id", "values", "metadata"}] upsert (index.upsert(vectors=...))
+            embed_workers: 동시 임베딩 호출 수
+            upsert_workers: 동시 upsert 호출 수
+            queue_size: 단계 사이 queue에 쌓아 둘 최대 배치 수
+            max_retries: 429 응답 재시도 횟수
+            base_delay: 첫 재시도 backoff 상한(초)
+            max_delay: backoff 상한(초)
+            progress: upsert가 끝날 때마다 청크 수로 호출 (예: tqdm.update)
+        """
+        if embed_workers < 1 or upsert_workers < 1:
+            raise ValueError("embed_workers와 upsert_workers는 1 이상이어야 합니다.")
+        self.embed_fn = embed_fn
+        self.upsert_fn = upsert_fn
+        self.embed_workers = embed_workers
+        self.upsert_workers = upsert_workers
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.progress = progress
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._wall_s = 0.0
+
+    # --------------------------------------------------------------------------
+    # Stats
+    # --------------------------------------------------------------------------
+
+    def _reset_counters(self):
+        self._counters = {stage: {"batches": 0, "items": 0, "retries": 0, "busy_s": 0.0, "wait_s": 0.0} for stage in STAGES}
+        self._wall_s = 0.0
+
+    def _count(self, stage: str, **values):
+        with self._lock:
+            for key, value in values.items():
+                self._counters[stage][key] += value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            {"wall_s", stage: {"batches", "items", "retries", "busy_s", "wait_s", "items_per_s"}}
+            (items_per_s = 처리한 청크 수 / 전체 실행 시간)
+        """
+        with self._lock:
+            stats = {"wall_s": self._wall_s}
+            for stage, counter in self._counters.items():
+                stats[stage] = {**counter, "items_per_s": counter["items"] / self._wall_s if self._wall_s else 0.0}
+        return stats
+
+    # --------------------------------------------------------------------------
+    # Queue helpers (stop 이후에는 기다리지 않음)
+    # --------------------------------------------------------------------------
+
+    def _put(self, queue: Queue, item, stage: Optional[str] = None) -> bool:
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                if stage:
+                    self._count(stage, wait_s=time.perf_counter() - start)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _get(self, queue: Queue):
+        while not self._stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                continue
+        return _STOP
+
+    def _call(self, stage: str, fn, arg):
+        """fn(arg)를 429면 backoff 후 재시도합니다."""
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = fn(arg)
+                self._count(stage, busy_s=time.perf_counter() - start)
+                return result
+            except Exception as e:
+                self._count(stage, busy_s=time.perf_counter() - start)
+                if attempt == self.max_retries or not is_rate_limited(e):
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                self._count(stage, retries=1)
+                print(f"[WARN] {stage} rate limit, {delay:.1f}s 후 재시도 ({attempt + 1}/{self.max_retries})")
+                if self._stop.wait(delay):
+                    raise RuntimeError(f"{stage} 재시도 중 파이프라인이 중단되었습니다.") from e
+
+    # --------------------------------------------------------------------------
+    # Workers
+    # --------------------------------------------------------------------------
+
+    def _embed_worker(self, source: Queue, sink: Queue):
+        while True:
+            batch = self._get(source)
+            if batch is _STOP:
+                return
+            vectors = self._call("embed", self.embed_fn, [record["text"] for record in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"임베딩 수({len(vectors)})가 청크 수({len(batch)})와 다릅니다.")
+            self._count("embed", batches=1, items=len(batch))
+            records = [{"id": r["id"], "values": v, "metadata": r["metadata"]} for r, v in zip(batch, vectors)]
+            if not self._put(sink, records, stage="embed"):
+                return
+
+    def _upsert_worker(self, source: Queue):
+        while True:
+            records = self._get(source)
+            if records is _STOP:
+                return
+            self._call("upsert", self.upsert_fn, records)
+            self._count("upsert", batches=1, items=len(records))
+            if self.progress is not None:
+                self.progress(len(records))
+
+    def run(self, batches: Iterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        batches를 모두 임베딩 / upsert할 때까지 기다립니다.
+
+        Args:
+            batches: [{"id", "text", "metadata"}] 배치 iterable (generator 가능, feeder thread에서 소비)
+        Returns:
+            stats()
+        Raises:
+            worker / feeder에서 처음 발생한 예외 (나머지 worker는 중단)
+        """
+        self._reset_counters()
+        self._stop.clear()
+        to_embed, to_upsert = Queue(maxsize=self.queue_size), Queue(maxsize=self.queue_size)
+        errors: List[BaseException] = []
+        remaining = {"embed": self.embed_workers}
+
+        def guarded(target, *args, on_exit=None):
+            def runner():
+                try:
+                    target(*args)
+                except BaseException as e:
+                    with self._lock:
+                        errors.append(e)
+                    self._stop.set()
+                finally:
+                    if on_exit is not None:
+                        on_exit()
+            return threading.Thread(target=runner, daemon=True)
+
+        def feed():
+            for batch in batches:
+                if batch and not self._put(to_embed, batch):
+                    return
+
+        def feeder_done():
+            for _ in range(self.embed_workers):
+                self._put(to_embed, _STOP)
+
+        def embed_done():
+            with self._lock:
+                remaining["embed"] -= 1
+                last = remaining["embed"] == 0
+            if last:
+                for _ in range(self.upsert_workers):
+                    self._put(to_upsert, _STOP)
+
+        threads = [guarded(feed, on_exit=feeder_done)]
+        threads += [guarded(self._embed_worker, to_embed, to_upsert, on_exit=embed_done) for _ in range(self.embed_workers)]
+        threads += [guarded(self._upsert_worker, to_upsert) for _ in range(self.upsert_workers)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with self._lock:
+            self._wall_s = time.perf_counter() - start
+
+        if errors:
+            raise errors[0]
+        return self.stats()
@@ -4,19 +4,239 @@ from typing import List, Dict, Any
 
 # Numba가 설치되어 있지 않을 경우를 대비한 안전 장치
 try:
-    from numba import jit
+    from numba import jit, prange
     HAS_NUMBA = True
 except ImportError:
     HAS_NUMBA = False
+    prange = range
     def jit(*args, **kwargs):
         def wrapper(func):
             return func
         return wrapper
 
+# Job 점수 집계 방식 (CV 청크 x JD 청크 유사도 행렬 → Job 점수)
+#   mean      전체 유사도 평균
+#   maxsim    CV 청크별 가장 유사한 JD 청크 유사도의 평균 (late interaction)
+#   topm      CV 청크별 상위 m개 JD 청크 유사도 평균의 평균
+#   coverage  가장 유사한 JD 청크 유사도가 threshold 이상인 CV 청크 비율
+AGGREGATIONS = {"mean": 0, "maxsim": 1, "topm": 2, "coverage": 3}
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    # 0 벡터는 유사도 0으로 처리 (_fast_cosine_matrix와 동일)
+    norms[norms < 1e-9] = np.inf
+    return vectors / norms
+
+
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def _aggregate_segments(sims, cv_offsets, job_offsets, kernel, top_m, threshold):
+    """
+    유사도 블록을 한 번 순회하면서 (이력서, Job)별 집계 점수를 계산합니다. (Job 단위 병렬)
+
+    Args:
+        sims: (Q x B) float32 유사도 블록 (행 = CV 청크, 열 = JD 청크)
+        cv_offsets: (R + 1) 이력서 r의 CV 청크 행 범위
+        job_offsets: (J + 1) Job j의 JD 청크 열 범위 (블록 기준)
+        kernel: AGGREGATIONS 값
+        top_m: topm 집계의 m
+        threshold: coverage 집계의 유사도 기준
+    Returns:
+        scores: (R x J) float32
+    """
+    num_resumes = len(cv_offsets) - 1
+    num_jobs = len(job_offsets) - 1
+    out = np.zeros((num_resumes, num_jobs), dtype=np.float32)
+    for j in prange(num_jobs):
+        lo, hi = job_offsets[j], job_offsets[j + 1]
+        if hi == lo:
+            continue
+        k = min(top_m, hi - lo)
+        buf = np.empty(k, dtype=np.float32)
+        for r in range(num_resumes):
+            q0, q1 = cv_offsets[r], cv_offsets[r + 1]
+            if q1 == q0:
+                continue
+            total = 0.0
+            for q in range(q0, q1):
+                if kernel == 0:
+                    s = 0.0
+                    for c in range(lo, hi):
+                        s += sims[q, c]
+                    total += s / (hi - lo)
+                elif kernel == 2:
+                    # 내림차순 top-k 삽입 버퍼
+                    filled = 0
+                    for c in range(lo, hi):
+                        v = sims[q, c]
+                        if filled < k:
+                            i = filled
+                            filled += 1
+                        elif v > buf[k - 1]:
+                            i = k - 1
+                        else:
+                            continue
+                        while i > 0 and buf[i - 1] < v:
+                            buf[i] = buf[i - 1]
+                            i -= 1
+                        buf[i] = v
+                    s = 0.0
+                    for i in range(k):
+                        s += buf[i]
+                    total += s / k
+                else:
+                    best = -np.inf
+                    for c in range(lo, hi):
+                        if sims[q, c] > best:
+                            best = sims[q, c]
+                    if kernel == 1:
+                        total += best
+                    elif best >= threshold:
+                        total += 1.0
+            out[r, j] = total / (q1 - q0)
+    return out
+
+
+def _job_blocks(offsets: np.ndarray, block_rows: int):
+    """청크 행 수가 block_rows를 넘지 않도록 Job 경계에 맞춰 (첫 Job, 끝 Job) 구간을 나눕니다. (Job이 블록에 걸치지 않음)"""
+    j, num_jobs = 0, len(offsets) - 1
+    while j < num_jobs:
+        end = max(int(np.searchsorted(offsets, offsets[j] + block_rows, side="right")) - 1, j + 1)
+        yield j, end
+        j = end
+
+
+class ChunkCorpus:
+    """
+    전체 JD 청크를 하나의 정규화된 (M_total x D) float32 행렬과 Job별 segment offset으로 보관합니다.
+    Job j의 청크 행 범위 = offsets[j]:offsets[j+1]
+    codec이 있으면 matrix는 압축 code 행렬이고, 유사도는 code에서 바로 계산합니다. (get_similarity.index.quantize)
+
+    select()로 고른 일부 Job은 matrix를 복사하지 않고 Job별 matrix 시작 행(starts)만 가지며,
+    offsets는 고른 Job 청크를 이어 붙인 가상의 행 번호입니다. similarity()가 가상 행 구간을 matrix의 연속 구간들로 바꿔 계산합니다.
+    """
+
+    def __init__(self, matrix: np.ndarray, offsets: np.ndarray, job_ids: List[str], codec=None, starts=None):
+        self.matrix = matrix
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.job_ids = job_ids
+        self.counts = np.diff(self.offsets)
+        self.codec = codec
+        # Job별 matrix 시작 행 (None이면 offsets[:-1]과 같음, 즉 matrix 행 순서 그대로)
+        self.starts = None if starts is None else np.asarray(starts, dtype=np.int64)
+        self._runs = None if self.starts is None else self._contiguous_runs()
+
+    def _contiguous_runs(self) -> np.ndarray:
+        """matrix에서 이어지는 Job들을 묶은 (K x 2) [가상 시작 행, matrix 시작 행]"""
+        if self.num_jobs == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        breaks = np.flatnonzero(self.starts[1:] != self.starts[:-1] + self.counts[:-1]) + 1
+        first = np.concatenate([[0], breaks])
+        return np.stack([self.offsets[first], self.starts[first]], axis=1)
+
+    @property
+    def num_rows(self) -> int:
+        return int(self.offsets[-1])
+
+    def _score_rows(self, queries: np.ndarray, rows) -> np.ndarray:
+        if self.codec is None:
+            return queries @ rows.T
+        return self.codec.scores(queries, rows)
+
+    def similarity(self, queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        """정규화된 query (Q x D)와 청크 행 [start, end)의 유사도 (Q x B)"""
+        if self._runs is None:
+            return self._score_rows(queries, self.matrix[start:end])
+
+        end = min(end, self.num_rows)
+        if end <= start:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        # [start, end)에 걸친 run들의 matrix 구간 [lo, hi)
+        first = int(np.searchsorted(self._runs[:, 0], start, side="right")) - 1
+        last = int(np.searchsorted(self._runs[:, 0], end, side="left"))
+        v0, p0 = self._runs[first:last, 0], self._runs[first:last, 1]
+        v1 = np.append(self._runs[first + 1:last, 0], end)
+        lo = p0 + np.maximum(start, v0) - v0
+        hi = p0 + np.minimum(end, v1) - v0
+        if len(lo) == 1:
+            return self._score_rows(queries, self.matrix[lo[0]:hi[0]])
+
+        lengths = hi - lo
+        span_lo, span_hi = int(lo.min()), int(hi.max())
+        if span_hi - span_lo <= 2 * int(lengths.sum()):
+            # 필터를 대부분 통과하는 등 구간이 촘촘하면 전체 범위를 한 번에 계산하고 열만 고름 (matrix 복사 없음)
+            cols = np.repeat(lo - span_lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+            return self._score_rows(queries, self.matrix[span_lo:span_hi])[:, cols]
+        return np.concatenate([self._score_rows(queries, self.matrix[a:b]) for a, b in zip(lo, hi)], axis=1)
+
+    @property
+    def num_jobs(self) -> int:
+        return len(self.job_ids)
+
+    @classmethod
+    def from_job_map(cls, job_embeddings_map: Dict[str, List[Dict[str, Any]]]) -> "ChunkCorpus":
+        job_ids, blocks, offsets = [], [], [0]
+        for jid, jembs in job_embeddings_map.items():
+            if not jembs:
+                continue
+            job_ids.append(jid)
+            blocks.extend(j["values"] for j in jembs)
+            offsets.append(offsets[-1] + len(jembs))
+        if not blocks:
+            return cls(np.empty((0, 0), dtype=np.float32), offsets, job_ids)
+        matrix = _l2_normalize(np.asarray(blocks, dtype=np.float32))
+        return cls(matrix, offsets, job_ids)
+
+    def select(self, positions) -> "ChunkCorpus":
+        """
+        일부 Job(위치 목록)만 고른 ChunkCorpus를 반환합니다. (후보 Job 재정렬 / 메타데이터 필터용)
+        matrix(스냅샷 mmap 등)는 복사하지 않고 공유하며, 고른 Job의 시작 행만 기록합니다.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        counts = self.counts[positions]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        starts = (self.offsets[:-1] if self.starts is None else self.starts)[positions]
+        return ChunkCorpus(self.matrix, offsets, [self.job_ids[p] for p in positions], codec=self.codec, starts=starts)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, quantized=None) -> "ChunkCorpus":
+        """
+        Args:
+            quantized: 스냅샷 압축 벡터 (QuantizedVectors, None이면 float32 원본)
+        """
+        if quantized is not None:
+            return cls(quantized.codes, snapshot.offsets, snapshot.job_ids, codec=quantized.codec)
+        # 스냅샷은 저장 시 이미 L2 정규화되어 있으므로 mmap을 그대로 사용 (복사 없음)
+        return cls(snapshot.vectors, snapshot.offsets, snapshot.job_ids)
+
+
 class DenseMatcher:
-    def __init__(self, num_workers: int = 4, **kwargs):
-        # coverage 관련 파라미터 무시
+    def __init__(
+        self,
+        num_workers: int = 4,
+        mode: str = "parallel",
+        block_rows: int = 32768,
+        aggregation: str = "mean",
+        top_m: int = 3,
+        coverage_threshold: float = 0.4,
+        **kwargs,
+    ):
+        """
+        Args:
+            num_workers: parallel 모드의 thread 수
+            mode: "parallel" (Job별 thread-pool) 또는 "fused" (전체 청크 단일 GEMM + segment reduction)
+            block_rows: fused 모드에서 한 번의 GEMM에 사용할 JD 청크 행 수 (유사도 블록 메모리 제한)
+            aggregation: Job 점수 집계 방식 ["mean", "maxsim", "topm", "coverage"]
+            top_m: topm 집계에서 CV 청크별로 평균할 JD 청크 수
+            coverage_threshold: coverage 집계에서 CV 청크가 충족됐다고 보는 유사도
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"지원하지 않는 집계 방식입니다: {aggregation} (가능: {list(AGGREGATIONS)})")
         self.num_workers = num_workers
+        self.mode = mode
+        self.block_rows = block_rows
+        self.aggregation = aggregation
+        self.top_m = top_m
+        self.coverage_threshold = coverage_threshold
 
     # --------------------------------------------------------------------------
     # Numba Optimized Kernels (Static Methods)
@@ -59,26 +279,6 @@ class DenseMatcher:
                     
         return dot_product
 
-    @staticmethod
-    @jit(nopython=True, fastmath=True)
-    def _calc_similarity_jit(sim_matrix: np.ndarray) -> float:
-        """
-        Returns average similarity only.
-        """
-        if sim_matrix.size == 0:
-            return 0.0
-
-        total_sim = 0.0
-        count = 0
-        rows, cols = sim_matrix.shape
-        
-        for i in range(rows):
-            for j in range(cols):
-                total_sim += sim_matrix[i, j]
-                count += 1
-        
-        return total_sim / count if count > 0 else 0.0
-
     # --------------------------------------------------------------------------
     # Python helpers
     # --------------------------------------------------------------------------
@@ -102,11 +302,45 @@ class DenseMatcher:
         except Exception:
             return None
 
+        return self._score_job(job_id, jd_vec_np, cv_vec_np)
+
+    def _aggregate(self, sims: np.ndarray, cv_offsets: np.ndarray, job_offsets: np.ndarray) -> np.ndarray:
+        return _aggregate_segments(
+            np.ascontiguousarray(sims, dtype=np.float32),
+            np.asarray(cv_offsets, dtype=np.int64),
+            np.asarray(job_offsets, dtype=np.int64),
+            AGGREGATIONS[self.aggregation],
+            self.top_m,
+            self.coverage_threshold,
+        )
+
+    def _aggregate_job(self, sim_matrix: np.ndarray) -> float:
+        """Job 하나의 (N x M) 유사도 행렬 → 점수"""
+        if sim_matrix.size == 0:
+            return 0.0
+        if self.aggregation == "mean":
+            return float(sim_matrix.mean())
+        rows, cols = sim_matrix.shape
+        return float(self._aggregate(sim_matrix, [0, rows], [0, cols])[0, 0])
+
+    def _aggregate_blocks(self, cv_norm: np.ndarray, cv_offsets: np.ndarray, corpus: ChunkCorpus) -> np.ndarray:
+        """
+        mean 이외의 집계: Job 경계에 맞춘 블록마다 GEMM 한 번 + 집계 kernel 한 번 (R x J)
+        """
+        scores = np.empty((len(cv_offsets) - 1, corpus.num_jobs), dtype=np.float32)
+        block_rows = max(256, self.block_rows * 16 // cv_norm.shape[0]) if len(cv_offsets) > 2 else self.block_rows
+        for j_start, j_end in _job_blocks(corpus.offsets, block_rows):
+            start, end = corpus.offsets[j_start], corpus.offsets[j_end]
+            sims = corpus.similarity(cv_norm, start, end)
+            scores[:, j_start:j_end] = self._aggregate(sims, cv_offsets, corpus.offsets[j_start:j_end + 1] - start)
+        return scores
+
+    def _score_job(self, job_id: str, jd_vec_np: np.ndarray, cv_vec_np: np.ndarray) -> Dict[str, Any]:
         # 1. Compute Similarity Matrix
         sim_matrix = self._fast_cosine_matrix(cv_vec_np.astype(np.float32), jd_vec_np)
         
-        # 2. Compute Average Similarity
-        sim = self._calc_similarity_jit(sim_matrix)
+        # 2. Aggregate (mean / maxsim / topm / coverage)
+        sim = self._aggregate_job(sim_matrix)
         
         return {
             "job_id": job_id,
@@ -134,3 +368,125 @@ class DenseMatcher:
                     results.append(res)
                     
         return results
+
+    def compute_from_snapshot(self, cv_vecs_list: List[np.ndarray], snapshot, job_positions=None) -> List[Dict[str, Any]]:
+        """
+        로컬 VectorSnapshot(mmap)에서 바로 점수를 계산합니다.
+        Job별 청크 행렬은 스냅샷의 view이므로 벡터 복사/재조립이 없습니다.
+
+        Args:
+            cv_vecs_list: CV 청크 벡터 리스트
+            snapshot: get_similarity.index.VectorSnapshot
+            job_positions: 점수를 계산할 Job 위치 목록 (None이면 전체)
+        """
+        if not cv_vecs_list or snapshot is None or snapshot.num_jobs == 0:
+            return []
+
+        cv_vec_np = np.stack([np.array(v, dtype=np.float32) for v in cv_vecs_list])
+        if job_positions is None:
+            job_positions = range(snapshot.num_jobs)
+
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = [
+                executor.submit(self._score_job, snapshot.job_ids[j], snapshot.job_vectors(j), cv_vec_np)
+                for j in job_positions
+            ]
+            for f in concurrent.futures.as_completed(futures):
+                res = f.result()
+                if res:
+                    results.append(res)
+
+        return results
+
+    # --------------------------------------------------------------------------
+    # Fused Scoring (single GEMM + segmented reduction)
+    # --------------------------------------------------------------------------
+
+    def compute_fused(self, cv_vecs_list: List[np.ndarray], corpus: ChunkCorpus) -> np.ndarray:
+        """
+        CV x 전체 JD 청크 유사도를 BLAS GEMM으로 한 번에 계산하고, Job별 평균은 segment reduction으로 구합니다.
+        (mean 이외의 집계는 블록마다 집계 kernel 한 번)
+        Job별 Python 객체를 만들지 않으며, 반환값은 corpus.job_ids 순서의 점수 배열입니다.
+        """
+        if not cv_vecs_list or corpus.num_jobs == 0:
+            return np.empty(0, dtype=np.float32)
+
+        cv_norm = _l2_normalize(np.asarray(cv_vecs_list, dtype=np.float32))
+        if self.aggregation != "mean":
+            return self._aggregate_blocks(cv_norm, np.array([0, len(cv_norm)]), corpus)[0]
+
+        col_sums = np.empty(corpus.num_rows, dtype=np.float32)
+        for start in range(0, corpus.num_rows, self.block_rows):
+            end = start + self.block_rows
+            # (N x B) 유사도 블록 -> 청크별 CV 합
+            np.sum(corpus.similarity(cv_norm, start, end), axis=0, out=col_sums[start:end])
+
+        job_sums = np.add.reduceat(col_sums, corpus.offsets[:-1])
+        return job_sums / (corpus.counts * cv_norm.shape[0])
+
+    def compute_fused_batch(self, cv_groups: List[List[np.ndarray]], corpus: ChunkCorpus) -> np.ndarray:
+        """
+        여러 이력서의 CV 청크를 하나의 (Q_total x D) 행렬로 쌓아 JD 청크와 블록 단위 GEMM 한 번씩으로 계산합니다.
+        이력서별 합은 행 방향, Job별 합은 열 방향 segment reduction으로 구합니다.
+
+        Args:
+            cv_groups: 이력서별 CV 청크 벡터 리스트
+            corpus: JD 청크 corpus
+        Returns:
+            scores: (R x J) 점수 행렬, 행 = cv_groups 순서, 열 = corpus.job_ids 순서 (청크가 없는 이력서는 0)
+        """
+        scores = np.zeros((len(cv_groups), corpus.num_jobs), dtype=np.float32)
+        valid = [r for r, group in enumerate(cv_groups) if len(group)]
+        if not valid or corpus.num_jobs == 0:
+            return scores
+
+        counts = np.asarray([len(cv_groups[r]) for r in valid], dtype=np.int64)
+        cv_offsets = np.concatenate([[0], np.cumsum(counts)])
+        cv_norm = _l2_normalize(np.concatenate([np.asarray(cv_groups[r], dtype=np.float32) for r in valid]))
+        if self.aggregation != "mean":
+            scores[valid] = self._aggregate_blocks(cv_norm, cv_offsets, corpus)
+            return scores
+
+        # (Q x B) 유사도 블록 크기를 단일 이력서 compute_fused와 비슷한 수준으로 제한
+        block = max(256, self.block_rows * 16 // cv_norm.shape[0])
+        col_sums = np.empty((len(valid), corpus.num_rows), dtype=np.float32)
+        for start in range(0, corpus.num_rows, block):
+            end = start + block
+            col_sums[:, start:end] = np.add.reduceat(corpus.similarity(cv_norm, start, end), cv_offsets[:-1], axis=0)
+
+        job_sums = np.add.reduceat(col_sums, corpus.offsets[:-1], axis=1)
+        scores[valid] = job_sums / (corpus.counts[None, :] * counts[:, None])
+        return scores
+
+    def rank_batch(self, cv_groups: List[List[np.ndarray]], corpus: ChunkCorpus, top_k: int = 4) -> List[List[Dict[str, Any]]]:
+        """compute_fused_batch 점수에서 이력서별 상위 top_k Job을 rank()와 같은 형식으로 반환합니다."""
+        scores = self.compute_fused_batch(cv_groups, corpus)
+        if scores.size == 0:
+            return [[] for _ in cv_groups]
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_scores, axis=1, kind="stable"), axis=1)
+        return [
+            [
+                {"job_id": corpus.job_ids[j], "final_score": float(scores[r, j]), "similarity": float(scores[r, j])}
+                for j in top[r]
+            ] if len(cv_groups[r]) else []
+            for r in range(len(cv_groups))
+        ]
+
+    def rank(self, cv_vecs_list: List[np.ndarray], corpus: ChunkCorpus, top_k: int = 4) -> List[Dict[str, Any]]:
+        """
+        fused 점수에서 argpartition으로 상위 top_k Job만 골라 기존 결과 형식(dict 리스트)으로 반환합니다.
+        """
+        scores = self.compute_fused(cv_vecs_list, corpus)
+        if scores.size == 0:
+            return []
+        k = min(top_k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"job_id": corpus.job_ids[j], "final_score": float(scores[j]), "similarity": float(scores[j])}
+            for j in top
+        ]
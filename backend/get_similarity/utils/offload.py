@@ -0,0 +1,48 @@
+"""
+async 매칭 경로의 blocking 단계 offload
+
+retriever.invoke, embed_documents, pinecone_index.query, scoring 등 blocking 호출을
+event loop 밖의 제한된 thread pool에서 실행하고 단계별 timeout을 적용합니다.
+하나의 느린 요청이 event loop(/chat 등 다른 요청)를 막지 않고, 같은 worker의 /matching 요청들이 겹쳐서 실행됩니다.
+
+Note:
+    timeout이 나도 이미 실행 중인 thread는 중단할 수 없으므로, 호출 결과만 버리고 요청은 바로 실패시킵니다.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from configs import BLOCKING_WORKERS, STAGE_TIMEOUTS
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="matching")
+_STAGE_DEFAULT = object()
+
+
+class StageTimeoutError(TimeoutError):
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"'{stage}' 단계가 {timeout}초 안에 끝나지 않았습니다.")
+        self.stage = stage
+        self.timeout = timeout
+
+
+async def run_blocking(stage: str, func: Callable, *args, timeout: Any = _STAGE_DEFAULT, **kwargs) -> Any:
+    """
+    blocking 함수를 thread pool에서 실행하고 결과를 기다립니다.
+
+    Args:
+        stage: 단계 이름 (STAGE_TIMEOUTS key, 로그/에러 메시지용)
+        func: 실행할 blocking 함수
+        timeout: timeout(초), 지정하지 않으면 STAGE_TIMEOUTS[stage], None이면 제한 없음
+    Raises:
+        StageTimeoutError: timeout 초과
+    """
+    if timeout is _STAGE_DEFAULT:
+        timeout = STAGE_TIMEOUTS.get(stage)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        raise StageTimeoutError(stage, timeout) from None
@@ -0,0 +1,83 @@
+"""
+/matching 결과 캐시
+
+key = (이력서 내용 해시, 필터 tuple, JD 인덱스 버전 stamp)
+    - TTL이 지난 항목은 조회 시 삭제
+    - max_items를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+    - 인덱스 버전이 바뀌면 이전 버전의 항목은 더 이상 조회될 수 없으므로 전체를 비움
+같은 이력서로 다시 매칭하면 파싱/임베딩/scoring 없이 바로 결과를 반환합니다.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def _filter_key(search_filter: Optional[Dict[str, Any]]) -> Tuple:
+    items = []
+    for field, value in sorted((search_filter or {}).items()):
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        items.append((field, tuple(sorted(str(v).strip().lower() for v in values))))
+    return tuple(items)
+
+
+class ResultCache:
+    def __init__(self, max_items: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            max_items: 최대 결과 개수
+            ttl: 결과 유효 시간(초)
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, resume: str, search_filter: Optional[Dict[str, Any]], version: str) -> Tuple:
+        resume_hash = hashlib.sha256(resume.encode("utf-8")).hexdigest()
+        return resume_hash, _filter_key(search_filter), version
+
+    def _check_version(self, version: str):
+        # 인덱스 버전이 바뀌면 이전 결과는 모두 무효
+        if version != self.version:
+            if self._items:
+                print(f"JD 인덱스 버전 변경 ({self.version} → {version}): 결과 캐시 {len(self._items)}개 무효화")
+            self._items.clear()
+            self.version = version
+
+    def get(self, resume: str, search_filter: Optional[Dict[str, Any]], version: str) -> Optional[Any]:
+        key = self.key(resume, search_filter, version)
+        with self._lock:
+            self._check_version(version)
+            item = self._items.get(key)
+            if item is None or item[0] < time.time():
+                self._items.pop(key, None)
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, resume: str, search_filter: Optional[Dict[str, Any]], version: str, value: Any):
+        key = self.key(resume, search_filter, version)
+        with self._lock:
+            # 매칭 도중 인덱스가 바뀌었다면 이전 버전 결과는 저장하지 않음
+            if self.version is not None and version != self.version:
+                return
+            self.version = version
+            self._items[key] = (time.time() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"items": len(self._items), "version": self.version, "hits": self.hits, "misses": self.misses}
@@ -1,7 +1,41 @@
+"""
+이력서 / JD 계층적 문맥 보존 분리
+
+문서를 한 번만 토큰화(줄 단위 markdown 판별 + 노드 파싱, 평문은 경계 패턴 한 번의 finditer)하고,
+정규식은 모두 모듈 로드 시 미리 컴파일합니다.
+segment_with_offsets()는 청크와 함께 원문 문자 범위(start, end)를 반환합니다.
+    - markdown: 청크 본문(업무 / 메타데이터 줄)의 첫 줄 시작 ~ 마지막 줄 끝 (context prefix인 제목 줄은 제외)
+    - 평문: 청크에 포함된 첫 문장 시작 ~ 마지막 문장 끝
+출력 청크는 기존 구현(util/segmenter.py)과 동일합니다.
+"""
+
 import re
 from typing import List, Dict, Tuple, Any
 
 
+# markdown 판별: 줄에 아래 패턴 중 하나라도 있으면 markdown 줄
+#   제목(#), 목록(- * •), 굵게(**..**), 구분선(---)
+_MARKDOWN_LINE = re.compile(r'^#{1,6}\s+|^\s*[-*•]\s+|\*\*.+?\*\*|^---+$')
+_RULE_LINE = re.compile(r'^[-=*_]{3,}$')
+_PERIOD = re.compile(r'\d{4}\.\d{2}\s*[–-]\s*\d{4}\.\d{2}')
+_BULLET = re.compile(r'^[\-\*•]\s+')
+
+# _clean_markdown 치환 (순서대로 적용, 해당 문자가 있을 때만)
+_CLEAN_RULES = [
+    ('*', re.compile(r'\*\*(.+?)\*\*')),
+    ('_', re.compile(r'__(.+?)__')),
+    ('*', re.compile(r'\*(.+?)\*')),
+    ('_', re.compile(r'_(.+?)_')),
+    ('[', re.compile(r'\[(.+?)\]\(.+?\)')),
+    ('`', re.compile(r'`(.+?)`')),
+]
+
+# 평문 문장 경계: JD 구분자(| •), 빈 줄(문단), 문장부호 + 공백 (문장부호는 앞 문장에 포함)
+# 선두 lookahead로 경계 문자가 아닌 위치에서는 alternation을 시도하지 않음
+_PLAIN_BOUNDARY = re.compile(r'(?=[|•\n.!?])(?:[|•]\s*|\n\s*\n|([.!?])\s+)')
+_SENTENCE_END = re.compile(r'([.!?]\s+)')
+
+
 class HierarchicalSegmenter:
     """범용 계층적 문맥 보존 분리"""
 
@@ -14,120 +48,147 @@ class HierarchicalSegmenter:
         self.max_chunk_length = max_chunk_length
 
     def segment(self, text: str) -> List[str]:
+        return [chunk['text'] for chunk in self.segment_with_offsets(text)]
+
+    def segment_with_offsets(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Args:
+            text: 이력서 / JD 원문
+        Returns:
+            chunks: [{"text", "start", "end"}] (text[start:end] = 청크의 근거가 되는 원문 범위)
+        """
         if not text or len(text.strip()) < 10:
             return []
-        
-        has_markdown = self._has_markdown_structure(text)
-        
+
+        lines, has_markdown = self._tokenize_lines(text)
+
         if has_markdown:
-            return self._segment_markdown(text)
+            return self.create_contextualized_chunks(self._parse_lines(lines), with_offsets=True)
         else:
-            return self._segment_plaintext(text)
+            return self._plaintext_chunks(text)
+
+    def _tokenize_lines(self, text: str) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        줄 단위로 한 번 순회하면서 (줄 시작 위치, 줄) 목록과 markdown 구조 여부를 함께 계산합니다.
+        markdown 구조: markdown 줄 비율이 40% 초과이고 '##'로 시작하는 줄이 있음
+        """
+        lines = []
+        markdown_lines = 0
+        has_heading = False
+        pos = 0
+
+        for line in text.split('\n'):
+            lines.append((pos, line))
+            pos += len(line) + 1
+            # 패턴 선두 문자(# - * •)가 없는 줄은 정규식 검사 생략
+            if (line[:1] == '#' or '-' in line or '*' in line or '•' in line) and _MARKDOWN_LINE.search(line):
+                markdown_lines += 1
+            if not has_heading and line.startswith('##'):
+                has_heading = True
+
+        return lines, markdown_lines / max(len(lines), 1) > 0.4 and has_heading
 
     def _has_markdown_structure(self, text: str) -> bool:
-        patterns = [
-            r'^#{1,6}\s+',     
-            r'^\s*[-*•]\s+',   
-            r'\*\*.+?\*\*',    
-            r'^---+$',         
-        ]
-        
-        lines = text.split('\n')
-        markdown_lines = 0
-        
-        for line in lines:
-            for pattern in patterns:
-                if re.search(pattern, line, re.MULTILINE):
-                    markdown_lines += 1
-                    break
-        
-        return (
-            markdown_lines / max(len(lines), 1) > 0.4
-            and re.search(r'^#{2,}', text, re.MULTILINE)
-        )
+        return self._tokenize_lines(text)[1]
 
     def _segment_markdown(self, text: str) -> List[str]:
         nodes = self.parse_markdown_hierarchy(text)
         chunks = self.create_contextualized_chunks(nodes)
         return chunks
 
-    def _segment_plaintext(self, text: str) -> List[str]:
-        # JD 특화 전처리
-        text = re.sub(r'\|\s*', '\n\n', text)
-        text = re.sub(r'•\s*', '\n\n', text)
-        text = re.sub(r'\n{2,}', '\n\n', text)
-
-        paragraphs = re.split(r'\n\s*\n', text)
+    def _plaintext_sentences(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        평문을 문장 단위로 나눕니다. (JD 구분자 | • 와 빈 줄은 문단 경계, 문장부호 + 공백은 문장 경계)
+
+        Returns:
+            sentences: [(앞뒤 공백을 제거한 문장, start, end)]
+        """
+        sentences = []
+        start = 0
+        for match in _PLAIN_BOUNDARY.finditer(text):
+            # 문장부호는 앞 문장에 포함
+            end = match.end(1) if match.group(1) else match.start()
+            self._add_sentence(sentences, text[start:end], start)
+            start = match.end()
+        self._add_sentence(sentences, text[start:], start)
+        return sentences
+
+    @staticmethod
+    def _add_sentence(sentences, piece, start):
+        sent = piece.strip()
+        if sent:
+            start += len(piece) - len(piece.lstrip())
+            sentences.append((sent, start, start + len(sent)))
+
+    def _plaintext_chunks(self, text: str) -> List[Dict[str, Any]]:
         chunks = []
         current_chunk = ""
+        chunk_start = chunk_end = 0
 
-        for para in paragraphs:
-            sentences = re.split(r'([.!?]\s+)', para)
-            combined = [
-                sentences[i] + (sentences[i+1] if i+1 < len(sentences) else '')
-                for i in range(0, len(sentences), 2)
-            ]
-
-            for sent in combined:
-                sent = sent.strip()
-                if not sent:
-                    continue
-
-                tentative = f"{current_chunk} {sent}".strip() if current_chunk else sent
+        for sent, start, end in self._plaintext_sentences(text):
+            tentative = f"{current_chunk} {sent}" if current_chunk else sent
 
-                if len(tentative) <= self.max_chunk_length:
-                    current_chunk = tentative
-                else:
-                    if current_chunk:
-                        chunks.append(current_chunk)
-                    current_chunk = sent
+            if len(tentative) <= self.max_chunk_length:
+                if not current_chunk:
+                    chunk_start = start
+                current_chunk = tentative
+            else:
+                if current_chunk:
+                    chunks.append({'text': current_chunk, 'start': chunk_start, 'end': chunk_end})
+                current_chunk = sent
+                chunk_start = start
+            chunk_end = end
 
         if current_chunk:
-            chunks.append(current_chunk)
+            chunks.append({'text': current_chunk, 'start': chunk_start, 'end': chunk_end})
 
         return chunks
 
+    def _segment_plaintext(self, text: str) -> List[str]:
+        return [chunk['text'] for chunk in self._plaintext_chunks(text)]
+
 
     def _split_long_chunk(self, chunk: str) -> List[str]:
         if len(chunk) <= self.max_chunk_length:
             return [chunk]
-        
-        sentences = re.split(r'([.!?]\s+)', chunk)
-        
+
+        sentences = _SENTENCE_END.split(chunk)
+
         chunks = []
         current = ""
-        
+
         for i in range(0, len(sentences), 2):
             if i + 1 < len(sentences):
                 sent = sentences[i] + sentences[i+1]
             else:
                 sent = sentences[i]
-            
+
             if len(current) + len(sent) <= self.max_chunk_length:
                 current += sent
             else:
                 if current:
                     chunks.append(current.strip())
                 current = sent
-        
+
         if current:
             chunks.append(current.strip())
-        
+
         return chunks
-  
+
     def parse_markdown_hierarchy(self, text: str) -> List[Dict]:
+        return self._parse_lines(self._tokenize_lines(text)[0])
+
+    def _parse_lines(self, lines: List[Tuple[int, str]]) -> List[Dict]:
         nodes = []
         context_stack = [None] * 5
 
-        lines = text.split('\n')
-
-        for line in lines:
+        for pos, line in lines:
             line_stripped = line.strip()
 
             if not line_stripped:
                 continue
 
-            if re.match(r'^[-=*_]{3,}$', line_stripped):
+            if _RULE_LINE.match(line_stripped):
                 continue
 
             level, node_type, content = self._parse_line(line_stripped)
@@ -139,11 +200,14 @@ class HierarchicalSegmenter:
 
             current_context = [c for c in context_stack[:level] if c]
 
+            start = pos + len(line) - len(line.lstrip())
             nodes.append({
                 'level': level,
                 'type': node_type,
                 'content': content,
-                'context': current_context.copy() if current_context else []
+                'context': current_context,
+                'start': start,
+                'end': start + len(line_stripped),
             })
 
         return nodes
@@ -163,7 +227,7 @@ class HierarchicalSegmenter:
             content = self._clean_markdown(content)
             return (3, 'subsection', content)
 
-        if re.match(r'\d{4}\.\d{2}\s*[–-]\s*\d{4}\.\d{2}', line):
+        if _PERIOD.match(line):
             return (3, 'period', line)
 
         if line.startswith('**') and ':**' in line:
@@ -173,7 +237,7 @@ class HierarchicalSegmenter:
             return (3, f'meta_{key}', value)
 
         if line.startswith(('-', '*', '•')):
-            content = re.sub(r'^[\-\*•]\s+', '', line)
+            content = _BULLET.sub('', line, count=1)
             content = self._clean_markdown(content)
             return (4, 'task', content)
 
@@ -181,22 +245,29 @@ class HierarchicalSegmenter:
         return (4, 'text', content)
 
     def _clean_markdown(self, text: str) -> str:
-        text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-        text = re.sub(r'__(.+?)__', r'\1', text)
-        text = re.sub(r'\*(.+?)\*', r'\1', text)
-        text = re.sub(r'_(.+?)_', r'\1', text)
-        text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
-        text = re.sub(r'`(.+?)`', r'\1', text)
+        # 치환 결과는 문자를 추가하지 않으므로, 해당 문자가 없는 패턴은 건너뛰어도 결과가 같음
+        for char, pattern in _CLEAN_RULES:
+            if char in text:
+                text = pattern.sub(r'\1', text)
         return text.strip()
 
-    def create_contextualized_chunks(self, nodes: List[Dict]) -> List[str]:
+    def create_contextualized_chunks(self, nodes: List[Dict], with_offsets: bool = False) -> List[Any]:
+        """
+        Args:
+            nodes: parse_markdown_hierarchy() 결과
+            with_offsets: True면 [{"text", "start", "end"}], False면 청크 문자열 리스트
+        """
         chunks = []
         groups = self._group_by_context(nodes)
 
+        def add(text, spans):
+            chunks.append({'text': text, 'start': spans[0][0], 'end': spans[-1][1]})
+
         for group in groups:
             context_prefix = group['context']
             tasks = group['tasks']
             metadata = group['metadata']
+            spans = group['spans']
 
             if '기간' in metadata and metadata['기간']:
                 context_prefix += f" ({metadata['기간']})"
@@ -204,38 +275,41 @@ class HierarchicalSegmenter:
             if '개요' in metadata and metadata['개요']:
                 overview_chunk = f"{context_prefix} - 개요: {metadata['개요']}"
                 if len(overview_chunk) >= self.min_chunk_length:
-                    chunks.append(overview_chunk)
+                    add(overview_chunk, [spans['개요']])
 
             if '기술' in metadata and metadata['기술']:
                 tech_chunk = f"{context_prefix} - 기술: {metadata['기술']}"
                 if len(tech_chunk) >= self.min_chunk_length:
-                    chunks.append(tech_chunk)
+                    add(tech_chunk, [spans['기술']])
 
             if '성과' in metadata and metadata['성과']:
                 achievement_chunk = f"{context_prefix} - 성과: {metadata['성과']}"
                 if len(achievement_chunk) >= self.min_chunk_length:
-                    chunks.append(achievement_chunk)
+                    add(achievement_chunk, [spans['성과']])
 
             if not tasks:
                 continue
 
+            task_spans = group['task_spans']
             if len(tasks) == 1:
                 chunk = f"{context_prefix}: {tasks[0]}"
                 if len(chunk) >= self.min_chunk_length:
-                    chunks.append(chunk)
+                    add(chunk, task_spans)
             else:
                 current_chunk_tasks = []
+                first = 0
                 current_length = len(context_prefix) + 2
 
-                for task in tasks:
+                for i, task in enumerate(tasks):
                     task_length = len(task) + 2
                     tentative_length = current_length + task_length
 
                     if tentative_length > self.max_chunk_length and current_chunk_tasks:
                         chunk_text = f"{context_prefix}: {'; '.join(current_chunk_tasks)}"
-                        chunks.append(chunk_text)
+                        add(chunk_text, task_spans[first:i])
 
                         current_chunk_tasks = [task]
+                        first = i
                         current_length = len(context_prefix) + 2 + len(task)
                     else:
                         current_chunk_tasks.append(task)
@@ -244,10 +318,12 @@ class HierarchicalSegmenter:
                 if current_chunk_tasks:
                     chunk_text = f"{context_prefix}: {'; '.join(current_chunk_tasks)}"
                     if len(chunk_text) >= self.min_chunk_length:
-                        chunks.append(chunk_text)
+                        add(chunk_text, task_spans[first:])
+
+        if with_offsets:
+            return chunks
+        return [chunk['text'] for chunk in chunks]
 
-        return chunks
-    
     def _group_by_context(self, nodes: List[Dict]) -> List[Dict]:
         groups = []
         current_group = None
@@ -255,15 +331,18 @@ class HierarchicalSegmenter:
         for node in nodes:
             node_type = node['type']
             content = node['content']
+            span = (node.get('start', 0), node.get('end', 0))
 
-            if node_type in ['company_or_project', 'section']:
+            if node_type in ('company_or_project', 'section'):
                 if current_group and (current_group['tasks'] or current_group['metadata']):
                     groups.append(current_group)
 
                 current_group = {
                     'context': content,   # 예: "주요업무", "자격요건"
                     'tasks': [],
-                    'metadata': {}
+                    'metadata': {},
+                    'task_spans': [],
+                    'spans': {},
                 }
 
             elif node_type == 'period' and current_group:
@@ -272,61 +351,14 @@ class HierarchicalSegmenter:
             elif node_type.startswith('meta_') and current_group:
                 meta_key = node_type.replace('meta_', '')
                 current_group['metadata'][meta_key] = content
+                current_group['spans'][meta_key] = span
 
-            elif node_type in ['task', 'text', 'subsection'] and current_group:
+            elif node_type in ('task', 'text', 'subsection') and current_group:
                 if len(content) >= 5:
                     current_group['tasks'].append(content)
+                    current_group['task_spans'].append(span)
 
         if current_group and (current_group['tasks'] or current_group['metadata']):
             groups.append(current_group)
 
-        return groups
-
-
-
-if __name__ == '__main__':
-    import sys
-    
-    segmenter = HierarchicalSegmenter(
-        min_chunk_length=100,
-        max_chunk_length=300
-    )
-    
-    # 테스트 1: 마크다운 CV
-    print("="*80)
-    print("테스트 1: 마크다운 CV")
-    print("="*80)
-    try:
-        with open('sample_cv.md', 'r', encoding='utf-8') as f:
-            cv_text = f.read()
-        
-        chunks = segmenter.segment(cv_text)
-        print(f" CV 청크 수: {len(chunks)}")
-        print(f"\n첫 번째 청크:\n{chunks[0][:150]}...")
-    except FileNotFoundError:
-        print("⚠️ sample_cv.md 파일 없음")
-    
-    # 테스트 2: 평문 텍스트
-    print("\n" + "="*80)
-    print("테스트 2: 평문 JD 텍스트")
-    print("="*80)
-    
-    jd_text = """
-Backend Engineer
-우리 회사는 핀테크 솔루션을 제공하는 스타트업입니다.
-현재 백엔드 개발자를 찾고 있습니다.
-
-주요 업무:
-API 개발 및 유지보수를 담당합니다. 데이터베이스 설계 및 최적화가 필요합니다.
-서버 아키텍처를 구축하고 관리합니다.
-
-자격 요건:
-Python 또는 Java 3년 이상 경험이 필요합니다.
-RESTful API 설계 경험이 있어야 합니다.
-AWS 또는 GCP 사용 경험을 우대합니다.
-"""
-    
-    chunks = segmenter.segment(jd_text)
-    print(f" JD 청크 수: {len(chunks)}")
-    for i, chunk in enumerate(chunks, 1):
-        print(f"\n청크 {i}:\n{chunk}")
\ No newline at end of file
+        return groups
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+/matching 검색 단계별 latency / 후보 recall 계측
+
+최근 window개 측정값만 보관하고 stats()에서 count, 평균, p50, p95를 계산합니다.
+    - latency: embed, candidates(1단계 후보 생성), rerank(후보 청크 재정렬), rescore(압축 벡터 사용 시 float32 재계산), fusion, total
+    - candidate_jobs: 재정렬한 후보 Job 수
+    - candidate_recall: two_stage 결과 상위 Job 중 full_scan 상위 Job과 겹치는 비율 (샘플링된 요청만)
+가장 싼 설정(SEARCH_MODE, CANDIDATE_TOP_K, ANN nprobe)을 고를 때 품질 손실을 같이 확인하기 위한 용도입니다.
+ndcg_at_k는 정답 순위가 있는 오프라인 벤치마크(dev/bench_retrieval.py)에서 사용합니다.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+def recall_at_k(candidate_ids: Iterable, reference_ids: Iterable) -> float:
+    """reference(full_scan) 상위 Job 중 candidate(two_stage) 결과에 포함된 비율"""
+    reference = set(reference_ids)
+    if not reference:
+        return 1.0
+    return len(reference & set(candidate_ids)) / len(reference)
+
+
+def ndcg_at_k(ranked_ids: Iterable, grades: Dict[str, float], k: int) -> float:
+    """
+    정답 relevance(grades, 없는 ID는 0) 기준 상위 k개 순위의 nDCG (gain = 2^grade - 1)
+    """
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    gains = np.array([2.0 ** grades.get(job_id, 0) - 1 for job_id in list(ranked_ids)[:k]])
+    ideal = np.sort(2.0 ** np.asarray(list(grades.values()), dtype=np.float64) - 1)[::-1][:k]
+    if not ideal.size or ideal[0] <= 0:
+        return 1.0
+    return float((gains * discounts[:gains.size]).sum() / (ideal * discounts[:ideal.size]).sum())
+
+
+class StageMetrics:
+    def __init__(self, window: int = 1024):
+        """
+        Args:
+            window: 항목별로 보관할 최근 측정값 수
+        """
+        self.window = window
+        self._values: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float):
+        with self._lock:
+            self._values[name].append(value)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """with 블록 실행 시간(ms)을 stage 이름으로 기록 (await 포함)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            {항목: {"count", "mean", "p50", "p95"}} (latency 항목의 단위는 ms)
+        """
+        with self._lock:
+            snapshot = {name: np.asarray(values, dtype=np.float64) for name, values in self._values.items() if values}
+        return {
+            name: {
+                "count": int(values.size),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+            }
+            for name, values in snapshot.items()
+        }
+
+
+# /matching 검색 경로 전체에서 공유
+search_metrics = StageMetrics()
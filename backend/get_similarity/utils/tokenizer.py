@@ -0,0 +1,56 @@
+import re
+import string
+from typing import List
+
+_HANGUL = re.compile(r"[가-힣]")
+# 명사 뒤에 붙는 대표적인 조사/어미 (긴 것부터 매칭)
+_JOSA = sorted(
+    [
+        "으로서", "으로써", "에서는", "이라는", "에게서",
+        "으로", "에서", "에게", "까지", "부터", "처럼", "보다", "이며", "이고", "이나", "라는", "하고", "와의", "과의", "에는", "으로는",
+        "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "만", "로",
+    ],
+    key=len,
+    reverse=True,
+)
+
+
+def clean_tokens(text: str) -> List[str]:
+    """공백 기준 토큰화 후 특수문자 제거·소문자 변환"""
+    tokens = text.split()                       # ① 공백 기준 분리
+    cleaned = []
+    for tok in tokens:
+        # ② 토큰 앞뒤 특수문자 제거  ( ###Job**  →  Job )
+        tok = tok.strip(string.punctuation)
+        # ③ 소문자 변환
+        tok = tok.lower()
+        # ④ 빈 토큰·순수 특수문자 토큰은 건너뛰기
+        if tok and not all(ch in string.punctuation for ch in tok):
+            cleaned.append(tok)
+    return cleaned
+
+
+def strip_josa(token: str) -> str:
+    """한글 토큰 끝의 조사를 제거합니다. (데이터베이스를 → 데이터베이스)"""
+    if not _HANGUL.search(token[-1:]):
+        return token
+    for josa in _JOSA:
+        if token.endswith(josa) and len(token) - len(josa) >= 2:
+            return token[: -len(josa)]
+    return token
+
+
+def korean_tokens(text: str) -> List[str]:
+    """
+    clean_tokens에 한국어 처리를 더한 BM25용 토크나이저
+        1. 한글 토큰의 조사 제거 (경험을 → 경험)
+        2. 3글자 이상 한글 토큰은 음절 bigram 추가 (백엔드개발자 → 백엔, 엔드, 드개, 개발, 발자)
+           형태소 분석기 없이 복합명사/띄어쓰기 차이를 부분 매칭하기 위함
+    """
+    tokens = []
+    for tok in clean_tokens(text):
+        tok = strip_josa(tok)
+        tokens.append(tok)
+        if len(tok) >= 3 and _HANGUL.search(tok):
+            tokens.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+    return tokens
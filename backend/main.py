@@ -1,14 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Request, Form
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import shutil
 import uuid
 import os
 import traceback
+from contextlib import asynccontextmanager
 
-from util.parser import run_parser
-from get_similarity.main import matching
+from util.parser import arun_parser
+from get_similarity.utils.offload import StageTimeoutError
+import asyncio
+from get_similarity.main import matching, matching_batch
+from get_similarity.registry import registry
 from openai import OpenAI
 import uvicorn
 import logging
@@ -40,10 +44,19 @@ location_cache = ""
 remote_cache = ""
 job_type_cache = ""
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 임베딩 모델, Vector DB 클라이언트를 서버 시작 시 한 번만 생성 (/matching 요청마다 재사용)
+    await registry.start()
+    yield
+    await registry.stop()
+
+
 app = FastAPI(
     title="JobPT",
     description="JobPT Backend Service",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # # Middleware to strip /api prefix for local development
@@ -100,6 +113,16 @@ class MatchRequest(BaseModel):
     resume_path: str
 
 
+# /matching/batch - 여러 이력서 일괄 매칭
+class BatchMatchRequest(BaseModel):
+    resume_paths: list[str]
+    location: str = ""
+    remote: str = "any"
+    job_type: str = "any"
+    # /matching과 같은 범위: 기본 4개, 최대 LEXICAL_TOP_K개 (단일 매칭이 재정렬하는 최대 Job 수)
+    top_k: int = Field(4, ge=1, le=LEXICAL_TOP_K)
+
+
 @api_router.post("/upload")
 async def upload_resume(
     file: UploadFile = File(...), location: str = Form(""), remote: str = Form("any"), job_type: str = Form("any")
@@ -162,11 +185,19 @@ async def run(data: MatchRequest):
 
     # PDF를 JPG로 변환 후 저장
     # PDF를 직접 파싱 (JPG 변환 없이)
-    resume = run_parser(resume_path)
-    resume_content_text = resume[0]  # 첫 번째 반환값이 텍스트
-
-    # 캐시 저장
-    resume_cache[resume_path] = resume_content_text
+    # 업로드 경로는 uuid로 매번 새로 만들어지므로, 이미 파싱한 이력서는 캐시된 텍스트 재사용
+    resume_content_text = resume_cache.get(resume_path)
+    if resume_content_text is None:
+        # 파싱 API 호출은 aiohttp로 기다리므로 다른 요청(/chat 등)을 막지 않음
+        try:
+            resume = await arun_parser(resume_path)
+        except asyncio.TimeoutError:
+            logger.error(f"[{trace_id}] resume parse timeout resume_path={resume_path}")
+            raise HTTPException(status_code=504, detail="Resume parsing timed out.")
+        resume_content_text = resume[0]  # 첫 번째 반환값이 텍스트
+
+        # 캐시 저장
+        resume_cache[resume_path] = resume_content_text
     logger.info(f"[{trace_id}] parsed_pages={len(resume_content_text)} total_chars={len(resume_content_text)}")
 
     # 채용공고 추천
@@ -174,9 +205,13 @@ async def run(data: MatchRequest):
     #     resume_content_text, location=location_cache, remote=remote_cache, jobtype=job_type_cache
     # )
 
-    jd_summaries, jd_urls, c_names = await matching(
-        resume_content_text, location=location_cache, remote=remote_cache, jobtype=job_type_cache
-    )
+    try:
+        jd_summaries, jd_urls, c_names = await matching(
+            resume_content_text, location=location_cache, remote=remote_cache, jobtype=job_type_cache
+        )
+    except StageTimeoutError as e:
+        logger.error(f"[{trace_id}] matching timeout stage={e.stage}: {e}")
+        raise HTTPException(status_code=504, detail=f"Matching timed out at stage '{e.stage}'.")
 
     logger.info(f">>>>"*30)
     logger.info(f"[{trace_id}] jd_summaries={jd_summaries}")
@@ -254,6 +289,61 @@ async def run(data: MatchRequest):
     }
 
 
+@api_router.post("/matching/batch")
+async def run_batch(data: BatchMatchRequest):
+    """
+    여러 이력서를 한 번에 JD corpus와 매칭하는 함수 (새 JD 적재 후 일괄 재정렬용)
+    파일이 없거나 파싱에 실패한 이력서는 error 항목으로 반환하고 나머지는 계속 처리합니다.
+    """
+    trace_id = str(uuid.uuid4())
+    logger.info(f"[{trace_id}] /matching/batch start resumes={len(data.resume_paths)}")
+    if not data.resume_paths:
+        raise HTTPException(status_code=400, detail="resume_paths is required.")
+
+    results = [{"resume_path": path} for path in data.resume_paths]
+    semaphore = asyncio.Semaphore(PARSER_CONCURRENCY)
+
+    async def parse(i, path):
+        if not os.path.exists(path):
+            results[i]["error"] = "resume_path file not found."
+            return None
+        if resume_cache.get(path) is not None:
+            return resume_cache[path]
+        try:
+            async with semaphore:
+                resume_content_text = (await arun_parser(path))[0]
+        except Exception as e:
+            logger.error(f"[{trace_id}] parse failed resume_path={path}: {e}")
+            results[i]["error"] = f"Failed to parse resume: {str(e)}"
+            return None
+        resume_cache[path] = resume_content_text
+        return resume_content_text
+
+    # 이력서 파싱은 PARSER_CONCURRENCY개씩 동시에 수행
+    texts = await asyncio.gather(*(parse(i, path) for i, path in enumerate(data.resume_paths)))
+    parsed = [i for i, text in enumerate(texts) if text is not None]
+    resumes = [texts[i] for i in parsed]
+
+    try:
+        matches = await matching_batch(
+            resumes, location=data.location, remote=data.remote, jobtype=data.job_type, top_k=data.top_k
+        ) if resumes else []
+    except StageTimeoutError as e:
+        logger.error(f"[{trace_id}] batch matching timeout stage={e.stage}: {e}")
+        raise HTTPException(status_code=504, detail=f"Matching timed out at stage '{e.stage}'.")
+
+    for i, (jd_summaries, jd_urls, c_names) in zip(parsed, matches):
+        recommendations = [
+            {"JD": summary, "job_url": url, "company": name}
+            for summary, url, name in zip(jd_summaries, jd_urls, c_names)
+        ]
+        results[i]["recommendations"] = recommendations
+        results[i]["primary"] = recommendations[0] if recommendations else {}
+
+    logger.info(f"[{trace_id}] /matching/batch success matched={len(parsed)}/{len(data.resume_paths)}")
+    return {"results": results, "trace_id": trace_id}
+
+
 # /chat - 캐시된 이력서/분석 결과 기반 OpenAI 응답
 langfuse_handler = CallbackHandler()
 
@@ -274,7 +364,7 @@ async def chat(request: Request):
 
     # 이력서 캐시 확인
     if resume_path not in resume_cache or resume_cache[resume_path] is None:
-        resume = run_parser(resume_path)
+        resume = await arun_parser(resume_path)
         resume_content_text = resume[0]
         resume_cache[resume_path] = resume_content_text
     else:
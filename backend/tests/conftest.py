@@ -8,6 +8,7 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime
+from types import SimpleNamespace
 import csv
 
 # 프로젝트 루트를 Python path에 추가
@@ -19,6 +20,72 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 _test_results = []
 
 
+class FakePineconeIndex:
+    """
+    Pinecone raw Index의 list / fetch / upsert / delete / describe_index_stats만 흉내내는 in-memory index
+    (카탈로그, 증분 재적재, 마감 공고 삭제, 스냅샷, registry 테스트 공용)
+    """
+
+    def __init__(self, page_size=3, dim=None, fail_upsert=False):
+        """
+        Args:
+            page_size: list() 한 page의 ID 수 (None이면 전체를 한 page로)
+            dim: describe_index_stats의 dimension (None이면 호출 시 실패: 동기화 상태를 원격 벡터 수로 판단하면 안 되는 테스트용)
+            fail_upsert: upsert가 항상 ConnectionError를 발생
+        """
+        self.vectors = {}
+        self.page_size = page_size
+        self.dim = dim
+        self.fail_upsert = fail_upsert
+        self.upserted = []        # upsert된 ID (호출 순서)
+        self.delete_calls = []    # delete 호출마다 ID 수
+        self.list_calls = 0
+        self.fetch_calls = 0
+        self.stats_calls = 0
+
+    def list(self, namespace=""):
+        self.list_calls += 1
+        ids = sorted(self.vectors)
+        page_size = self.page_size or max(len(ids), 1)
+        for start in range(0, len(ids), page_size):
+            yield ids[start:start + page_size]
+
+    def fetch(self, ids, namespace=""):
+        self.fetch_calls += 1
+        return SimpleNamespace(vectors={
+            vid: SimpleNamespace(values=self.vectors[vid].get("values"), metadata=self.vectors[vid]["metadata"])
+            for vid in ids if vid in self.vectors
+        })
+
+    def upsert(self, vectors, namespace=""):
+        if self.fail_upsert:
+            raise ConnectionError("upsert failed")
+        for v in vectors:
+            self.vectors[v["id"]] = v
+            self.upserted.append(v["id"])
+
+    def delete(self, ids=None, delete_all=False, filter=None, namespace=""):
+        self.delete_calls.append(len(ids or []))
+        if delete_all:
+            self.vectors.clear()
+        if filter:
+            self.vectors = {vid: v for vid, v in self.vectors.items() if any(v["metadata"].get(k) != val for k, val in filter.items())}
+        for vid in ids or []:
+            self.vectors.pop(vid, None)
+
+    def describe_index_stats(self):
+        self.stats_calls += 1
+        if self.dim is None:
+            raise AssertionError("describe_index_stats가 호출됨 (동기화 상태는 로컬에서만 판단해야 함)")
+        return {"dimension": self.dim, "total_vector_count": len(self.vectors)}
+
+
+@pytest.fixture
+def fake_index():
+    """FakePineconeIndex 클래스 (테스트마다 fake_index(page_size=..., dim=...)로 생성)"""
+    return FakePineconeIndex
+
+
 def pytest_configure(config):
     """pytest 실행 전 설정"""
     config.addinivalue_line(
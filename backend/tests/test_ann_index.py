@@ -0,0 +1,82 @@
+"""
+IVF-Flat ANN 인덱스 테스트
+
+실행 방법:
+pytest backend/tests/test_ann_index.py -v
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from get_similarity.index import IVFFlatIndex, SnapshotWriter, build_snapshot_ann, get_snapshot_ann, load_snapshot
+
+
+DIM = 16
+
+
+def _data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), [f"v{i}" for i in range(n)]
+
+
+def _exact(vectors, ids, query, k):
+    sims = vectors @ (query / np.linalg.norm(query))
+    return [ids[i] for i in np.argsort(-sims)[:k]]
+
+
+def test_full_probe_equals_brute_force():
+    vectors, ids = _data()
+    index = IVFFlatIndex(dim=DIM, nlist=10).build(vectors, ids)
+    query = np.random.default_rng(1).standard_normal(DIM)
+
+    scores, found = index.search(query, k=5, nprobe=10)
+    assert found[0] == _exact(vectors, ids, query, 5)
+    assert np.all(np.diff(scores[0]) <= 0)
+
+
+def test_add_and_delete():
+    vectors, ids = _data()
+    index = IVFFlatIndex(dim=DIM, nlist=8).build(vectors[:200], ids[:200])
+    index.add(vectors[200:], ids[200:])
+    assert len(index) == 300
+
+    target = vectors[250]
+    assert index.search(target, k=1, nprobe=8)[1][0] == ["v250"]
+
+    assert index.delete(["v250", "missing"]) == 1
+    assert len(index) == 299
+    assert "v250" not in index.search(target, k=10, nprobe=8)[1][0]
+
+
+def test_save_load_roundtrip(tmp_path):
+    vectors, ids = _data()
+    index = IVFFlatIndex(dim=DIM, nlist=8).build(vectors, ids)
+    index.delete(["v0"])
+    index.save(str(tmp_path))
+
+    # 벡터는 저장하지 않고, 인덱스를 만든 행렬을 넘겨서 로드
+    assert not (tmp_path / "vectors.npy").exists()
+    loaded = IVFFlatIndex.load(str(tmp_path), vectors, ids)
+    query = np.random.default_rng(2).standard_normal((3, DIM))
+    assert len(loaded) == 299
+    assert loaded.search(query, k=7, nprobe=8)[1] == index.search(query, k=7, nprobe=8)[1]
+
+
+def test_snapshot_ann_maps_hits_to_jobs(tmp_path):
+    rng = np.random.default_rng(3)
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    for j in range(6):
+        writer.add_job(f"job{j}", rng.standard_normal((4, DIM)))
+    writer.commit()
+    snapshot = load_snapshot(str(tmp_path))
+    assert get_snapshot_ann(snapshot) is None
+
+    build_snapshot_ann(snapshot, nlist=4)
+    ann = get_snapshot_ann(snapshot)
+    # 행 벡터는 스냅샷 mmap을 그대로 참조 (ANN 디렉토리에 벡터 사본 없음)
+    assert ann.vectors is snapshot.vectors
+    assert sorted(p.name for p in (Path(snapshot.path) / "ann").iterdir()) == ["centroids.npy", "ivf.json", "lists.npy", "order.npy"]
+    _, hits = ann.search(snapshot.job_vectors(2), k=1, nprobe=4)
+    assert snapshot.jobs_for_chunks([h for row in hits for h in row]).tolist() == [2]
@@ -0,0 +1,64 @@
+"""
+오프라인 검색 벤치마크(합성 코퍼스, HashingEmbedder, recall / nDCG) 테스트
+
+실행 방법:
+pytest backend/tests/test_bench_retrieval.py -v
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from get_similarity.dev.bench_retrieval import STAGES, compare, quality, run
+from get_similarity.dev.synthetic import HashingEmbedder, make_corpus
+from get_similarity.utils.stage_metrics import ndcg_at_k
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dim=64)
+    a, b = embedder.embed_documents(["PyTorch와 CUDA 경험", ""])
+    np.testing.assert_array_equal(a, HashingEmbedder(dim=64).embed_query("PyTorch와 CUDA 경험"))
+    assert np.linalg.norm(a) == pytest.approx(1.0) and np.linalg.norm(b) == pytest.approx(1.0)
+    # 조사가 붙어도 같은 기술 토큰으로 취급
+    assert float(embedder.embed_query("pytorch") @ embedder.embed_query("PyTorch를")) > 0.5
+
+
+def test_synthetic_corpus_is_reproducible():
+    first, second = make_corpus(30, 3, seed=7), make_corpus(30, 3, seed=7)
+    assert [job["text"] for job in first["jobs"]] == [job["text"] for job in second["jobs"]]
+    resume = first["resumes"][0]
+    assert resume["grades"] == second["resumes"][0]["grades"]
+    for job in first["jobs"]:
+        expected = 2 + (job["secondary"] == resume["secondary"]) if job["primary"] == resume["primary"] else None
+        if expected is not None:
+            assert resume["grades"][job["job_id"]] == expected
+
+
+def test_ndcg_and_recall():
+    grades = {"a": 3, "b": 2, "c": 1}
+    assert ndcg_at_k(["a", "b", "c"], grades, 3) == pytest.approx(1.0)
+    assert ndcg_at_k(["x", "y"], grades, 2) == 0.0
+    assert 0 < ndcg_at_k(["c", "b", "a"], grades, 3) < 1
+    assert ndcg_at_k(["x"], {}, 5) == 1.0
+    # relevance 2 이상 Job(a, b) 중 상위 2개에 든 비율
+    assert quality(["a", "c"], grades, 2) == (0.5, pytest.approx(ndcg_at_k(["a", "c"], grades, 2)))
+
+
+def test_run_reports_stage_latency_and_quality():
+    report = run(num_jobs=200, num_resumes=4, dim=256, top_k=5, expands=[50], nprobes=[4], ann_top_k=20)
+    json.dumps(report)
+
+    rows = {row["method"]: row for row in report["results"]}
+    assert set(rows) == {"full_scan", "centroid@50", "ann@4"}
+    assert rows["full_scan"]["candidate_recall"] == 1.0 and rows["full_scan"]["candidate_jobs"] == 200
+    for row in rows.values():
+        assert set(STAGES) <= set(row["latency_ms"])
+        assert 0 <= row["recall@5"] <= 1 and 0 <= row["ndcg@5"] <= 1
+    # 합성 정답과 무관한 랜덤 순위보다 확실히 좋아야 함
+    assert rows["full_scan"]["ndcg@5"] > 0.3
+
+    worse = json.loads(json.dumps(report))
+    worse["results"][0]["ndcg@5"] += 0.5
+    assert compare(report, worse, max_ndcg_drop=0.01) == ["full_scan"]
+    assert compare(report, report, max_ndcg_drop=0.01) == []
@@ -0,0 +1,89 @@
+"""
+BM25Index / 한국어 토크나이저 테스트
+
+실행 방법:
+pytest backend/tests/test_bm25.py -v
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from get_similarity.index.bm25 import BM25Index, get_bm25_index
+from get_similarity.utils.tokenizer import clean_tokens, korean_tokens
+
+
+DOCS = {
+    "wd_1__c0000": "Python 백엔드 개발자를 모집합니다. FastAPI 경험이 있으면 좋습니다.",
+    "wd_1__c0001": "PostgreSQL 데이터베이스를 설계하고 운영합니다.",
+    "wd_2__c0000": "React 프론트엔드 개발자, TypeScript 필수",
+    "wd_3__c0000": "데이터 엔지니어: Spark, Airflow 파이프라인 구축 경험",
+    "wd_4__c0000": "Marketing manager for our Berlin office.",
+}
+
+
+def _naive_bm25(texts, query, k1=1.5, b=0.75):
+    """posting list 없이 정의대로 계산한 BM25 (비교용)"""
+    docs = [Counter(korean_tokens(t)) for t in texts]
+    lengths = np.array([sum(d.values()) for d in docs], dtype=np.float64)
+    avgdl = lengths.mean()
+    scores = np.zeros(len(docs))
+    for term in korean_tokens(query):
+        df = sum(term in d for d in docs)
+        if df == 0:
+            continue
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        for i, d in enumerate(docs):
+            tf = d.get(term, 0)
+            scores[i] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[i] / avgdl))
+    return scores
+
+
+def test_korean_tokens_strip_josa_and_add_bigrams():
+    assert clean_tokens("###Job** 공고!") == ["job", "공고"]
+    tokens = korean_tokens("데이터베이스를 백엔드개발자")
+    assert "데이터베이스" in tokens and "데이터베이스를" not in tokens
+    assert {"백엔", "개발", "발자"} <= set(tokens)
+
+
+def test_scores_match_naive_bm25():
+    index = BM25Index().build(DOCS.values(), DOCS.keys())
+    query = "백엔드 개발 경험, 데이터베이스 설계 (Python)"
+    np.testing.assert_allclose(index.score(query), _naive_bm25(list(DOCS.values()), query), rtol=1e-5)
+
+
+def test_search_jobs_groups_chunks_by_job():
+    index = BM25Index().build(DOCS.values(), DOCS.keys())
+    hits = index.search_jobs("Python 데이터베이스 설계", k=3)
+    assert hits[0][0] == "wd_1"
+    assert len({job_id for job_id, _ in hits}) == len(hits)
+    assert index.search("존재하지않는단어qq", k=3) == []
+
+
+def test_save_load_mmap(tmp_path):
+    index = BM25Index().build(DOCS.values(), DOCS.keys())
+    index.save(str(tmp_path))
+
+    loaded = get_bm25_index(str(tmp_path))
+    assert isinstance(loaded.postings, np.memmap)
+    assert get_bm25_index(str(tmp_path)) is loaded
+    assert loaded.search("React TypeScript", k=2) == index.search("React TypeScript", k=2)
+    assert get_bm25_index(str(tmp_path / "missing")) is None
+
+
+def test_rebuild_while_loaded_keeps_old_mmap_and_switches_current(tmp_path):
+    root = str(tmp_path)
+    BM25Index().build(DOCS.values(), DOCS.keys()).save(root)
+    loaded = get_bm25_index(root)
+    before = loaded.search("React TypeScript", k=2)
+
+    # 로드된 상태에서 재빌드 → 기존 파일을 덮어쓰지 않으므로 이전 mmap은 그대로 읽힘
+    docs = dict(DOCS, **{"wd_5__c0000": "React Native 모바일 개발자"})
+    for _ in range(3):
+        BM25Index().build(docs.values(), docs.keys()).save(root)
+    assert loaded.search("React TypeScript", k=2) == before and len(loaded) == len(DOCS)
+
+    reloaded = get_bm25_index(root)
+    assert reloaded is not loaded and len(reloaded) == len(docs)
+    # CURRENT 포함 최근 2개 버전만 남음
+    assert len([d for d in tmp_path.iterdir() if d.is_dir()]) == 2
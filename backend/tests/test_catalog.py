@@ -0,0 +1,148 @@
+"""
+벡터 인덱스 메타데이터 카탈로그(SQLite) 테스트 (in-memory fake index 사용)
+
+실행 방법:
+pytest backend/tests/test_catalog.py -v
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from get_similarity.index import CatalogedIndex, MetadataCatalog
+from get_similarity.index.catalog import parse_deadline
+from get_similarity.utils.ingest import IngestPipeline, job_records, plan_delta
+
+
+def _records(job_id, url, deadline, texts=("a", "b")):
+    return job_records(job_id, list(texts), {"job_url": url, "deadline": deadline})
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = MetadataCatalog(str(tmp_path / "catalog" / "korea-jd-dev.sqlite"))
+    yield catalog
+    catalog.close()
+
+
+def test_cataloged_index_mirrors_upserts_and_deletes(catalog, fake_index):
+    index = CatalogedIndex(fake_index(), catalog)
+    assert not catalog.in_sync()
+    catalog.sync(index)
+    index.upsert(vectors=_records("job1", "https://a/1", "2026-03-01") + _records("job2", "https://a/2", "상시채용", ["c"]))
+    assert catalog.count() == 3 and catalog.in_sync()
+    assert catalog.existing_urls(["https://a/1", "https://a/9"]) == {"https://a/1"}
+    assert set(catalog.hashes(job_ids=["job1"])) == {"job1__c0000", "job1__c0001"}
+
+    index.delete(ids=["job1__c0001"])
+    index.delete(ids=[])
+    assert catalog.count() == 2 and catalog.in_sync()
+    index.delete(delete_all=True)
+    assert catalog.count() == 0 and catalog.in_sync()
+
+    # 원격 upsert가 실패하면 카탈로그도 바뀌지 않음
+    failing = CatalogedIndex(fake_index(fail_upsert=True), catalog)
+    with pytest.raises(ConnectionError):
+        failing.upsert(vectors=_records("job3", "https://a/3", "2026-03-01"))
+    assert catalog.count() == 0 and catalog.in_sync()
+
+
+def test_expired_ids_match_check_deadline_rules(catalog, fake_index):
+    index = CatalogedIndex(fake_index(), catalog)
+    index.upsert(vectors=(
+        _records("past", "https://a/1", "2026-01-31", ["x"])
+        + _records("today", "https://a/2", "2026-02-01", ["x"])
+        + _records("future", "https://a/3", "2026-02-02", ["x"])
+        + _records("always", "https://a/4", "상시채용", ["x"])
+        + _records("missing", "https://a/5", float("nan"), ["x"])
+    ))
+    expired = catalog.expired_ids(today=date(2026, 2, 1))
+    # 마감일이 오늘 이전/당일이거나 파싱할 수 없으면 마감 (check_deadline이 False)
+    assert sorted(expired) == ["always__c0000", "missing__c0000", "past__c0000", "today__c0000"]
+    assert parse_deadline(" 2026-02-02 ") == "2026-02-02" and parse_deadline("2026/02/02") is None
+
+
+def test_hashes_by_url_include_legacy_vectors_for_delta(catalog, fake_index):
+    raw = fake_index()
+    # 예전 랜덤 ID로 적재된 같은 URL의 벡터
+    raw.upsert([{"id": "7f3e-legacy", "values": [0.0], "metadata": {"job_url": "https://a/1", "deadline": "2026-03-01"}}])
+    index = CatalogedIndex(raw, catalog)
+    catalog.sync(index)
+    index.upsert(vectors=_records("job1", "https://a/1", "2026-03-01", ["a", "b", "c"]))
+
+    records = _records("job1", "https://a/1", "2026-03-01", ["a", "b 수정"])
+    delta = plan_delta(records, catalog.hashes(job_ids=["job1"], urls=["https://a/1"]), full_sync=True)
+    assert [r["id"] for r in delta["upsert"]] == ["job1__c0001"]
+    assert sorted(delta["delete"]) == ["7f3e-legacy", "job1__c0002"]
+    assert delta["unchanged"] == 1
+
+
+def test_sync_repairs_drift_with_a_single_scan(catalog, fake_index):
+    raw = fake_index(page_size=2)
+    raw.upsert(_records("job1", "https://a/1", "2026-03-01", ["a", "b", "c"]))
+    index = CatalogedIndex(raw, catalog)
+    assert not catalog.in_sync() and catalog.synced_at() is None
+    assert catalog.sync(index) == 3 and catalog.in_sync()
+    ingested_at = catalog._conn.execute("SELECT ingested_at FROM chunks WHERE id = 'job1__c0000'").fetchone()[0]
+
+    # 카탈로그를 거치지 않은 변경은 복구 명령(sync)으로 맞춤, 기존 청크의 ingested_at은 유지
+    raw.delete(ids=["job1__c0002"])
+    raw.upsert(_records("job2", "https://a/2", "2026-03-01", ["d"]))
+    raw.upsert(_records("job3", "https://a/3", "2026-03-01", ["e"]))
+    catalog.sync(index)
+    assert set(catalog.hashes(job_ids=["job1", "job2", "job3"])) == {"job1__c0000", "job1__c0001", "job2__c0000", "job3__c0000"}
+    assert catalog._conn.execute("SELECT ingested_at FROM chunks WHERE id = 'job1__c0000'").fetchone()[0] == ingested_at
+
+    # 동기화된 뒤의 조회는 원격 fetch 없이 로컬 쿼리
+    raw.fetch_calls = 0
+    catalog.hashes(urls=["https://a/1"])
+    catalog.expired_ids()
+    assert raw.fetch_calls == 0
+
+
+def test_unmirrored_and_filter_writes_mark_the_catalog_dirty(tmp_path, fake_index):
+    path = str(tmp_path / "dirty.sqlite")
+    catalog = MetadataCatalog(path)
+    index = CatalogedIndex(fake_index(), catalog)
+    catalog.sync(index)
+
+    # 원격 쓰기 후 카탈로그 반영 전에 프로세스가 종료됨 → 다시 열면 어긋난 상태
+    catalog.begin_write("upsert")
+    catalog.close()
+    catalog = MetadataCatalog(path)
+    assert not catalog.in_sync() and "미반영" in catalog.status()["dirty"]
+    index = CatalogedIndex(fake_index(), catalog)
+    catalog.sync(index)
+    assert catalog.in_sync()
+
+    # filter 삭제는 지워진 벡터를 알 수 없음
+    index.upsert(vectors=_records("job1", "https://a/1", "2026-03-01"))
+    index.delete(filter={"job_id": "job1"})
+    assert catalog.count() == 0 and not catalog.in_sync()
+    catalog.close()
+
+
+def test_concurrent_pipeline_upserts_are_all_recorded(catalog, fake_index):
+    index = CatalogedIndex(fake_index(), catalog)
+    catalog.sync(index)
+    batches = [_records(f"job{j}", f"https://a/{j}", "2026-03-01", [f"t{j}-{c}" for c in range(5)]) for j in range(40)]
+    IngestPipeline(lambda texts: [[1.0]] * len(texts), index.upsert, embed_workers=3, upsert_workers=3).run(batches)
+    assert catalog.count() == 200 and catalog.in_sync()
+
+
+def test_old_catalog_files_get_a_metadata_hash_column(tmp_path, fake_index):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chunks (id TEXT PRIMARY KEY, job_id TEXT, url TEXT, deadline TEXT, content_hash TEXT, ingested_at REAL NOT NULL)")
+    conn.execute("INSERT INTO chunks VALUES ('job1__c0000', 'job1', 'https://a/1', NULL, 'abc', 0)")
+    conn.commit()
+    conn.close()
+
+    catalog = MetadataCatalog(path)
+    # 예전 청크는 metadata_hash가 없으므로 다음 적재 때 메타데이터만 갱신됨
+    assert catalog.hashes(job_ids=["job1"]) == {"job1__c0000": ("abc", None)}
+    records = _records("job1", "https://a/1", "2026-03-01", ["a"])
+    CatalogedIndex(fake_index(), catalog).upsert(vectors=records)
+    assert catalog.hashes(job_ids=["job1"]) == {"job1__c0000": tuple(records[0]["metadata"][k] for k in ("content_hash", "metadata_hash"))}
+    catalog.close()
@@ -0,0 +1,76 @@
+"""
+Job centroid/medoid coarse 인덱스 테스트
+
+실행 방법:
+pytest backend/tests/test_centroids.py -v
+"""
+
+
+import numpy as np
+
+from get_similarity.index import JobCentroidIndex, SnapshotWriter, build_snapshot_centroids, get_snapshot_centroids, load_snapshot
+from get_similarity.index.centroids import select_medoids
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+DIM = 16
+
+
+def _jobs(num_jobs=40, seed=0):
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 8, size=num_jobs)
+    vectors = rng.standard_normal((int(counts.sum()), DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return vectors, offsets, [f"wd_{j}" for j in range(num_jobs)]
+
+
+def test_centroid_score_equals_chunk_level_mean():
+    vectors, offsets, job_ids = _jobs()
+    index = JobCentroidIndex(dim=DIM, centroid_weight=1.0).build(vectors, offsets, job_ids)
+    cv = np.random.default_rng(1).standard_normal((5, DIM))
+
+    # centroid 점수 = 모든 CV 청크 x JD 청크 유사도 평균 (DenseMatcher fused 점수와 동일)
+    expected = DenseMatcher(mode="fused").compute_fused(list(cv), ChunkCorpus(vectors, offsets, job_ids))
+    np.testing.assert_allclose(index.scores(cv), expected, rtol=1e-5, atol=1e-6)
+
+    positions, scores = index.search(cv, k=5)
+    assert list(positions) == list(np.argsort(-expected)[:5])
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_search_restricted_to_job_positions():
+    vectors, offsets, job_ids = _jobs()
+    index = JobCentroidIndex(dim=DIM).build(vectors, offsets, job_ids)
+    cv = vectors[offsets[7]:offsets[8]]
+
+    positions, _ = index.search(cv, k=3)
+    assert positions[0] == 7
+    allowed = np.array([1, 2, 3, 30])
+    positions, _ = index.search(cv, k=3, job_positions=allowed)
+    assert len(positions) == 3 and set(positions) <= set(allowed)
+
+
+def test_select_medoids_covers_distinct_groups():
+    rng = np.random.default_rng(0)
+    centers = np.eye(DIM, dtype=np.float32)[:3]
+    block = np.repeat(centers, 4, axis=0) + 0.05 * rng.standard_normal((12, DIM)).astype(np.float32)
+    block /= np.linalg.norm(block, axis=1, keepdims=True)
+
+    medoids = select_medoids(block, 3)
+    assert sorted(m // 4 for m in medoids) == [0, 1, 2]
+    assert list(select_medoids(block[:2], 3)) == [0, 1]
+
+
+def test_snapshot_centroids_roundtrip(tmp_path):
+    vectors, offsets, job_ids = _jobs(num_jobs=6)
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    for j, job_id in enumerate(job_ids):
+        writer.add_job(job_id, vectors[offsets[j]:offsets[j + 1]])
+    writer.commit()
+    snapshot = load_snapshot(str(tmp_path))
+
+    assert get_snapshot_centroids(snapshot) is None
+    built = build_snapshot_centroids(snapshot, num_medoids=2)
+    loaded = get_snapshot_centroids(load_snapshot(str(tmp_path)))
+    assert loaded.job_ids == job_ids
+    np.testing.assert_allclose(loaded.scores(vectors[:3]), built.scores(vectors[:3]), rtol=1e-6)
@@ -0,0 +1,78 @@
+"""
+로컬 Chroma collection의 Pinecone 호환 wrapper(ChromaIndex) 테스트
+
+실행 방법:
+pytest backend/tests/test_chroma_index.py -v
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from get_similarity.index import ChromaIndex, build_snapshot_from_pinecone, load_snapshot
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+DIM = 8
+
+
+def _index(page_size=3):
+    collection = chromadb.EphemeralClient().create_collection(f"test-{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"})
+    return ChromaIndex(collection, page_size=page_size)
+
+
+def _jobs(n_jobs=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return {f"job{j}": rng.standard_normal((2 + j % 2, DIM)).astype(np.float32) for j in range(n_jobs)}
+
+
+def _upsert(index, jobs):
+    index.upsert([
+        {"id": f"{job_id}__c{c:04d}", "values": vec, "metadata": {"company": job_id, "text": f"{job_id} {c}", "salary": None}}
+        for job_id, vecs in jobs.items()
+        for c, vec in enumerate(vecs)
+    ])
+
+
+def test_pinecone_compatible_roundtrip():
+    index, jobs = _index(), _jobs()
+    _upsert(index, jobs)
+
+    stats = index.describe_index_stats()
+    assert stats["dimension"] == DIM and stats["total_vector_count"] == 10
+    assert sorted(vid for batch in index.list() for vid in batch) == sorted(f"{j}__c{c:04d}" for j, v in jobs.items() for c in range(len(v)))
+
+    fetched = index.fetch(["job1__c0001", "job0__c0000"]).vectors
+    np.testing.assert_allclose(fetched["job1__c0001"].values, jobs["job1"][1], rtol=1e-6)
+    assert fetched["job0__c0000"].metadata == {"company": "job0", "text": "job0 0"}
+
+    matches = index.query(vector=jobs["job2"][0], top_k=3, include_metadata=True, include_values=True)["matches"]
+    assert matches[0]["id"] == "job2__c0000"
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+
+    index.delete(delete_all=True)
+    assert index.describe_index_stats()["total_vector_count"] == 0
+    assert index.query(vector=jobs["job2"][0], top_k=3)["matches"] == []
+
+
+def test_snapshot_from_chroma_matches_query_rerank(tmp_path):
+    index, jobs = _index(), _jobs(n_jobs=6)
+    _upsert(index, jobs)
+    cv = list(np.random.default_rng(1).standard_normal((3, DIM)))
+
+    build_snapshot_from_pinecone(index, str(tmp_path), batch_size=4)
+    snapshot = load_snapshot(str(tmp_path))
+    assert snapshot.num_jobs == 6 and snapshot.metadata("job3")["company"] == "job3"
+
+    # query로 가져온 청크(전체)로 재정렬한 결과 = 스냅샷 재정렬 결과
+    job_map = {}
+    for m in index.query(vector=cv[0], top_k=100, include_values=True)["matches"]:
+        job_map.setdefault(m["id"].split("__")[0], []).append({"values": m["values"]})
+    matcher = DenseMatcher(mode="fused")
+    from_query = matcher.rank(cv, ChunkCorpus.from_job_map(job_map), top_k=3)
+    from_snapshot = matcher.rank(cv, ChunkCorpus.from_snapshot(snapshot), top_k=3)
+    assert [j["job_id"] for j in from_query] == [j["job_id"] for j in from_snapshot]
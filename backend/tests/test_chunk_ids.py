@@ -0,0 +1,110 @@
+"""
+결정적 청크 ID / content hash 기반 증분 재적재 테스트 (in-memory fake index 사용)
+
+실행 방법:
+pytest backend/tests/test_chunk_ids.py -v
+"""
+
+
+from get_similarity.utils.chunk_ids import CONTENT_HASH_KEY, METADATA_HASH_KEY, content_hash, make_chunk_id, metadata_hash, resolve_job_id, stable_job_id
+from get_similarity.utils.ingest import IngestPipeline, job_records, plan_delta, reuse_vectors, stored_hashes
+
+
+EMBEDDED = []
+
+
+def _embed(texts):
+    EMBEDDED.extend(texts)
+    return [[float(len(t))] for t in texts]
+
+
+def _ingest(index, jobs, full_sync=True, model=""):
+    records = [r for job_id, (texts, meta) in jobs.items() for r in job_records(job_id, texts, meta, model=model)]
+    delta = plan_delta(records, stored_hashes(index), full_sync=full_sync)
+    index.delete(ids=delta["delete"])
+    index.upserted = []
+    EMBEDDED.clear()
+    vectors, missing = reuse_vectors(index, delta["update"])
+    index.upsert(vectors)
+    IngestPipeline(_embed, index.upsert, embed_workers=1, upsert_workers=1).run([delta["upsert"] + missing])
+    return delta
+
+
+def test_stable_job_id_and_content_hash_are_deterministic():
+    meta = {"job_url": "https://example.com/jobs/1", "company": "A"}
+    assert stable_job_id(meta, "본문") == stable_job_id(dict(meta), "다른 본문")
+    assert stable_job_id(meta).startswith("jd_")
+    assert stable_job_id({"job_id": "job42"}) == "job42"
+    # 구분자가 들어간 job_id는 쓰지 않고 본문 hash로 대체
+    assert stable_job_id({"job_id": "a__b"}, "본문") == stable_job_id({}, "본문") != stable_job_id({}, "다른 본문")
+
+    # 본문 hash는 본문 + 임베딩 모델로만 정해지고, 메타데이터는 별도 hash
+    assert content_hash("text", "model-a") == content_hash("text", "model-a") != content_hash("text", "model-b")
+    assert content_hash("text") != content_hash("text2")
+    assert metadata_hash({"a": 1, "b": 2}) == metadata_hash({"b": 2, "a": 1, CONTENT_HASH_KEY: "x"})
+    assert metadata_hash({"deadline": "2026-01-01"}) != metadata_hash({"deadline": "2026-02-01"})
+
+
+def test_job_records_number_chunks_densely():
+    records = job_records("job1", ["첫 청크", "", "   ", "둘째 청크"], {"company": "A"})
+    assert [r["id"] for r in records] == [make_chunk_id("job1", 0), make_chunk_id("job1", 1)] == ["job1__c0000", "job1__c0001"]
+    assert all(resolve_job_id(r["id"]) == "job1" for r in records)
+    assert records[1]["metadata"]["text"] == "둘째 청크" and records[1]["metadata"]["job_id"] == "job1"
+    assert records[0]["metadata"][CONTENT_HASH_KEY] != records[1]["metadata"][CONTENT_HASH_KEY]
+    assert records[0]["metadata"][CONTENT_HASH_KEY] == job_records("job2", ["첫 청크"], {"company": "B"})[0]["metadata"][CONTENT_HASH_KEY]
+    assert records[0]["metadata"][METADATA_HASH_KEY] == metadata_hash(records[0]["metadata"])
+
+
+def test_reingest_only_upserts_changed_chunks_and_deletes_orphans(fake_index):
+    index = fake_index()
+    jobs = {
+        "job1": (["a1", "a2", "a3"], {"company": "A"}),
+        "job2": (["b1", "b2"], {"company": "B"}),
+        "job3": (["c1"], {"company": "C"}),
+    }
+    first = _ingest(index, jobs)
+    assert len(first["upsert"]) == len(index.vectors) == 6
+
+    # 같은 입력 → 임베딩 / upsert 없음
+    again = _ingest(index, jobs)
+    assert again["upsert"] == [] and again["delete"] == [] and again["unchanged"] == 6
+
+    # job1 청크 하나 수정 + 마지막 청크 제거, job2 메타데이터 변경, job3 제거
+    jobs["job1"] = (["a1", "a2 수정"], {"company": "A"})
+    jobs["job2"] = (["b1", "b2"], {"company": "B", "deadline": "2026-12-31", "cluster_id": "job1"})
+    del jobs["job3"]
+    before = index.vectors["job2__c0000"]["values"]
+    delta = _ingest(index, jobs)
+    assert sorted(index.upserted) == ["job1__c0001", "job2__c0000", "job2__c0001"]
+    assert sorted(delta["delete"]) == ["job1__c0002", "job3__c0000"]
+    assert delta["unchanged"] == 1 and len(delta["update"]) == 2
+    assert sorted(index.vectors) == ["job1__c0000", "job1__c0001", "job2__c0000", "job2__c0001"]
+    assert index.vectors["job1__c0001"]["metadata"]["text"] == "a2 수정"
+
+    # 메타데이터만 바뀐 청크는 다시 임베딩하지 않고 저장된 벡터로 갱신
+    assert EMBEDDED == ["a2 수정"]
+    assert index.vectors["job2__c0000"]["values"] == before and index.vectors["job2__c0000"]["metadata"]["deadline"] == "2026-12-31"
+
+    # 임베딩 모델을 바꾸면 모든 청크를 다시 임베딩
+    assert len(_ingest(index, jobs, model="model-b")["upsert"]) == 4
+
+
+def test_partial_delta_only_touches_jobs_in_records(fake_index):
+    index = fake_index()
+    _ingest(index, {"job1": (["a1", "a2", "a3"], {}), "job2": (["b1"], {})})
+
+    # 일부 공고만 다시 올리면 records에 없는 job2는 그대로 두고, job1의 남는 청크만 삭제
+    records = job_records("job1", ["a1"], {})
+    delta = plan_delta(records, stored_hashes(index), full_sync=False)
+    assert delta["upsert"] == [] and delta["unchanged"] == 1
+    assert delta["delete"] == ["job1__c0001", "job1__c0002"]
+
+    # job_ids로 fetch 대상을 제한해도 같은 결과
+    assert plan_delta(records, stored_hashes(index, job_ids={"job1"}))["delete"] == delta["delete"]
+    assert set(stored_hashes(index, job_ids={"job1"})) == {"job1__c0000", "job1__c0001", "job1__c0002"}
+
+    # metadata hash가 없는 청크는 메타데이터만 갱신, 본문 hash가 없는 예전 청크는 변경된 것으로 간주
+    index.vectors["job1__c0000"]["metadata"].pop(METADATA_HASH_KEY)
+    assert [r["id"] for r in plan_delta(records, stored_hashes(index))["update"]] == ["job1__c0000"]
+    index.vectors["job1__c0000"]["metadata"].pop(CONTENT_HASH_KEY)
+    assert [r["id"] for r in plan_delta(records, stored_hashes(index))["upsert"]] == ["job1__c0000"]
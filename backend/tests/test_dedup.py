@@ -0,0 +1,75 @@
+"""
+JD 근사 중복(MinHash LSH) 탐지 테스트
+
+실행 방법:
+pytest backend/tests/test_dedup.py -v
+"""
+
+
+import numpy as np
+
+from get_similarity.index import (
+    NearDuplicateIndex,
+    collapse_duplicates,
+    load_near_dup_index,
+)
+
+
+def _jd(seed, n_words=200):
+    rng = np.random.default_rng(seed)
+    return " ".join(f"w{w}" for w in rng.integers(0, 5000, n_words))
+
+
+def _edited(text, n_edits, seed=0):
+    words = text.split()
+    rng = np.random.default_rng(seed)
+    for i in rng.choice(len(words), n_edits, replace=False):
+        words[i] = "edited"
+    return " ".join(words)
+
+
+def test_near_duplicates_share_cluster():
+    index = NearDuplicateIndex(threshold=0.8)
+    original = _jd(1)
+
+    assert index.add("a", original) == "a"
+    assert index.add("b", _edited(original, 3)) == "a"
+    assert index.add("c", _jd(2)) == "c"
+    # 이미 있는 Job은 기존 cluster_id 유지
+    assert index.add("b", _jd(3)) == "a"
+    assert [job_id for job_id, _ in index.query(original)] == ["a", "b"]
+
+
+def test_save_load_continues_clusters(tmp_path):
+    index = NearDuplicateIndex(threshold=0.8)
+    original = _jd(1)
+    index.add("a", original)
+    index.add("c", _jd(2))
+    index.save(str(tmp_path))
+
+    loaded = load_near_dup_index(str(tmp_path))
+    assert loaded.cluster_of("c") == "c"
+    assert loaded.add("d", _edited(original, 2, seed=5)) == "a"
+    assert load_near_dup_index(str(tmp_path / "missing")).job_ids == []
+
+
+def test_add_all_is_independent_of_input_order():
+    original = _jd(1)
+    texts = {"job_b": _edited(original, 3), "job_c": _jd(2), "job_a": original, "job_d": _edited(original, 2, seed=5)}
+    clusters = NearDuplicateIndex(threshold=0.8).add_all(texts)
+    reordered = NearDuplicateIndex(threshold=0.8).add_all(dict(reversed(list(texts.items()))))
+    # 같은 Job 집합이면 순서와 무관하게 cluster에서 가장 작은 job_id
+    assert clusters == reordered == {"job_a": "job_a", "job_b": "job_a", "job_c": "job_c", "job_d": "job_a"}
+
+
+def test_collapse_keeps_first_per_cluster():
+    jobs = [{"id": "a", "cluster": "x"}, {"id": "b", "cluster": None}, {"id": "c", "cluster": "x"}, {"id": "d", "cluster": None}]
+    assert [j["id"] for j in collapse_duplicates(jobs, lambda j: j["cluster"])] == ["a", "b", "d"]
+
+
+def test_collapse_after_ranking_keeps_highest_score():
+    # cluster 대표(job_id가 가장 작은 Job)보다 재등록 공고의 점수가 높으면 재등록 공고가 남음
+    scored = {"a": 0.2, "b": 0.9, "c": 0.5, "d": 0.7}
+    clusters = {"a": "a", "b": "a", "c": "c", "d": "c"}
+    ranked = sorted(scored, key=scored.get, reverse=True)
+    assert collapse_duplicates(ranked, clusters.get) == ["b", "d"]
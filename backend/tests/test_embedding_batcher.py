@@ -0,0 +1,132 @@
+"""
+요청 간 임베딩 micro-batcher 테스트
+
+실행 방법:
+pytest backend/tests/test_embedding_batcher.py -v
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from get_similarity.utils.embedding_batcher import MicroBatchEmbeddings
+
+
+class RecordingEmbeddings(Embeddings):
+    """호출마다 전달된 텍스트를 기록하는 가짜 임베딩 모델 (텍스트 → [len, hash])"""
+
+    model = "fake-embedding"
+
+    def __init__(self, fail=False):
+        self.document_calls = []
+        self.query_calls = []
+        self.fail = fail
+
+    def embed_documents(self, texts):
+        if self.fail:
+            raise RuntimeError("rate limited")
+        self.document_calls.append(list(texts))
+        return [[float(len(t)), float(hash(t) % 1000)] for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [float(len(text)), -1.0]
+
+
+def _run_concurrently(fn, args):
+    results = [None] * len(args)
+    barrier = threading.Barrier(len(args))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fn(args[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(args))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_are_coalesced():
+    base = RecordingEmbeddings()
+    batcher = MicroBatchEmbeddings(base, window_ms=50, max_batch=100)
+    requests = [[f"cv{i} chunk{j}" for j in range(3)] for i in range(8)]
+
+    results = _run_concurrently(batcher.embed_documents, requests)
+
+    # 요청마다 자기 텍스트 순서대로 결과를 받아야 함
+    expected = RecordingEmbeddings()
+    for texts, vectors in zip(requests, results):
+        assert vectors == expected.embed_documents(texts)
+    assert len(base.document_calls) < len(requests)
+
+    stats = batcher.stats()
+    assert stats["requests"] == len(requests)
+    assert stats["requests_per_batch"] > 1
+    assert 0 < stats["fill_rate"] <= 1
+
+
+def test_batches_respect_max_batch_and_dedup():
+    base = RecordingEmbeddings()
+    batcher = MicroBatchEmbeddings(base, window_ms=50, max_batch=4)
+    requests = [["공통 문장", f"문장 {i}"] for i in range(6)]
+
+    results = _run_concurrently(batcher.embed_documents, requests)
+
+    assert all(len(call) <= 4 for call in base.document_calls)
+    assert all(vectors[0] == results[0][0] for vectors in results)
+    assert batcher.stats()["dedup_ratio"] < 1
+
+
+def test_queries_use_embed_query():
+    base = RecordingEmbeddings()
+    batcher = MicroBatchEmbeddings(base, window_ms=20)
+
+    results = _run_concurrently(batcher.embed_query, ["백엔드", "백엔드", "프론트엔드"])
+
+    assert results == [[3.0, -1.0], [3.0, -1.0], [5.0, -1.0]]
+    assert base.document_calls == []
+    assert len(base.query_calls) <= 3
+
+
+class FakeUpstageClient:
+    """UpstageEmbeddings.client (OpenAI embeddings API) 대신 호출을 기록"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model, **kwargs):
+        self.calls.append((model, list(input) if isinstance(input, list) else input))
+        texts = input if isinstance(input, list) else [input]
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(texts)]
+        return SimpleNamespace(data=data[::-1])
+
+
+def test_upstage_queries_are_sent_in_one_query_model_call():
+    pytest.importorskip("langchain_upstage")
+    from langchain_upstage import UpstageEmbeddings
+
+    base = UpstageEmbeddings(model="solar-embedding-1-large", api_key="test", embed_batch_size=10)
+    client = FakeUpstageClient()
+    object.__setattr__(base, "client", client)
+    batcher = MicroBatchEmbeddings(base, window_ms=50)
+
+    results = _run_concurrently(batcher.embed_query, ["백엔드", "백엔드", "프론트엔드", "데이터"])
+
+    # passage 모델(embed_documents)이 아닌 query 모델에 중복 제거된 텍스트를 list로 한 번에 전송
+    assert results == [[3.0, 1.0], [3.0, 1.0], [5.0, 1.0], [3.0, 1.0]]
+    assert all(model == "solar-embedding-1-large-query" for model, _ in client.calls)
+    assert sum(len(texts) for _, texts in client.calls) == 3
+    assert batcher.stats()["calls"] == len(client.calls) < 4
+
+
+def test_errors_are_raised_in_every_waiting_request():
+    batcher = MicroBatchEmbeddings(RecordingEmbeddings(fail=True), window_ms=1)
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        batcher.embed_documents(["a", "b"])
+    assert batcher.embed_documents([]) == []
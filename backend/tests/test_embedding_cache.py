@@ -0,0 +1,77 @@
+"""
+CV 청크 임베딩 캐시 테스트
+
+실행 방법:
+pytest backend/tests/test_embedding_cache.py -v
+"""
+
+
+from langchain_core.embeddings import Embeddings
+
+from get_similarity.utils.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """호출 횟수를 기록하는 가짜 임베딩 모델"""
+
+    model = "fake-embedding"
+
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(t)), float(i)] for i, t in enumerate(texts)]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return [float(len(text)), -1.0]
+
+
+def test_rematch_needs_no_api_calls(tmp_path):
+    base = CountingEmbeddings()
+    cached = CachedEmbeddings(base, cache_dir=str(tmp_path))
+
+    chunks = ["Python 3년 경험", "AWS 배포 경험", "Python 3년 경험"]
+    first = cached.embed_documents(chunks)
+    query = cached.embed_query("resume")
+    # 같은 배치 안의 중복 텍스트는 한 번만 임베딩
+    assert base.document_calls == [["Python 3년 경험", "AWS 배포 경험"]]
+    assert first[0] == first[2]
+
+    second = cached.embed_documents(chunks)
+    assert cached.embed_query("resume") == query
+    assert second == first
+    assert len(base.document_calls) == 1
+    assert base.query_calls == 1
+
+
+def test_disk_tier_survives_new_process(tmp_path):
+    cached = CachedEmbeddings(CountingEmbeddings(), cache_dir=str(tmp_path))
+    expected = cached.embed_documents(["a", "bb"])
+
+    # 새 프로세스(메모리 tier 비어 있음)에서도 디스크 tier에서 조회
+    base = CountingEmbeddings()
+    reopened = CachedEmbeddings(base, cache_dir=str(tmp_path))
+    assert reopened.embed_documents(["a", "bb"]) == expected
+    assert base.document_calls == []
+
+
+def test_query_and_document_keys_are_separate(tmp_path):
+    base = CountingEmbeddings()
+    cached = CachedEmbeddings(base, cache_dir=str(tmp_path))
+    cached.embed_documents(["same text"])
+    cached.embed_query("same text")
+    assert base.query_calls == 1
+
+
+def test_size_bounded_eviction(tmp_path):
+    # 벡터 하나 = float32 2개 = 8 bytes, 최대 40 bytes
+    cached = CachedEmbeddings(CountingEmbeddings(), cache_dir=str(tmp_path), max_bytes=40, max_items=2)
+    for i in range(20):
+        cached.embed_documents([f"text-{i}"])
+
+    total = cached._conn.execute("SELECT SUM(size) FROM embeddings").fetchone()[0]
+    assert total <= 40
+    assert len(cached._memory) == 2
@@ -0,0 +1,89 @@
+"""
+마감 공고 정기 삭제(ExpirySweeper) 테스트 (in-memory fake index 사용)
+
+실행 방법:
+pytest backend/tests/test_expiry.py -v
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from get_similarity.index import CatalogedIndex, ExpirySweeper, MetadataCatalog
+from get_similarity.utils.ingest import job_records
+
+TODAY = date(2026, 2, 1)
+
+
+@pytest.fixture
+def index(tmp_path, fake_index):
+    catalog = MetadataCatalog(str(tmp_path / "korea-jd-dev.sqlite"))
+    index = CatalogedIndex(fake_index(page_size=None), catalog)
+    catalog.sync(index)
+    for j, deadline in enumerate(["2026-01-20"] * 3 + ["2026-01-31"] * 2 + ["2026-02-01", "2026-02-02", "2026-03-01", "상시채용"]):
+        index.upsert(vectors=job_records(f"job{j}", ["a", "b"], {"job_url": f"https://a/{j}", "deadline": deadline}))
+    yield index
+    catalog.close()
+
+
+def test_deadline_buckets_are_grouped_by_day(index):
+    buckets = index.catalog.deadline_buckets(TODAY, include_undated=False)
+    assert list(buckets) == ["2026-01-20", "2026-01-31", "2026-02-01"]
+    assert [len(ids) for ids in buckets.values()] == [6, 4, 2]
+    assert list(index.catalog.deadline_buckets(TODAY)) == [None, "2026-01-20", "2026-01-31", "2026-02-01"]
+    assert len(index.catalog.deadline_buckets()) == 6
+
+
+def test_sweep_deletes_expired_buckets_in_batches_and_invalidates(index):
+    expired_events = []
+    sweeper = ExpirySweeper(index, batch_size=5, on_expire=expired_events.append)
+    result = sweeper.sweep(today=TODAY)
+
+    # 4개 bucket(상시채용 포함) 14개 벡터를 5개씩 3번에 삭제
+    assert result["buckets"] == 4 and result["deleted"] == 14 and result["calls"] == 3
+    assert index.index.delete_calls == [5, 5, 4]
+    assert sorted({vid.split("__")[0] for vid in index.index.vectors}) == ["job6", "job7"]
+    assert result["catalog_in_sync"] and index.catalog.count() == 4
+    assert len(expired_events) == 1 and sweeper.status()["last_result"] == result
+
+    # 다시 실행하면 삭제 / 캐시 무효화 없음
+    again = sweeper.sweep(today=TODAY)
+    assert again["deleted"] == 0 and again["calls"] == 0
+    assert len(expired_events) == 1
+
+
+def test_sweep_keeps_undated_jobs_when_configured(index):
+    result = ExpirySweeper(index, include_undated=False).sweep(today=TODAY)
+    assert result["deleted"] == 12 and result["calls"] == 1
+    assert "job8__c0000" in index.index.vectors
+
+
+def test_first_sweep_fills_a_new_catalog_once(tmp_path, fake_index):
+    raw = fake_index(page_size=None)
+    raw.upsert(job_records("old", ["a"], {"deadline": "2025-12-31"}) + job_records("new", ["b"], {"deadline": "2026-12-31"}))
+    catalog = MetadataCatalog(str(tmp_path / "new.sqlite"))
+    sweeper = ExpirySweeper(CatalogedIndex(raw, catalog))
+    result = sweeper.sweep(today=TODAY)
+    assert result["deleted"] == 1 and list(raw.vectors) == ["new__c0000"]
+    assert catalog.count() == 1 and raw.list_calls == 1
+
+    # 이후 sweep은 카탈로그만 조회 (어긋난 상태여도 전체 list + fetch를 다시 하지 않음)
+    catalog.mark_dirty("test")
+    result = sweeper.sweep(today=TODAY)
+    assert raw.list_calls == 1 and result["catalog_in_sync"] is False
+    catalog.close()
+
+
+def test_background_loop_runs_and_stops(index):
+    async def run():
+        sweeper = ExpirySweeper(index, interval=0.01)
+        await sweeper.start()
+        await asyncio.sleep(0.05)
+        await sweeper.stop()
+        return sweeper
+
+    sweeper = asyncio.run(run())
+    # 실제 오늘 날짜 기준으로 한 번 이상 sweep됨
+    assert sweeper.status()["running"] is False and sweeper.last_result is not None
+    assert index.catalog.expired_ids() == []
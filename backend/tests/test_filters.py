@@ -0,0 +1,106 @@
+"""
+FilterIndex (bitmap + deadline range) 테스트
+
+실행 방법:
+pytest backend/tests/test_filters.py -v
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from get_similarity.index.filters import FilterIndex
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+JOBS = [
+    {"location": "Korea", "is_remote": True, "job_type": "fulltime", "deadline": "2026-01-10"},
+    {"location": "USA", "is_remote": False, "job_type": "fulltime", "deadline": "2026-03-01"},
+    {"location": "Korea", "is_remote": False, "job_type": "parttime", "deadline": "상시채용"},
+    {"location": "korea ", "is_remote": "True", "job_type": "fulltime", "deadline": "2025-12-31"},
+]
+COUNTS = [3, 1, 2, 4]
+
+
+def _rows_of(positions):
+    offsets = np.concatenate([[0], np.cumsum(COUNTS)])
+    return set(np.concatenate([np.arange(offsets[p], offsets[p + 1]) for p in positions]).tolist()) if len(positions) else set()
+
+
+def test_bitmap_filters_and_any_values():
+    index = FilterIndex.build(JOBS, COUNTS)
+
+    assert set(np.flatnonzero(index.mask({"location": "Korea"}))) == _rows_of([0, 2, 3])
+    assert set(np.flatnonzero(index.mask({"location": "Korea", "is_remote": "True"}))) == _rows_of([0, 3])
+    assert set(np.flatnonzero(index.mask({"location": ["USA", "korea"], "job_type": "fulltime"}))) == _rows_of([0, 1, 3])
+    # /upload 기본값 "any"는 필터를 적용하지 않음
+    assert index.mask({"is_remote": "any", "job_type": ""}).all()
+    assert not FilterIndex.is_active({"is_remote": "any", "location": None})
+    # 코퍼스에 없는 값은 모든 공고를 제외하지 않고 필터를 적용하지 않음
+    assert index.mask({"location": "Germany"}).all()
+    # 프론트엔드가 쉼표로 이어 보내는 값은 OR
+    assert set(np.flatnonzero(index.mask({"job_type": "fulltime,parttime", "location": "USA"}))) == _rows_of([1])
+
+
+def test_deadline_range_keeps_jobs_without_deadline():
+    index = FilterIndex.build(JOBS, COUNTS)
+
+    mask = index.mask(deadline_from=date(2026, 1, 1))
+    assert set(np.flatnonzero(mask)) == _rows_of([0, 1, 2])
+    mask = index.mask({"location": "Korea"}, deadline_from=date(2026, 1, 1), deadline_to=date(2026, 2, 1))
+    assert set(np.flatnonzero(mask)) == _rows_of([0, 2])
+
+
+def test_filtered_rank_only_scores_passing_jobs():
+    rng = np.random.default_rng(0)
+    job_map = {f"job{j}": [{"values": v} for v in rng.standard_normal((c, 16))] for j, c in enumerate(COUNTS)}
+    corpus = ChunkCorpus.from_job_map(job_map)
+    index = FilterIndex.build(JOBS, corpus.counts)
+
+    positions = FilterIndex.job_positions(index.mask({"job_type": "fulltime"}), corpus.offsets)
+    subset = corpus.select(positions)
+    ranked = DenseMatcher(mode="fused").rank(list(rng.standard_normal((2, 16))), subset, top_k=4)
+
+    # 필터 결과는 행렬을 복사하지 않고 통과한 Job의 행 구간만 계산
+    assert subset.num_rows == sum(COUNTS[p] for p in (0, 1, 3)) and subset.matrix is corpus.matrix
+    assert {r["job_id"] for r in ranked} == {"job0", "job1", "job3"}
+
+
+# 프론트엔드(page.tsx)가 항상 보내는 필터 값
+FRONTEND_FILTER = {"location": "Korea", "is_remote": "False", "job_type": "fulltime,parttime"}
+
+
+def _ingested_metadata():
+    """preprocess make_chunks가 청크에 기록하는 키 (is_remote / job_type 없음, location은 자유 형식)"""
+    return [
+        {"job_url": "https://a/1", "company": "A", "location": "서울 성동구", "experience_requirement": "3년", "summary": "", "deadline": "2026-03-01"},
+        {"job_url": "https://a/2", "company": "B", "location": "경기 성남시 분당구", "experience_requirement": "신입", "summary": "", "deadline": "상시채용"},
+        {"job_url": "https://a/3", "company": "C", "location": float("nan"), "experience_requirement": "", "summary": "", "deadline": "2026-04-01"},
+    ]
+
+
+def test_frontend_filter_keeps_ingested_jobs():
+    index = FilterIndex.build(_ingested_metadata(), [2, 1, 3])
+    assert index.mask(FRONTEND_FILTER).all()
+
+    # 코퍼스에 있는 location은 부분 문자열로 비교, location이 없는 공고는 통과
+    assert set(np.flatnonzero(index.mask(dict(FRONTEND_FILTER, location="서울")))) == {0, 1, 3, 4, 5}
+    assert set(np.flatnonzero(index.mask({"location": "경기,  서울 성동구"}))) == set(range(6))
+
+
+def test_frontend_filter_keeps_make_chunks_output():
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("langchain.text_splitter")
+    sys.path.append(str(Path(__file__).resolve().parents[2] / "preprocess"))
+    from utils import make_chunks
+
+    table = pd.DataFrame([
+        {"url": "https://a/1", "company_name": "A", "location": "서울 성동구", "experience_requirement": "3년", "summary": "요약", "deadline": "2026-03-01", "description": "백엔드 개발"},
+        {"url": "https://a/2", "company_name": "B", "location": "부산 해운대구", "experience_requirement": "신입", "summary": "요약", "deadline": "상시채용", "description": "데이터 분석"},
+    ])
+    chunks = make_chunks(list(table["description"]), table)
+    index = FilterIndex.build([c.metadata for c in chunks], [1] * len(chunks))
+    assert index.mask(FRONTEND_FILTER).all()
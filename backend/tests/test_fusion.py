@@ -0,0 +1,66 @@
+"""
+rank fusion (weighted RRF / CombSUM) 테스트
+
+실행 방법:
+pytest backend/tests/test_fusion.py -v
+"""
+
+import tracemalloc
+
+import pytest
+
+from get_similarity.utils.fusion import fuse, rrf
+
+
+def _reference_rrf(rankings, weights, k):
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank + 1)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def test_weighted_rrf_matches_reference():
+    rankings = [["a", "b", "c", "d"], ["c", "a", "e"], ["e", "f"]]
+    weights = [1.0, 0.5, 2.0]
+    fused = fuse(rankings, weights=weights, k=60)
+    expected = _reference_rrf(rankings, weights, 60)
+
+    assert [doc_id for doc_id, _ in fused] == [doc_id for doc_id, _ in expected]
+    for (_, score), (_, ref) in zip(fused, expected):
+        assert score == pytest.approx(ref)
+    assert fuse(rankings, weights=weights, k=60, top_k=2) == fused[:2]
+
+
+def test_rrf_compat_keeps_first_seen_order_on_ties():
+    assert [doc_id for doc_id, _ in rrf([["x", "y"], ["y", "x"]])] == ["x", "y"]
+
+
+def test_combsum_normalizes_scores():
+    dense = [("a", 0.9), ("b", 0.8), ("c", 0.1)]
+    lexical = [("c", 30.0), ("a", 10.0)]
+    fused = dict(fuse([dense, lexical], method="combsum"))
+    assert fused["a"] == pytest.approx(1.0 + 0.0)
+    assert fused["b"] == pytest.approx(0.7 / 0.8)
+    assert fused["c"] == pytest.approx(0.0 + 1.0)
+
+    with pytest.raises(ValueError):
+        fuse([dense], method="combmnz")
+
+
+def test_memory_stays_flat_across_calls():
+    def call(i):
+        dense = [f"job{(i + j) % 500}" for j in range(20)]
+        lexical = [(f"job{(i * 7 + j) % 500}", float(20 - j)) for j in range(20)]
+        return fuse([dense, lexical], weights=[1.0, 0.5], top_k=4)
+
+    for i in range(1000):  # warm-up (numpy 내부 캐시 등)
+        call(i)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(100_000):
+        call(i)
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    assert growth < 64 * 1024
@@ -0,0 +1,112 @@
+"""
+JD 적재 임베딩 / upsert 파이프라인 테스트 (로컬 fake vector store 사용)
+
+실행 방법:
+pytest backend/tests/test_ingest.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from get_similarity.utils.ingest import IngestPipeline, backoff_delay, is_rate_limited
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeVectorStore:
+    """raw index upsert(vectors=...)만 흉내내는 in-memory store (처음 fail_first번은 429)"""
+
+    def __init__(self, delay=0.0, fail_first=0):
+        self.vectors = {}
+        self.delay = delay
+        self.fail_first = fail_first
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.fail_first:
+                raise RateLimitError("Too Many Requests")
+        time.sleep(self.delay)
+        with self._lock:
+            for v in vectors:
+                assert v["id"] not in self.vectors
+                self.vectors[v["id"]] = v
+
+
+def fake_embed(delay=0.0):
+    def embed(texts):
+        time.sleep(delay)
+        return [[float(len(t)), 1.0] for t in texts]
+    return embed
+
+
+def make_batches(num_batches, batch_size=10, produced=None):
+    for b in range(num_batches):
+        if produced is not None:
+            produced.append(b)
+        yield [{"id": f"job{b}__c{i:04d}", "text": "x" * i, "metadata": {"job_id": f"job{b}"}} for i in range(batch_size)]
+
+
+def test_every_record_is_upserted_once_with_bounded_queues():
+    store, produced = FakeVectorStore(delay=0.005), []
+    pipeline = IngestPipeline(fake_embed(), store.upsert, embed_workers=3, upsert_workers=2, queue_size=2)
+
+    # upsert가 느려도 feeder가 queue 크기 이상 앞서 나가지 않아야 함
+    upserted, max_ahead = [], []
+    pipeline.progress = lambda n: (upserted.append(n), max_ahead.append(len(produced) - len(upserted)))
+    stats = pipeline.run(make_batches(30, produced=produced))
+
+    assert len(store.vectors) == 300
+    assert store.vectors["job7__c0003"]["values"] == [3.0, 1.0]
+    assert store.vectors["job7__c0003"]["metadata"] == {"job_id": "job7"}
+    assert stats["embed"]["items"] == stats["upsert"]["items"] == 300
+    assert stats["upsert"]["batches"] == 30 and stats["upsert"]["items_per_s"] > 0
+    assert max(max_ahead) <= 2 * 2 + 3 + 2 + 1
+
+
+def test_embedding_and_upsert_overlap():
+    batches, delay = 12, 0.02
+    store = FakeVectorStore(delay=delay)
+    stats = IngestPipeline(fake_embed(delay), store.upsert, embed_workers=2, upsert_workers=2).run(make_batches(batches))
+    assert len(store.vectors) == batches * 10
+    # 직렬 루프라면 batches x (임베딩 + upsert) 시간
+    assert stats["wall_s"] < 0.6 * batches * 2 * delay
+
+
+def test_rate_limit_is_retried_with_backoff():
+    store = FakeVectorStore(fail_first=3)
+    pipeline = IngestPipeline(fake_embed(), store.upsert, embed_workers=1, upsert_workers=1, base_delay=0.001, max_delay=0.01)
+    stats = pipeline.run(make_batches(4))
+    assert len(store.vectors) == 40
+    assert stats["upsert"]["retries"] == 3
+
+    with pytest.raises(RateLimitError):
+        IngestPipeline(fake_embed(), FakeVectorStore(fail_first=10).upsert, max_retries=2, base_delay=0.001).run(make_batches(4))
+
+
+def test_non_retryable_error_stops_pipeline():
+    calls = []
+
+    def broken_embed(texts):
+        calls.append(len(texts))
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        IngestPipeline(broken_embed, FakeVectorStore().upsert, embed_workers=2).run(make_batches(100))
+    # 첫 실패 후 나머지 배치는 처리하지 않음 (재시도 없음)
+    assert len(calls) < 10
+
+
+def test_rate_limit_detection_and_jitter_bounds():
+    assert is_rate_limited(RateLimitError())
+    assert is_rate_limited(Exception("Error code: 429 - rate limit exceeded"))
+    assert not is_rate_limited(ValueError("bad input"))
+    delays = [backoff_delay(attempt, 0.5, 4.0) for attempt in range(10) for _ in range(20)]
+    assert min(delays) >= 0 and max(delays) <= 4.0
+    assert max(backoff_delay(0, 0.5, 4.0) for _ in range(50)) <= 0.5
@@ -0,0 +1,174 @@
+"""
+DenseMatcher scoring 테스트
+
+실행 방법:
+pytest backend/tests/test_matcher.py -v
+"""
+
+
+import numpy as np
+import pytest
+
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+
+DIM = 32
+
+
+def _job_map(n_jobs=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f"job{j}": [{"values": v} for v in rng.standard_normal((int(rng.integers(1, 6)), DIM))]
+        for j in range(n_jobs)
+    }
+
+
+def _cv_vectors(n=4, seed=1):
+    return list(np.random.default_rng(seed).standard_normal((n, DIM)))
+
+
+def test_fused_matches_parallel():
+    job_map = _job_map()
+    cv_vectors = _cv_vectors()
+
+    expected = {r["job_id"]: r["final_score"] for r in DenseMatcher(mode="parallel").compute_batch_parallel(cv_vectors, job_map)}
+    corpus = ChunkCorpus.from_job_map(job_map)
+    # block_rows를 작게 잡아 블록 경계도 함께 검증
+    scores = DenseMatcher(mode="fused", block_rows=7).compute_fused(cv_vectors, corpus)
+
+    assert len(scores) == len(expected)
+    for j, job_id in enumerate(corpus.job_ids):
+        assert abs(scores[j] - expected[job_id]) < 1e-5
+
+
+def test_rank_returns_sorted_top_k():
+    job_map = _job_map()
+    cv_vectors = _cv_vectors()
+    matcher = DenseMatcher(mode="fused")
+
+    ranked = matcher.rank(cv_vectors, ChunkCorpus.from_job_map(job_map), top_k=4)
+    expected = sorted(
+        DenseMatcher(mode="parallel").compute_batch_parallel(cv_vectors, job_map),
+        key=lambda x: x["final_score"],
+        reverse=True,
+    )[:4]
+
+    assert [r["job_id"] for r in ranked] == [r["job_id"] for r in expected]
+
+
+def test_zero_vector_scores_zero():
+    job_map = {"zero": [{"values": np.zeros(DIM)}], "one": [{"values": np.ones(DIM)}]}
+    scores = DenseMatcher(mode="fused").compute_fused([np.ones(DIM)], ChunkCorpus.from_job_map(job_map))
+    assert scores[0] == 0.0
+    assert abs(scores[1] - 1.0) < 1e-6
+
+
+def test_select_scores_subset_like_full_corpus():
+    job_map = _job_map()
+    cv_vectors = _cv_vectors()
+    matcher = DenseMatcher(mode="fused")
+    corpus = ChunkCorpus.from_job_map(job_map)
+
+    full = dict(zip(corpus.job_ids, matcher.compute_fused(cv_vectors, corpus)))
+    subset = corpus.select([3, 0, 7])
+    scores = matcher.compute_fused(cv_vectors, subset)
+
+    assert subset.job_ids == [corpus.job_ids[3], corpus.job_ids[0], corpus.job_ids[7]]
+    for job_id, score in zip(subset.job_ids, scores):
+        assert abs(score - full[job_id]) < 1e-6
+
+
+@pytest.mark.parametrize("aggregation", ["mean", "topm"])
+def test_select_shares_matrix_across_blocks(aggregation):
+    corpus = ChunkCorpus.from_job_map(_job_map(n_jobs=60))
+    groups = [_cv_vectors(n=3, seed=2), _cv_vectors(n=2, seed=3)]
+    # 연속 구간 / 촘촘한 구간 / 드문 구간 / 역순을 작은 블록으로 계산해도 복사한 corpus와 같은 점수
+    for positions in [list(range(10, 30)), [p for p in range(60) if p % 5], [1, 17, 44, 58], [9, 8, 3, 40, 41]]:
+        subset = corpus.select(positions)
+        copied = ChunkCorpus(
+            np.concatenate([corpus.matrix[corpus.offsets[p]:corpus.offsets[p + 1]] for p in positions]),
+            subset.offsets,
+            subset.job_ids,
+        )
+        assert subset.matrix is corpus.matrix
+        for block_rows in (7, 32768):
+            matcher = DenseMatcher(mode="fused", block_rows=block_rows, aggregation=aggregation)
+            np.testing.assert_allclose(matcher.compute_fused(groups[0], subset), matcher.compute_fused(groups[0], copied), atol=1e-5)
+            np.testing.assert_allclose(matcher.compute_fused_batch(groups, subset), matcher.compute_fused_batch(groups, copied), atol=1e-5)
+        # select를 다시 해도 원래 행렬 기준 행 구간을 유지
+        np.testing.assert_allclose(
+            DenseMatcher(mode="fused").compute_fused(groups[0], subset.select([1, 0])),
+            DenseMatcher(mode="fused").compute_fused(groups[0], copied.select([1, 0])),
+            atol=1e-5,
+        )
+
+
+def test_batch_matches_single_resume_scoring():
+    job_map = _job_map()
+    corpus = ChunkCorpus.from_job_map(job_map)
+    groups = [_cv_vectors(n=3, seed=2), [], _cv_vectors(n=5, seed=3), _cv_vectors(n=1, seed=4)]
+    # block_rows를 작게 잡아 배치 블록 경계도 함께 검증
+    matcher = DenseMatcher(mode="fused", block_rows=16)
+
+    scores = matcher.compute_fused_batch(groups, corpus)
+    assert scores.shape == (len(groups), corpus.num_jobs)
+    assert not scores[1].any()
+    for r, group in enumerate(groups):
+        if group:
+            np.testing.assert_allclose(scores[r], matcher.compute_fused(group, corpus), atol=1e-5)
+
+    ranked = matcher.rank_batch(groups, corpus, top_k=4)
+    assert ranked[1] == []
+    assert [r["job_id"] for r in ranked[2]] == [r["job_id"] for r in matcher.rank(groups[2], corpus, top_k=4)]
+
+
+def _reference_scores(cv_vectors, job_map, aggregation, top_m=3, threshold=0.4):
+    cv = np.asarray(cv_vectors, dtype=np.float64)
+    cv /= np.linalg.norm(cv, axis=1, keepdims=True)
+    scores = {}
+    for job_id, chunks in job_map.items():
+        jd = np.asarray([c["values"] for c in chunks], dtype=np.float64)
+        sims = cv @ (jd / np.linalg.norm(jd, axis=1, keepdims=True)).T
+        if aggregation == "mean":
+            scores[job_id] = sims.mean()
+        elif aggregation == "maxsim":
+            scores[job_id] = sims.max(axis=1).mean()
+        elif aggregation == "topm":
+            scores[job_id] = np.sort(sims, axis=1)[:, ::-1][:, :top_m].mean()
+        else:
+            scores[job_id] = (sims.max(axis=1) >= threshold).mean()
+    return scores
+
+
+def test_aggregations_match_reference():
+    job_map = _job_map()
+    cv_vectors = _cv_vectors()
+    corpus = ChunkCorpus.from_job_map(job_map)
+
+    for aggregation in ["mean", "maxsim", "topm", "coverage"]:
+        expected = _reference_scores(cv_vectors, job_map, aggregation, threshold=0.2)
+        # block_rows를 작게 잡아 Job 경계 블록 분할도 함께 검증
+        fused = DenseMatcher(mode="fused", block_rows=7, aggregation=aggregation, coverage_threshold=0.2)
+        scores = fused.compute_fused(cv_vectors, corpus)
+        for j, job_id in enumerate(corpus.job_ids):
+            assert abs(scores[j] - expected[job_id]) < 1e-5, aggregation
+
+        parallel = DenseMatcher(mode="parallel", aggregation=aggregation, coverage_threshold=0.2)
+        for r in parallel.compute_batch_parallel(cv_vectors, job_map):
+            assert abs(r["final_score"] - expected[r["job_id"]]) < 1e-5, aggregation
+
+
+def test_aggregation_batch_matches_single_resume():
+    corpus = ChunkCorpus.from_job_map(_job_map())
+    groups = [_cv_vectors(n=3, seed=2), [], _cv_vectors(n=5, seed=3)]
+    matcher = DenseMatcher(mode="fused", block_rows=16, aggregation="topm", top_m=2)
+
+    scores = matcher.compute_fused_batch(groups, corpus)
+    assert not scores[1].any()
+    np.testing.assert_allclose(scores[0], matcher.compute_fused(groups[0], corpus), atol=1e-5)
+    np.testing.assert_allclose(scores[2], matcher.compute_fused(groups[2], corpus), atol=1e-5)
+
+
+def test_unknown_aggregation_raises():
+    with pytest.raises(ValueError):
+        DenseMatcher(aggregation="median")
@@ -0,0 +1,51 @@
+"""
+blocking 단계 offload (run_blocking) 테스트
+
+실행 방법:
+pytest backend/tests/test_offload.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from get_similarity.utils.offload import StageTimeoutError, run_blocking
+
+
+def _slow(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def test_concurrent_blocking_stages_overlap_and_keep_loop_free():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_blocking("embed", _slow, 0.2, i) for i in range(4)))
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    assert results == [0, 1, 2, 3]
+    # 순차 실행(0.8s)이 아니라 겹쳐서 실행되고, 그동안 event loop도 계속 동작
+    assert elapsed < 0.6
+    assert ticks >= 5
+
+
+def test_stage_timeout():
+    async def main():
+        return await run_blocking("score", _slow, 0.3, "late", timeout=0.05)
+
+    with pytest.raises(StageTimeoutError) as exc_info:
+        asyncio.run(main())
+    assert exc_info.value.stage == "score"
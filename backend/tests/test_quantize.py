@@ -0,0 +1,102 @@
+"""
+JD 청크 벡터 압축 (fp16 / int8 / PQ) 테스트
+
+실행 방법:
+pytest backend/tests/test_quantize.py -v
+"""
+
+
+import numpy as np
+import pytest
+
+from get_similarity.index import SnapshotWriter, build_snapshot_quantized, get_snapshot_quantized, load_snapshot
+from get_similarity.index.quantize import Float16Codec, Int8Codec, VectorCodec, train_codec
+from get_similarity.utils.matcher import ChunkCorpus, DenseMatcher
+
+DIM = 32
+
+
+def _vectors(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("method,max_error,ratio", [("fp16", 1e-3, 2), ("int8", 3e-2, 4), ("pq", 0.25, 16)])
+def test_scores_on_codes_approximate_float32(method, max_error, ratio):
+    vectors = _vectors()
+    queries = _vectors(5, seed=1)
+    codec = train_codec(method, vectors)
+    codes = codec.encode(vectors)
+
+    assert 4 * DIM / codec.bytes_per_vector(DIM) == ratio
+    assert codes.nbytes * ratio == vectors.nbytes
+    # code에서 바로 계산한 점수 = 복원 벡터와의 내적 ≈ float32 점수
+    scores = codec.scores(queries, codes)
+    np.testing.assert_allclose(scores, queries @ codec.decode(codes).T, atol=1e-4)
+    assert np.abs(scores - queries @ vectors.T).max() < max_error
+
+
+def test_int8_scale_is_computed_block_by_block(tmp_path):
+    vectors = _vectors(1001)
+    np.save(tmp_path / "vectors.npy", vectors)
+    mmap = np.load(tmp_path / "vectors.npy", mmap_mode="r")
+
+    codec = Int8Codec.train(mmap, block_rows=64)
+    np.testing.assert_allclose(codec.scale, np.abs(vectors).max(axis=0) / 127)
+    assert codec.block_rows == 64
+
+
+@pytest.mark.parametrize("method", ["int8", "pq"])
+def test_quantized_corpus_rank_with_exact_rescore(method):
+    vectors = _vectors()
+    offsets = np.arange(0, len(vectors) + 1, 5)
+    job_ids = [f"wd_{j}" for j in range(len(offsets) - 1)]
+    exact_corpus = ChunkCorpus(vectors, offsets, job_ids)
+    codec = train_codec(method, vectors)
+    corpus = ChunkCorpus(codec.encode(vectors), offsets, job_ids, codec=codec)
+    cv = list(vectors[offsets[3]:offsets[4]] + 0.1 * _vectors(5, seed=2))
+    matcher = DenseMatcher(mode="fused")
+
+    exact = matcher.rank(cv, exact_corpus, top_k=5)
+    coarse = matcher.rank(cv, corpus.select(np.arange(len(job_ids))), top_k=15)
+    assert coarse[0]["job_id"] == "wd_3"
+    # 상위 후보를 float32로 다시 계산하면 정확한 점수와 순위가 복원됨
+    positions = [job_ids.index(job["job_id"]) for job in coarse]
+    rescored = matcher.rank(cv, exact_corpus.select(positions), top_k=5)
+    assert [job["job_id"] for job in rescored] == [job["job_id"] for job in exact]
+    assert rescored[0]["final_score"] == pytest.approx(exact[0]["final_score"])
+
+
+def test_snapshot_quantized_roundtrip(tmp_path):
+    vectors = _vectors(40)
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    for j in range(8):
+        writer.add_job(f"wd_{j}", vectors[j * 5:(j + 1) * 5])
+    writer.commit()
+    snapshot = load_snapshot(str(tmp_path))
+
+    assert get_snapshot_quantized(snapshot) is None
+    built = build_snapshot_quantized(snapshot, method="int8", block_rows=16)
+    loaded = get_snapshot_quantized(snapshot)
+    assert loaded.method == "int8" and loaded.compression_ratio() == 4
+    np.testing.assert_array_equal(np.asarray(loaded.codes), built.codes)
+
+
+def test_incomplete_codec_fails_at_construction():
+    class NoScores(VectorCodec):
+        method = "broken"
+
+        def encode(self, vectors):
+            return vectors
+
+        def decode(self, codes):
+            return codes
+
+        def bytes_per_vector(self, dim):
+            return dim
+
+    with pytest.raises(TypeError):
+        NoScores()
+    assert isinstance(Float16Codec(), VectorCodec)
+
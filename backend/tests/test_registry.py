@@ -0,0 +1,54 @@
+"""
+프로세스 단위 리소스 레지스트리 테스트 (Pinecone/Upstage 호출 없이 get_db를 대체해서 검증)
+
+실행 방법:
+pytest backend/tests/test_registry.py -v
+"""
+
+import asyncio
+
+import get_similarity.registry as registry_module
+from get_similarity.registry import ResourceRegistry
+
+
+def _patch_get_db(monkeypatch, fake_index):
+    calls = []
+    index = fake_index(dim=4096)
+
+    def fake_get_db(db_path, emb_model, collection, db_type, check_status=True):
+        calls.append(check_status)
+        return object(), index
+
+    monkeypatch.setattr(registry_module, "load_embedding_model", lambda: object())
+    monkeypatch.setattr(registry_module, "get_db", fake_get_db)
+    monkeypatch.setattr(registry_module, "DB_TYPE", "Pinecone")
+    return calls, index
+
+
+def test_resources_built_once(monkeypatch, fake_index):
+    calls, index = _patch_get_db(monkeypatch, fake_index)
+    registry = ResourceRegistry()
+
+    first = registry.resources()
+    second = registry.resources()
+
+    assert first is not None and first == second
+    # 요청 경로에서는 상태 확인(describe_index_stats)을 하지 않음
+    assert calls == [False]
+    assert index.stats_calls == 0
+
+
+def test_lifespan_runs_background_health_check(monkeypatch, fake_index):
+    calls, index = _patch_get_db(monkeypatch, fake_index)
+    registry = ResourceRegistry(health_interval=0.01)
+
+    async def scenario():
+        await registry.start()
+        await asyncio.sleep(0.05)
+        await registry.stop()
+
+    asyncio.run(scenario())
+
+    assert calls == [False]
+    assert index.stats_calls >= 1
+    assert registry.status()["healthy"] is True
@@ -0,0 +1,68 @@
+"""
+/matching 결과 캐시 / 인덱스 버전 stamp 테스트
+
+실행 방법:
+pytest backend/tests/test_result_cache.py -v
+"""
+
+import time
+
+import numpy as np
+
+from get_similarity.index import BM25Index, SnapshotWriter, bump_index_version, index_version
+from get_similarity.utils.result_cache import ResultCache
+
+
+RESULT = (["요약"], ["https://example.com/1"], ["회사"])
+
+
+def test_hit_requires_same_resume_filter_and_version():
+    cache = ResultCache(max_items=8, ttl=60)
+    cache.put("이력서", {"location": "Korea", "job_type": "fulltime"}, "v1", RESULT)
+
+    # 필터 순서/대소문자는 key에 영향 없음
+    assert cache.get("이력서", {"job_type": "FullTime", "location": "korea"}, "v1") == RESULT
+    assert cache.get("이력서", {"location": "USA"}, "v1") is None
+    assert cache.get("다른 이력서", {"location": "Korea", "job_type": "fulltime"}, "v1") is None
+
+
+def test_version_change_invalidates_and_stale_put_is_dropped():
+    cache = ResultCache()
+    cache.put("이력서", {}, "v1", RESULT)
+    assert cache.get("이력서", {}, "v2") is None
+    assert cache.stats()["items"] == 0
+
+    # v1으로 시작한 매칭이 인덱스 교체 후 끝난 경우 저장하지 않음
+    cache.put("이력서", {}, "v1", RESULT)
+    assert cache.stats() == {"items": 0, "version": "v2", "hits": 0, "misses": 1}
+
+
+def test_ttl_and_lru_eviction():
+    cache = ResultCache(max_items=2, ttl=0.05)
+    cache.put("a", {}, "v", 1)
+    cache.put("b", {}, "v", 2)
+    assert cache.get("a", {}, "v") == 1
+    cache.put("c", {}, "v", 3)  # 가장 오래 사용하지 않은 b 삭제
+    assert cache.get("b", {}, "v") is None
+    assert cache.get("a", {}, "v") == 1
+
+    time.sleep(0.06)
+    assert cache.get("c", {}, "v") is None
+
+
+def test_index_version_tracks_snapshot_and_stamp(tmp_path):
+    snapshot_root, bm25, stamp = str(tmp_path / "snapshot"), str(tmp_path / "bm25"), str(tmp_path / "index_version")
+    before = index_version(snapshot_root, bm25, stamp)
+
+    bump_index_version(stamp)
+    after_bump = index_version(snapshot_root, bm25, stamp)
+    assert after_bump != before
+
+    writer = SnapshotWriter(snapshot_root, dim=4)
+    writer.add_job("wd_1", np.ones((2, 4)), metadata={})
+    writer.commit()
+    after_snapshot = index_version(snapshot_root, bm25, stamp)
+    assert after_snapshot != after_bump
+
+    BM25Index().build(["Python 백엔드"], ["wd_1__c0000"]).save(bm25)
+    assert index_version(snapshot_root, bm25, stamp) != after_snapshot
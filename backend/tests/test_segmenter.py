@@ -0,0 +1,77 @@
+"""
+HierarchicalSegmenter 테스트 (기존 구현 util/segmenter.py와 출력 동일 여부, 원문 offset)
+
+실행 방법:
+pytest backend/tests/test_segmenter.py -v
+"""
+
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+from get_similarity.utils.segmenter import HierarchicalSegmenter
+from util.segmenter import HierarchicalSegmenter as LegacySegmenter
+
+
+MARKDOWN_CV = """# 홍길동
+
+## 경력
+### **결제 플랫폼 팀**
+**기간:** 2021.03 - 2023.02
+**개요:** 월 거래액 1조 규모 결제 시스템의 백엔드 개발과 운영을 담당했으며 정산 도메인의 신규 서비스 설계를 맡았습니다
+- **Python**과 FastAPI로 결제 API 서버를 설계하고 운영했습니다
+- Kafka 기반 실시간 `event` 파이프라인 구축으로 처리 지연을 40% 줄였습니다
+- [사내 MLOps 플랫폼](https://example.com) 도입을 주도했습니다
+---
+## 기술
+- Python, Go, Kafka, PostgreSQL, AWS, Kubernetes 기반 서비스 운영 및 장애 대응 경험
+"""
+
+PLAIN_JD = """
+Backend Engineer | 핀테크 스타트업
+우리 회사는 핀테크 솔루션을 제공하는 스타트업입니다. 현재 백엔드 개발자를 찾고 있습니다.
+
+주요 업무:
+• API 개발 및 유지보수를 담당합니다. 데이터베이스 설계 및 최적화가 필요합니다!
+• 서버 아키텍처를 구축하고 관리합니다.
+
+자격 요건: Python 또는 Java 3년 이상 경험이 필요합니다? AWS 또는 GCP 사용 경험을 우대합니다.
+"""
+
+
+def test_output_matches_legacy_segmenter():
+    sample = (backend_dir / "get_similarity" / "data" / "sample_resume.txt").read_text(encoding="utf-8")
+    docs = [MARKDOWN_CV, PLAIN_JD, sample, "", "짧은 글", "a. . b | c•d\n\n. e"]
+    for min_len, max_len in [(100, 300), (20, 80)]:
+        segmenter = HierarchicalSegmenter(min_len, max_len)
+        legacy = LegacySegmenter(min_len, max_len)
+        for doc in docs:
+            assert segmenter.segment(doc) == legacy.segment(doc)
+            assert segmenter._segment_plaintext(doc) == legacy._segment_plaintext(doc)
+
+
+def test_markdown_offsets_point_to_source_lines():
+    segmenter = HierarchicalSegmenter(min_chunk_length=20, max_chunk_length=120)
+    chunks = segmenter.segment_with_offsets(MARKDOWN_CV)
+
+    assert [c["text"] for c in chunks] == segmenter.segment(MARKDOWN_CV)
+    overview = next(c for c in chunks if " - 개요: " in c["text"])
+    assert MARKDOWN_CV[overview["start"]:overview["end"]].startswith("**개요:**")
+    for chunk in chunks:
+        source = MARKDOWN_CV[chunk["start"]:chunk["end"]].splitlines()
+        # 원문 범위의 첫 줄 / 마지막 줄 내용이 청크 본문에 포함됨
+        for line in (source[0], source[-1]):
+            assert segmenter._parse_line(line.strip())[2] in chunk["text"]
+
+
+def test_plaintext_offsets_cover_sentences():
+    segmenter = HierarchicalSegmenter(min_chunk_length=20, max_chunk_length=60)
+    chunks = segmenter.segment_with_offsets(PLAIN_JD)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        source = PLAIN_JD[chunk["start"]:chunk["end"]]
+        # 구분자(| •)와 공백 차이를 제외하면 청크 문장과 원문 범위가 같음
+        assert [w for w in source.split() if w not in ("|", "•")] == chunk["text"].split()
+    # 청크 범위는 원문 순서대로 겹치지 않음
+    assert all(a["end"] <= b["start"] for a, b in zip(chunks, chunks[1:]))
@@ -0,0 +1,88 @@
+"""
+로컬 JD 벡터 스냅샷 테스트
+
+실행 방법:
+pytest backend/tests/test_snapshot.py -v
+"""
+
+
+import numpy as np
+
+from get_similarity.index import SnapshotWriter, build_snapshot_from_pinecone, get_snapshot, load_snapshot
+from get_similarity.utils.matcher import DenseMatcher
+
+
+DIM = 16
+
+
+def _random_jobs(n_jobs=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return {f"job{j}": rng.standard_normal((2 + j, DIM)).astype(np.float32) for j in range(n_jobs)}
+
+
+def test_snapshot_roundtrip(tmp_path):
+    jobs = _random_jobs()
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    for job_id, vecs in jobs.items():
+        writer.add_job(job_id, vecs, metadata={"company": job_id})
+    version = writer.commit()
+
+    snapshot = load_snapshot(str(tmp_path))
+    assert snapshot.version == version
+    assert snapshot.num_jobs == len(jobs)
+    assert snapshot.num_rows == sum(len(v) for v in jobs.values())
+    assert isinstance(snapshot.vectors, np.memmap)
+    assert snapshot.metadata("job3") == {"company": "job3"}
+    # 저장 시 L2 정규화
+    np.testing.assert_allclose(np.linalg.norm(snapshot.job_vectors(2), axis=1), 1.0, rtol=1e-5)
+
+
+def test_get_snapshot_reloads_new_version(tmp_path):
+    assert get_snapshot(str(tmp_path)) is None
+
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    writer.add_job("job0", np.ones((2, DIM)))
+    first = writer.commit()
+    assert get_snapshot(str(tmp_path)).version == first
+    assert get_snapshot(str(tmp_path)) is get_snapshot(str(tmp_path))
+
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    writer.add_job("job1", np.ones((3, DIM)))
+    second = writer.commit()
+    assert get_snapshot(str(tmp_path)).version == second
+    assert get_snapshot(str(tmp_path)).job_ids == ["job1"]
+
+
+def test_build_snapshot_from_pinecone(tmp_path, fake_index):
+    jobs = _random_jobs(n_jobs=4)
+    index = fake_index(dim=DIM)
+    index.upsert([{"id": f"{job_id}__c{i:04d}", "values": v.tolist(), "metadata": {"company": job_id}} for job_id, vecs in jobs.items() for i, v in enumerate(vecs)])
+    build_snapshot_from_pinecone(index, str(tmp_path), batch_size=4)
+
+    snapshot = load_snapshot(str(tmp_path))
+    assert snapshot.job_ids == sorted(jobs)
+    for j, job_id in enumerate(snapshot.job_ids):
+        expected = jobs[job_id] / np.linalg.norm(jobs[job_id], axis=1, keepdims=True)
+        np.testing.assert_allclose(snapshot.job_vectors(j), expected, rtol=1e-5, atol=1e-6)
+    assert snapshot.chunk_ids[:2] == ["job0__c0000", "job0__c0001"]
+
+
+def test_matcher_scores_snapshot_like_job_map(tmp_path):
+    jobs = _random_jobs()
+    writer = SnapshotWriter(str(tmp_path), dim=DIM)
+    for job_id, vecs in jobs.items():
+        writer.add_job(job_id, vecs)
+    writer.commit()
+    snapshot = load_snapshot(str(tmp_path))
+
+    rng = np.random.default_rng(1)
+    cv_vectors = [rng.standard_normal(DIM) for _ in range(3)]
+    job_embeddings_map = {jid: [{"values": v} for v in vecs] for jid, vecs in jobs.items()}
+
+    matcher = DenseMatcher(num_workers=2)
+    from_snapshot = {r["job_id"]: r["final_score"] for r in matcher.compute_from_snapshot(cv_vectors, snapshot)}
+    from_map = {r["job_id"]: r["final_score"] for r in matcher.compute_batch_parallel(cv_vectors, job_embeddings_map)}
+
+    assert from_snapshot.keys() == from_map.keys()
+    for job_id in from_map:
+        assert abs(from_snapshot[job_id] - from_map[job_id]) < 1e-5
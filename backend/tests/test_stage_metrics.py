@@ -0,0 +1,32 @@
+"""
+검색 단계별 latency / recall 계측 테스트
+
+실행 방법:
+pytest backend/tests/test_stage_metrics.py -v
+"""
+
+import time
+
+from get_similarity.utils.stage_metrics import StageMetrics, recall_at_k
+
+
+def test_timer_records_latency_percentiles():
+    metrics = StageMetrics(window=3)
+    for _ in range(4):
+        with metrics.timer("rerank"):
+            time.sleep(0.002)
+    metrics.record("candidate_jobs", 10)
+
+    stats = metrics.stats()
+    # window를 넘은 오래된 측정값은 버림
+    assert stats["rerank"]["count"] == 3
+    assert 2 <= stats["rerank"]["p50"] <= stats["rerank"]["p95"]
+    assert stats["candidate_jobs"]["mean"] == 10
+
+    metrics.clear()
+    assert metrics.stats() == {}
+
+
+def test_recall_at_k():
+    assert recall_at_k(["a", "b", "c"], ["a", "b", "d", "e"]) == 0.5
+    assert recall_at_k([], []) == 1.0
@@ -1,33 +1,29 @@
-from configs import UPSTAGE_API_KEY
+from configs import UPSTAGE_API_KEY, STAGE_TIMEOUTS
+import os
+import aiohttp
 import requests
 
-def run_parser(pdf_path):
-    """
-    Upstage API를 사용하여 PDF에서 텍스트를 추출합니다.
-    """
-    url = "https://api.upstage.ai/v1/document-digitization"
-    headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
-    files = {"document": open(pdf_path, "rb")}
-    data = {
-        "ocr": "force",
-        "base64_encoding": "['table']",
-        "model": "document-parse",
-        "output_formats": "['markdown', 'text']"
-    }
+PARSER_URL = "https://api.upstage.ai/v1/document-digitization"
+PARSER_DATA = {
+    "ocr": "force",
+    "base64_encoding": "['table']",
+    "model": "document-parse",
+    "output_formats": "['markdown', 'text']"
+}
 
-    response = requests.post(url, headers=headers, files=files, data=data)
 
+def _parse_response(pdf_path, status_code, response_data, response_text):
+    """
+    Upstage document-parse 응답을 검사하고 (contents, coordinates, full_contents)로 변환합니다.
+    """
     # ✅ 응답 검사
-    try:
-        response_data = response.json()
-    except Exception as e:
-        print(" JSON 파싱 실패:", e)
-        print("응답 원문:", response.text)
+    if response_data is None:
+        print("응답 원문:", response_text)
         raise Exception("Upstage API 응답이 JSON 형식이 아닙니다")
 
-    if response.status_code != 200:
+    if status_code != 200:
         print("Upstage API 요청 실패")
-        print("Status Code:", response.status_code)
+        print("Status Code:", status_code)
         print("응답:", response_data)
         raise Exception("Upstage API 요청 실패")
 
@@ -48,3 +44,41 @@ def run_parser(pdf_path):
     print(f"{pdf_path}에서 텍스트 추출 완료")
     return contents, coordinates, full_contents
 
+
+def run_parser(pdf_path, timeout=STAGE_TIMEOUTS["parse"]):
+    """
+    Upstage API를 사용하여 PDF에서 텍스트를 추출합니다.
+    """
+    headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
+    with open(pdf_path, "rb") as f:
+        response = requests.post(PARSER_URL, headers=headers, files={"document": f}, data=PARSER_DATA, timeout=timeout)
+
+    try:
+        response_data = response.json()
+    except Exception as e:
+        print(" JSON 파싱 실패:", e)
+        response_data = None
+    return _parse_response(pdf_path, response.status_code, response_data, response.text)
+
+
+async def arun_parser(pdf_path, timeout=STAGE_TIMEOUTS["parse"]):
+    """
+    run_parser의 비동기 버전 (aiohttp). 파싱을 기다리는 동안 event loop를 막지 않습니다.
+    timeout을 넘기면 asyncio.TimeoutError가 발생합니다.
+    """
+    headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
+    form = aiohttp.FormData()
+    for key, value in PARSER_DATA.items():
+        form.add_field(key, value)
+    with open(pdf_path, "rb") as f:
+        form.add_field("document", f.read(), filename=os.path.basename(pdf_path))
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        async with session.post(PARSER_URL, headers=headers, data=form) as response:
+            response_text = await response.text()
+            try:
+                response_data = await response.json(content_type=None)
+            except Exception as e:
+                print(" JSON 파싱 실패:", e)
+                response_data = None
+            return _parse_response(pdf_path, response.status, response_data, response_text)
@@ -1,3 +1,10 @@
+"""
+기존 HierarchicalSegmenter 구현 (줄마다 정규식 컴파일 / 여러 번 재분할)
+
+검색 경로는 get_similarity/utils/segmenter.py(단일 pass, 원문 offset 지원)를 사용합니다.
+이 파일은 출력 동일성 비교 기준으로만 유지합니다. (tests/test_segmenter.py, get_similarity/dev/bench_segmenter.py)
+"""
+
 import re
 from typing import List, Dict, Tuple, Any
 
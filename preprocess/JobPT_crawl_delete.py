@@ -7,14 +7,15 @@ from jobspy import scrape_jobs
 from datetime import datetime, timedelta
 
 def remove_old_jobs(csv_file, days_old=30):
+    """
+    date_posted가 days_old일보다 오래된 행을 제거합니다.
+    백업 파일을 복사하지 않고 임시 파일에 쓴 뒤 os.replace로 교체하므로, 실패하면 원본이 그대로 남습니다.
+    (이미 적재된 벡터의 마감 삭제는 preprocess ExpirySweeper가 담당)
+    """
+    tmp_file = csv_file + '.tmp'
     try:
-        backup_file = csv_file + '.backup'
-
         df = pd.read_csv(csv_file)
 
-        df.to_csv(backup_file, index=False)
-        print(f"백업 파일 생성: {backup_file}")
-
         if 'date_posted' not in df.columns:
             print(f"'date_posted' 열이 {csv_file}에 없습니다.")
             return 0
@@ -30,26 +31,22 @@ def remove_old_jobs(csv_file, days_old=30):
         df_filtered = df[(df['date_posted'] >= cutoff_date) | (~valid_dates)]
 
         removed_count = len(df) - len(df_filtered)
+        if removed_count == 0:
+            return 0
 
-        mask = df_filtered['date_posted'].notna()
-        df_filtered.loc[mask, 'date_posted'] = df_filtered.loc[mask, 'date_posted'].dt.strftime('%Y-%m-%d')
+        df_filtered = df_filtered.copy()
+        df_filtered['date_posted'] = df_filtered['date_posted'].dt.strftime('%Y-%m-%d')
 
-        df_filtered.to_csv(csv_file, index=False, quoting=csv.QUOTE_NONNUMERIC, escapechar="\\")
+        df_filtered.to_csv(tmp_file, index=False, quoting=csv.QUOTE_NONNUMERIC, escapechar="\\")
+        os.replace(tmp_file, csv_file)
 
         print(f"{csv_file}에서 {removed_count}개의 오래된 잡 포스팅을 삭제했습니다.")
-
-        if os.path.exists(backup_file):
-            os.remove(backup_file)
-            print("백업 파일 삭제됨")
-
         return removed_count
 
     except Exception as e:
         print(f"오류 발생: {e}")
-        if os.path.exists(backup_file):
-            print("백업에서 복구 중...")
-            pd.read_csv(backup_file).to_csv(csv_file, index=False)
-            print("복구 완료")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         return 0
 
 def scrape_jobs_for_countries(positions, countries, total_pages=4):
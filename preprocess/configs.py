@@ -12,6 +12,25 @@ PINECONE_INDEX = "korea-jd-dev"
 DB_PATH = "Pinecone"    #크로마에서만 사용
 COLLECTION = "semantic_0"   #크로마에서만 사용
 PROMPT_YAML = "get_similarity/data/prompt.yaml"
+# backend 결과 캐시 무효화용 인덱스 버전 stamp. backend configs.INDEX_VERSION_PATH와 같은 파일이어야 하므로
+# 실행 위치와 무관한 절대 경로(backend/data/index_version)를 쓰고, 배포 시에는 두 서비스에 같은 INDEX_VERSION_PATH 환경변수를 지정
+INDEX_VERSION_PATH = os.getenv("INDEX_VERSION_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "data", "index_version"))
+# JD 근사 중복(MinHash LSH) 인덱스. /upsert_jd가 공고마다 cluster_id를 부여하며 갱신 (backend configs.NEAR_DUP_PATH와 같은 인덱스, 설정값도 같아야 함)
+NEAR_DUP_PATH = os.getenv("NEAR_DUP_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "data", "near_dup"))
+NEAR_DUP_THRESHOLD = 0.8    #같은 cluster로 묶을 JD 본문 단어 shingle Jaccard 유사도
+NEAR_DUP_NUM_PERM = 128 #MinHash 해시 함수 수
+EXPIRY_COLLECTIONS = ["korea-jd-dev", "korea-jd-prod"]    #마감 공고를 정기 삭제할 인덱스 (서버 시작 시 존재하는 인덱스만)
+EXPIRY_SWEEP_INTERVAL = 86400   #마감 공고 삭제 주기(초), 마감일이 일 단위라 하루 1회
+EXPIRY_DELETE_BATCH = 1000  #마감 벡터 delete 호출 한 번에 보낼 ID 수 (Pinecone 제한 1000)
+EXPIRE_UNDATED_JOBS = True  #마감일이 없거나 파싱할 수 없는 공고(상시채용 등)도 삭제 (check_deadline 기준)
+CATALOG_PATH = "./data/catalog"     #인덱스 메타데이터 카탈로그 (SQLite, 인덱스마다 <collection>.sqlite, upsert/delete와 함께 갱신)
+CSV_BATCH_ROWS = 200    #/upsert_jd에서 CSV를 한 번에 읽는 행 수
+UPSERT_BATCH_SIZE = 100     #임베딩/upsert 한 번에 보내는 청크 수 (Pinecone 요청 크기 제한)
+EMBED_WORKERS = 4   #동시 임베딩 API 호출 수
+UPSERT_WORKERS = 2  #동시 Pinecone upsert 호출 수
+INGEST_QUEUE_SIZE = 4   #CSV 읽기 / 임베딩 / upsert 단계 사이에 쌓아 둘 최대 배치 수 (backpressure)
+INGEST_MAX_RETRIES = 5  #임베딩 / upsert 429 응답 재시도 횟수 (지수 backoff + jitter)
+EMBEDDING_MODEL = "solar-embedding-1-large" #JD 임베딩 모델 (청크 content_hash에 포함되므로 바꾸면 다음 적재 때 모든 청크를 다시 임베딩, backend와 같은 값)
 
 ### General api key
 UPSTAGE_API_KEY=os.getenv("UPSTAGE_API_KEY", "")
@@ -1,13 +1,16 @@
 from fastapi import FastAPI, File, UploadFile
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
+from contextlib import asynccontextmanager
 import os
+import sys
+import threading
 from dotenv import load_dotenv
 import pandas as pd
 
 from pinecone import Pinecone, ServerlessSpec
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_upstage import UpstageEmbeddings
 from langchain_upstage import UpstageEmbeddings
@@ -15,6 +18,17 @@ from tqdm import tqdm
 import yaml
 
 from utils import *
+from streaming import iter_chunk_batches, iter_csv_batches, iter_new_rows
+from configs import CATALOG_PATH, CSV_BATCH_ROWS, INDEX_VERSION_PATH, UPSERT_BATCH_SIZE
+from configs import EMBED_WORKERS, UPSERT_WORKERS, INGEST_QUEUE_SIZE, INGEST_MAX_RETRIES
+from configs import EXPIRY_COLLECTIONS, EXPIRY_SWEEP_INTERVAL, EXPIRY_DELETE_BATCH, EXPIRE_UNDATED_JOBS
+from configs import NEAR_DUP_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM, EMBEDDING_MODEL
+
+# 적재 파이프라인은 backend와 공유 (backend/get_similarity/utils/ingest.py, sys.path는 utils에서 추가)
+from get_similarity.utils.ingest import IngestPipeline, documents_to_records, plan_delta, reuse_vectors
+from get_similarity.index.catalog import CatalogedIndex, MetadataCatalog
+from get_similarity.index.dedup import load_near_dup_index
+from get_similarity.index.expiry import ExpirySweeper
 
 load_dotenv(dotenv_path="../backend/.env")
 prompts = yaml.safe_load(open("prompts.yaml", "r", encoding="utf-8"))
@@ -26,7 +40,52 @@ collection = "korea-jd-test"
 
 
 
-app = FastAPI()
+catalogs = {}
+sweepers = {}
+# 근사 중복 인덱스(NEAR_DUP_PATH)는 요청 간에 공유하는 파일이므로 로드 → 적재 → 저장을 한 요청씩 수행
+near_dup_lock = threading.Lock()
+
+
+def open_index(collection: str):
+    """
+    인덱스를 메타데이터 카탈로그(CATALOG_PATH/<collection>.sqlite)와 함께 엽니다.
+    반환된 index의 upsert / delete는 카탈로그에도 반영됩니다.
+    """
+    if collection not in catalogs:
+        catalogs[collection] = MetadataCatalog(os.path.join(CATALOG_PATH, f"{collection}.sqlite"))
+    return CatalogedIndex(pc.Index(collection), catalogs[collection])
+
+
+def get_sweeper(collection: str):
+    """인덱스별 마감 공고 sweeper (삭제가 있으면 backend /matching 결과 캐시 무효화)"""
+    if collection not in sweepers:
+        sweepers[collection] = ExpirySweeper(
+            open_index(collection),
+            interval=EXPIRY_SWEEP_INTERVAL,
+            batch_size=EXPIRY_DELETE_BATCH,
+            include_undated=EXPIRE_UNDATED_JOBS,
+            on_expire=lambda result: bump_index_version(INDEX_VERSION_PATH),
+        )
+    return sweepers[collection]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 마감 공고 정기 삭제 시작 (존재하는 인덱스만)
+    for name in EXPIRY_COLLECTIONS:
+        try:
+            if check_index(name)["message"]:
+                await get_sweeper(name).start()
+        except Exception as e:
+            print(f"[WARN] {name} 마감 공고 sweeper 시작 실패: {str(e)}")
+    yield
+    for sweeper in sweepers.values():
+        await sweeper.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
 def check_index(collection: str="korea-jd-test"):
     """
     인덱스 존재 여부를 조회합니다.
@@ -79,6 +138,11 @@ async def stat(collection: str="korea-jd-test"):
         index = pc.Index(index_name)
         stat = index.describe_index_stats()
         stat = stat.to_dict()
+        if index_name in sweepers:
+            stat["expiry"] = sweepers[index_name].status()
+        if index_name in catalogs:
+            # in_sync가 False면 /repair_catalog로 복구
+            stat["catalog"] = catalogs[index_name].status()
         return stat
     else:
         return {"message": "인덱스가 존재하지 않습니다"}
@@ -135,6 +199,14 @@ async def drop_index(collection: str="index-name-for-drop"):
     try:
         index_name = collection
         pc.delete_index(name=index_name)
+        if index_name in sweepers:
+            await sweepers.pop(index_name).stop()
+        if index_name in catalogs:
+            catalogs.pop(index_name).close()
+        catalog_file = os.path.join(CATALOG_PATH, f"{index_name}.sqlite")
+        for path in (catalog_file, f"{catalog_file}-wal", f"{catalog_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
         return {
             "index_name": index_name,
             "status": "success",
@@ -172,6 +244,69 @@ async def drop_index(collection: str="index-name-for-drop"):
 
 
 
+def run_ingest_pipeline(index, record_batches, desc="Upserting to Pinecone"):
+    """
+    레코드({"id", "text", "metadata"}) 배치를 임베딩 worker(EMBED_WORKERS) → upsert worker(UPSERT_WORKERS)로 겹쳐서 적재합니다.
+    429 응답은 backoff 후 재시도하고, 단계별 처리량(stats)을 반환합니다.
+    """
+    emb_model = UpstageEmbeddings(model=EMBEDDING_MODEL)
+    with tqdm(desc=desc, unit="chunk") as pbar:
+        pipeline = IngestPipeline(
+            emb_model.embed_documents,
+            lambda vectors: index.upsert(vectors=vectors),
+            embed_workers=EMBED_WORKERS,
+            upsert_workers=UPSERT_WORKERS,
+            queue_size=INGEST_QUEUE_SIZE,
+            max_retries=INGEST_MAX_RETRIES,
+            progress=pbar.update,
+        )
+        stats = pipeline.run(record_batches)
+    print(f"📊 적재 처리량: embed {stats['embed']['items_per_s']:.0f} / upsert {stats['upsert']['items_per_s']:.0f} chunks/s, "
+          f"재시도 embed {stats['embed']['retries']} / upsert {stats['upsert']['retries']}")
+    return stats
+
+
+def upsert_csv_stream(file, index):
+    """
+    업로드된 CSV를 CSV_BATCH_ROWS행씩 읽어 청킹하고, 카탈로그의 저장 청크 hash와 비교해 새 청크 / 바뀐 청크만
+    UPSERT_BATCH_SIZE개씩 임베딩/upsert합니다.
+    CSV 읽기와 청킹은 파이프라인 feeder thread에서 queue가 허용하는 만큼만 앞서 진행되므로
+    파일 크기와 무관하게 메모리 사용량이 일정하고, 첫 배치는 CSV 전체를 읽기 전에 적재됩니다.
+    공고마다 근사 중복 인덱스(NEAR_DUP_PATH)로 cluster_id를 부여하고, 적재가 끝나면 인덱스를 저장합니다.
+
+    Args:
+        index: open_index()로 연 CatalogedIndex
+    메타데이터(마감일, cluster_id 등)만 바뀐 청크는 임베딩하지 않고 저장된 벡터를 다시 써서 upsert합니다.
+
+    Returns:
+        result: {"upserted": 임베딩해서 적재한 청크 수, "updated": 메타데이터만 갱신한 청크 수, "unchanged": 건너뛴 청크 수, "orphans": 삭제할 벡터 ID}
+    """
+    result = {"upserted": 0, "updated": 0, "unchanged": 0, "orphans": []}
+
+    def changed_records(df):
+        records = documents_to_records(preprocess(df, near_dup_index))
+        # 배치 공고(Job ID / URL)의 저장 청크만 카탈로그에서 조회 (한 공고의 청크는 모두 같은 행 배치에 있음)
+        # → 청크 수가 줄어든 공고의 남는 청크, 같은 URL의 예전 랜덤 ID 벡터는 삭제 대상
+        stored = index.catalog.hashes(job_ids={r["metadata"]["job_id"] for r in records}, urls=df["url"].dropna())
+        delta = plan_delta(records, stored, full_sync=True)
+        vectors, missing = reuse_vectors(index, delta["update"])
+        for start in range(0, len(vectors), UPSERT_BATCH_SIZE):
+            index.upsert(vectors=vectors[start:start + UPSERT_BATCH_SIZE])
+        result["orphans"].extend(delta["delete"])
+        result["upserted"] += len(delta["upsert"]) + len(missing)
+        result["updated"] += len(vectors)
+        result["unchanged"] += delta["unchanged"]
+        return delta["upsert"] + missing
+
+    # 같은 파일 안의 중복 URL만 제거 (이미 적재된 공고도 다시 읽어 바뀐 청크를 찾음)
+    rows = iter_new_rows(iter_csv_batches(file, CSV_BATCH_ROWS), set())
+    with near_dup_lock:
+        near_dup_index = load_near_dup_index(NEAR_DUP_PATH, threshold=NEAR_DUP_THRESHOLD, num_perm=NEAR_DUP_NUM_PERM)
+        run_ingest_pipeline(index, iter_chunk_batches(rows, changed_records, UPSERT_BATCH_SIZE))
+        near_dup_index.save(NEAR_DUP_PATH)
+    return result
+
+
 @app.post("/upsert_jd")
 async def update_index(file: UploadFile, collection: str="korea-jd-dev"):
     """
@@ -190,71 +325,24 @@ async def update_index(file: UploadFile, collection: str="korea-jd-dev"):
         ### 요약전 인덱스 부터 chk
         index_name = collection
         result = check_index(collection)
-        index = pc.Index(index_name)
-        ids = get_all_ids(index)
-        url_set = set()
-        date_dicts = {}
-        
-        # Pinecone fetch API - URI 길이 제한 고려하여 100개씩 처리
-        batch_size = 100
-        print(f"총 {len(ids)}개 ID를 {batch_size}개씩 배치 처리...")
-        
-        for start_idx in tqdm(range(0, len(ids), batch_size), desc="Getting metadata from Pinecone"):
-            end_idx = min(start_idx + batch_size, len(ids))
-            batch_ids = ids[start_idx:end_idx]
-            
-            # 한 번에 여러 ID 가져오기
-            resp = index.fetch(ids=batch_ids)
-            
-            for vid, vector_data in resp.vectors.items():
-                metadata = vector_data.metadata
-                url_set.add(metadata["job_url"])
-                date_dicts[vid] = metadata["deadline"]
-        
-        print(f"📊 Pinecone에서 가져온 URL: {len(url_set)}개")
-        if result == False:
+        if result["message"] == False:
             raise ValueError("Index check failed: result is False")
+        sweeper = get_sweeper(index_name)
+        index = sweeper.index
 
-        uploaded_file = file.file
-        df = pd.read_csv(uploaded_file)
-        print(f"📊 CSV에서 읽은 데이터: {len(df)}개")
-        print(f"📊 Pinecone에 있는 URL: {len(url_set)}개")
-        
-        # INSERT_YOUR_CODE
-        # df["url"] 컬럼에서 url_set에 존재하는 url이 있는 행 제거
-        before = len(df)
-        df = df[~df["url"].isin(url_set)].reset_index(drop=True)
-        removed = before - len(df)
-        after = len(df)
-        
-        print(f"📊 처리 전: {before}개")
-        print(f"📊 처리 후: {after}개")
-        print(f"📊 제거된 행: {removed}개")
-
-        delete_ids = []
-        for k, v in date_dicts.items():
-            if check_deadline(v)==False:
-                delete_ids.append(k)
-        delete_vectors(index, delete_ids)
-        print(f"✅ {len(delete_ids)}개의 벡터가 삭제되었습니다.")
+        # 마감 공고는 적재 전에 삭제 (이번에 적재하는 공고는 다음 sweep 대상)
+        # 카탈로그를 처음 만든 경우에만 sweep 전에 전체 메타데이터를 한 번 훑어 채움 (어긋난 카탈로그는 /repair_catalog로 복구)
+        await asyncio.to_thread(sweeper.sweep)
 
-        total_chunks = preprocess(df)
+        # CSV 읽기 → 청킹 → hash 비교 → 바뀐 청크만 임베딩/upsert를 배치 단위로 스트리밍 (event loop를 막지 않도록 thread에서 실행)
+        result = await asyncio.to_thread(upsert_csv_stream, file.file, index)
+        print(f"✅ {result['upserted']}개 청크가 적재되었습니다. (메타데이터만 갱신 {result['updated']}개, 변경 없음 {result['unchanged']}개)")
 
-        # index = pc.Index(index_name)
+        # 남는 청크 / 같은 URL의 예전 벡터는 적재 후에 삭제
+        delete_vectors(index, result["orphans"])
 
-        # emb_model = OpenAIEmbeddings()
-        emb_model = UpstageEmbeddings(model="solar-embedding-1-large")
-
-        vector_store = PineconeVectorStore(index=index, embedding=emb_model)
-
-        ### 파인콘 API로 한번에 대용량 update가 불가능하여 배치처리
-        total = len(total_chunks)
-        batch_size = 100
-        for start in tqdm(range(0, total, batch_size), desc="Upserting to Pinecone"):
-            end = start + batch_size
-            batch_docs = total_chunks[start:end]
-            # print(batch_docs)
-            vector_store.add_documents(documents=batch_docs)
+        # backend /matching 결과 캐시 무효화
+        bump_index_version(INDEX_VERSION_PATH)
         return JSONResponse(
             status_code=200, 
             content={"message": "인덱스가 업데이트되었습니다"}
@@ -290,20 +378,15 @@ async def update_index(file: UploadFile, collection: str="test-custom-index"):
             index = pc.Index(index_name)
         uploaded_file = file.file
         df = pd.read_csv(uploaded_file)
-        total_chunks = make_documents_from_csv(df)
-        emb_model = UpstageEmbeddings(model="solar-embedding-1-large")
-
-        vector_store = PineconeVectorStore(index=index, embedding=emb_model)
+        total_chunks = documents_to_records(make_documents_from_csv(df))
 
         ### 파인콘 API로 한번에 대용량 update가 불가능하여 배치처리
-        total = len(total_chunks)
-        batch_size = 100
-        for start in tqdm(range(0, total, batch_size), desc="Upserting to Pinecone"):
-            end = start + batch_size
-
-            batch_docs = total_chunks[start:end]
-            # print(batch_docs)
-            vector_store.add_documents(documents=batch_docs)
+        batch_size = UPSERT_BATCH_SIZE
+        await asyncio.to_thread(
+            run_ingest_pipeline, index, (total_chunks[start:start + batch_size] for start in range(0, len(total_chunks), batch_size))
+        )
+        # backend /matching 결과 캐시 무효화
+        bump_index_version(INDEX_VERSION_PATH)
         return JSONResponse(
             status_code=200, 
             content={"message": "인덱스가 업데이트되었습니다"}
@@ -316,15 +399,51 @@ async def update_index(file: UploadFile, collection: str="test-custom-index"):
         )
 
 
+@app.post("/sweep_expired")
+async def sweep_expired(collection: str="korea-jd-dev"):
+    """
+    마감 공고 벡터를 바로 삭제합니다. (EXPIRY_SWEEP_INTERVAL마다 자동 실행되는 작업을 즉시 실행)
+
+    return: 삭제한 마감일 bucket 수, 벡터 수, delete 호출 수
+    """
+    try:
+        if check_index(collection)["message"] == False:
+            return JSONResponse(status_code=404, content={"message": "인덱스가 존재하지 않습니다"})
+        result = await asyncio.to_thread(get_sweeper(collection).sweep)
+        return {"collection": collection, **result}
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": str(e)})
+
+
+@app.post("/repair_catalog")
+async def repair_catalog(collection: str="korea-jd-dev"):
+    """
+    인덱스 전체(list + fetch)를 훑어 메타데이터 카탈로그를 인덱스와 다시 맞춥니다.
+    적재/삭제는 카탈로그를 함께 갱신하므로 평소에는 필요 없고, /stat의 catalog.in_sync가 False일 때
+    (카탈로그 반영 전에 서버가 종료됨, filter 삭제, 카탈로그를 거치지 않은 변경 등) 수동으로 실행합니다.
+
+    return: 동기화 후 카탈로그 상태
+    """
+    try:
+        if check_index(collection)["message"] == False:
+            return JSONResponse(status_code=404, content={"message": "인덱스가 존재하지 않습니다"})
+        index = open_index(collection)
+        await asyncio.to_thread(index.catalog.sync, index)
+        return {"collection": collection, **index.catalog.status()}
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"message": str(e)})
+
+
 @app.delete("/clear_index")
 async def clear_index(collection: str):
     """
     특정 컬렉션의 모든 데이터를 삭제합니다.
     """
     try:
-        index = pc.Index(collection)
+        index = open_index(collection)
         if len(index.describe_index_stats()["namespaces"]) > 0:
             index.delete(delete_all=True, namespace="")
+            bump_index_version(INDEX_VERSION_PATH)
             return JSONResponse(status_code=200, content={"message": f"{collection} 인덱스가 초기화되었습니다"})
         return JSONResponse(status_code=200, content={"message": "삭제할 데이터가 없습니다"})
     except Exception as e:
@@ -0,0 +1,51 @@
+"""
+/upsert_jd 스트리밍 적재용 generator 단계
+
+CSV 전체, 전체 청크 리스트를 메모리에 올리지 않고 배치 단위로 흘려보냅니다.
+(기존 청크 hash / 마감 벡터는 인덱스를 훑지 않고 로컬 카탈로그(get_similarity/index/catalog.py)에서 조회)
+
+    iter_csv_batches      CSV를 batch_rows행씩 읽음 (pd.read_csv chunksize)
+    iter_new_rows         이미 처리한 URL 행 제거 (파일 안 중복)
+    iter_chunk_batches    행 배치 → 청크(Document) → upsert 크기 배치
+
+청크 배치는 backend의 IngestPipeline(get_similarity/utils/ingest.py)이 feeder thread에서 소비하며,
+단계 사이 queue가 차면 CSV 읽기/청킹도 멈춥니다(backpressure).
+메모리 사용량은 (batch_rows행 + queue에 남은 배치) + 파일 안 중복 제거용 URL 집합으로, JD 본문 크기와 무관합니다.
+"""
+
+from typing import Callable, Iterable, Iterator, Set
+
+import pandas as pd
+
+
+def iter_csv_batches(file, batch_rows: int = 200) -> Iterator[pd.DataFrame]:
+    for df in pd.read_csv(file, chunksize=batch_rows):
+        yield df.reset_index(drop=True)
+
+
+def iter_new_rows(batches: Iterable[pd.DataFrame], url_set: Set[str], url_column: str = "url") -> Iterator[pd.DataFrame]:
+    """
+    url_set에 있는 URL 행을 제거합니다. 통과한 URL은 url_set에 추가되어 뒤 배치의 같은 URL도 제거됩니다.
+    (빈 집합을 넘기면 파일 안 중복만 제거되어, 한 공고의 청크가 항상 한 배치에 모임)
+    """
+    for df in batches:
+        before = len(df)
+        df = df[~df[url_column].isin(url_set)]
+        # URL이 없는 행은 서로 중복으로 보지 않음 (drop_duplicates는 NaN끼리 같은 값으로 취급)
+        df = df[df[url_column].isna() | ~df.duplicated(subset=url_column)].reset_index(drop=True)
+        url_set.update(df[url_column].dropna())
+        print(f"📊 CSV 배치 {before}행 → 신규 {len(df)}행 (제거 {before - len(df)}행)")
+        if len(df):
+            yield df
+
+
+def iter_chunk_batches(batches: Iterable[pd.DataFrame], make_chunks: Callable[[pd.DataFrame], list], batch_size: int = 100) -> Iterator[list]:
+    """행 배치마다 make_chunks로 청크를 만들고 batch_size개씩 묶어 내보냅니다. (마지막 배치는 더 작을 수 있음)"""
+    pending = []
+    for df in batches:
+        pending.extend(make_chunks(df))
+        while len(pending) >= batch_size:
+            yield pending[:batch_size]
+            pending = pending[batch_size:]
+    if pending:
+        yield pending
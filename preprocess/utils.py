@@ -12,6 +12,15 @@ from tqdm import tqdm
 import argparse
 from openai import OpenAI # openai==1.52.2
 from datetime import datetime
+import sys
+
+# 청크 ID 규칙 / 적재 파이프라인은 backend와 공유 (backend/get_similarity/utils/)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from get_similarity.utils.chunk_ids import make_chunk_id, stable_job_id
+from get_similarity.utils.ingest import set_hashes
+# backend /matching 결과 캐시 무효화용 stamp 갱신 (backend와 같은 함수, 경로는 configs.INDEX_VERSION_PATH)
+from get_similarity.index.version import bump_index_version
+from configs import EMBEDDING_MODEL
 ### 전역변수 가져와서 넣기
 # table = pd.read_csv("/home/yhkim/code/JobPT/backend/get_similarity/data/korean_jd_105.csv")
 
@@ -29,14 +38,15 @@ def build_embedding_sentence(table):
     f"\n\nurl: {x['url']}\n\njob_name: {x['job_name']}\n\ncompany_name: {x['company_name']}\n\nwelfare: {x['welfare']}"]), axis=1)
     return table
 
-def make_chunks(sentences, table):
+def make_chunks(sentences, table, near_dup_index=None):
     """
     청킹&구분자 제거 및 메타데이터 추출
-    입력: sentences(list), table(pandas DataFrame)
+    입력: sentences(list), table(pandas DataFrame), near_dup_index(NearDuplicateIndex, 있으면 공고마다 cluster_id 부여)
     출력: total_chunks(List(Document))
     """
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=100, separators=["<chunk_sep>","\r\n","\n\n", "\n", "\t", " ", ""])
     total_chunks = []
+    chunk_counts = {}
     
     ### 여기까지는 csv가 컬럼명을 그대로 가지고 온다 null 값만 chk해서 메타데이터 그대로 사용
     for i, desciption in enumerate(sentences):
@@ -47,12 +57,23 @@ def make_chunks(sentences, table):
         "summary": table.iloc[i]["summary"],
         "deadline": table.iloc[i]["deadline"]
         }]
+        ### 같은 공고(URL)는 다시 올려도 같은 청크 ID "<job_id>__c<NNNN>" → 재업로드 시 바뀐 청크만 임베딩
+        job_id = stable_job_id(meta_data[0], desciption)
+        meta_data[0]["job_id"] = job_id
+        ### 문구만 조금 바뀐 재등록 공고는 같은 cluster_id (backend 검색 시 점수가 가장 높은 하나만 추천)
+        ### 이미 있는 공고는 기존 cluster_id를 그대로 받음 (cluster_id만 바뀌어도 다시 임베딩하지 않고 메타데이터만 갱신)
+        if near_dup_index is not None:
+            meta_data[0]["cluster_id"] = near_dup_index.add(job_id, table.iloc[i]["description"])
         chunks = text_splitter.create_documents([desciption], meta_data)
 
         for chunk in chunks:
             chunk.page_content = chunk.page_content.replace("<chunk_sep>","")
-            # 빈 chunk는 추가하지 않음
+            # 빈 chunk는 추가하지 않음 (청크 번호는 0부터 연속)
             if chunk.page_content and chunk.page_content.strip():
+                chunk.id = make_chunk_id(job_id, chunk_counts.get(job_id, 0))
+                chunk_counts[job_id] = chunk_counts.get(job_id, 0) + 1
+                ### 본문 + 모델 hash가 같으면 재적재 시 임베딩하지 않음 (마감일 등 메타데이터만 바뀐 청크는 기존 벡터로 갱신)
+                set_hashes(chunk.metadata, chunk.page_content, EMBEDDING_MODEL)
                 total_chunks.append(chunk)
             else:
                 print(f"⚠️ Chunk {i} is empty, skipping...")
@@ -156,13 +177,13 @@ def delete_vectors(index, ids):
 
 
 
-def preprocess(table):
+def preprocess(table, near_dup_index=None):
     print("전처리를 시작합니다")
     table = table.drop_duplicates()
     table = build_embedding_sentence(table)
 
     sentences = table["sentence"]
-    total_chunks = make_chunks(sentences, table)
+    total_chunks = make_chunks(sentences, table, near_dup_index)
     print(f"문장처리&청킹 완료")
     print(f"원본 데이터 개수: {len(table)}")
     print(f"청크 개수: {len(total_chunks)}")